@@ -0,0 +1,142 @@
+"""
+BENCHMARK: ABR theo RTCP Receiver Report trên đường truyền bị nghẽn (giả lập).
+
+Tạo 3 bản chất lượng của cùng 1 video (frame ~40 / 20 / 8 KB ở 30 fps, khai báo trong
+"renditions" của <video>.json) và chạy Server thật với / không có --abr.
+Client headless nhận RTP qua 1 nút cổ chai giả lập: hàng đợi drop-tail --queue-kb
+được xả với tốc độ --link-mbit (gói không vừa hàng đợi bị coi là mất), gửi RTCP RR
+mỗi giây về cổng server_port trong header Transport.
+Frame "trọn vẹn" = mọi gói của frame đều qua được nút cổ chai (ảnh hiển thị được).
+
+Usage:
+    python -m benchmarks.bench_abr --link-mbit 6 --duration 30
+"""
+import argparse
+import os
+import socket
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from benchmarks.media import writeMjpeg
+from benchmarks.bench_sessions import startServer, stopServer, rtspRequest
+from src.common.media_info import MediaInfo
+from src.common.rtcp_packet import ReceiverReport, ReceptionStats
+from src.common.rtp_packet import RTP_CLOCK_RATE
+
+LADDER = [("bench.Mjpeg", 40000), ("bench_mid.Mjpeg", 20000), ("bench_low.Mjpeg", 8000)]
+
+def writeLadder(videoDir, frames):
+    for name, size in LADDER:
+        writeMjpeg(os.path.join(videoDir, name), frames, size)
+    MediaInfo(fps=30, frames=frames, renditions=[{"file": name} for name, _ in LADDER[1:]]).save(
+        os.path.join(videoDir, LADDER[0][0]))
+
+class Bottleneck:
+    """ Hàng đợi drop-tail xả với tốc độ cố định: accept() = gói có qua được không. """
+
+    def __init__(self, mbit, queueBytes):
+        self.rate = mbit * 1e6 / 8
+        self.queueBytes = queueBytes
+        self.freeAt = 0.0
+
+    def accept(self, size, now):
+        backlog = max(0.0, self.freeAt - now) * self.rate
+        if backlog + size > self.queueBytes:
+            return False
+        self.freeAt = max(now, self.freeAt) + size / self.rate
+        return True
+
+def receive(port, fileName, duration, link, interval):
+    rtp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    rtp.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+    rtp.bind(("127.0.0.1", 0))
+    rtp.settimeout(0.2)
+    rtcp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    rtpPort = rtp.getsockname()[1]
+    rtsp = socket.create_connection(("127.0.0.1", port))
+    reply = rtspRequest(rtsp, f"SETUP {fileName} RTSP/1.0\r\nCSeq: 1\r\n"
+                              f"Transport: RTP/AVP;unicast;client_port={rtpPort}-{rtpPort + 1}\r\n\r\n")
+    serverRtcp = None
+    for line in reply.splitlines():
+        if line.startswith("Transport:") and "server_port=" in line:
+            serverRtcp = int(line.split("server_port=")[1].split(';')[0].split('-')[1])
+    rtspRequest(rtsp, f"PLAY {fileName} RTSP/1.0\r\nCSeq: 2\r\n\r\n")
+
+    stats = ReceptionStats(RTP_CLOCK_RATE)
+    timeline = []
+    received = dropped = frames = frameBytes = 0
+    frameOk = True
+    start = time.perf_counter()
+    nextReport = start + 1.0
+    nextSample, sample = start + interval, [0, 0]
+    end = start + duration
+    try:
+        while True:
+            now = time.perf_counter()
+            if now >= end:
+                break
+            if now >= nextReport and serverRtcp:
+                block = stats.reportBlock()
+                if block is not None:
+                    rtcp.sendto(ReceiverReport(1, [block]).encode(), ("127.0.0.1", serverRtcp))
+                nextReport = now + 1.0
+            if now >= nextSample:
+                timeline.append((sample[0] / interval, sample[1] * 8 / interval / 1e6))
+                nextSample, sample = now + interval, [0, 0]
+            try:
+                data = rtp.recv(2048)
+            except socket.timeout:
+                continue
+            marker = data[1] >> 7
+            if link.accept(len(data), time.perf_counter()):
+                received += 1
+                stats.update(int.from_bytes(data[2:4], 'big'), int.from_bytes(data[4:8], 'big'),
+                             time.perf_counter(), int.from_bytes(data[8:12], 'big'))
+                frameBytes += len(data) - 12
+            else:
+                dropped += 1
+                frameOk = False
+            if marker:
+                if frameOk:
+                    frames += 1
+                    sample[0] += 1
+                    sample[1] += frameBytes
+                frameOk, frameBytes = True, 0
+    finally:
+        rtsp.close()
+        rtp.close()
+        rtcp.close()
+    return received, dropped, frames, timeline
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--link-mbit", type=float, default=6.0)
+    parser.add_argument("--queue-kb", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--interval", type=float, default=3.0, help="Độ dài mỗi mốc của timeline (giây)")
+    parser.add_argument("--mode", choices=["thread", "async"], default="thread")
+    parser.add_argument("--port", type=int, default=18562)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as videoDir:
+        writeLadder(videoDir, 30 * 120)
+        print(f"link={args.link_mbit:g} Mbit/s queue={args.queue_kb} KB, renditions 9.6 / 4.8 / 1.9 Mbit/s")
+        print(f"{'server':>8} {'loss':>7} {'good fps':>9} {'goodput':>9}   timeline (good fps / Mbit/s every {args.interval:g}s)")
+        for extra in ([], ["--abr"]):
+            proc = startServer(args.mode, args.port, videoDir, extra)
+            try:
+                link = Bottleneck(args.link_mbit, args.queue_kb * 1024)
+                received, dropped, frames, timeline = receive(args.port, LADDER[0][0], args.duration, link, args.interval)
+            finally:
+                stopServer(proc)
+            total = received + dropped
+            loss = dropped / total if total else 0.0
+            goodput = sum(rate for _, rate in timeline) / len(timeline) if timeline else 0.0
+            points = ' '.join(f"{fps:.0f}/{rate:.1f}" for fps, rate in timeline)
+            label = "abr" if extra else "fixed"
+            print(f"{label:>8} {loss:>7.1%} {frames / args.duration:>9.1f} {goodput:>9.2f}   {points}")
+
+if __name__ == "__main__":
+    main()
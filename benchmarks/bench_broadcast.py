@@ -0,0 +1,47 @@
+"""
+BENCHMARK: Chi phí CPU phía Server khi nhiều người xem cùng 1 nội dung.
+
+  unicast  : mỗi người xem 1 ServerWorker đọc + gửi riêng
+  broadcast: Server chạy với --broadcast, 1 BroadcastChannel đọc + ghi header 1 lần / frame
+             rồi phát cùng chuỗi gói tới mọi subscriber
+
+Báo cáo FPS nhận trung bình và CPU của tiến trình Server (% 1 core) theo số người xem.
+
+Usage:
+    python -m benchmarks.bench_broadcast --mode thread --subscribers 10 50 100 200
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from benchmarks.media import writeMjpeg
+from benchmarks.bench_sessions import measure
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["thread", "async"], default="thread")
+    parser.add_argument("--subscribers", type=int, nargs="+", default=[10, 50, 100, 200])
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--frame-size", type=int, default=20000)
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--port", type=int, default=18554)
+    args = parser.parse_args()
+
+    fileName = "bench.Mjpeg"
+    with tempfile.TemporaryDirectory() as videoDir:
+        writeMjpeg(os.path.join(videoDir, fileName), 30 * 120, args.frame_size)
+        print(f"mode={args.mode} frame={args.frame_size}B nominal={args.fps}fps cpus={os.cpu_count()}")
+        print(f"{'subs':>6} {'unicast fps':>12} {'CPU':>6} {'broadcast fps':>14} {'CPU':>6}")
+        for n in args.subscribers:
+            row = []
+            for extra in ([], ["--broadcast", fileName]):
+                rates, _, cpu = measure(args.mode, args.port, videoDir, fileName, n, args.duration, args.fps, extra)
+                row.append((sum(rates) / len(rates), cpu))
+            (uFps, uCpu), (bFps, bCpu) = row
+            fmt = lambda cpu: f"{cpu:.0%}" if cpu is not None else "-"
+            print(f"{n:>6} {uFps:>12.1f} {fmt(uCpu):>6} {bFps:>14.1f} {fmt(bCpu):>6}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+BENCHMARK: FEC (parity XOR, --fec K) so với gửi lại theo NACK qua 1 proxy UDP mất gói cục bộ.
+
+Server gửi RTP tới cổng của LossyProxy thay vì tới Client; proxy bỏ ngẫu nhiên --loss gói và giữ
+mỗi gói --delay-ms trước khi chuyển tiếp. Chiều ngược lại (RTCP NACK từ Client) đi qua 1 proxy giống
+hệt -> RTT = 2 x delay. Client headless dùng FrameReassembler như RtspCore.
+- good fps   : frame đủ mảnh trả ra cho bộ giải mã.
+- delay      : thời gian frame phải chờ thêm (p50 / p95) so với frame đến nhanh nhất - chờ vá gói làm hình đứng.
+              Mỗi frame mang số thứ tự của nó, Server phát frame i đúng lúc start + i / 30.
+- overhead   : byte FEC / byte video Server gửi (metric rtp_fec_bytes_sent_total / rtp_bytes_sent_total).
+
+Usage:
+    python -m benchmarks.bench_fec --loss 0.03 --delay-ms 50 --duration 20
+"""
+import argparse
+import heapq
+import os
+import random
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from benchmarks.media import makeFrame
+from benchmarks.bench_sessions import startServer, stopServer, rtspRequest
+from benchmarks.bench_nack import fetchMetrics, metricValue
+from src.client.reassembler import FrameReassembler
+from src.client.rtp_receiver import parseRtp
+from src.common.rtcp_packet import GenericNack
+from src.common.fec_packet import FEC_PT
+
+FPS = 30
+
+def writeNumbered(path, frameCount, frameSize):
+    """ MJPEG tổng hợp (header 6 số) với số thứ tự frame ghi ngay sau SOI. """
+    rng = random.Random(953)
+    body = makeFrame(frameSize, rng)
+    with open(path, 'wb') as f:
+        for i in range(frameCount):
+            frame = body[:2] + i.to_bytes(4, 'big') + body[6:]
+            f.write(str(len(frame)).zfill(6).encode())
+            f.write(frame)
+
+class LossyProxy:
+    """ Chuyển tiếp datagram UDP tới target, bỏ ngẫu nhiên loss, trễ delay giây (1 thread). """
+
+    def __init__(self, target, loss, delay, seed):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.settimeout(0.001)
+        self.port = self.sock.getsockname()[1]
+        self.target = target
+        self.loss = loss
+        self.delay = delay
+        self.rng = random.Random(seed)
+        self.out = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.running = True
+        self.forwarded = self.dropped = 0
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self):
+        queue, counter = [], 0
+        while self.running:
+            now = time.perf_counter()
+            while queue and queue[0][0] <= now:
+                self.out.sendto(heapq.heappop(queue)[2], self.target)
+                self.forwarded += 1
+            try:
+                data = self.sock.recv(65536)
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            if self.rng.random() < self.loss:
+                self.dropped += 1
+                continue
+            counter += 1
+            heapq.heappush(queue, (time.perf_counter() + self.delay, counter, data))
+
+    def close(self):
+        self.running = False
+        self.thread.join()
+        self.sock.close()
+        self.out.close()
+
+def receive(port, fileName, duration, loss, delay, seed):
+    rtp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    rtp.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+    rtp.bind(("127.0.0.1", 0))
+    rtp.settimeout(0.005)
+    rtcp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    downlink = LossyProxy(rtp.getsockname(), loss, delay, seed)
+    rtsp = socket.create_connection(("127.0.0.1", port))
+    reply = rtspRequest(rtsp, f"SETUP {fileName} RTSP/1.0\r\nCSeq: 1\r\n"
+                              f"Transport: RTP/AVP;unicast;client_port={downlink.port}-{downlink.port + 1}\r\n\r\n")
+    uplink = None
+    for line in reply.splitlines():
+        if line.startswith("Transport:") and "server_port=" in line:
+            serverRtcp = int(line.split("server_port=")[1].split(';')[0].split('-')[1])
+            uplink = LossyProxy(("127.0.0.1", serverRtcp), loss, delay, seed + 1)
+    rtspRequest(rtsp, f"PLAY {fileName} RTSP/1.0\r\nCSeq: 2\r\n\r\n")
+
+    reassembler = FrameReassembler()
+    emitted = []
+    ssrc = 0
+    start = time.perf_counter()
+    end = start + duration
+    try:
+        while True:
+            now = time.perf_counter()
+            if now >= end:
+                break
+            lost = reassembler.poll(now)
+            if lost and uplink is not None:
+                rtcp.sendto(GenericNack(1, ssrc, lost).encode(), ("127.0.0.1", uplink.port))
+            try:
+                data = rtp.recv(2048)
+            except socket.timeout:
+                continue
+            now = time.perf_counter()
+            packet = parseRtp(memoryview(data), len(data))
+            if packet is None:
+                continue
+            marker, pt, seq, timestamp, ssrc, payload, info = packet
+            if pt == FEC_PT:
+                reassembler.pushParity(payload, now, timestamp)
+            else:
+                reassembler.push(seq, marker, payload, now, timestamp, info)
+            for frame, _, _ in reassembler.frames():
+                if frame[:2] == b'\xff\xd8' and frame[-2:] == b'\xff\xd9':
+                    emitted.append(now - int.from_bytes(frame[2:6], 'big') / FPS)
+        metrics = fetchMetrics(rtsp, fileName, 3)
+    finally:
+        rtsp.close()
+        rtp.close()
+        rtcp.close()
+        downlink.close()
+        if uplink is not None:
+            uplink.close()
+    # Chờ thêm của từng frame so với frame đến sớm nhất (theo lịch phát của Server)
+    base = min(emitted, default=0.0)
+    delays = sorted(t - base for t in emitted)
+    stats = reassembler.stats()
+    media = metricValue(metrics, 'rtp_bytes_sent_total')
+    return {'fps': len(emitted) / duration,
+            'p50': delays[len(delays) // 2] if delays else 0.0,
+            'p95': delays[int(len(delays) * 0.95)] if delays else 0.0,
+            'overhead': metricValue(metrics, 'rtp_fec_bytes_sent_total') / media if media else 0.0,
+            'fec': stats['fecRecovered'], 'nack': stats['recovered'], 'dropped': stats['dropped']}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--loss", type=float, default=0.03)
+    parser.add_argument("--delay-ms", type=float, default=50.0, help="Trễ 1 chiều của proxy (RTT = 2 x)")
+    parser.add_argument("--k", type=int, nargs="+", default=[4, 8], help="Các cỡ nhóm FEC cần đo")
+    parser.add_argument("--frame-kb", type=int, default=40)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--mode", choices=["thread", "async"], default="thread")
+    parser.add_argument("--port", type=int, default=18582)
+    args = parser.parse_args()
+
+    configs = [("none", ["--rtx-window", "0"]), ("nack", [])]
+    for k in args.k:
+        configs.append((f"fec K={k}", ["--rtx-window", "0", "--fec", str(k)]))
+        configs.append((f"fec K={k}+nack", ["--fec", str(k)]))
+
+    with tempfile.TemporaryDirectory() as videoDir:
+        writeNumbered(os.path.join(videoDir, "bench.Mjpeg"), FPS * 120, args.frame_kb * 1000)
+        print(f"loss={args.loss:.1%} each way, RTT={2 * args.delay_ms:g} ms, frame={args.frame_kb} KB @ 30 fps, {args.duration:g}s")
+        print(f"{'server':>15} {'good fps':>9} {'delay p50/p95':>14} {'overhead':>9} {'vá FEC':>7} {'vá NACK':>8} {'bỏ frame':>9}")
+        for label, extra in configs:
+            proc = startServer(args.mode, args.port, videoDir, extra)
+            try:
+                r = receive(args.port, "bench.Mjpeg", args.duration, args.loss, args.delay_ms / 1000, 953)
+            finally:
+                stopServer(proc)
+            print(f"{label:>15} {r['fps']:>9.1f} {r['p50'] * 1000:>6.0f}/{r['p95'] * 1000:>4.0f}ms {r['overhead']:>9.1%} "
+                  f"{r['fec']:>7} {r['nack']:>8} {r['dropped']:>9}")
+
+if __name__ == "__main__":
+    main()
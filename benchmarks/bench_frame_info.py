@@ -0,0 +1,108 @@
+"""
+BENCHMARK: Header extension FRAME_INFO (chỉ số mảnh, số mảnh, kích thước frame) - mô phỏng offline có NACK.
+
+Luồng 30 fps các JPEG tổng hợp, kích thước đổi theo từng frame (như MJPEG thật). --join mảnh đầu tiên của luồng bị mất
+(Client nhận gói đầu ở giữa frame 0, các mảnh trước đó vẫn xin gửi lại được), đường truyền mất gói theo cụm (--loss, trung bình --burst gói liền nhau),
+gói NACK được gửi lại sau --rtt ms (gói gửi lại cũng có thể mất). So sánh FrameReassembler:
+  marker : chỉ có Marker / SOI / RTP Timestamp để biết biên frame (luồng không có extension).
+  info   : gói kèm FRAME_INFO - ghép ngay frame đang tới khi vào luồng / sau khi bỏ 1 frame (NACK các mảnh trước),
+           buffer frame cấp đúng kích thước.
+- first frame : thời gian từ gói đầu tiên tới frame đầu tiên đưa cho bộ giải mã.
+- good / dropped : frame trọn vẹn / bị bỏ.
+- us/pkt : CPU của FrameReassembler (push + poll + frames) cho mỗi gói.
+
+Usage:
+    python -m benchmarks.bench_frame_info --loss 0 0.01 0.03 --frames 3000
+"""
+import argparse
+import heapq
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from benchmarks.media import makeFrame
+from src.client.reassembler import FrameReassembler
+from src.server.packetizer import MAX_RTP_PAYLOAD
+
+FPS = 30
+
+def makePackets(frameCount, frameSize, seed):
+    """ Gói Server gửi: (lúc gửi, seq, marker, payload, timestamp, info). """
+    rng = random.Random(seed)
+    bodies = [makeFrame(frameSize + rng.randrange(-frameSize // 3, frameSize // 3 + 1), rng) for _ in range(16)]
+    packets = []
+    seq = rng.randrange(65536)
+    for i in range(frameCount):
+        frame = bodies[rng.randrange(len(bodies))]
+        fragments = [frame[j:j + MAX_RTP_PAYLOAD] for j in range(0, len(frame), MAX_RTP_PAYLOAD)]
+        for j, fragment in enumerate(fragments):
+            sentAt = (i + j / len(fragments)) / FPS
+            info = (i, j, len(fragments), len(frame))
+            packets.append((sentAt, seq & 0xFFFF, int(j == len(fragments) - 1), fragment, i * 90000 // FPS, info))
+            seq += 1
+    return packets
+
+def run(packets, join, loss, burst, rtt, frameInfo, seed):
+    rng = random.Random(seed)
+    reassembler = FrameReassembler()
+    arrivals = []
+    lossy = False
+    for counter, packet in enumerate(packets):
+        # Mất gói theo cụm: vào trạng thái mất với xác suất loss / burst, ở lại với xác suất 1 - 1 / burst
+        lossy = rng.random() < (1 - 1 / burst if lossy else loss / burst)
+        if not lossy and counter >= join:
+            heapq.heappush(arrivals, (packet[0] + rtt / 2, counter, counter))
+    counter = len(packets)
+    newest = 0
+    good = 0
+    firstFrame = firstPacket = None
+    cpu = 0.0
+    received = 0
+    while arrivals:
+        now, _, index = heapq.heappop(arrivals)
+        _, seq, marker, payload, timestamp, info = packets[index]
+        newest = max(newest, index)
+        start = time.perf_counter()
+        lost = reassembler.poll(now)
+        reassembler.push(seq, marker, payload, now, timestamp, info if frameInfo else None)
+        frames = [frame for frame, count, _ in reassembler.frames() if count]
+        cpu += time.perf_counter() - start
+        received += 1
+        if firstPacket is None:
+            firstPacket = now
+        if frames and firstFrame is None:
+            firstFrame = now
+        good += len(frames)
+        for lostSeq in lost:
+            if rng.random() >= loss:
+                # Seq 16 bit -> gói gần nhất (đã gửi) mang Seq đó
+                counter += 1
+                heapq.heappush(arrivals, (now + rtt, counter, newest - ((packets[newest][1] - lostSeq) & 0xFFFF)))
+    stats = reassembler.stats()
+    return {'first': (firstFrame - firstPacket) * 1000, 'good': good, 'dropped': stats['dropped'],
+            'usPerPacket': cpu / received * 1e6}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--loss", type=float, nargs="+", default=[0.0, 0.01, 0.03])
+    parser.add_argument("--burst", type=float, default=4, help="Số gói mất liền nhau trung bình")
+    parser.add_argument("--rtt", type=float, default=40, help="ms")
+    parser.add_argument("--join", type=int, default=5, help="Số mảnh đầu luồng bị mất")
+    parser.add_argument("--frame-kb", type=int, default=60)
+    parser.add_argument("--frames", type=int, default=3000)
+    parser.add_argument("--seed", type=int, default=953)
+    args = parser.parse_args()
+
+    packets = makePackets(args.frames, args.frame_kb * 1000, args.seed)
+    print(f"{args.frames} frames x ~{args.frame_kb} KB @ {FPS} fps, burst={args.burst:g} pkt, rtt={args.rtt:g} ms, "
+          f"join at fragment {args.join}")
+    print(f"{'loss':>5} {'client':>7} {'first frame':>12} {'good':>6} {'dropped':>8} {'us/pkt':>7}")
+    for loss in args.loss:
+        for label, frameInfo in (("marker", False), ("info", True)):
+            r = run(packets, args.join, loss, args.burst, args.rtt / 1000, frameInfo, args.seed)
+            print(f"{loss:>5.0%} {label:>7} {r['first']:>9.0f} ms {r['good']:>6} {r['dropped']:>8} {r['usPerPacket']:>7.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+BENCHMARK: Tài nguyên Server bị giữ bởi Client bỏ đi không TEARDOWN.
+
+Mở N phiên (SETUP + PLAY) rồi bỏ rơi tất cả: 1 nửa đóng TCP ngay (Client crash),
+1 nửa giữ TCP nhưng im lặng (máy Client treo / mất mạng, không còn keepalive).
+Đo số thread, file descriptor và CPU của Server lúc đang phát, ngay sau khi bỏ rơi
+và sau khi hết --session-timeout.
+
+Usage:
+    python -m benchmarks.bench_idle_sessions --sessions 100 --timeout 5
+"""
+import argparse
+import os
+import socket
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from benchmarks.media import writeMjpeg
+from benchmarks.bench_sessions import startServer, stopServer, rtspRequest, threadCount, cpuSeconds
+
+def fdCount(pid):
+    """ Số file descriptor đang mở của Server (Linux /proc), None nếu không đọc được. """
+    try:
+        return len(os.listdir(f"/proc/{pid}/fd"))
+    except OSError:
+        return None
+
+def snapshot(label, pid, window=1.0):
+    cpuStart = cpuSeconds(pid)
+    time.sleep(window)
+    cpuEnd = cpuSeconds(pid)
+    cpu = (cpuEnd - cpuStart) / window if cpuStart is not None and cpuEnd is not None else None
+    cpuText = f"{cpu:6.1%}" if cpu is not None else "     ?"
+    print(f"{label:<24} threads={threadCount(pid)!s:>5}  fds={fdCount(pid)!s:>5}  cpu={cpuText}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["thread", "async"], default="thread")
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--timeout", type=int, default=5, help="--session-timeout của Server (0 = tắt, như trước)")
+    parser.add_argument("--port", type=int, default=18560)
+    args = parser.parse_args()
+
+    videoDir = tempfile.mkdtemp(prefix="bench_idle_")
+    fileName = "bench.Mjpeg"
+    writeMjpeg(os.path.join(videoDir, fileName), 3000, 20000)
+
+    proc = startServer(args.mode, args.port, videoDir, ["--session-timeout", str(args.timeout)])
+    sockets = []
+    try:
+        snapshot("idle server", proc.pid)
+        for _ in range(args.sessions):
+            rtp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            rtp.bind(("127.0.0.1", 0))
+            rtsp = socket.create_connection(("127.0.0.1", args.port))
+            rtspRequest(rtsp, f"SETUP {fileName} RTSP/1.0\r\nCSeq: 1\r\nTransport: RTP/UDP; client_port={rtp.getsockname()[1]}\r\n\r\n")
+            rtspRequest(rtsp, f"PLAY {fileName} RTSP/1.0\r\nCSeq: 2\r\n\r\n")
+            sockets.append((rtsp, rtp))
+        snapshot(f"{args.sessions} sessions playing", proc.pid)
+
+        # Bỏ rơi: nửa đầu đóng TCP (crash), nửa sau giữ TCP nhưng không gửi gì nữa
+        for rtsp, rtp in sockets[:args.sessions // 2]:
+            rtsp.close()
+            rtp.close()
+        snapshot("abandoned", proc.pid)
+
+        time.sleep(args.timeout + 1 if args.timeout > 0 else 1)
+        snapshot(f"after {args.timeout}s timeout", proc.pid)
+    finally:
+        stopServer(proc)
+        for rtsp, rtp in sockets:
+            rtsp.close()
+            rtp.close()
+
+if __name__ == "__main__":
+    main()
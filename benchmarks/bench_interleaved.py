@@ -0,0 +1,108 @@
+"""
+BENCHMARK: Thông lượng RTP/UDP so với RTP/AVP/TCP (interleaved, khung '$' trên kết nối RTSP) trên loopback.
+
+Chạy Server thật với --fps tăng dần (tải danh định = kích thước frame x fps). Client headless
+nhận như RtspCore: UDP -> recv từng datagram; TCP -> recv 64 KB rồi RtspMessageParser tách khung '$'.
+Cả 2 đều ghép frame bằng FrameReassembler. Frame "tốt" = JPEG trọn vẹn (SOI ... EOI).
+- good fps / Mbit/s : frame tốt nhận được mỗi giây và thông lượng tương ứng.
+- CPU client / server: ms CPU cho mỗi MB video nhận được (client: process_time, server: /proc).
+Chú ý: loopback không mất gói do mạng - UDP chỉ mất khi bộ đệm nhận tràn (Client đọc không kịp);
+TCP không mất gói nhưng Server bỏ cả frame khi bộ đệm gửi TCP còn đầy.
+
+Usage:
+    python -m benchmarks.bench_interleaved --frame-kb 200 --fps 30 120 240 --duration 10
+"""
+import argparse
+import os
+import socket
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from benchmarks.media import writeMjpeg
+from benchmarks.bench_sessions import startServer, stopServer, rtspRequest, cpuSeconds
+from src.client.reassembler import FrameReassembler
+from src.client.rtp_receiver import parseRtp
+from src.common.rtsp_parser import RtspMessageParser, InterleavedFrame
+
+def receive(port, fileName, duration, transport):
+    """ SETUP + PLAY rồi nhận trong duration giây. Trả về (số frame tốt, số byte frame tốt, CPU client). """
+    rtsp = socket.create_connection(("127.0.0.1", port))
+    rtp = None
+    if transport == "tcp":
+        spec = "RTP/AVP/TCP;unicast;interleaved=0-1"
+    else:
+        rtp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        rtp.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 2 * 1024 * 1024)
+        rtp.bind(("127.0.0.1", 0))
+        rtp.settimeout(0.05)
+        rtpPort = rtp.getsockname()[1]
+        spec = f"RTP/UDP; client_port={rtpPort}-{rtpPort + 1}"
+    rtspRequest(rtsp, f"SETUP {fileName} RTSP/1.0\r\nCSeq: 1\r\nTransport: {spec}\r\n\r\n")
+    # PLAY gửi không chờ phản hồi: ở chế độ TCP phản hồi đi chung luồng với gói RTP, parser tách ra
+    rtsp.sendall(f"PLAY {fileName} RTSP/1.0\r\nCSeq: 2\r\n\r\n".encode())
+
+    reassembler = FrameReassembler()
+    parser = RtspMessageParser()
+    rtsp.settimeout(0.05)
+    good = goodBytes = 0
+    cpuStart = time.process_time()
+    end = time.perf_counter() + duration
+    try:
+        while time.perf_counter() < end:
+            try:
+                if rtp is not None:
+                    packets = [rtp.recv(2048)]
+                else:
+                    data = rtsp.recv(65536)
+                    if not data:
+                        break
+                    packets = [m.data for m in parser.feed(data) if isinstance(m, InterleavedFrame) and m.channel == 0]
+            except socket.timeout:
+                continue
+            now = time.perf_counter()
+            for packet in packets:
+                marker, _, seq, timestamp, _, payload, info = parseRtp(memoryview(packet), len(packet))
+                reassembler.push(seq, marker, payload, now, timestamp, info)
+            for frame, _, _ in reassembler.frames():
+                if frame[:2] == b'\xff\xd8' and frame[-2:] == b'\xff\xd9':
+                    good += 1
+                    goodBytes += len(frame)
+        cpu = time.process_time() - cpuStart
+    finally:
+        rtsp.close()
+        if rtp is not None:
+            rtp.close()
+    return good, goodBytes, cpu
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frame-kb", type=int, default=200)
+    parser.add_argument("--fps", type=float, nargs="+", default=[30, 120, 240])
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--mode", choices=["thread", "async"], default="async")
+    parser.add_argument("--port", type=int, default=18592)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as videoDir:
+        writeMjpeg(os.path.join(videoDir, "bench.Mjpeg"), 10000, args.frame_kb * 1000)
+        print(f"mode={args.mode} frame={args.frame_kb} KB, {args.duration:g}s / run")
+        print(f"{'fps':>5} {'offered':>10} {'transport':>9} {'good fps':>9} {'Mbit/s':>8} {'client ms/MB':>13} {'server ms/MB':>13}")
+        for fps in args.fps:
+            offered = args.frame_kb * 8e3 * fps / 1e6
+            for transport in ("udp", "tcp"):
+                proc = startServer(args.mode, args.port, videoDir, ["--fps", str(fps)])
+                try:
+                    serverStart = cpuSeconds(proc.pid)
+                    good, goodBytes, cpu = receive(args.port, "bench.Mjpeg", args.duration, transport)
+                    serverEnd = cpuSeconds(proc.pid)
+                finally:
+                    stopServer(proc)
+                megabytes = goodBytes / 1e6 or 1
+                serverCpu = (serverEnd - serverStart) * 1000 / megabytes if serverStart is not None else float('nan')
+                print(f"{fps:>5g} {offered:>6.0f} Mb/s {transport:>9} {good / args.duration:>9.1f} "
+                      f"{goodBytes * 8 / args.duration / 1e6:>8.1f} {cpu * 1000 / megabytes:>13.2f} {serverCpu:>13.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+BENCHMARK: Chi phí của metric ServerMetrics trên mỗi frame gửi đi.
+
+Mỗi frame ServerWorker: 4 lần perf_counter() quanh lần đọc / gửi frame, 3 phép cộng vào
+SessionStats của phiên (frames/packets/bytes) + 1 lần ServerMetrics.recordFrame (3 histogram, 1 lock).
+So sánh với chi phí gửi 1 frame thật (RtpSender trên UDP loopback) để thấy phần trăm tăng thêm.
+
+Usage:
+    python -m benchmarks.bench_metrics --frames 20000 --frame-size 20000
+"""
+import argparse
+import os
+import socket
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from benchmarks.media import makeFrame
+from src.server.metrics import ServerMetrics
+from src.server.packetizer import PacketizedFrame, RtpSender
+
+def instrumentation(metrics, count):
+    stats = metrics.openSession(1)
+    perf = time.perf_counter
+    start = perf()
+    for _ in range(count):
+        lateness = max(0.0, perf() - perf())
+        t = perf()
+        read = perf() - t
+        t = perf()
+        send = perf() - t
+        stats.frames += 1
+        stats.packets += 15
+        stats.bytes += 20000
+        metrics.recordFrame(lateness, read, send)
+    return (perf() - start) / count
+
+def sending(frame, count):
+    sink = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sink.bind(("127.0.0.1", 0))
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sender = RtpSender(sock, sink.getsockname(), ssrc=1)
+    start = time.perf_counter()
+    for i in range(count):
+        sender.sendFrame(frame, i)
+    elapsed = (time.perf_counter() - start) / count
+    sock.close()
+    sink.close()
+    return elapsed, sender.mode
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=20000)
+    parser.add_argument("--frame-size", type=int, default=20000)
+    args = parser.parse_args()
+
+    metrics = ServerMetrics()
+    perFrame = instrumentation(metrics, args.frames)
+    sendCost, mode = sending(PacketizedFrame(makeFrame(args.frame_size)), args.frames)
+    render = time.perf_counter()
+    text = metrics.render()
+    render = time.perf_counter() - render
+
+    print(f"metrics per frame      : {perFrame * 1e6:6.2f} us")
+    print(f"send per frame ({mode:>7}): {sendCost * 1e6:6.2f} us  ({args.frame_size // 1000} KB frame)")
+    print(f"overhead               : {perFrame / sendCost:6.1%}")
+    print(f"scrape (render)        : {render * 1e3:6.2f} ms for {len(text.splitlines())} lines")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+BENCHMARK: Gửi lại gói mất theo RTCP NACK (RetransmitRing của Server) trên đường truyền mất gói ngẫu nhiên.
+
+Chạy Server thật với --rtx-window 0 (tắt gửi lại) và mặc định. Client headless dùng FrameReassembler
+như RtspCore, bỏ ngẫu nhiên --loss gói RTP nhận được (cả gói gửi lại) và gửi NACK về cổng
+server_port trong header Transport. --rtt-ms giả lập thời gian khứ hồi: NACK được giữ lại rồi mới gửi.
+Frame "tốt" = frame đủ mảnh, là JPEG trọn vẹn (SOI ... EOI, đúng kích thước).
+"ghép thẳng" = cách ghép cũ (nối payload tới Marker): frame tốt chỉ khi không mất gói nào.
+
+Usage:
+    python -m benchmarks.bench_nack --loss 0.02 --rtt-ms 20 --duration 20
+"""
+import argparse
+import heapq
+import os
+import random
+import socket
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from benchmarks.media import writeMjpeg
+from benchmarks.bench_sessions import startServer, stopServer, rtspRequest
+from src.client.reassembler import FrameReassembler
+from src.client.rtp_receiver import parseRtp
+from src.common.rtcp_packet import GenericNack
+
+def metricValue(text, name):
+    """ Tổng các mẫu của 1 metric trong text Prometheus. """
+    total = 0.0
+    for line in text.splitlines():
+        if line.startswith(name + ' ') or line.startswith(name + '{'):
+            total += float(line.rsplit(' ', 1)[1])
+    return total
+
+def fetchMetrics(sock, fileName, cseq):
+    """ Metric của Server qua RTSP GET_PARAMETER "metrics" (đọc đủ body theo Content-Length). """
+    body = "metrics\r\n"
+    reply = rtspRequest(sock, f"GET_PARAMETER {fileName} RTSP/1.0\r\nCSeq: {cseq}\r\n"
+                              f"Content-Type: text/parameters\r\nContent-Length: {len(body)}\r\n\r\n{body}").encode()
+    head, _, rest = reply.partition(b'\r\n\r\n')
+    length = 0
+    for line in head.decode().splitlines():
+        if line.lower().startswith("content-length:"):
+            length = int(line.split(':')[1])
+    while len(rest) < length:
+        chunk = sock.recv(65536)
+        if not chunk:
+            break
+        rest += chunk
+    return rest.decode(errors="replace")
+
+def receive(port, fileName, duration, loss, rtt, seed):
+    rng = random.Random(seed)
+    rtp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    rtp.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+    rtp.bind(("127.0.0.1", 0))
+    rtp.settimeout(0.005)
+    rtcp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    rtpPort = rtp.getsockname()[1]
+    rtsp = socket.create_connection(("127.0.0.1", port))
+    reply = rtspRequest(rtsp, f"SETUP {fileName} RTSP/1.0\r\nCSeq: 1\r\n"
+                              f"Transport: RTP/AVP;unicast;client_port={rtpPort}-{rtpPort + 1}\r\n\r\n")
+    serverRtcp = None
+    for line in reply.splitlines():
+        if line.startswith("Transport:") and "server_port=" in line:
+            serverRtcp = int(line.split("server_port=")[1].split(';')[0].split('-')[1])
+    rtspRequest(rtsp, f"PLAY {fileName} RTSP/1.0\r\nCSeq: 2\r\n\r\n")
+
+    reassembler = FrameReassembler()
+    pending = []            # (gửi lúc, thứ tự, gói NACK): giả lập nửa RTT đi của NACK
+    counter = 0
+    good = corrupt = naiveGood = dropped = 0
+    naiveOk = True
+    start = time.perf_counter()
+    end = start + duration
+    try:
+        while True:
+            now = time.perf_counter()
+            if now >= end:
+                break
+            lost = reassembler.poll(now)
+            if lost and serverRtcp:
+                counter += 1
+                heapq.heappush(pending, (now + rtt, counter, GenericNack(1, ssrc, lost).encode()))
+            while pending and pending[0][0] <= now:
+                rtcp.sendto(heapq.heappop(pending)[2], ("127.0.0.1", serverRtcp))
+            try:
+                data = rtp.recv(2048)
+            except socket.timeout:
+                continue
+            seq = int.from_bytes(data[2:4], 'big')
+            ssrc = int.from_bytes(data[8:12], 'big')
+            marker = data[1] >> 7
+            retransmit = reassembler.isRetransmission(seq)
+            if rng.random() < loss:
+                dropped += 1
+                if not retransmit:
+                    naiveOk = False
+            else:
+                _, _, _, timestamp, _, payload, info = parseRtp(memoryview(data), len(data))
+                reassembler.push(seq, marker, payload, time.perf_counter(), timestamp, info)
+            if marker and not retransmit:
+                naiveGood += naiveOk
+                naiveOk = True
+            for frame, _, _ in reassembler.frames():
+                if frame[:2] == b'\xff\xd8' and frame[-2:] == b'\xff\xd9':
+                    good += 1
+                else:
+                    corrupt += 1
+        metrics = fetchMetrics(rtsp, fileName, 3)
+    finally:
+        rtsp.close()
+        rtp.close()
+        rtcp.close()
+    stats = reassembler.stats()
+    return {'good': good, 'corrupt': corrupt, 'naive': naiveGood, 'dropped': stats['dropped'],
+            'recovered': stats['recovered'], 'lostPackets': dropped,
+            'retransmits': metricValue(metrics, 'rtp_retransmits_total'),
+            'skipped': metricValue(metrics, 'rtp_retransmits_skipped_total')}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--loss", type=float, default=0.02, help="Tỉ lệ gói RTP bị bỏ ở phía nhận")
+    parser.add_argument("--rtt-ms", type=float, default=20.0)
+    parser.add_argument("--frame-kb", type=int, default=40)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--mode", choices=["thread", "async"], default="thread")
+    parser.add_argument("--port", type=int, default=18572)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as videoDir:
+        writeMjpeg(os.path.join(videoDir, "bench.Mjpeg"), 30 * 120, args.frame_kb * 1000)
+        print(f"loss={args.loss:.1%} rtt={args.rtt_ms:g} ms frame={args.frame_kb} KB @ 30 fps, {args.duration:g}s")
+        print(f"{'server':>10} {'good fps':>9} {'ghép thẳng':>11} {'bỏ frame':>9} {'hỏng':>5} {'vá được':>8} {'gửi lại':>8} {'bỏ qua':>7}")
+        for label, extra in (("no-rtx", ["--rtx-window", "0"]), ("rtx", [])):
+            proc = startServer(args.mode, args.port, videoDir, extra)
+            try:
+                r = receive(args.port, "bench.Mjpeg", args.duration, args.loss, args.rtt_ms / 2000, 953)
+            finally:
+                stopServer(proc)
+            print(f"{label:>10} {r['good'] / args.duration:>9.1f} {r['naive'] / args.duration:>11.1f} "
+                  f"{r['dropped']:>9} {r['corrupt']:>5} {r['recovered']:>8} {r['retransmits']:>8.0f} {r['skipped']:>7.0f}")
+
+if __name__ == "__main__":
+    main()
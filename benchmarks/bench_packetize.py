@@ -0,0 +1,69 @@
+"""
+BENCHMARK: Số gói RTP/giây của đường gửi cũ (makeRtp cho từng gói) so với
+đường gửi pre-packetized (mảnh cắt sẵn + header template + buffer dùng lại).
+
+Đo 2 kiểu:
+  build : chỉ dựng gói (sendto là no-op) -> chi phí Python thuần cho mỗi gói.
+  send  : gửi thật qua UDP loopback.
+
+Usage:
+    python -m benchmarks.bench_packetize --frame-size 150000 --frames 2000
+"""
+import argparse
+import os
+import socket
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from benchmarks.media import makeFrame
+from src.server.packetizer import PacketizedFrame, RtpSender
+from src.server.server_worker import ServerWorker
+
+class NullSocket:
+    def sendto(self, data, address):
+        return len(data)
+
+def runLegacy(sock, address, frames, count):
+    worker = ServerWorker({})
+    worker.rtpSender = RtpSender(sock, address, ssrc=1234)
+    packets = 0
+    start = time.perf_counter()
+    for i in range(count):
+        data = frames[i % len(frames)].data
+        worker.sendFragments(data, i)
+        packets += (len(data) + ServerWorker.MAX_RTP_PAYLOAD - 1) // ServerWorker.MAX_RTP_PAYLOAD
+    return packets / (time.perf_counter() - start)
+
+def runPrepacketized(sock, address, frames, count):
+    sender = RtpSender(sock, address, ssrc=1234)
+    packets = 0
+    start = time.perf_counter()
+    for i in range(count):
+        packets += sender.sendFrame(frames[i % len(frames)], i)
+    return packets / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frame-size", type=int, default=150000)
+    parser.add_argument("--frames", type=int, default=2000)
+    args = parser.parse_args()
+
+    # 30 frame khác nhau, đã cắt mảnh sẵn như khi nằm trong FrameCache
+    frames = [PacketizedFrame(makeFrame(args.frame_size)) for _ in range(30)]
+    for frame in frames:
+        frame.fragments()
+
+    sink = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sink.bind(("127.0.0.1", 0))
+    udp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    address = sink.getsockname()
+
+    print(f"frame={args.frame_size // 1000} KB x {args.frames} frames")
+    for label, sock in (("build", NullSocket()), ("send", udp)):
+        legacy = runLegacy(sock, address, frames, args.frames)
+        fast = runPrepacketized(sock, address, frames, args.frames)
+        print(f"{label:>5}: legacy {legacy:>10,.0f} pkt/s | prepacketized {fast:>10,.0f} pkt/s | x{fast / legacy:.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+BENCHMARK: Lịch hiển thị frame - timer cố định vs PlayoutScheduler (RTP Timestamp 90 kHz) - mô phỏng offline.
+
+Server gửi --fps frame/giây, frame tới Client sau 20 ms + jitter (phân phối mũ, trung bình --jitter ms; --spike
+phần frame bị trễ thêm 5 chu kỳ frame, như khi mạng nghẽn thoáng qua), mỗi frame --frame-kb KB. Bên hiển thị:
+  timer-40ms : vòng gốc của ModernClient - nạp trước --prebuffer frame, mỗi 40 ms lấy 1 frame khỏi JitterBuffer.
+  scheduler  : PlayoutScheduler - nạp trước --prebuffer frame, mỗi 5 ms hỏi frame tới hạn; frame hiện đúng thời điểm
+               media + offset (làm mượt), frame trễ bị bỏ qua.
+  adaptive   : như scheduler, nạp trước tới khi JitterBuffer.occupancy() >= targetDelay() (theo jitter đo được),
+               delay của PlayoutScheduler bám targetDelay() trong suốt phiên.
+- shown fps   : số frame hiển thị / giây.
+- judder p95  : |khoảng cách 2 lần hiển thị - khoảng cách Timestamp của 2 frame đó| (ms).
+- latency     : lúc hiển thị - lúc Server gửi, đầu và cuối phiên (độ trễ cộng dồn nếu hiển thị chậm hơn nguồn).
+- peak MB     : byte frame lớn nhất JitterBuffer giữ cùng lúc.
+
+Usage:
+    python -m benchmarks.bench_playout --fps 30 --jitter 0 5 20 --prebuffer 60 --seconds 60
+"""
+import argparse
+import os
+import random
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.client.buffer import JitterBuffer
+from src.client.playout import PlayoutScheduler
+from src.common.rtp_packet import RTP_CLOCK_RATE
+
+BASE_DELAY = 0.02
+
+def makeArrivals(fps, seconds, jitter, spike, seed):
+    """ [(lúc tới Client, lúc Server gửi, RTP Timestamp)] theo thứ tự tới (frame bị trễ không vượt frame sau). """
+    rng = random.Random(seed)
+    base = rng.randrange(1 << 32)
+    arrivals, last = [], 0.0
+    for i in range(int(fps * seconds)):
+        sentAt = i / fps
+        delay = BASE_DELAY + (rng.expovariate(1 / jitter) if jitter > 0 else 0)
+        if rng.random() < spike:
+            delay += 5 / fps
+        last = max(last, sentAt + delay)
+        arrivals.append((last, sentAt, (base + round(i * RTP_CLOCK_RATE / fps)) & 0xFFFFFFFF))
+    return arrivals
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] if values else 0.0
+
+def simulate(arrivals, fps, prebuffer, mode, frameBytes):
+    """ mode: 'timer-40ms' | 'scheduler' | 'adaptive'. """
+    buffer = JitterBuffer()
+    playout = PlayoutScheduler(buffer, RTP_CLOCK_RATE)
+    scheduled = mode != 'timer-40ms'
+    tick = 0.005 if scheduled else 0.04
+    frame = bytes(frameBytes)
+    sentAt = {}                 # Thời điểm media -> lúc Server gửi
+    shown = []
+    i, now, started, peak = 0, 0.0, False, 0
+    end = arrivals[-1][0] + 1.0
+    while now < end:
+        while i < len(arrivals) and arrivals[i][0] <= now:
+            arrivedAt, sent, timestamp = arrivals[i]
+            media = playout.arrive(timestamp, arrivedAt)
+            sentAt[media] = sent
+            buffer.put((frame, 0, 0.0, media), arrivedAt)
+            peak = max(peak, buffer.size())
+            i += 1
+        if not started:
+            if mode == 'adaptive':
+                started = buffer.qsize() > 0 and buffer.occupancy() >= buffer.targetDelay()
+            else:
+                started = buffer.qsize() >= prebuffer
+            if started and scheduled:
+                playout.start(now)
+        if started:
+            item = playout.next(now) if scheduled else buffer.get()
+            if item is not None:
+                shown.append((now, sentAt[item[3]]))
+        now += tick
+    judder = [abs((b[0] - a[0]) - (b[1] - a[1])) * 1000 for a, b in zip(shown, shown[1:])]
+    duration = shown[-1][0] - shown[0][0] if len(shown) > 1 else 1.0
+    return {'fps': (len(shown) - 1) / duration, 'judder': percentile(judder, 0.95), 'shown': len(shown),
+            'latencyStart': (shown[0][0] - shown[0][1]) * 1000, 'latencyEnd': (shown[-1][0] - shown[-1][1]) * 1000,
+            'skipped': playout.skipped if scheduled else 0, 'peak': peak / 1e6}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fps", type=float, default=30)
+    parser.add_argument("--jitter", type=float, nargs="+", default=[0, 5, 20], help="ms")
+    parser.add_argument("--spike", type=float, default=0.01)
+    parser.add_argument("--prebuffer", type=int, default=60, help="Số frame nạp trước (timer-40ms / scheduler)")
+    parser.add_argument("--frame-kb", type=int, default=60)
+    parser.add_argument("--seconds", type=float, default=60)
+    parser.add_argument("--seed", type=int, default=953)
+    args = parser.parse_args()
+
+    print(f"{args.fps:g} fps x {args.seconds:g} s, spike={args.spike:.0%}, prebuffer={args.prebuffer} frames, "
+          f"~{args.frame_kb} KB/frame")
+    print(f"{'jitter':>7} {'display':>11} {'shown fps':>10} {'judder p95':>11} {'latency start/end':>18} "
+          f"{'skipped':>8} {'peak MB':>8}")
+    for jitter in args.jitter:
+        arrivals = makeArrivals(args.fps, args.seconds, jitter / 1000, args.spike, args.seed)
+        for mode in ("timer-40ms", "scheduler", "adaptive"):
+            r = simulate(arrivals, args.fps, args.prebuffer, mode, args.frame_kb * 1000)
+            print(f"{jitter:>5g}ms {mode:>11} {r['fps']:>10.1f} {r['judder']:>8.1f} ms "
+                  f"{r['latencyStart']:>7.0f}/{r['latencyEnd']:>6.0f} ms {r['skipped']:>8} {r['peak']:>8.1f}")
+
+if __name__ == "__main__":
+    main()
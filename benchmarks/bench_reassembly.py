@@ -0,0 +1,105 @@
+"""
+BENCHMARK: Ghép frame khi mất gói / đảo thứ tự / Server bỏ dở frame - mô phỏng offline, không cần Server.
+
+Luồng 30 fps các JPEG tổng hợp (SOI ... EOI), mỗi frame 1 RTP Timestamp (90 kHz). Trên đường truyền:
+--loss gói mất, --reorder gói đổi chỗ với gói kế, --truncate frame bị Server bỏ dở (gửi thiếu đuôi, không Marker,
+như khi socket non-blocking đầy). Không NACK / FEC: lỗ hổng không bao giờ được vá.
+  naive      : vòng nhận gốc - nối payload theo thứ tự đến, đóng frame khi thấy Marker.
+  reassembler: FrameReassembler (theo Seq + Timestamp, kiểm tra JPEG), CONCEAL tắt / bật.
+- good    : frame đưa cho bộ giải mã đúng từng byte với frame gốc.
+- corrupt : frame đưa cho bộ giải mã nhưng hỏng (thiếu mảnh, sai thứ tự, 2 frame gộp làm 1) - tốn 1 lần decode vô ích.
+- dropped / concealed : frame bị bỏ / được thay bằng frame tốt gần nhất (CONCEAL).
+
+Usage:
+    python -m benchmarks.bench_reassembly --loss 0 0.01 0.03 --frames 3000
+"""
+import argparse
+import os
+import random
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from benchmarks.media import makeFrame
+from src.client.reassembler import FrameReassembler
+from src.server.packetizer import MAX_RTP_PAYLOAD
+
+FPS = 30
+
+def makeStream(frameCount, frameSize, loss, reorder, truncate, seed):
+    """ Danh sách (đến lúc, seq, marker, payload, timestamp) sau khi qua đường truyền + tập frame gốc. """
+    rng = random.Random(seed)
+    bodies = [makeFrame(frameSize + rng.randrange(-frameSize // 10, frameSize // 10 + 1), rng) for _ in range(8)]
+    originals = set()
+    packets = []
+    seq = rng.randrange(65536)
+    for i in range(frameCount):
+        body = bodies[i % len(bodies)]
+        frame = body[:2] + i.to_bytes(4, 'big') + body[6:]
+        originals.add(frame)
+        fragments = [frame[j:j + MAX_RTP_PAYLOAD] for j in range(0, len(frame), MAX_RTP_PAYLOAD)]
+        complete = rng.random() >= truncate
+        if not complete:
+            fragments = fragments[:rng.randrange(1, len(fragments))]
+        for j, fragment in enumerate(fragments):
+            marker = int(complete and j == len(fragments) - 1)
+            arrival = (i + j / len(fragments)) / FPS
+            packets.append((arrival, seq & 0xFFFF, marker, fragment, i * 90000 // FPS))
+            seq += 1
+    packets = [p for p in packets if rng.random() >= loss]
+    for i in range(len(packets) - 1):
+        if rng.random() < reorder:
+            packets[i], packets[i + 1] = (packets[i + 1][0],) + packets[i][1:], (packets[i][0],) + packets[i + 1][1:]
+    return packets, originals
+
+def runNaive(packets, originals):
+    good = corrupt = 0
+    buffer = bytearray()
+    for _, _, marker, payload, _ in packets:
+        buffer += payload
+        if marker:
+            if bytes(buffer) in originals:
+                good += 1
+            else:
+                corrupt += 1
+            buffer = bytearray()
+    return {'good': good, 'corrupt': corrupt}
+
+def runReassembler(packets, originals, conceal):
+    reassembler = FrameReassembler()
+    reassembler.CONCEAL = conceal
+    good = corrupt = concealed = 0
+    for now, seq, marker, payload, timestamp in packets:
+        reassembler.poll(now)
+        reassembler.push(seq, marker, payload, now, timestamp)
+        for frame, count, _ in reassembler.frames():
+            if count == 0:
+                concealed += 1
+            elif bytes(frame) in originals:
+                good += 1
+            else:
+                corrupt += 1
+    stats = reassembler.stats()
+    return {'good': good, 'corrupt': corrupt, 'dropped': stats['dropped'], 'concealed': concealed}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--loss", type=float, nargs="+", default=[0.0, 0.01, 0.03])
+    parser.add_argument("--reorder", type=float, default=0.02)
+    parser.add_argument("--truncate", type=float, default=0.02)
+    parser.add_argument("--frame-kb", type=int, default=20)
+    parser.add_argument("--frames", type=int, default=3000)
+    parser.add_argument("--seed", type=int, default=953)
+    args = parser.parse_args()
+
+    print(f"{args.frames} frames x {args.frame_kb} KB @ {FPS} fps, reorder={args.reorder:.0%}, truncate={args.truncate:.0%}")
+    print(f"{'loss':>5} {'client':>20} {'good':>6} {'corrupt':>8} {'dropped':>8} {'concealed':>10}")
+    for loss in args.loss:
+        packets, originals = makeStream(args.frames, args.frame_kb * 1000, loss, args.reorder, args.truncate, args.seed)
+        rows = [("naive", runNaive(packets, originals)),
+                ("reassembler", runReassembler(packets, originals, False)),
+                ("reassembler+conceal", runReassembler(packets, originals, True))]
+        for label, r in rows:
+            print(f"{loss:>5.0%} {label:>20} {r['good']:>6} {r['corrupt']:>8} {r.get('dropped', '-'):>8} {r.get('concealed', '-'):>10}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+BENCHMARK: Số gói RTP/giây vòng nhận của Client xử lý được trên 1 core.
+
+Gửi sẵn --frames frame (RtpSender, UDP loopback, bộ đệm nhận đủ lớn để không mất gói) rồi chỉ đo phía nhận:
+  legacy : recv(20480) -> bytes mới / gói, RtpPacket().decode (copy header + payload), getPayload, push.
+  pooled : RtpReceiver (recv_into buffer cấp sẵn, cả lô), header đọc tại chỗ trên memoryview,
+           mảnh ghi thẳng vào buffer của frame (FrameReassembler.push nhận memoryview).
+Cả 2 đều cập nhật ReceptionStats như listenRtp. Yêu cầu để theo kịp MJPEG 1080p @ --fps:
+ceil(frame / 1400) gói x fps.
+
+Usage:
+    python -m benchmarks.bench_receive --frame-kb 300 --fps 60 --frames 8 --rounds 100
+"""
+import argparse
+import os
+import socket
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from benchmarks.media import makeFrame
+from src.client.reassembler import FrameReassembler
+from src.client.rtp_receiver import RtpReceiver
+from src.common.rtcp_packet import ReceptionStats
+from src.common.rtp_packet import RtpPacket, RTP_CLOCK_RATE
+from src.server.packetizer import PacketizedFrame, RtpSender, MAX_RTP_PAYLOAD
+
+def openPair():
+    sink = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sink.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 64 * 1024 * 1024)
+    sink.bind(("127.0.0.1", 0))
+    sender = RtpSender(socket.socket(socket.AF_INET, socket.SOCK_DGRAM), sink.getsockname(), ssrc=1234)
+    return sink, sender
+
+def fill(sender, frames, count, timestamp):
+    """ Gửi count frame vào socket nhận (chưa đọc). Trả về số gói đã gửi. """
+    packets = 0
+    for i in range(count):
+        packets += sender.sendFrame(frames[i % len(frames)], timestamp + i)
+    return packets
+
+def receiveLegacy(sink, packets, reassembler, reception):
+    received = frames = 0
+    start = time.perf_counter()
+    while received < packets:
+        data = sink.recv(20480)
+        rtpPacket = RtpPacket()
+        rtpPacket.decode(data)
+        now = time.monotonic()
+        seq = rtpPacket.seqNum()
+        if not reassembler.isRetransmission(seq):
+            reception.update(seq, rtpPacket.timestamp(), now, rtpPacket.ssrc())
+        reassembler.push(seq, rtpPacket.header[1] >> 7, rtpPacket.getPayload(), now, rtpPacket.timestamp(),
+                         rtpPacket.frameInfo())
+        frames += sum(1 for _ in reassembler.frames())
+        received += 1
+    return time.perf_counter() - start, frames
+
+def receivePooled(receiver, packets, reassembler, reception):
+    received = frames = 0
+    start = time.perf_counter()
+    while received < packets:
+        count = receiver.receive(0.5)
+        now = time.monotonic()
+        for i in range(count):
+            marker, pt, seq, timestamp, ssrc, payload, info = receiver.packet(i)
+            if not reassembler.isRetransmission(seq):
+                reception.update(seq, timestamp, now, ssrc)
+            reassembler.push(seq, marker, payload, now, timestamp, info)
+        frames += sum(1 for _ in reassembler.frames())
+        received += count
+    return time.perf_counter() - start, frames
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frame-kb", type=int, default=300, help="Cỡ frame MJPEG (1080p ~ 200-400 KB)")
+    parser.add_argument("--fps", type=float, default=60)
+    parser.add_argument("--frames", type=int, default=8, help="Số frame gửi sẵn cho mỗi lần đo (vừa bộ đệm nhận)")
+    parser.add_argument("--rounds", type=int, default=100)
+    args = parser.parse_args()
+
+    frames = [PacketizedFrame(makeFrame(args.frame_kb * 1000)) for _ in range(10)]
+    perFrame = -(-args.frame_kb * 1000 // MAX_RTP_PAYLOAD)
+    required = perFrame * args.fps
+    print(f"frame={args.frame_kb} KB ({perFrame} pkt) @ {args.fps:g} fps -> cần {required:,.0f} pkt/s, "
+          f"{args.frames} frames x {args.rounds} rounds")
+
+    results = {}
+    for label, receive in (("legacy", receiveLegacy), ("pooled", receivePooled)):
+        sink, sender = openPair()
+        if label == "pooled":
+            source = RtpReceiver(sink)
+        else:
+            source = sink
+            sink.settimeout(0.5)
+        reassembler, reception = FrameReassembler(), ReceptionStats(RTP_CLOCK_RATE)
+        elapsed = packets = frameCount = 0
+        cpuStart = time.process_time()
+        sendCpu = 0.0
+        for r in range(args.rounds):
+            sendStart = time.process_time()
+            count = fill(sender, frames, args.frames, r * args.frames)
+            sendCpu += time.process_time() - sendStart
+            seconds, emitted = receive(source, count, reassembler, reception)
+            elapsed += seconds
+            packets += count
+            frameCount += emitted
+        cpu = time.process_time() - cpuStart - sendCpu
+        sink.close()
+        sender.sock.close()
+        rate = packets / elapsed
+        results[label] = rate
+        print(f"{label:>7}: {rate:>10,.0f} pkt/s | {packets / cpu:>10,.0f} pkt/CPU-s | {rate / perFrame:>6.0f} fps max | "
+              f"{rate / required:>5.2f}x yêu cầu | frames {frameCount}/{args.frames * args.rounds}")
+    print(f"pooled / legacy: x{results['pooled'] / results['legacy']:.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+BENCHMARK: Số phiên đồng thời tối đa (concurrent-session ceiling) trên loopback.
+
+Chạy Server thật (subprocess) ở chế độ thread hoặc async, mở N client headless
+(SETUP + PLAY, nhận RTP bằng selectors) rồi đo FPS thực nhận của từng phiên.
+"Trần" là N lớn nhất mà FPS trung bình vẫn >= 90% FPS danh định.
+
+Usage:
+    python -m benchmarks.bench_sessions --mode async --sessions 50 100 200 400
+"""
+import argparse
+import os
+import selectors
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from benchmarks.media import writeMjpeg
+
+def startServer(mode, port, videoDir, extraArgs=()):
+    cmd = [sys.executable, "-m", "src.server.server_main", str(port), "--mode", mode, "--video-dir", videoDir]
+    cmd += list(extraArgs)
+    root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    # Nhóm tiến trình riêng: stopServer() dừng cả các worker con (--workers N)
+    proc = subprocess.Popen(cmd, cwd=root, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                            start_new_session=hasattr(os, 'killpg'))
+    # Chờ Server mở cổng
+    deadline = time.time() + 10
+    while time.time() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return proc
+        except OSError:
+            time.sleep(0.1)
+    stopServer(proc)
+    raise RuntimeError("Server did not start")
+
+def stopServer(proc):
+    """ Dừng Server cùng mọi tiến trình con của nó. """
+    if not hasattr(os, 'killpg'):
+        proc.kill()
+        proc.wait()
+        return
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except OSError:
+        pass
+    proc.wait()
+    # Chờ các worker con thoát hẳn (nếu không, lần chạy sau có thể kết nối nhầm vào socket sắp đóng)
+    deadline = time.time() + 5
+    while time.time() < deadline:
+        try:
+            os.killpg(proc.pid, 0)
+        except OSError:
+            return
+        time.sleep(0.05)
+
+def threadCount(pid):
+    """ Số thread của tiến trình Server (Linux /proc), None nếu không đọc được. """
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("Threads:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+def cpuSeconds(pid):
+    """ Tổng CPU (user + system, giây) của tiến trình Server (Linux /proc), None nếu không đọc được. """
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(')', 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return None
+
+def rtspRequest(sock, text):
+    sock.sendall(text.encode())
+    reply = b''
+    while b'\r\n\r\n' not in reply:
+        chunk = sock.recv(4096)
+        if not chunk:
+            break
+        reply += chunk
+    return reply.decode(errors="replace")
+
+def openSession(port, fileName, sel):
+    rtp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    rtp.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+    rtp.bind(("127.0.0.1", 0))
+    rtp.setblocking(False)
+    rtpPort = rtp.getsockname()[1]
+
+    rtsp = socket.create_connection(("127.0.0.1", port))
+    rtspRequest(rtsp, f"SETUP {fileName} RTSP/1.0\r\nCSeq: 1\r\nTransport: RTP/UDP; client_port={rtpPort}\r\n\r\n")
+    rtspRequest(rtsp, f"PLAY {fileName} RTSP/1.0\r\nCSeq: 2\r\n\r\n")
+    stats = {'frames': 0, 'packets': 0}
+    sel.register(rtp, selectors.EVENT_READ, stats)
+    return rtsp, rtp, stats
+
+def measure(mode, port, videoDir, fileName, sessions, duration, fps, extraArgs=()):
+    proc = startServer(mode, port, videoDir, extraArgs)
+    sel = selectors.DefaultSelector()
+    opened = []
+    try:
+        for _ in range(sessions):
+            opened.append(openSession(port, fileName, sel))
+
+        # Bỏ qua 1 giây khởi động rồi mới đếm
+        warmup = time.time() + 1.0
+        end = warmup + duration
+        counting = False
+        while True:
+            now = time.time()
+            if now >= end:
+                break
+            if not counting and now >= warmup:
+                for _, _, stats in opened:
+                    stats['frames'] = stats['packets'] = 0
+                cpuStart = cpuSeconds(proc.pid)
+                counting = True
+            for key, _ in sel.select(timeout=0.05):
+                stats = key.data
+                while True:
+                    try:
+                        data = key.fileobj.recv(2048)
+                    except BlockingIOError:
+                        break
+                    stats['packets'] += 1
+                    if data[1] >> 7:
+                        stats['frames'] += 1
+        rates = sorted(stats['frames'] / duration for _, _, stats in opened)
+        cpuEnd = cpuSeconds(proc.pid)
+        cpu = (cpuEnd - cpuStart) / duration if cpuStart is not None and cpuEnd is not None else None
+        return rates, threadCount(proc.pid), cpu
+    finally:
+        for rtsp, rtp, _ in opened:
+            rtsp.close()
+            rtp.close()
+        stopServer(proc)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["thread", "async"], default="async")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[10, 50, 100, 200])
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--frame-size", type=int, default=20000)
+    parser.add_argument("--fps", type=float, default=30.0, help="FPS danh định để so sánh")
+    parser.add_argument("--port", type=int, default=18554)
+    parser.add_argument("--server-args", default="",
+                        help='Tham số thêm cho Server, vd: --server-args="--sender-threads 0"')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as videoDir:
+        writeMjpeg(os.path.join(videoDir, "bench.Mjpeg"), 30 * 120, args.frame_size)
+        print(f"mode={args.mode} {args.server_args} frame={args.frame_size}B nominal={args.fps}fps cpus={os.cpu_count()}")
+        print(f"{'sessions':>8} {'avg fps':>8} {'p10 fps':>8} {'threads':>8} {'ok':>4}")
+        for n in args.sessions:
+            rates, threads, _ = measure(args.mode, args.port, videoDir, "bench.Mjpeg", n, args.duration, args.fps,
+                                     args.server_args.split())
+            avg = sum(rates) / len(rates)
+            p10 = rates[len(rates) // 10]
+            ok = "yes" if avg >= 0.9 * args.fps else "no"
+            print(f"{n:>8} {avg:>8.1f} {p10:>8.1f} {threads if threads is not None else '-':>8} {ok:>4}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+BENCHMARK: Tỉ lệ mất gói theo kích thước burst của TokenBucket (UDP loopback).
+
+Chạy Server thật với --shape-burst B (0 = bắn cả frame liền 1 lúc như cũ), 1 client headless
+nhận RTP với buffer nhận nhỏ và chi phí xử lý mỗi gói (giống client GUI: giải mã header,
+ghép mảnh). Loss = số gói thiếu (theo khoảng trống Seq) / số gói lẽ ra nhận được.
+marker/s = số gói cuối frame (Marker = 1) nhận được mỗi giây: khi burst làm tràn buffer,
+đuôi frame luôn bị rơi trước nên cột này cho thấy số frame còn ghép được.
+
+Usage:
+    python -m benchmarks.bench_shaping --bursts 0 64 32 16 8 4 --frame-size 150000
+"""
+import argparse
+import os
+import socket
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from benchmarks.media import writeMjpeg
+from benchmarks.bench_sessions import startServer, stopServer, rtspRequest
+
+def receive(port, fileName, duration, rcvbuf, workUs):
+    rtp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    rtp.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, rcvbuf)
+    rtp.bind(("127.0.0.1", 0))
+    rtp.settimeout(1.0)
+    rtsp = socket.create_connection(("127.0.0.1", port))
+    rtspRequest(rtsp, f"SETUP {fileName} RTSP/1.0\r\nCSeq: 1\r\nTransport: RTP/UDP; client_port={rtp.getsockname()[1]}\r\n\r\n")
+    rtspRequest(rtsp, f"PLAY {fileName} RTSP/1.0\r\nCSeq: 2\r\n\r\n")
+
+    received = expected = frames = 0
+    lastSeq = None
+    work = workUs / 1e6
+    end = time.perf_counter() + duration
+    try:
+        while time.perf_counter() < end:
+            try:
+                data = rtp.recv(2048)
+            except socket.timeout:
+                continue
+            seq = int.from_bytes(data[2:4], 'big')
+            expected += 1 if lastSeq is None else (seq - lastSeq) & 0xFFFF
+            lastSeq = seq
+            received += 1
+            frames += data[1] >> 7
+            # Chi phí xử lý mỗi gói của client (busy-wait, không nhường CPU như sleep)
+            stop = time.perf_counter() + work
+            while time.perf_counter() < stop:
+                pass
+    finally:
+        rtsp.close()
+        rtp.close()
+    return received, expected, frames
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bursts", type=int, nargs="+", default=[0, 64, 32, 16, 8, 4])
+    parser.add_argument("--frame-size", type=int, default=150000)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--rcvbuf", type=int, default=64 * 1024, help="SO_RCVBUF của client (byte)")
+    parser.add_argument("--work-us", type=float, default=60.0, help="Chi phí xử lý mỗi gói phía client (micro-giây)")
+    parser.add_argument("--mode", choices=["thread", "async"], default="thread")
+    parser.add_argument("--port", type=int, default=18554)
+    args = parser.parse_args()
+
+    fileName = "bench.Mjpeg"
+    with tempfile.TemporaryDirectory() as videoDir:
+        writeMjpeg(os.path.join(videoDir, fileName), 30 * 60, args.frame_size)
+        print(f"frame={args.frame_size // 1000} KB rcvbuf={args.rcvbuf // 1024} KB client work={args.work_us:g} us/packet")
+        print(f"{'burst':>6} {'received':>9} {'expected':>9} {'loss':>7} {'marker/s':>9}")
+        for burst in args.bursts:
+            proc = startServer(args.mode, args.port, videoDir, ["--shape-burst", str(burst)])
+            try:
+                received, expected, frames = receive(args.port, fileName, args.duration, args.rcvbuf, args.work_us)
+            finally:
+                stopServer(proc)
+            loss = 1 - received / expected if expected else 0.0
+            label = "off" if burst == 0 else str(burst)
+            print(f"{label:>6} {received:>9} {expected:>9} {loss:>7.1%} {frames / args.duration:>9.1f}")
+
+if __name__ == "__main__":
+    main()
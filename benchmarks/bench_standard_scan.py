@@ -0,0 +1,96 @@
+"""
+BENCHMARK: Thông lượng đọc frame ở STANDARD mode (MB/s).
+
+So sánh bộ quét cũ (đọc từng byte bằng file.read(1)) với bộ quét mmap + find()
+của VideoStream trên 1 file STANDARD lớn (mặc định ~150 MB, frame 720p ~150 KB).
+
+Usage:
+    python -m benchmarks.bench_standard_scan --size-mb 150
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from benchmarks.media import writeMjpeg
+from src.common.video_stream import VideoStream
+
+def legacyReadStandardFrame(file):
+    """ Bộ quét cũ (trước khi dùng mmap), giữ nguyên để đối chiếu. """
+    data = bytearray()
+    found_soi = False
+    while not found_soi:
+        byte = file.read(1)
+        if not byte: return None
+        if byte == b'\xff':
+            next_byte = file.read(1)
+            if next_byte == b'\xd8':
+                data.extend(b'\xff\xd8')
+                found_soi = True
+            elif next_byte == b'\xff':
+                file.seek(-1, 1)
+    while True:
+        byte = file.read(1)
+        if not byte: return None
+        data.extend(byte)
+        if byte == b'\xff':
+            next_byte = file.read(1)
+            data.extend(next_byte)
+            if next_byte == b'\xd9':
+                return bytes(data)
+            if next_byte == b'\xd8':
+                file.seek(-2, 1)
+                return bytes(data[:-2])
+
+def timeLegacy(path, budgetSeconds):
+    """ Bộ quét cũ rất chậm -> chỉ chạy trong budgetSeconds rồi ngoại suy MB/s. """
+    total = frames = 0
+    start = time.perf_counter()
+    with open(path, 'rb') as f:
+        while time.perf_counter() - start < budgetSeconds:
+            data = legacyReadStandardFrame(f)
+            if data is None: break
+            total += len(data)
+            frames += 1
+    return total, frames, time.perf_counter() - start
+
+def timeMmap(path):
+    total = frames = 0
+    start = time.perf_counter()
+    stream = VideoStream(path)
+    while True:
+        data = stream.nextFrame()
+        if not data: break
+        total += len(data)
+        frames += 1
+    elapsed = time.perf_counter() - start
+    stream.close()
+    return total, frames, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=int, default=150)
+    parser.add_argument("--frame-size", type=int, default=150000)
+    parser.add_argument("--legacy-seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "big_standard.Mjpeg")
+        frames = args.size_mb * 1024 * 1024 // args.frame_size
+        writeMjpeg(path, frames, args.frame_size, mode="STANDARD")
+        size = os.path.getsize(path) / 1e6
+        print(f"file={size:.0f} MB frames={frames} frame~{args.frame_size // 1000} KB")
+
+        total, n, elapsed = timeLegacy(path, args.legacy_seconds)
+        legacy = total / 1e6 / elapsed
+        print(f"legacy read(1) scanner : {legacy:10.1f} MB/s  ({n} frames in {elapsed:.1f}s, {n / elapsed:.1f} fps)")
+
+        total, n, elapsed = timeMmap(path)
+        fast = total / 1e6 / elapsed
+        print(f"mmap find() scanner    : {fast:10.1f} MB/s  ({n} frames in {elapsed:.2f}s, {n / elapsed:.0f} fps)")
+        print(f"speed-up               : {fast / legacy:10.0f}x")
+
+if __name__ == "__main__":
+    main()
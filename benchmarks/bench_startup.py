@@ -0,0 +1,122 @@
+"""
+BENCHMARK: Thời gian khởi động phiên (connect -> gói RTP đầu tiên) qua 1 proxy TCP có độ trễ.
+
+  sequential: SETUP, chờ phản hồi, rồi mới PLAY              (2 RTT RTSP)
+  pipelined : SETUP + PLAY trong cùng 1 lần ghi TCP           (1 RTT RTSP)
+
+Proxy thêm độ trễ 1 chiều --delay-ms cho mọi dữ liệu RTSP (RTP đi thẳng qua loopback),
+mô phỏng client ở xa. Server tách request bằng RtspMessageParser nên xử lý được cả 2 request
+dính trong 1 segment.
+
+Usage:
+    python -m benchmarks.bench_startup --delay-ms 25 --runs 10
+"""
+import argparse
+import os
+import queue
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from benchmarks.media import writeMjpeg
+from benchmarks.bench_sessions import startServer, stopServer
+
+class DelayProxy:
+    """ Proxy TCP: mỗi chunk được chuyển tiếp sau đúng delay giây (giữ nguyên thứ tự). """
+
+    def __init__(self, target, delay):
+        self.target = target
+        self.delay = delay
+        self.listener = socket.create_server(("127.0.0.1", 0))
+        self.port = self.listener.getsockname()[1]
+        threading.Thread(target=self.acceptLoop, daemon=True).start()
+
+    def acceptLoop(self):
+        while True:
+            try:
+                client, _ = self.listener.accept()
+            except OSError:
+                return
+            server = socket.create_connection(self.target)
+            for src, dst in ((client, server), (server, client)):
+                pending = queue.Queue()
+                threading.Thread(target=self.reader, args=(src, pending), daemon=True).start()
+                threading.Thread(target=self.writer, args=(dst, pending), daemon=True).start()
+
+    def reader(self, src, pending):
+        while True:
+            try:
+                data = src.recv(4096)
+            except OSError:
+                data = b''
+            pending.put((time.perf_counter() + self.delay, data))
+            if not data:
+                return
+
+    def writer(self, dst, pending):
+        while True:
+            due, data = pending.get()
+            time.sleep(max(0.0, due - time.perf_counter()))
+            try:
+                if not data:
+                    dst.shutdown(socket.SHUT_WR)
+                    return
+                dst.sendall(data)
+            except OSError:
+                return
+
+def readReply(sock, buffer):
+    while b'\r\n\r\n' not in buffer:
+        buffer += sock.recv(4096)
+    end = buffer.index(b'\r\n\r\n') + 4
+    return buffer[end:]
+
+def startup(port, fileName, pipelined):
+    rtp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    rtp.bind(("127.0.0.1", 0))
+    rtp.settimeout(5)
+    setup = f"SETUP {fileName} RTSP/1.0\r\nCSeq: 1\r\nTransport: RTP/UDP; client_port={rtp.getsockname()[1]}\r\n\r\n"
+    play = f"PLAY {fileName} RTSP/1.0\r\nCSeq: 2\r\n\r\n"
+
+    start = time.perf_counter()
+    rtsp = socket.create_connection(("127.0.0.1", port))
+    if pipelined:
+        rtsp.sendall((setup + play).encode())
+    else:
+        rtsp.sendall(setup.encode())
+        readReply(rtsp, b'')
+        rtsp.sendall(play.encode())
+    rtp.recv(2048)
+    elapsed = time.perf_counter() - start
+    rtsp.close()
+    rtp.close()
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--delay-ms", type=float, default=25.0, help="Độ trễ 1 chiều của proxy RTSP")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--mode", choices=["thread", "async"], default="thread")
+    parser.add_argument("--port", type=int, default=18554)
+    args = parser.parse_args()
+
+    fileName = "bench.Mjpeg"
+    with tempfile.TemporaryDirectory() as videoDir:
+        writeMjpeg(os.path.join(videoDir, fileName), 300, 20000)
+        proc = startServer(args.mode, args.port, videoDir)
+        try:
+            proxy = DelayProxy(("127.0.0.1", args.port), args.delay_ms / 1000)
+            print(f"mode={args.mode} RTSP one-way delay={args.delay_ms:g} ms (RTT {2 * args.delay_ms:g} ms)")
+            for pipelined in (False, True):
+                times = [startup(proxy.port, fileName, pipelined) * 1000 for _ in range(args.runs)]
+                label = "pipelined" if pipelined else "sequential"
+                print(f"{label:>10}: median {statistics.median(times):6.1f} ms  min {min(times):6.1f} ms")
+        finally:
+            stopServer(proc)
+
+if __name__ == "__main__":
+    main()
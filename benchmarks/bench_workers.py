@@ -0,0 +1,82 @@
+"""
+BENCHMARK: Băng thông phát (egress) tổng theo số tiến trình Server (--workers N, SO_REUSEPORT).
+
+Mở S phiên với frame lớn và FPS cao để Server luôn bị giới hạn bởi CPU, rồi đo số byte
+interface loopback gửi đi mỗi giây (/proc/net/dev, Linux). Client không đọc gói RTP (kernel tự bỏ
+khi buffer đầy) để chi phí phía nhận không ảnh hưởng kết quả.
+Với 1 tiến trình, mọi phiên chung 1 GIL; N tiến trình dùng được tới N core.
+
+Usage:
+    python -m benchmarks.bench_workers --workers 1 2 4 --sessions 64
+"""
+import argparse
+import os
+import socket
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from benchmarks.media import writeMjpeg
+from benchmarks.bench_sessions import startServer, stopServer, rtspRequest
+
+def loopbackTxBytes():
+    with open("/proc/net/dev") as f:
+        for line in f:
+            name, _, counters = line.partition(':')
+            if name.strip() == "lo":
+                return int(counters.split()[8])
+    raise RuntimeError("loopback interface not found")
+
+def measure(mode, port, videoDir, fileName, workers, sessions, duration):
+    proc = startServer(mode, port, videoDir, ["--workers", str(workers)])
+    opened = []
+    try:
+        for _ in range(sessions):
+            rtp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            rtp.bind(("127.0.0.1", 0))
+            rtsp = socket.create_connection(("127.0.0.1", port))
+            rtspRequest(rtsp, f"SETUP {fileName} RTSP/1.0\r\nCSeq: 1\r\nTransport: RTP/UDP; client_port={rtp.getsockname()[1]}\r\n\r\n")
+            rtspRequest(rtsp, f"PLAY {fileName} RTSP/1.0\r\nCSeq: 2\r\n\r\n")
+            opened.append((rtsp, rtp))
+
+        time.sleep(1.0)
+        start = loopbackTxBytes()
+        time.sleep(duration)
+        return (loopbackTxBytes() - start) * 8 / duration / 1e6
+    finally:
+        for rtsp, rtp in opened:
+            rtsp.close()
+            rtp.close()
+        stopServer(proc)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["thread", "async"], default="async")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--sessions", type=int, default=64)
+    parser.add_argument("--frame-size", type=int, default=150000)
+    parser.add_argument("--fps", type=int, default=60, help="FPS của file thử (ghi vào <video>.json)")
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--port", type=int, default=18554)
+    args = parser.parse_args()
+
+    fileName = "bench.Mjpeg"
+    with tempfile.TemporaryDirectory() as videoDir:
+        path = os.path.join(videoDir, fileName)
+        writeMjpeg(path, args.fps * 60, args.frame_size)
+        with open(path + ".json", "w") as f:
+            f.write(f'{{"fps": {args.fps}}}')
+
+        demand = args.sessions * args.fps * args.frame_size * 8 / 1e6
+        print(f"mode={args.mode} sessions={args.sessions} frame={args.frame_size // 1000} KB @ {args.fps} fps "
+              f"(demand {demand:,.0f} Mbit/s) cpus={os.cpu_count()}")
+        print(f"{'workers':>8} {'egress Mbit/s':>14} {'scaling':>8}")
+        base = None
+        for workers in args.workers:
+            mbps = measure(args.mode, args.port, videoDir, fileName, workers, args.sessions, args.duration)
+            base = base or mbps
+            print(f"{workers:>8} {mbps:>14,.0f} {mbps / base:>7.2f}x")
+
+if __name__ == "__main__":
+    main()
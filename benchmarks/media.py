@@ -0,0 +1,30 @@
+"""
+Tạo file MJPEG tổng hợp (synthetic) cho benchmark.
+Không cần Pillow/OpenCV: mỗi frame là SOI + dữ liệu ngẫu nhiên (không chứa 0xFF) + EOI,
+đủ để Server quét marker / đọc header như với file thật.
+"""
+import os
+import random
+
+def makeFrame(size, rng=random):
+    """ Tạo 1 'JPEG' giả có kích thước size bytes. """
+    body = bytes(rng.randrange(0, 255) for _ in range(min(size - 4, 4096)))
+    body = (body * ((size - 4) // len(body) + 1))[:size - 4]
+    return b'\xff\xd8' + body + b'\xff\xd9'
+
+def writeMjpeg(path, frameCount, frameSize, mode="PROPRIETARY", seed=953):
+    """
+    Ghi file MJPEG tổng hợp.
+    mode = "PROPRIETARY": Header 6 số + JPEG (giống converter.py).
+    mode = "STANDARD": Chỉ nối các JPEG liên tiếp.
+    """
+    rng = random.Random(seed)
+    frames = [makeFrame(frameSize + rng.randrange(-frameSize // 10, frameSize // 10 + 1), rng) for _ in range(8)]
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'wb') as f:
+        for i in range(frameCount):
+            frame = frames[i % len(frames)]
+            if mode == "PROPRIETARY":
+                f.write(str(len(frame)).zfill(6).encode())
+            f.write(frame)
+    return path
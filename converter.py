@@ -3,72 +3,136 @@ from PIL import Image
 import io
 import sys
 import os
+import argparse
 
-def convert_to_hd_optimized(input_path, output_path, target_fps=30, quality=90):
+from src.common.media_info import MediaInfo
+
+# Thang chất lượng mặc định (Rendition Ladder): (chiều rộng tối đa, JPEG quality)
+# Bậc đầu là file chính, các bậc sau ghi ra file anh em "<tên>_<rộng>w.Mjpeg" cùng thư mục
+DEFAULT_LADDER = [(1280, 90), (854, 80), (640, 70)]
+
+def rendition_path(output_path, width):
+    """ Đường dẫn file của bậc chất lượng phụ: movie.Mjpeg -> movie_854w.Mjpeg """
+    stem, ext = os.path.splitext(output_path)
+    return f"{stem}_{width}w{ext}"
+
+def convert_ladder(input_path, output_path, target_fps=30, ladder=DEFAULT_LADDER):
+    """
+    Giải mã video nguồn 1 lần, mỗi frame được thu nhỏ dần qua từng bậc (1280 -> 854 -> 640)
+    và nén JPEG với quality của bậc đó, ghi vào các file khớp nhau từng frame.
+    Sidecar của file chính liệt kê các bậc phụ ("renditions") để Server đổi chất lượng (--abr).
+    """
     if not os.path.exists(input_path):
         print(f"[Lỗi] Không tìm thấy: {input_path}")
         return
 
     cap = cv2.VideoCapture(input_path)
-    
+
     # Lấy thông số gốc
     original_fps = cap.get(cv2.CAP_PROP_FPS)
     total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-    
+    source_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+
+    # Không phóng to: bỏ các bậc phụ rộng hơn (hoặc bằng) video gốc, chúng sẽ trùng bậc trên
+    ladder = sorted(ladder, key=lambda rung: -rung[0])
+    ladder = ladder[:1] + [rung for rung in ladder[1:] if not source_width or rung[0] < source_width]
+    paths = [output_path] + [rendition_path(output_path, width) for width, _ in ladder[1:]]
+
     print(f"[*] Input: {input_path} | FPS gốc: {original_fps:.2f}")
-    print(f"[*] Target: {output_path} | FPS đích: {target_fps} | Quality: {quality}")
+    for path, (width, quality) in zip(paths, ladder):
+        print(f"[*] Target: {path} | Width <= {width} | FPS đích: {target_fps} | Quality: {quality}")
 
     # Tính toán bước nhảy frame (Frame Skipping)
     # Nếu video gốc 60fps, ta chỉ lấy mỗi frame thứ 2 (step=2) để về 30fps
     step = max(1, round(original_fps / target_fps))
-    
+
     frame_idx = 0
     saved_count = 0
-    
-    with open(output_path, 'wb') as f:
+    sizes = [None] * len(ladder)
+    files = [open(path, 'wb') for path in paths]
+
+    try:
         while True:
             ret, frame = cap.read()
             if not ret:
                 break
-            
+
             # Chỉ xử lý nếu frame này nằm trong bước nhảy
             if frame_idx % step == 0:
-                # 1. Convert sang RGB
+                # 1. Convert sang RGB (1 lần cho mọi bậc)
                 frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
                 pil_img = Image.fromarray(frame_rgb)
-                
-                # 2. Resize nhẹ nếu video quá lớn (Optional - giúp giảm lag mạng)
-                # Nếu video > 1080p, ép về 1280x720 để mạng UDP chịu nổi
-                if pil_img.width > 1280:
-                    ratio = 1280 / pil_img.width
-                    new_height = int(pil_img.height * ratio)
-                    pil_img = pil_img.resize((1280, new_height), Image.Resampling.LANCZOS)
-
-                # 3. Nén JPEG High Quality
-                buffer = io.BytesIO()
-                pil_img.save(buffer, format="JPEG", quality=quality) # <--- TĂNG ĐỘ NÉT TẠI ĐÂY
-                jpeg_data = buffer.getvalue()
-                
-                # 4. Ghi Header 6 số
-                size = len(jpeg_data)
-                header = str(size).zfill(6).encode()
-                
-                f.write(header)
-                f.write(jpeg_data)
+
+                for i, (f, (width, quality)) in enumerate(zip(files, ladder)):
+                    # 2. Thu nhỏ từ ảnh của bậc trên (đã nhỏ hơn ảnh gốc -> resize rẻ hơn)
+                    if pil_img.width > width:
+                        ratio = width / pil_img.width
+                        new_height = int(pil_img.height * ratio)
+                        pil_img = pil_img.resize((width, new_height), Image.Resampling.LANCZOS)
+
+                    # 3. Nén JPEG theo quality của bậc
+                    buffer = io.BytesIO()
+                    pil_img.save(buffer, format="JPEG", quality=quality)
+                    jpeg_data = buffer.getvalue()
+                    sizes[i] = pil_img.size
+
+                    # 4. Ghi Header 6 số
+                    size = len(jpeg_data)
+                    header = str(size).zfill(6).encode()
+
+                    f.write(header)
+                    f.write(jpeg_data)
                 saved_count += 1
-                
+
                 if saved_count % 50 == 0:
-                    print(f"   -> Processed: {frame_idx}/{total_frames} | Saved: {saved_count} frames")
+                    print(f"   -> Processed: {frame_idx}/{total_frames} | Saved: {saved_count} frames x {len(ladder)} renditions")
 
             frame_idx += 1
+    finally:
+        for f in files:
+            f.close()
+        cap.release()
+
+    # Ghi metadata (FPS thực sau khi bỏ frame) -> Server tự phát đúng tốc độ của file
+    output_fps = round(original_fps / step if original_fps > 0 else target_fps, 3)
+    renditions = []
+    for path, (width, height), (_, quality) in zip(paths[1:], sizes[1:], ladder[1:]):
+        # Bậc phụ cũng có sidecar riêng: phát độc lập được như file thường
+        MediaInfo(fps=output_fps, width=width, height=height, frames=saved_count).save(path)
+        renditions.append({"file": os.path.basename(path), "width": width, "height": height, "quality": quality})
+    width, height = sizes[0] or (None, None)
+    MediaInfo(fps=output_fps, width=width, height=height, frames=saved_count,
+              renditions=renditions or None).save(output_path)
 
-    cap.release()
     print(f"\n[XONG] Video đã được tối ưu hóa!")
-    print(f"Lưu ý: Bạn phải chỉnh Server gửi với tốc độ {target_fps} FPS (sleep {1.0/target_fps:.3f})")
+    print(f"Metadata: {MediaInfo.sidecarPath(output_path)} | FPS: {output_fps:.3f} (Server tự đọc, không cần chỉnh tay)")
+    if renditions:
+        print(f"Renditions: {', '.join(r['file'] for r in renditions)} (Server: --abr)")
+
+def convert_to_hd_optimized(input_path, output_path, target_fps=30, quality=90):
+    """ 1 file duy nhất, rộng tối đa 1280 (không tạo bậc chất lượng phụ). """
+    convert_ladder(input_path, output_path, target_fps, [(1280, quality)])
+
+def parse_ladder(text):
+    """ "1280:90,854:80,640:70" -> [(1280, 90), (854, 80), (640, 70)] """
+    ladder = []
+    for rung in text.split(','):
+        width, _, quality = rung.partition(':')
+        ladder.append((int(width), int(quality or 90)))
+    return ladder
 
 if __name__ == "__main__":
-    INPUT = "input.mp4" 
-    OUTPUT = "assets/video/movie_hd_sp.Mjpeg"
-    
-    # Convert về 30 FPS, Chất lượng 90 (Rất nét)
-    convert_to_hd_optimized(INPUT, OUTPUT, target_fps=30, quality=100)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Convert MP4/AVI sang MJPEG (header 6 số) cho Server")
+    parser.add_argument("input", nargs="?", default="input.mp4")
+    parser.add_argument("output", nargs="?", default="assets/video/movie_hd_sp.Mjpeg")
+    parser.add_argument("--fps", type=float, default=30)
+    parser.add_argument("--ladder", type=parse_ladder, default=DEFAULT_LADDER, metavar="WIDTH:QUALITY,...",
+                        help="Các bậc chất lượng, giải mã nguồn 1 lần (mặc định: 1280:90,854:80,640:70)")
+    parser.add_argument("--single", type=int, metavar="QUALITY",
+                        help="Chỉ ghi 1 file rộng tối đa 1280 với QUALITY (như trước, không có renditions)")
+    args = parser.parse_args()
+
+    if args.single is not None:
+        convert_to_hd_optimized(args.input, args.output, target_fps=args.fps, quality=args.single)
+    else:
+        convert_ladder(args.input, args.output, target_fps=args.fps, ladder=args.ladder)
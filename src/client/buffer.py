@@ -1,51 +1,129 @@
-﻿import queue
+﻿import threading
+import time
+from collections import deque
 
 class JitterBuffer:
     """
-    Bộ đệm khung hình (Jitter Buffer).
-    Giúp ổn định luồng video khi mạng chập chờn hoặc gói tin đến không đều.
+    Bộ đệm khung hình (Jitter Buffer) giữa luồng mạng và luồng hiển thị.
+    - Mục = (data, packets, loss, thời điểm media giây | None) - thời điểm media do PlayoutScheduler.arrive() tính.
+    - Giới hạn theo byte (max_bytes) và số frame (max_size): vượt -> bỏ frame cũ nhất (Drop Oldest).
+    - Độ trễ phát mục tiêu (targetDelay) thích nghi theo jitter giữa các lần frame tới (RFC 3550:
+      J += (|D| - J) / 16, D = chênh lệch khoảng cách tới so với khoảng cách Timestamp): JITTER_FACTOR * J
+      + 1 chu kỳ frame, kẹp trong [MIN_DELAY, MAX_DELAY]. Bên hiển thị nạp trước tới khi occupancy() >= targetDelay().
+    - Lưu trong deque (append / popleft nguyên tử dưới GIL): luồng mạng không bao giờ chờ khóa. Byte đang giữ
+      = byte vào - byte ra - byte bỏ, mỗi bộ đếm chỉ do 1 luồng ghi.
     """
-    def __init__(self, max_size=300):
-        # max_size: Số lượng frame tối đa lưu trong bộ đệm
-        # Sử dụng Queue của Python để đảm bảo Thread-safe (An toàn đa luồng)
-        self.buffer = queue.Queue(maxsize=max_size)
 
-    def put(self, frame):
+    MAX_BYTES = 64 * 1024 * 1024
+    JITTER_FACTOR = 4
+    MIN_DELAY = 0.04
+    MAX_DELAY = 2.0
+    DEFAULT_INTERVAL = 1 / 30
+    # Timestamp nhảy xa hơn ngưỡng này (seek / PAUSE / Server vòng lại) -> không tính vào jitter
+    MAX_STEP = 1.0
+
+    def __init__(self, max_size=300, max_bytes=None):
+        # max_size: Số lượng frame tối đa, max_bytes: tổng kích thước frame tối đa
+        self.max_size = max_size
+        self.max_bytes = self.MAX_BYTES if max_bytes is None else max_bytes
+        self.frames = deque()
+        self.bytesIn = 0            # Luồng mạng (put)
+        self.bytesDropped = 0       # Luồng mạng (put bỏ frame cũ)
+        self.bytesOut = 0           # Luồng hiển thị (get / clear)
+        self.dropped = 0
+        self.consumerLock = threading.Lock()    # Chỉ giữa get() và clear() (có thể gọi từ luồng điều khiển)
+        self.jitter = 0.0           # Giây
+        self.interval = self.DEFAULT_INTERVAL
+        self.lastArrival = None     # (lúc tới, thời điểm media) của frame gần nhất có Timestamp
+
+    def put(self, frame, now=None):
         """
-        Thêm frame vào hàng đợi.
-        (Được gọi bởi luồng mạng - Network Thread/Core)
+        Thêm frame vào hàng đợi (luồng mạng), now = lúc frame ghép xong (cập nhật jitter).
+        Đầy (byte hoặc số frame) -> xóa frame cũ nhất để nhường chỗ: giữ độ trễ thấp khi mạng bị tắc nghẽn.
         """
-        if not self.buffer.full():
-            self.buffer.put(frame)
-        else:
-            # Nếu bộ đệm đầy, xóa frame cũ nhất để nhường chỗ (Strategy: Drop Oldest)
-            # Điều này giúp giảm độ trễ (latency) nếu mạng bị tắc nghẽn
+        media = frame[3]
+        if media is not None:
+            now = time.monotonic() if now is None else now
+            if self.lastArrival is not None:
+                arrivedAt, lastMedia = self.lastArrival
+                step = media - lastMedia
+                if 0 < step < self.MAX_STEP:
+                    d = (now - arrivedAt) - step
+                    self.jitter += (abs(d) - self.jitter) / 16
+                    self.interval += (step - self.interval) / 16
+            self.lastArrival = (now, media)
+
+        size = len(frame[0])
+        frames = self.frames
+        while frames and (len(frames) >= self.max_size or self.size() + size > self.max_bytes):
             try:
-                self.buffer.get_nowait()
-                self.buffer.put(frame)
-            except queue.Empty:
-                pass
+                old = frames.popleft()
+            except IndexError:
+                break
+            self.bytesDropped += len(old[0])
+            self.dropped += 1
+        frames.append(frame)
+        self.bytesIn += size
 
     def get(self):
         """
-        Lấy frame ra để hiển thị.
-        (Được gọi bởi luồng giao diện - UI Thread/Timer)
+        Lấy frame ra để hiển thị (luồng giao diện), None nếu rỗng (không chặn UI).
         """
+        with self.consumerLock:
+            try:
+                frame = self.frames.popleft()
+            except IndexError:
+                return None
+            self.bytesOut += len(frame[0])
+            return frame
 
+    def peek(self):
+        """ Xem frame đầu hàng (frame sẽ được get() trả ra) mà không lấy ra, None nếu rỗng. """
         try:
-            # Lấy frame ra, nếu không có thì trả về None (không chặn UI)
-            return self.buffer.get_nowait()
-        except queue.Empty:
+            return self.frames[0]
+        except IndexError:
             return None
-    
+
     def qsize(self):
         """ Kiểm tra số lượng frame hiện có """
-        return self.buffer.qsize()
+        return len(self.frames)
+
+    def size(self):
+        """ Tổng số byte frame đang giữ. """
+        return self.bytesIn - self.bytesDropped - self.bytesOut
+
+    def occupancy(self):
+        """ Lượng video đang giữ tính theo thời gian (giây): khoảng Timestamp đầu -> cuối hàng + 1 chu kỳ frame. """
+        try:
+            first, last = self.frames[0][3], self.frames[-1][3]
+        except IndexError:
+            return 0.0
+        if first is None or last is None or not 0 <= last - first < self.MAX_DELAY * 4:
+            return len(self.frames) * self.interval
+        return last - first + self.interval
+
+    def targetDelay(self):
+        """ Độ trễ phát nên giữ (giây) theo jitter đo được. """
+        return min(self.MAX_DELAY, max(self.MIN_DELAY, self.JITTER_FACTOR * self.jitter + self.interval))
+
+    def resume(self):
+        """ Phát tiếp sau PAUSE: frame tới sau không tính jitter so với frame trước lúc dừng. """
+        self.lastArrival = None
+
+    def stats(self):
+        return {'frames': len(self.frames), 'bytes': self.size(), 'occupancy': self.occupancy(),
+                'jitter': self.jitter, 'target': self.targetDelay(), 'dropped': self.dropped}
 
     def clear(self):
         """ 
         Xóa sạch bộ đệm.
         Dùng khi Stop, Replay hoặc Switch Video để tránh hiện ảnh cũ. 
         """
-        with self.buffer.mutex:
-            self.buffer.queue.clear()
\ No newline at end of file
+        with self.consumerLock:
+            while True:
+                try:
+                    frame = self.frames.popleft()
+                except IndexError:
+                    break
+                self.bytesOut += len(frame[0])
+        self.lastArrival = None
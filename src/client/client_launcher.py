@@ -51,6 +51,17 @@ def run_modern_gui(server_ip, server_port, rtp_port, filename):
 
 if __name__ == "__main__":
     try:
+        # --tcp: nhận RTP lồng trên kết nối RTSP (RTP/AVP/TCP) thay vì UDP
+        if "--tcp" in sys.argv:
+            sys.argv.remove("--tcp")
+            from src.client.rtsp_core import RtspCore
+            RtspCore.INTERLEAVED = True
+        # --conceal: frame thiếu mảnh được thay bằng frame tốt gần nhất (hình đứng) thay vì bỏ qua
+        if "--conceal" in sys.argv:
+            sys.argv.remove("--conceal")
+            from src.client.reassembler import FrameReassembler
+            FrameReassembler.CONCEAL = True
+
         # Kiểm tra tham số đầu vào
         if len(sys.argv) < 5:
             # Chế độ test nhanh (nếu lười gõ tham số)
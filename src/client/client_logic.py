@@ -92,13 +92,16 @@ class Client:
         Vòng lặp lấy dữ liệu từ Buffer (Polling Loop).
         Thay thế cho while True để không chặn giao diện.
         """
-        item = self.core.jitter_buffer.get()
+        # Frame tới hạn hiển thị theo RTP Timestamp (PlayoutScheduler), frame trễ bị bỏ qua
+        item = self.core.playout.next()
         if item:
             frame_data = item[0]  # Lấy phần dữ liệu khung hình
             self.updateMovie(frame_data)
 
-        # Gọi lại hàm này sau 10ms
-        self.master.after(10, self.check_buffer)
+        # Gọi lại hàm này đúng lúc frame kế tiếp tới hạn (tối đa sau 10ms)
+        wait = self.core.playout.wait()
+        delay = 10 if wait is None else min(10, max(1, int(wait * 1000)))
+        self.master.after(delay, self.check_buffer)
 
     def updateMovie(self, imageBytes):
         """ Chuyển đổi bytes thành ảnh và hiển thị lên Tkinter Label. """
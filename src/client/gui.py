@@ -56,9 +56,9 @@ class ModernClient(QMainWindow):
         self.current_fps = 0
         
         # --- BIẾN BUFFERING ---
-        self.empty_buffer_count = 0
-        self.is_buffering = True 
-        self.BUFFER_THRESHOLD = 60
+        self.empty_since = None     # Lúc bộ đệm bắt đầu rỗng khi đang PLAYING (hết video sau END_OF_STREAM_WAIT giây)
+        self.END_OF_STREAM_WAIT = 2.0
+        self.is_buffering = True     # Nạp trước tới khi bộ đệm giữ đủ targetDelay() (theo jitter đo được)
         self.last_buf_size = -1
         self.stuck_buffer_count = 0
         
@@ -75,10 +75,12 @@ class ModernClient(QMainWindow):
         # Cập nhật trạng thái icon ban đầu
         self.change_status("connecting")
 
-        # Timer cập nhật Video
+        # Timer cập nhật Video: nhịp ngắn, frame nào hiện lúc nào do PlayoutScheduler quyết định theo RTP Timestamp
+        self.PLAYOUT_TICK_MS = 5
         self.timer = QTimer()
+        self.timer.setTimerType(Qt.TimerType.PreciseTimer)
         self.timer.timeout.connect(self.update_video_frame)
-        self.timer.start(40)
+        self.timer.start(self.PLAYOUT_TICK_MS)
      
     # Hàm load font tùy chỉnh
     def load_custom_fonts(self):
@@ -466,7 +468,10 @@ class ModernClient(QMainWindow):
         if not self.core: return
         
         current_buf_size = self.core.jitter_buffer.qsize()
-        self.buffer_bar.setValue(current_buf_size)
+        # Thanh buffer: lượng video đang giữ (ms) so với độ trễ mục tiêu
+        occupancy = self.core.jitter_buffer.occupancy()
+        target = self.core.jitter_buffer.targetDelay()
+        self.buffer_bar.setValue(min(100, int(occupancy / target * 100)))
         
         # Chỉ xử lý khi đang ở trạng thái PLAYING
         if self.core.state != self.core.PLAYING:
@@ -481,33 +486,34 @@ class ModernClient(QMainWindow):
                 self.last_buf_size = current_buf_size
 
             if current_buf_size > 0:
-                threshold = self.BUFFER_THRESHOLD if self.BUFFER_THRESHOLD > 0 else 1
-                percent = int((current_buf_size / threshold) * 100)
-                if percent > 100: percent = 100
+                percent = min(100, int(occupancy / target * 100))
                 
-                self.lbl_loading.setText(f"BUFFERING... {percent}%")
+                self.lbl_loading.setText(f"BUFFERING... {percent}% ({occupancy * 1000:.0f}/{target * 1000:.0f} ms)")
                 self.lbl_loading.show()
                 self.lbl_loading.raise_()
             else:
                 self.lbl_loading.hide()
             
-            # Kiểm tra ngưỡng nạp
-            if current_buf_size < self.BUFFER_THRESHOLD:
+            # Kiểm tra ngưỡng nạp (theo thời gian, không theo số frame)
+            if occupancy < target:
                 return 
             else:
                 self.is_buffering = False
                 self.lbl_loading.hide()
                 self.stuck_buffer_count = 0
+                # Frame đầu hàng hiện ngay, các frame sau theo đúng khoảng cách Timestamp
+                self.core.playout.start()
 
         # --- LOGIC PLAYING ---
-        item = self.core.jitter_buffer.get()
+        # Frame tới hạn hiển thị (None: chưa tới hạn hoặc bộ đệm rỗng; frame trễ đã bị bỏ qua)
+        item = self.core.playout.next()
         
         if item:
             # Reset biến đếm buffer rỗng/stuck
-            self.empty_buffer_count = 0
+            self.empty_since = None
             self.stuck_buffer_count = 0
 
-            frame_data, pkt_count, loss_rate = item
+            frame_data, pkt_count, loss_rate, _ = item
             try:
                 # VẼ ẢNH LÊN KHUNG VIDEO
                 
@@ -552,11 +558,14 @@ class ModernClient(QMainWindow):
             except Exception:
                 pass
         
-        else:
-            # Buffer rỗng
+        elif current_buf_size == 0:
+            # Buffer rỗng (không phải đang chờ tới hạn frame kế tiếp)
             if self.core.state == self.core.PLAYING:
-                self.empty_buffer_count += 1
-                if self.empty_buffer_count > 50:
+                now = time.monotonic()
+                if self.empty_since is None:
+                    self.empty_since = now
+                elif now - self.empty_since > self.END_OF_STREAM_WAIT:
+                    self.empty_since = None
                     self.handle_log("🛑 STREAM_STATUS: End of video stream.", "SYSTEM")
                     self.reset_ui_to_idle()
    
@@ -0,0 +1,559 @@
+"""
+LOAD GENERATOR: N client RTSP/RTP headless (không GUI) trong 1 tiến trình, chạy với Server thật.
+
+Mỗi client là 1 máy trạng thái nhỏ trên socket non-blocking (1 vòng selectors cho tất cả, không thread):
+SETUP + PLAY gửi liền (như RtspCore), nhận RTP qua UDP hoặc lồng trên kết nối RTSP (--transport tcp),
+gửi RTCP Receiver Report mỗi giây, keepalive theo timeout của phiên, TEARDOWN khi kết thúc.
+Tùy chọn --actions: thỉnh thoảng (trung bình mỗi --action-interval giây) PAUSE rồi PLAY lại, tua ngẫu nhiên
+(PLAY Range: npt=) hoặc đổi file (TEARDOWN + phiên mới, file lấy ngẫu nhiên trong danh sách).
+
+Báo cáo (tính trong cửa sổ đo, sau khi đã mở đủ client - trừ độ trễ khởi động):
+- Thông lượng tổng (Mbit/s payload RTP, không tính header / CSRC / header extension), FPS từng client (trung bình / p10).
+- Tỉ lệ mất gói từng client (theo Seq RTP, RFC 3550): trung bình / p50 / p95 / max.
+- Độ trễ khởi động: từ lúc bắt đầu kết nối tới gói RTP đầu tiên của mỗi phiên (p50 / p90 / p99 / max),
+  tính cho mọi phiên của cả lần chạy - phần lớn phiên được mở trong lúc ramp, trước cửa sổ đo.
+- CPU Server: process_cpu_seconds_total (RTSP GET_PARAMETER "metrics") đầu và cuối cửa sổ đo,
+  tính theo % 1 core. Với --workers N chỉ đo được worker nhận kết nối đo metric.
+- CPU của chính load generator: gần 100% nghĩa là con số đo bị giới hạn bởi phía tải, không phải Server.
+--seed cố định mọi lựa chọn ngẫu nhiên -> chạy lại cho cùng kịch bản. --json ghi kết quả ra file.
+
+Usage:
+    python -m src.client.load_generator 127.0.0.1 3636 movie.Mjpeg --clients 100 --duration 30
+    python -m src.client.load_generator 127.0.0.1 3636 a.Mjpeg b.Mjpeg --clients 50 --actions pause seek switch
+"""
+import argparse
+import json
+import os
+import random
+import selectors
+import socket
+import sys
+import time
+
+# --- IMPORT MODULES ---
+try:
+    from src.common.rtsp_parser import RtspMessageParser, InterleavedFrame, frameInterleaved
+    from src.common.rtcp_packet import ReceiverReport, ReceptionStats
+    from src.common.fec_packet import FEC_PT
+    from src.client.rtsp_core import RtspCore
+    from src.client.rtp_receiver import parseRtp
+except ImportError:
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+    from src.common.rtsp_parser import RtspMessageParser, InterleavedFrame, frameInterleaved
+    from src.common.rtcp_packet import ReceiverReport, ReceptionStats
+    from src.common.fec_packet import FEC_PT
+    from src.client.rtsp_core import RtspCore
+    from src.client.rtp_receiver import parseRtp
+
+def percentile(values, fraction):
+    """ Phần tử ở vị trí fraction của danh sách đã sắp xếp (None nếu rỗng). """
+    if not values:
+        return None
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+def fetchServerCpu(address, timeout=5.0):
+    """ process_cpu_seconds_total của Server qua RTSP GET_PARAMETER "metrics" (None nếu không đọc được). """
+    body = "metrics\r\n"
+    request = (f"GET_PARAMETER * RTSP/1.0\r\nCSeq: 1\r\nContent-Type: text/parameters\r\n"
+               f"Content-Length: {len(body)}\r\n\r\n{body}")
+    parser = RtspMessageParser()
+    parser.MAX_BODY_BYTES = 64 * 1024 * 1024   # Metric từng phiên: body lớn dần theo số phiên
+    try:
+        with socket.create_connection(address, timeout=timeout) as sock:
+            sock.sendall(request.encode())
+            while True:
+                data = sock.recv(65536)
+                if not data:
+                    return None
+                for message in parser.feed(data):
+                    if isinstance(message, InterleavedFrame):
+                        continue
+                    for line in message.body.decode(errors='replace').splitlines():
+                        if line.startswith('process_cpu_seconds_total '):
+                            return float(line.split()[1])
+                    return None
+    except (OSError, ValueError):
+        return None
+
+class SyntheticClient:
+    """
+    1 client RTSP/RTP nhẹ: chỉ đếm gói / byte / frame (bit Marker) và mất gói theo Seq,
+    không ghép frame, không giải mã. Mọi socket non-blocking, do LoadGenerator điều khiển.
+    """
+
+    # Trạng thái phiên (như RtspCore) + CLOSED: chưa mở / đã đóng kết nối
+    INIT = 0
+    READY = 1
+    PLAYING = 2
+    CLOSED = 3
+
+    RTCP_INTERVAL = 1.0
+    RECV_SIZE = 65536
+
+    def __init__(self, generator, index, rng):
+        self.generator = generator
+        self.index = index
+        self.rng = rng
+        self.state = self.CLOSED
+        self.fileName = None
+        self.rtsp = self.rtp = self.rtcp = None
+        self.parser = None
+        self.outbox = bytearray()
+        self.mask = 0
+        self.connected = False
+
+        # Phiên hiện tại
+        self.cseq = 0
+        self.pending = {}           # CSeq -> lệnh chờ phản hồi
+        self.sessionId = None
+        self.sessionTimeout = RtspCore.DEFAULT_SESSION_TIMEOUT
+        self.serverRtcpPort = None
+        self.rtpChannel, self.rtcpChannel = RtspCore.INTERLEAVED_CHANNELS
+        self.duration = None        # Độ dài video (giây) từ Range của phản hồi PLAY, để tua
+        self.reception = None
+        self.startedAt = None
+        self.gotFirstPacket = False
+        self.lastRequest = 0.0
+        self.nextReport = 0.0
+        self.nextAction = None
+        self.resumeAt = None
+
+        # Thống kê dồn qua mọi phiên của client
+        self.packets = self.bytes = self.frames = 0
+        self.expectedPrior = self.receivedPrior = 0
+        self.startupLatencies = []
+        self.sessions = self.rejected = self.errors = 0
+        self.actions = {}
+
+    # =========================================================================
+    # MỞ / ĐÓNG PHIÊN
+    # =========================================================================
+
+    def open(self, now, fileName):
+        """ Mở kết nối RTSP (non-blocking) và xếp SETUP + PLAY vào hàng gửi (gửi khi kết nối xong). """
+        generator = self.generator
+        self.fileName = fileName
+        self.state = self.INIT
+        self.cseq = 0
+        self.pending = {}
+        self.sessionId = None
+        self.serverRtcpPort = None
+        self.duration = None
+        self.reception = ReceptionStats(RtspCore.RTP_CLOCK_RATE)
+        self.startedAt = now
+        self.gotFirstPacket = False
+        self.nextAction = None
+        self.resumeAt = None
+        self.parser = RtspMessageParser()
+        self.outbox = bytearray()
+        self.connected = False
+        self.mask = 0
+
+        self.rtsp = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.rtsp.setblocking(False)
+        self.rtsp.connect_ex(generator.address)
+        if generator.transport == 'tcp':
+            spec = f"RTP/AVP/TCP;unicast;interleaved={self.rtpChannel}-{self.rtcpChannel}"
+        else:
+            self.rtp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self.rtp.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, generator.rcvbuf)
+            self.rtp.bind(('', 0))
+            self.rtp.setblocking(False)
+            generator.selector.register(self.rtp, selectors.EVENT_READ, (self, 'rtp'))
+            rtpPort = self.rtp.getsockname()[1]
+            self.rtcp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self.rtcp.setblocking(False)
+            spec = f"RTP/AVP;unicast;client_port={rtpPort}-{rtpPort + 1}"
+        self.request(now, 'SETUP', f"Transport: {spec}\r\n")
+        self.request(now, 'PLAY')
+        self.updateMask()
+
+    def close(self, now, teardown=True):
+        """ TEARDOWN (không chờ phản hồi), cộng thống kê mất gói của phiên, đóng mọi socket. """
+        if self.state == self.CLOSED:
+            return
+        if teardown and self.sessionId is not None and self.connected:
+            self.request(now, 'TEARDOWN')
+        if self.reception is not None:
+            self.expectedPrior += self.reception.expected()
+            self.receivedPrior += self.reception.received
+            self.reception = None
+        selector = self.generator.selector
+        for sock in (self.rtsp, self.rtp):
+            if sock is not None:
+                try:
+                    selector.unregister(sock)
+                except (KeyError, ValueError):
+                    pass
+        for sock in (self.rtsp, self.rtp, self.rtcp):
+            if sock is not None:
+                sock.close()
+        self.rtsp = self.rtp = self.rtcp = None
+        self.state = self.CLOSED
+
+    # =========================================================================
+    # GỬI LỆNH RTSP
+    # =========================================================================
+
+    def request(self, now, method, headers=''):
+        self.cseq += 1
+        text = f"{method} {self.fileName} RTSP/1.0\r\nCSeq: {self.cseq}\r\n"
+        if self.sessionId is not None:
+            text += f"Session: {self.sessionId}\r\n"
+        self.pending[self.cseq] = method
+        self.lastRequest = now
+        self.outbox += (text + headers + "\r\n").encode()
+        self.flush()
+
+    def flush(self):
+        """ Ghi hết mức socket cho phép; phần còn lại chờ sự kiện EVENT_WRITE. """
+        if self.connected and self.outbox:
+            try:
+                sent = self.rtsp.send(self.outbox)
+                del self.outbox[:sent]
+            except BlockingIOError:
+                pass
+            except OSError:
+                self.errors += 1
+                self.close(time.monotonic(), teardown=False)
+                return
+        self.updateMask()
+
+    def updateMask(self):
+        if self.rtsp is None:
+            return
+        mask = selectors.EVENT_READ
+        if self.outbox or not self.connected:
+            mask |= selectors.EVENT_WRITE
+        if mask == self.mask:
+            return
+        if self.mask:
+            self.generator.selector.modify(self.rtsp, mask, (self, 'rtsp'))
+        else:
+            self.generator.selector.register(self.rtsp, mask, (self, 'rtsp'))
+        self.mask = mask
+
+    def sendRtcp(self, packet):
+        """ UDP: tới cổng RTCP của Server. TCP: khung '$' kênh RTCP trên kết nối RTSP. """
+        if self.generator.transport == 'tcp':
+            self.outbox += frameInterleaved(self.rtcpChannel, packet)
+            self.flush()
+        elif self.serverRtcpPort is not None:
+            try:
+                self.rtcp.sendto(packet, (self.generator.address[0], self.serverRtcpPort))
+            except OSError:
+                pass
+
+    # =========================================================================
+    # SỰ KIỆN SOCKET
+    # =========================================================================
+
+    def onWritable(self, now):
+        if not self.connected:
+            error = self.rtsp.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+            if error:
+                self.errors += 1
+                self.close(now, teardown=False)
+                return
+            self.connected = True
+        self.flush()
+
+    def onRtspReadable(self, now):
+        while self.rtsp is not None:
+            try:
+                data = self.rtsp.recv(self.RECV_SIZE)
+            except BlockingIOError:
+                return
+            except OSError:
+                data = b''
+            if not data:
+                # Server đóng kết nối (hết hạn / lỗi)
+                self.close(now, teardown=False)
+                return
+            try:
+                messages = self.parser.feed(data)
+            except ValueError:
+                self.errors += 1
+                self.close(now, teardown=False)
+                return
+            for message in messages:
+                if isinstance(message, InterleavedFrame):
+                    if message.channel == self.rtpChannel:
+                        self.onRtp(message.data, now)
+                else:
+                    self.onReply(message, now)
+                if self.rtsp is None:
+                    return
+
+    def onRtpReadable(self, now):
+        recv, onRtp = self.rtp.recv, self.onRtp
+        while True:
+            try:
+                data = recv(2048)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                return
+            onRtp(data, now)
+
+    def onRtp(self, data, now):
+        if self.reception is None:
+            return
+        # parseRtp bỏ qua CSRC, header extension (FRAME_INFO) và padding: bytes chỉ đếm payload thật
+        packet = parseRtp(memoryview(data), len(data))
+        if packet is None or packet[1] == FEC_PT:
+            return
+        marker, _, seq, timestamp, ssrc, payload, _ = packet
+        if not self.gotFirstPacket:
+            self.gotFirstPacket = True
+            self.startupLatencies.append(now - self.startedAt)
+        self.reception.update(seq, timestamp, now, ssrc)
+        self.packets += 1
+        self.bytes += len(payload)
+        if marker:
+            self.frames += 1
+
+    def onReply(self, message, now):
+        status = message.startLine.split(' ')[1:2]
+        try:
+            method = self.pending.pop(int(message.header('CSeq', '0')), None)
+        except ValueError:
+            method = None
+        session = message.header('Session')
+        if session:
+            params = session.split(';')
+            self.sessionId = params[0].strip()
+            for param in params[1:]:
+                name, _, value = param.partition('=')
+                if name.strip() == 'timeout' and value.strip().isdigit():
+                    self.sessionTimeout = int(value)
+        transport = message.header('Transport')
+        if transport:
+            for part in transport.split(';'):
+                name, _, value = part.strip().partition('=')
+                if name == 'server_port' and '-' in value:
+                    self.serverRtcpPort = int(value.split('-')[1])
+                elif name == 'interleaved' and '-' in value:
+                    self.rtpChannel, self.rtcpChannel = (int(c) for c in value.split('-')[:2])
+
+        if status != ['200']:
+            if method == 'SETUP':
+                # vd: 503 (đủ --max-sessions) / 404 -> phiên không mở được
+                self.rejected += 1
+                self.close(now, teardown=False)
+            else:
+                self.errors += 1
+            return
+        if method == 'SETUP':
+            self.state = self.READY
+            self.sessions += 1
+        elif method == 'PLAY':
+            self.state = self.PLAYING
+            rangeValue = message.header('Range', '')
+            if rangeValue.startswith('npt=') and '-' in rangeValue:
+                end = rangeValue[4:].split('-')[1]
+                try:
+                    self.duration = float(end) if end else None
+                except ValueError:
+                    pass
+            if self.nextAction is None:
+                self.scheduleAction(now)
+        elif method == 'PAUSE':
+            self.state = self.READY
+            self.resumeAt = now + self.rng.uniform(0.5, 2.0)
+
+    # =========================================================================
+    # HÀNH VI THEO THỜI GIAN (RR, KEEPALIVE, PAUSE / SEEK / SWITCH)
+    # =========================================================================
+
+    def scheduleAction(self, now):
+        generator = self.generator
+        if generator.actions:
+            self.nextAction = now + self.rng.expovariate(1.0 / generator.actionInterval)
+
+    def tick(self, now):
+        if self.state == self.CLOSED:
+            return
+        reception = self.reception
+        if reception is not None and reception.baseSeq is not None and now >= self.nextReport:
+            self.nextReport = now + self.RTCP_INTERVAL
+            block = reception.reportBlock()
+            if block is not None:
+                self.sendRtcp(ReceiverReport(self.index + 1, [block]).encode())
+        if self.sessionId is not None and now - self.lastRequest >= self.sessionTimeout / 2:
+            self.request(now, 'GET_PARAMETER')
+        if self.resumeAt is not None and now >= self.resumeAt and self.state == self.READY:
+            self.resumeAt = None
+            self.request(now, 'PLAY')
+        if self.state == self.PLAYING and self.nextAction is not None and now >= self.nextAction:
+            self.nextAction = None
+            self.act(now)
+            if self.state != self.CLOSED and self.nextAction is None:
+                self.scheduleAction(now)
+
+    def act(self, now):
+        action = self.rng.choice(self.generator.actions)
+        self.actions[action] = self.actions.get(action, 0) + 1
+        if action == 'pause':
+            self.request(now, 'PAUSE')
+        elif action == 'seek':
+            if self.duration:
+                self.request(now, 'PLAY', f"Range: npt={self.rng.uniform(0, self.duration * 0.9):.3f}-\r\n")
+        elif action == 'switch':
+            self.close(now)
+            self.open(now, self.rng.choice(self.generator.files))
+
+    def receptionTotals(self):
+        """ (số gói mong đợi, số gói nhận được) cộng dồn qua mọi phiên của client. """
+        expected, received = self.expectedPrior, self.receivedPrior
+        if self.reception is not None:
+            expected += self.reception.expected()
+            received += self.reception.received
+        return expected, received
+
+    def loss(self, since=(0, 0)):
+        """ Tỉ lệ mất gói (0..1) qua mọi phiên của client, tính từ mốc since (receptionTotals() lúc đó). """
+        expected, received = self.receptionTotals()
+        expected -= since[0]
+        received -= since[1]
+        return max(0, expected - received) / expected if expected > 0 else 0.0
+
+class LoadGenerator:
+    """ Chạy N SyntheticClient trên 1 selectors, mở dần trong --ramp giây, đo trong cửa sổ sau đó. """
+
+    SWEEP_INTERVAL = 0.1        # Chu kỳ gọi tick() của mọi client (RR, keepalive, hành vi)
+
+    def __init__(self, host, port, files, clients, transport='udp', actions=(), actionInterval=10.0,
+                 seed=953, rcvbuf=256 * 1024):
+        self.address = (host, port)
+        self.files = list(files)
+        self.transport = transport
+        self.actions = list(actions)
+        self.actionInterval = actionInterval
+        self.rcvbuf = rcvbuf
+        self.selector = selectors.DefaultSelector()
+        rng = random.Random(seed)
+        self.clients = [SyntheticClient(self, i, random.Random(rng.random())) for i in range(clients)]
+
+    def run(self, duration, ramp=0.0, warmup=1.0):
+        """ Trả về dict kết quả (xem report()). duration: độ dài cửa sổ đo, sau ramp + warmup giây. """
+        clock = time.monotonic
+        start = clock()
+        pending = [(start + ramp * i / max(1, len(self.clients)), client) for i, client in enumerate(self.clients)]
+        pending.reverse()
+        windowStart = start + ramp + warmup
+        windowEnd = windowStart + duration
+        snapshot = None
+        nextSweep = start
+        cpuStart = None
+        while True:
+            now = clock()
+            if now >= windowEnd:
+                break
+            if snapshot is None and now >= windowStart:
+                cpuStart = (fetchServerCpu(self.address), time.process_time(), clock())
+                # Mốc đầu cửa sổ đo: byte, frame, gói mong đợi / nhận được (loại lưu lượng lúc ramp + warmup)
+                snapshot = {c.index: (c.bytes, c.frames) + c.receptionTotals() for c in self.clients}
+            if now >= nextSweep:
+                nextSweep = now + self.SWEEP_INTERVAL
+                while pending and pending[-1][0] <= now:
+                    client = pending.pop()[1]
+                    client.open(now, self.files[client.index % len(self.files)])
+                for client in self.clients:
+                    client.tick(now)
+            for key, mask in self.selector.select(timeout=min(0.02, max(0.0, nextSweep - now))):
+                client, kind = key.data
+                now = clock()
+                if kind == 'rtp':
+                    client.onRtpReadable(now)
+                    continue
+                if mask & selectors.EVENT_WRITE:
+                    client.onWritable(now)
+                if mask & selectors.EVENT_READ and client.rtsp is not None:
+                    client.onRtspReadable(now)
+        cpuEnd = (fetchServerCpu(self.address), time.process_time(), clock())
+        for client in self.clients:
+            client.close(clock())
+        return self.report(snapshot or {}, cpuStart, cpuEnd)
+
+    def report(self, snapshot, cpuStart, cpuEnd):
+        elapsed = cpuEnd[2] - cpuStart[2] if cpuStart else 0.0
+        clients = self.clients
+        marks = {c.index: snapshot.get(c.index, (0, 0, 0, 0)) for c in clients}
+        bytesWindow = sum(c.bytes - marks[c.index][0] for c in clients)
+        fpsList = sorted((c.frames - marks[c.index][1]) / elapsed for c in clients) if elapsed else []
+        losses = sorted(c.loss(marks[c.index][2:]) for c in clients)
+        startups = sorted(latency for c in clients for latency in c.startupLatencies)
+        actions = {}
+        for c in clients:
+            for name, count in c.actions.items():
+                actions[name] = actions.get(name, 0) + count
+        serverCpu = None
+        if cpuStart and cpuStart[0] is not None and cpuEnd[0] is not None and elapsed:
+            serverCpu = (cpuEnd[0] - cpuStart[0]) / elapsed
+        return {
+            'clients': len(clients), 'transport': self.transport, 'window': elapsed,
+            'sessions': sum(c.sessions for c in clients), 'rejected': sum(c.rejected for c in clients),
+            'errors': sum(c.errors for c in clients), 'actions': actions,
+            'mbps': bytesWindow * 8 / elapsed / 1e6 if elapsed else 0.0,
+            'fps': sum(fpsList), 'fpsAvg': sum(fpsList) / len(fpsList) if fpsList else 0.0,
+            'fpsP10': percentile(fpsList, 0.10) or 0.0,
+            'lossAvg': sum(losses) / len(losses) if losses else 0.0,
+            'lossP50': percentile(losses, 0.50) or 0.0, 'lossP95': percentile(losses, 0.95) or 0.0,
+            'lossMax': losses[-1] if losses else 0.0,
+            'startupCount': len(startups),
+            'startupP50': percentile(startups, 0.50), 'startupP90': percentile(startups, 0.90),
+            'startupP99': percentile(startups, 0.99), 'startupMax': startups[-1] if startups else None,
+            'serverCpu': serverCpu,
+            'generatorCpu': (cpuEnd[1] - cpuStart[1]) / elapsed if elapsed else None,
+            'perClient': [{'client': c.index, 'loss': c.loss(marks[c.index][2:]), 'sessions': c.sessions,
+                           'frames': c.frames - marks[c.index][1], 'bytes': c.bytes - marks[c.index][0]}
+                          for c in clients],
+        }
+
+def printReport(r, perClient=False):
+    ms = lambda value: f"{value * 1000:.0f} ms" if value is not None else "-"
+    pct = lambda value: f"{value:.1%}" if value is not None else "-"
+    print(f"clients={r['clients']} transport={r['transport']} window={r['window']:.1f}s "
+          f"sessions={r['sessions']} rejected={r['rejected']} errors={r['errors']} actions={r['actions'] or '-'}")
+    print(f"throughput : {r['mbps']:.1f} Mbit/s, {r['fps']:.0f} frames/s "
+          f"(per client avg {r['fpsAvg']:.1f} fps, p10 {r['fpsP10']:.1f} fps)")
+    print(f"loss       : avg {pct(r['lossAvg'])}, p50 {pct(r['lossP50'])}, p95 {pct(r['lossP95'])}, max {pct(r['lossMax'])}")
+    print(f"startup    : p50 {ms(r['startupP50'])}, p90 {ms(r['startupP90'])}, p99 {ms(r['startupP99'])}, "
+          f"max {ms(r['startupMax'])} (n={r['startupCount']})")
+    print(f"cpu        : server {pct(r['serverCpu'])} of 1 core, load generator {pct(r['generatorCpu'])}")
+    if perClient:
+        print(f"{'client':>6} {'sessions':>8} {'frames':>8} {'MB':>8} {'loss':>7}")
+        for c in r['perClient']:
+            print(f"{c['client']:>6} {c['sessions']:>8} {c['frames']:>8} {c['bytes'] / 1e6:>8.1f} {c['loss']:>7.2%}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("host")
+    parser.add_argument("port", type=int, help="Cổng RTSP của Server")
+    parser.add_argument("files", nargs="+", help="File video (client i phát file i %% số file; switch chọn ngẫu nhiên)")
+    parser.add_argument("--clients", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=30.0, help="Độ dài cửa sổ đo (giây)")
+    parser.add_argument("--ramp", type=float, default=0.0, help="Mở dần các client trong bao nhiêu giây")
+    parser.add_argument("--warmup", type=float, default=1.0, help="Chờ thêm sau ramp trước khi đo")
+    parser.add_argument("--transport", choices=["udp", "tcp"], default="udp",
+                        help="tcp = RTP/AVP/TCP (RTP lồng trên kết nối RTSP)")
+    parser.add_argument("--actions", nargs="*", choices=["pause", "seek", "switch"], default=[])
+    parser.add_argument("--action-interval", type=float, default=10.0, metavar="SECONDS",
+                        help="Khoảng trung bình giữa 2 hành vi của 1 client (phân phối mũ)")
+    parser.add_argument("--rcvbuf-kb", type=int, default=256, help="SO_RCVBUF của mỗi socket RTP")
+    parser.add_argument("--seed", type=int, default=953)
+    parser.add_argument("--per-client", action="store_true", help="In thêm bảng từng client")
+    parser.add_argument("--json", metavar="PATH", help="Ghi kết quả (kể cả từng client) ra file JSON")
+    args = parser.parse_args()
+
+    generator = LoadGenerator(args.host, args.port, args.files, args.clients, args.transport, args.actions,
+                              args.action_interval, args.seed, args.rcvbuf_kb * 1024)
+    result = generator.run(args.duration, args.ramp, args.warmup)
+    printReport(result, args.per_client)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(result, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+import time
+
+class PlayoutScheduler:
+    """
+    Lịch hiển thị frame theo RTP Timestamp (thay cho việc lấy 1 frame mỗi nhịp timer cố định).
+    - Luồng mạng (arrive): Timestamp 32 bit -> thời điểm media (giây, không quay vòng), cập nhật
+      offset = lúc nhận - thời điểm media, làm mượt (EWMA hệ số SMOOTHING) để jitter mạng không lọt vào lịch phát.
+    - Luồng giao diện (next): frame hiển thị lúc thời điểm media + offset + delay. Nhiều frame cùng tới hạn ->
+      chỉ hiện frame mới nhất; frame trễ quá MAX_LATE chu kỳ frame bị bỏ qua thay vì hiện sai thời điểm.
+    - delay theo targetDelay() của JitterBuffer (jitter đo được): tăng ngay khi jitter tăng, giảm dần (phát nhanh hơn
+      CATCH_UP) khi mạng ổn định lại - độ trễ giảm về mức jitter thực tế mà không bỏ frame.
+    - Offset nhảy quá RESET_GAP giây (Server vòng lại / tụt nhịp, seek) -> lấy lại gốc từ frame đó; frame cũ còn
+      đầu hàng mà tới hạn xa hơn RESET_GAP (frame trước seek lùi) bị bỏ thay vì chặn cả hàng.
+      PAUSE: pause() / resume() dời gốc đúng bằng thời gian dừng, frame còn trong bộ đệm phát tiếp bình thường.
+    Mục trong bộ đệm: (data, packets, loss, thời điểm media) - thời điểm media None = hiện ngay (vd: frame che lỗi
+    không rõ Timestamp).
+    """
+
+    SMOOTHING = 1 / 16
+    DELAY = 0.1             # Độ trễ phát sau offset (giây) trước khi bộ đệm đo được jitter
+    CATCH_UP = 0.05         # Giảm delay tối đa 50 ms mỗi giây (phát nhanh hơn 5%)
+    MAX_LATE = 0.5          # Trễ hơn nửa chu kỳ frame -> bỏ
+    RESET_GAP = 1.0
+    DEFAULT_INTERVAL = 1 / 30
+
+    def __init__(self, buffer, clockRate, delay=None, clock=time.monotonic):
+        self.buffer = buffer
+        self.clockRate = clockRate
+        self.baseDelay = self.DELAY if delay is None else delay
+        self.clock = clock
+        self.shown = 0
+        self.skipped = 0            # Frame bỏ qua: quá hạn, hoặc có frame sau đã tới hạn
+        self.resets = 0
+        self.reset()
+
+    def reset(self):
+        """ Luồng mới (seek, đổi file): quên gốc thời gian, frame tới sau đặt lại offset. """
+        self.offset = None          # Lúc nhận - thời điểm media (giây, đồng hồ clock), đã làm mượt
+        self.delay = self.baseDelay
+        self.lastAdapt = None
+        self.interval = self.DEFAULT_INTERVAL
+        self.lastStamp = None       # Timestamp 32 bit gần nhất + bản mở rộng (không quay vòng) của nó
+        self.lastExtended = 0
+        self.pausedAt = None
+
+    # =========================================================================
+    # LUỒNG MẠNG
+    # =========================================================================
+
+    def arrive(self, timestamp, now=None):
+        """ Frame (RTP Timestamp) vừa ghép xong lúc now. Trả về thời điểm media của nó (giây) cho mục trong bộ đệm. """
+        if timestamp is None:
+            return None
+        now = self.clock() if now is None else now
+        if self.lastStamp is None:
+            extended = timestamp
+        else:
+            extended = self.lastExtended + ((timestamp - self.lastStamp + 0x80000000) & 0xFFFFFFFF) - 0x80000000
+            step = (extended - self.lastExtended) / self.clockRate
+            if 0 < step < self.RESET_GAP:
+                self.interval += (step - self.interval) * self.SMOOTHING
+        self.lastStamp, self.lastExtended = timestamp, extended
+        media = extended / self.clockRate
+        transit = now - media
+        if self.offset is None or abs(transit - self.offset) > self.RESET_GAP:
+            if self.offset is not None:
+                self.resets += 1
+            self.offset = transit
+        else:
+            self.offset += (transit - self.offset) * self.SMOOTHING
+        return media
+
+    # =========================================================================
+    # LUỒNG GIAO DIỆN
+    # =========================================================================
+
+    def playAt(self, media):
+        """ Thời điểm (đồng hồ clock) hiển thị frame có thời điểm media. """
+        if media is None or self.offset is None:
+            return float('-inf')
+        return media + self.offset + self.delay
+
+    def start(self, now=None):
+        """
+        Bắt đầu phát sau khi bên hiển thị đã nạp trước bộ đệm: frame đầu hàng hiện ngay lúc này,
+        độ trễ phát = phần bộ đệm đã nạp (không nhỏ hơn targetDelay()).
+        """
+        now = self.clock() if now is None else now
+        head = self.buffer.peek()
+        if head is not None and head[3] is not None and self.offset is not None:
+            self.delay = max(self.buffer.targetDelay(), now - head[3] - self.offset)
+        self.lastAdapt = now
+
+    def adapt(self, now):
+        """ delay -> targetDelay() của bộ đệm: tăng ngay, giảm tối đa CATCH_UP giây mỗi giây. """
+        target = self.buffer.targetDelay()
+        if target >= self.delay:
+            self.delay = target
+        elif self.lastAdapt is not None:
+            self.delay = max(target, self.delay - (now - self.lastAdapt) * self.CATCH_UP)
+        self.lastAdapt = now
+
+    def next(self, now=None):
+        """ Frame cần hiển thị lúc now (mục của bộ đệm), None nếu chưa tới hạn frame nào. """
+        now = self.clock() if now is None else now
+        if self.pausedAt is not None:
+            return None
+        self.adapt(now)
+        item, due = None, None
+        while True:
+            head = self.buffer.peek()
+            if head is None:
+                break
+            playAt = self.playAt(head[3])
+            if playAt > now + self.delay + self.RESET_GAP:
+                self.buffer.get()
+                self.skipped += 1
+                continue
+            if playAt > now:
+                break
+            self.buffer.get()
+            if item is not None:
+                self.skipped += 1
+            item, due = head, playAt
+        if item is not None and item[3] is not None and now - due > self.interval * self.MAX_LATE:
+            self.skipped += 1
+            return None
+        if item is not None:
+            self.shown += 1
+        return item
+
+    def wait(self, now=None):
+        """ Số giây tới hạn hiển thị của frame đầu hàng (None nếu bộ đệm rỗng) - để hẹn timer. """
+        head = self.buffer.peek()
+        if head is None:
+            return None
+        now = self.clock() if now is None else now
+        return max(0.0, self.playAt(head[3]) - now)
+
+    def pause(self, now=None):
+        if self.pausedAt is None:
+            self.pausedAt = self.clock() if now is None else now
+
+    def resume(self, now=None):
+        """ Phát tiếp sau PAUSE: dời gốc thời gian đúng bằng thời gian đã dừng. """
+        if self.pausedAt is None:
+            return
+        now = self.clock() if now is None else now
+        if self.offset is not None:
+            self.offset += now - self.pausedAt
+        self.pausedAt = None
+        self.lastAdapt = None
+
+    def stats(self):
+        return {'shown': self.shown, 'skipped': self.skipped, 'resets': self.resets,
+                'delay': self.delay, 'interval': self.interval}
@@ -0,0 +1,350 @@
+import os
+import sys
+from collections import deque
+
+# --- IMPORT MODULES ---
+try:
+    from src.common.fec_packet import FecPacket
+except ImportError:
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+    from src.common.fec_packet import FecPacket
+
+JPEG_SOI = b'\xff\xd8'
+JPEG_EOI = b'\xff\xd9'
+NO_META = (None, None)
+
+class FrameReassembler:
+    """
+    Ghép frame từ các mảnh RTP theo Seq (không theo thứ tự đến).
+    - Frame = các gói có Seq liên tiếp, kết thúc ở gói có Marker bit. Chỉ frame đủ mọi mảnh mới được
+      trả ra (JPEG thiếu mảnh là ảnh hỏng, không đưa vào JitterBuffer).
+    - Seq bị nhảy qua = lỗ hổng: chờ NACK_DELAY (gói chỉ đến lệch thứ tự) rồi xin gửi lại (RTCP NACK),
+      nhắc lại mỗi NACK_RETRY, tối đa MAX_NACKS lần.
+    - Lỗ hổng quá MAX_WAIT vẫn chưa được vá, hoặc đã có hơn REORDER_FRAMES frame đủ mảnh chờ sau nó -> bỏ frame
+      chứa nó. Frame kế tiếp bắt đầu sau Marker, hoặc ở gói mở đầu 1 JPEG (SOI) nếu Marker cũng mất.
+    - Mỗi frame gắn với 1 RTP Timestamp: gói liền mạch mà Timestamp đổi / mở đầu JPEG khi frame chưa có Marker
+      (Server bỏ dở frame, Marker mất) -> phần đã ghép là frame dở, bị bỏ; 2 frame không bao giờ bị gộp làm 1.
+    - Frame ghép xong phải là JPEG trọn vẹn (SOI ... EOI), không thì bỏ (invalid). CONCEAL: mỗi frame bị bỏ
+      được thay bằng frame tốt gần nhất (hình đứng, packets = 0) để bên hiển thị giữ nhịp.
+    - Frame trả ra kèm RTP Timestamp của nó (lịch hiển thị - PlayoutScheduler); None nếu không biết.
+    - Gói FEC (Server chạy --fec K): nhóm chỉ mất 1 gói được dựng lại ngay từ parity, không chờ NACK.
+    - Gói đến đúng thứ tự (trường hợp thường gặp) được ghi thẳng vào buffer của frame đang ghép
+      (cấp sẵn theo kích thước frame trước), frame xong được trả ra luôn buffer đó - không copy lần 2.
+      Chỉ gói đến sớm (sau lỗ hổng) mới được copy ra giữ riêng. payload có thể là memoryview vào
+      buffer nhận dùng lại (RtpReceiver): chỉ cần hợp lệ trong lúc gọi push().
+    - info = FRAME_INFO từ header extension (số frame, chỉ số mảnh, số mảnh, kích thước frame), nếu Server gửi:
+      buffer frame cấp đúng kích thước; mỗi gói cho biết Seq mảnh đầu frame của nó -> vào giữa luồng / sau khi bỏ
+      frame thì ghép ngay frame đang tới (NACK các mảnh trước) thay vì chờ Marker / SOI.
+    Dùng:
+        reassembler.push(seq, marker, payload, now, timestamp, info)      # gói FEC: pushParity(payload, now, timestamp)
+        for data, packets, timestamp in reassembler.frames(): ...
+        lost = reassembler.poll(now)   # Seq cần NACK ngay
+    """
+
+    NACK_DELAY = 0.01
+    NACK_RETRY = 0.05
+    MAX_NACKS = 3
+    MAX_WAIT = 0.3
+    # Seq nhảy xa hơn ngưỡng này (vd: Server mở phiên mới) -> bắt đầu lại từ đầu
+    MAX_DROPOUT = 3000
+    # Số frame đủ mảnh tối đa được giữ sau 1 lỗ hổng (giới hạn bộ nhớ và độ trễ khi chờ vá)
+    REORDER_FRAMES = 8
+    VALIDATE_JPEG = True
+    CONCEAL = False
+
+    def __init__(self):
+        self.ready = deque()        # (data, số gói) của frame đã ghép xong
+        self.nacked = 0             # Số Seq đã xin gửi lại (tính cả nhắc lại)
+        self.recovered = 0          # Lỗ hổng được vá sau khi NACK
+        self.fecRecovered = 0       # Gói dựng lại từ parity FEC
+        self.completed = 0          # Frame trả ra (JPEG trọn vẹn)
+        self.repaired = 0           # ... trong đó có gói được vá (NACK / FEC)
+        self.dropped = 0            # Frame bị bỏ (thiếu mảnh quá hạn, bỏ dở, không phải JPEG trọn vẹn)
+        self.invalid = 0            # ... trong đó đủ mảnh nhưng không phải JPEG trọn vẹn
+        self.concealed = 0          # Frame bị bỏ đã được thay bằng frame tốt gần nhất (CONCEAL)
+        self.lastFrame = None
+        self.sizeHint = 0           # Kích thước frame vừa ghép xong: cỡ cấp sẵn cho buffer frame sau
+        self.reset()
+
+    def reset(self):
+        self.packets = {}           # Seq mở rộng -> payload (bản copy) của gói đến sớm, chưa ghép được
+        self.markers = set()        # Seq mở rộng của các gói có Marker đang giữ
+        self.meta = {}              # Seq mở rộng -> (RTP Timestamp, FRAME_INFO) của gói đang giữ
+        self.patched = set()        # Seq mở rộng đã được vá (NACK / FEC), chưa tính vào frame nào
+        self.missing = {}           # Seq mở rộng -> [phát hiện lúc, NACK kế tiếp lúc, số lần NACK]
+        self.highest = None         # Seq mở rộng lớn nhất đã nhận
+        self.frameStart = None      # Seq đầu của frame đang ghép
+        self.contiguous = None      # Seq đầu tiên chưa nhận kể từ frameStart
+        self.discarding = False     # Đang bỏ phần đuôi của frame đã bị bỏ (chờ Marker / SOI)
+        self.fec = {}               # Seq mở rộng của gói đầu nhóm -> FecPacket chờ thêm gói (nhóm đang mất >= 2)
+        self.newFrame()
+
+    def newFrame(self):
+        """ Frame kế tiếp: gói frameStart .. contiguous - 1 sẽ nằm liền nhau trong 1 buffer (cấp ở gói đầu). """
+        self.frame = None
+        self.filled = 0
+        self.offsets = [0]          # offsets[i]: vị trí gói thứ i của frame trong buffer
+        self.frameStamp = None      # RTP Timestamp của frame đang ghép
+
+    # =========================================================================
+    # NHẬN GÓI
+    # =========================================================================
+
+    def extend(self, seq):
+        """ Seq 16 bit -> Seq mở rộng (không quay vòng), gần highest nhất. """
+        if self.highest is None:
+            return seq
+        return self.highest + ((seq - self.highest + 0x8000) & 0xFFFF) - 0x8000
+
+    def isRetransmission(self, seq):
+        """ Gói này vá 1 lỗ hổng đã NACK (gói gửi lại) -> không tính vào thống kê RTCP của luồng gốc. """
+        state = self.missing.get(self.extend(seq))
+        return state is not None and state[2] > 0
+
+    def push(self, seq, marker, payload, now, timestamp=None, info=None):
+        ext = self.extend(seq)
+        if self.highest is None or abs(ext - self.highest) > self.MAX_DROPOUT:
+            self.reset()
+            self.highest = self.frameStart = self.contiguous = ext
+            if info is None:
+                # Luồng mới: chưa biết gói đầu tiên nhận được có phải đầu frame không (gói trước nó có thể
+                # đã mất) -> bỏ tới Marker / gói mở đầu JPEG đầu tiên
+                self.discarding = True
+            else:
+                # FRAME_INFO: gói này là mảnh thứ info[1] -> ghép frame từ mảnh đầu, các mảnh trước coi như mất
+                self.frameStart = self.contiguous = ext - info[1]
+                self.expect(self.frameStart, ext, now)
+        if ext < self.contiguous or ext in self.packets:
+            # Gói trùng (đã ghép / đang giữ), hoặc đến sau khi frame của nó đã xong / đã bị bỏ
+            return
+
+        if ext > self.highest:
+            if not self.discarding:
+                for lost in range(self.highest + 1, ext):
+                    self.missing[lost] = [now, now + self.NACK_DELAY, 0]
+            self.highest = ext
+        state = self.missing.pop(ext, None)
+        if state is not None and state[2] > 0:
+            self.recovered += 1
+            self.patched.add(ext)
+
+        if self.discarding:
+            # Đuôi của frame đã bỏ: frame sau bắt đầu ngay sau Marker, ở gói mới nhất mở đầu 1 JPEG,
+            # hoặc (FRAME_INFO) ở mảnh đầu của frame chứa gói này nếu mảnh đó chưa bị bỏ qua
+            if info is not None and ext - info[1] >= self.frameStart:
+                first = ext - info[1]
+                self.skipTo(first - 1)
+                # Các gói của frame này đến trong lúc đang bỏ đã bị vứt -> coi như mất, NACK lại
+                self.expect(first, self.highest + 1, now, ext)
+            elif info is None and ext == self.highest and payload[:2] == JPEG_SOI:
+                self.skipTo(ext - 1)
+            else:
+                if marker:
+                    self.skipTo(ext)
+                return
+        if ext == self.contiguous:
+            # Đúng gói đang chờ: ghi thẳng vào buffer frame
+            self.append(payload, marker, timestamp, info)
+            if self.packets:
+                self.advance()
+        else:
+            self.packets[ext] = bytes(payload)
+            if timestamp is not None or info is not None:
+                self.meta[ext] = (timestamp, info)
+            if marker:
+                self.markers.add(ext)
+        if self.fec:
+            for base in [base for base, fec in self.fec.items() if base <= ext < base + fec.count]:
+                if base in self.fec:
+                    self.recoverGroup(base, now)
+
+    def expect(self, start, end, now, skip=None):
+        """ Các Seq trong [start, end) chưa nhận (trừ skip) -> lỗ hổng chờ NACK. """
+        for seq in range(start, end):
+            if seq != skip and seq not in self.packets:
+                self.missing.setdefault(seq, [now, now + self.NACK_DELAY, 0])
+
+    def append(self, payload, marker, timestamp=None, info=None):
+        """ Ghi gói contiguous vào buffer frame; gói có Marker -> frame xong, trả ra chính buffer đó. """
+        if self.filled:
+            opens = info[1] == 0 if info is not None else payload[:2] == JPEG_SOI
+            if opens or timestamp is not None and self.frameStamp is not None and timestamp != self.frameStamp:
+                # Frame mới bắt đầu khi frame đang ghép chưa có Marker (Server bỏ dở frame): bỏ phần đã ghép
+                if self.patched:
+                    self.takePatched()
+                self.discard()
+                self.frameStart = self.contiguous
+                self.newFrame()
+        if not self.filled:
+            # FRAME_INFO: buffer đúng bằng kích thước frame; không có -> đoán theo frame trước (+1/8)
+            self.frame = bytearray(info[3] if info is not None else self.sizeHint + self.sizeHint // 8)
+            self.frameStamp = timestamp
+        start = self.filled
+        end = start + len(payload)
+        self.frame[start:end] = payload
+        self.filled = end
+        self.offsets.append(end)
+        self.contiguous += 1
+        if marker:
+            frame = self.frame
+            del frame[end:]
+            repaired = bool(self.patched) and self.takePatched()
+            if not self.VALIDATE_JPEG or self.isJpeg(frame):
+                self.ready.append((frame, self.contiguous - self.frameStart, self.frameStamp))
+                self.completed += 1
+                self.repaired += repaired
+                self.lastFrame = frame
+            else:
+                self.invalid += 1
+                self.discard()
+            self.sizeHint = end
+            self.frameStart = self.contiguous
+            self.newFrame()
+
+    @staticmethod
+    def isJpeg(frame):
+        """ SOI ở đầu, EOI ở cuối (cho phép vài byte đệm sau EOI). """
+        return frame[:2] == JPEG_SOI and frame.find(JPEG_EOI, -16) >= 0
+
+    def takePatched(self):
+        """ Bỏ các Seq đã vá thuộc frame vừa xong (Seq < contiguous). True nếu frame đó có gói được vá. """
+        patched = [seq for seq in self.patched if seq < self.contiguous]
+        self.patched.difference_update(patched)
+        return bool(patched)
+
+    def discard(self):
+        """ Đếm 1 frame bị bỏ; CONCEAL -> trả ra lại frame tốt gần nhất thay cho nó. """
+        self.dropped += 1
+        if self.CONCEAL and self.lastFrame is not None:
+            self.ready.append((self.lastFrame, 0, self.frameStamp))
+            self.concealed += 1
+
+    def advance(self):
+        """ Ghép tiếp các gói đến sớm đã liền mạch với frame đang ghép (trả ra mọi frame đủ mảnh). """
+        packets, markers = self.packets, self.markers
+        while self.contiguous in packets:
+            seq = self.contiguous
+            marker = seq in markers
+            if marker:
+                markers.discard(seq)
+            timestamp, info = self.meta.pop(seq, NO_META)
+            self.append(packets.pop(seq), marker, timestamp, info)
+
+    def has(self, seq):
+        return self.frameStart <= seq < self.contiguous or seq in self.packets
+
+    def payload(self, seq):
+        """ Payload (bản copy) của gói đã nhận: trong buffer frame đang ghép hoặc trong packets. """
+        if self.frameStart <= seq < self.contiguous:
+            i = seq - self.frameStart
+            return bytes(self.frame[self.offsets[i] : self.offsets[i + 1]])
+        return self.packets[seq]
+
+    def pushParity(self, payload, now, timestamp=None):
+        """
+        Nhận 1 gói FEC (timestamp = RTP Timestamp trong header của nó, cũng là của frame được bảo vệ):
+        nhóm của nó đang mất đúng 1 gói -> dựng lại ngay, mất nhiều hơn -> giữ chờ thêm gói.
+        """
+        if self.highest is None or self.discarding:
+            return
+        try:
+            fec = FecPacket.decode(payload, timestamp)
+        except ValueError:
+            return
+        base = self.extend(fec.base)
+        if base < self.frameStart or fec.count == 0:
+            return
+        self.fec[base] = fec
+        self.recoverGroup(base, now)
+
+    def recoverGroup(self, base, now):
+        fec = self.fec[base]
+        if base < self.frameStart:
+            del self.fec[base]
+            return
+        group = range(base, base + fec.count)
+        absent = [seq for seq in group if not self.has(seq)]
+        if len(absent) > 1:
+            return
+        del self.fec[base]
+        if not absent:
+            return
+        lost = absent[0]
+        try:
+            marker, payload = fec.recover([(seq in self.markers, self.payload(seq)) for seq in group if seq != lost])
+        except ValueError:
+            return
+        self.fecRecovered += 1
+        # Vá bằng FEC không tính là vá nhờ NACK
+        self.missing.pop(lost, None)
+        self.patched.add(lost)
+        # Nhóm nằm trong 1 frame: Timestamp lấy từ gói FEC, FRAME_INFO suy từ gói cùng nhóm còn giữ (nếu có)
+        info = None
+        for seq in group:
+            neighbour = self.meta.get(seq, NO_META)[1]
+            if neighbour is not None:
+                info = (neighbour[0], neighbour[1] + lost - seq, neighbour[2], neighbour[3])
+                break
+        self.push(lost & 0xFFFF, marker, payload, now, fec.timestamp, info)
+
+    def frames(self):
+        while self.ready:
+            yield self.ready.popleft()
+
+    # =========================================================================
+    # NACK & BỎ FRAME QUÁ HẠN
+    # =========================================================================
+
+    def poll(self, now):
+        """ Bỏ frame có lỗ hổng quá MAX_WAIT / quá cửa sổ REORDER_FRAMES, trả về Seq (16 bit) cần NACK ngay. """
+        while self.missing:
+            oldest = min(self.missing)
+            if now - self.missing[oldest][0] <= self.MAX_WAIT and len(self.markers) <= self.REORDER_FRAMES:
+                break
+            self.dropFrame(oldest)
+            # dropFrame bỏ mọi Seq <= lỗ hổng; phòng trường hợp lỗ hổng nằm trước frameStart -> vòng lặp luôn dừng
+            self.missing.pop(oldest, None)
+
+        due = []
+        for ext, state in self.missing.items():
+            if now >= state[1] and state[2] < self.MAX_NACKS:
+                due.append(ext & 0xFFFF)
+                state[1] = now + self.NACK_RETRY
+                state[2] += 1
+        self.nacked += len(due)
+        return due
+
+    def dropFrame(self, hole):
+        """
+        Bỏ frame chứa lỗ hổng hole. Frame kế tiếp bắt đầu ở gói đầu tiên sau hole mà gói trước nó là Marker,
+        bản thân nó mở đầu 1 JPEG (Marker của frame bị bỏ cũng mất), hoặc là mảnh đầu theo FRAME_INFO của
+        1 gói đang giữ. Chưa có -> bỏ tiếp các gói tới sau.
+        """
+        self.discard()
+        starts = [seq + 1 for seq in self.markers if seq >= hole]
+        starts += [seq for seq, payload in self.packets.items() if seq > hole and payload[:2] == JPEG_SOI]
+        starts += [seq - info[1] for seq, (_, info) in self.meta.items() if info is not None and seq - info[1] > hole]
+        if starts:
+            self.skipTo(min(starts) - 1)
+            self.advance()
+        else:
+            self.skipTo(self.highest)
+            self.discarding = True
+
+    def skipTo(self, end):
+        """ Bỏ mọi gói / lỗ hổng có Seq <= end, frame kế tiếp bắt đầu ở end + 1. """
+        for seq in range(self.frameStart, end + 1):
+            self.packets.pop(seq, None)
+            self.missing.pop(seq, None)
+            self.markers.discard(seq)
+            self.meta.pop(seq, None)
+            self.patched.discard(seq)
+        for base in [base for base in self.fec if base <= end]:
+            del self.fec[base]
+        self.frameStart = self.contiguous = end + 1
+        self.discarding = False
+        self.newFrame()
+
+    def stats(self):
+        return {'completed': self.completed, 'repaired': self.repaired, 'dropped': self.dropped,
+                'invalid': self.invalid, 'concealed': self.concealed, 'nacked': self.nacked, 'recovered': self.recovered, 'fecRecovered': self.fecRecovered}
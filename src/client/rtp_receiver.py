@@ -0,0 +1,109 @@
+import os
+import queue
+import select
+import sys
+
+# --- IMPORT MODULES ---
+try:
+    from src.common.rtp_packet import HEADER_SIZE, HEADER_FIELDS, EXTENSION_ONE_BYTE, FRAME_INFO, FRAME_INFO_BLOCK, FRAME_INFO_ID, FRAME_INFO_TAG, decodeExtension
+except ImportError:
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+    from src.common.rtp_packet import HEADER_SIZE, HEADER_FIELDS, EXTENSION_ONE_BYTE, FRAME_INFO, FRAME_INFO_BLOCK, FRAME_INFO_ID, FRAME_INFO_TAG, decodeExtension
+
+# 3 trường đầu của khối FRAME_INFO_BLOCK: profile 0xBEDE, độ dài (từ 32 bit), byte ID/L
+FRAME_INFO_HEAD = (EXTENSION_ONE_BYTE, (FRAME_INFO_BLOCK.size - 4) // 4, FRAME_INFO_TAG)
+
+def parseRtp(view, size):
+    """
+    Đọc header RTP ngay trên buffer nhận (không tạo RtpPacket / không copy payload).
+    Trả về (marker, pt, seq, timestamp, ssrc, payload memoryview, frameInfo), None nếu không phải gói RTP hợp lệ.
+    frameInfo = (số frame, chỉ số mảnh, số mảnh, kích thước frame) từ header extension RFC 8285, None nếu không có.
+    Bỏ qua CSRC, các phần tử extension khác và padding nếu có.
+    """
+    if size < HEADER_SIZE or view[0] >> 6 != 2:
+        return None
+    first = view[0]
+    second, seq, timestamp, ssrc = HEADER_FIELDS.unpack_from(view, 1)
+    start = HEADER_SIZE + 4 * (first & 0x0F)
+    info = None
+    if first & 0x10:
+        # Trường hợp thường gặp: khối extension chỉ chứa FRAME_INFO (do RtpSender ghi) -> 1 lần unpack
+        block = FRAME_INFO_BLOCK.unpack_from(view, start) if size >= start + FRAME_INFO_BLOCK.size else ()
+        if block[:3] == FRAME_INFO_HEAD:
+            info = block[3:]
+            start += FRAME_INFO_BLOCK.size
+        else:
+            if size < start + 4:
+                return None
+            end = start + 4 + 4 * int.from_bytes(view[start + 2 : start + 4], 'big')
+            if end > size:
+                return None
+            data = decodeExtension(view[start:end]).get(FRAME_INFO_ID)
+            if data is not None and len(data) == FRAME_INFO.size:
+                info = FRAME_INFO.unpack(data)
+            start = end
+    if first & 0x20:
+        size -= view[size - 1]
+    if start > size:
+        return None
+    return second >> 7, second & 0x7F, seq, timestamp, ssrc, view[start:size], info
+
+class RtpReceiver:
+    """
+    Nhận RTP qua UDP vào 1 bộ buffer cấp sẵn (recv_into), không tạo bytes mới cho mỗi datagram.
+    receive() chờ gói đầu (select) rồi lấy luôn các gói đã có trong socket (tối đa `slots` gói / lần),
+    vòng nhận xử lý cả lô: kiểm tra NACK / RR 1 lần cho cả lô thay vì mỗi gói.
+    Payload trả về (packet(i)) là memoryview vào buffer: chỉ hợp lệ tới lần receive() kế tiếp.
+    """
+
+    SLOT_SIZE = 2048        # > 1 gói RTP vừa MTU (header + 1400 byte payload)
+
+    def __init__(self, sock, slots=64):
+        self.sock = sock
+        sock.setblocking(False)
+        self.buffers = [bytearray(self.SLOT_SIZE) for _ in range(slots)]
+        self.views = [memoryview(buffer) for buffer in self.buffers]
+        self.sizes = [0] * slots
+
+    def receive(self, timeout=0.5):
+        """ Số gói nhận được (0 nếu hết timeout mà chưa có gói). """
+        if not select.select((self.sock,), (), (), timeout)[0]:
+            return 0
+        recvInto, views, sizes = self.sock.recv_into, self.views, self.sizes
+        count = 0
+        while count < len(views):
+            try:
+                sizes[count] = recvInto(views[count])
+            except (BlockingIOError, InterruptedError):
+                break
+            count += 1
+        return count
+
+    def packet(self, i):
+        return parseRtp(self.views[i], self.sizes[i])
+
+class QueueReceiver:
+    """
+    Cùng giao diện với RtpReceiver cho RTP/AVP/TCP: gói (bytes) do luồng đọc RTSP tách từ khung '$'
+    được lấy theo lô từ hàng đợi.
+    """
+
+    def __init__(self, packets, slots=64):
+        self.queue = packets
+        self.slots = slots
+        self.batch = []
+
+    def receive(self, timeout=0.5):
+        batch = self.batch
+        batch.clear()
+        try:
+            batch.append(self.queue.get(timeout=timeout))
+            while len(batch) < self.slots:
+                batch.append(self.queue.get_nowait())
+        except queue.Empty:
+            pass
+        return len(batch)
+
+    def packet(self, i):
+        data = self.batch[i]
+        return parseRtp(memoryview(data), len(data))
@@ -1,18 +1,32 @@
 import socket
 import threading
+import queue
 import sys
 import traceback
 import os
 import time
+from random import randint
 
 # --- IMPORT MODULES ---
 try:
-    from src.common.rtp_packet import RtpPacket
+    from src.client.rtp_receiver import RtpReceiver, QueueReceiver
+    from src.common.rtsp_parser import RtspMessageParser, InterleavedFrame, frameInterleaved
+    from src.common.rtcp_packet import ReceiverReport, ReceptionStats, GenericNack
     from src.client.buffer import JitterBuffer
+    from src.client.playout import PlayoutScheduler
+    from src.client.reassembler import FrameReassembler
+    from src.common.fec_packet import FEC_PT
+    from src.common.rtp_packet import RTP_CLOCK_RATE
 except ImportError:
     sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
-    from src.common.rtp_packet import RtpPacket
+    from src.client.rtp_receiver import RtpReceiver, QueueReceiver
+    from src.common.rtsp_parser import RtspMessageParser, InterleavedFrame, frameInterleaved
+    from src.common.rtcp_packet import ReceiverReport, ReceptionStats, GenericNack
     from src.client.buffer import JitterBuffer
+    from src.client.playout import PlayoutScheduler
+    from src.client.reassembler import FrameReassembler
+    from src.common.fec_packet import FEC_PT
+    from src.common.rtp_packet import RTP_CLOCK_RATE
 
 class RtspCore:
     """
@@ -31,6 +45,24 @@ class RtspCore:
     PLAY = 'PLAY'
     PAUSE = 'PAUSE'
     TEARDOWN = 'TEARDOWN'
+    GET_PARAMETER = 'GET_PARAMETER'
+    
+    # --- KEEPALIVE ---
+    # Server đóng phiên im lặng quá timeout giây (Session: <id>;timeout=<giây>, mặc định 60 theo RFC 2326)
+    DEFAULT_SESSION_TIMEOUT = 60
+    KEEPALIVE_CHECK = 1.0
+    
+    # --- RTCP ---
+    # Chu kỳ gửi Receiver Report (Server dùng để đổi chất lượng khi mất gói - ABR)
+    RTCP_INTERVAL = 1.0
+    # Đơn vị RTP timestamp của Server (tick/giây): tính jitter + lịch hiển thị frame
+    RTP_CLOCK_RATE = RTP_CLOCK_RATE
+    
+    # --- TRANSPORT ---
+    # True: RTP/AVP/TCP - RTP & RTCP đi lồng trên kết nối RTSP (khung '$'), cho mạng chặn / bóp UDP
+    INTERLEAVED = False
+    INTERLEAVED_CHANNELS = (0, 1)   # (kênh RTP, kênh RTCP) xin Server trong SETUP
+    MEDIA_QUEUE_PACKETS = 8192      # Gói RTP nhận trên TCP chờ listenRtp (đầy -> bỏ gói)
     
     def __init__(self, server_addr, server_port, rtp_port, file_name, on_log_callback=None):
         """ Khởi tạo Core và kết nối ngay lập tức. """
@@ -48,17 +80,33 @@ class RtspCore:
         self.rtspSeq = 0
         self.sessionId = 0
         self.requestSent = -1
+        self.pendingRequests = {}   # CSeq -> lệnh đang chờ phản hồi (hỗ trợ gửi pipeline)
         self.teardownAcked = 0
+        self.sessionTimeout = self.DEFAULT_SESSION_TIMEOUT
+        self.lastRequest = time.monotonic()
         
-        # Socket RTSP & RTP
+        # Socket RTSP & RTP & RTCP
         self.rtspSocket = None
         self.rtpSocket = None
+        self.rtcpSocket = None
+        
+        # RTCP: SSRC của Client + cổng Server nhận report (từ header Transport của phản hồi SETUP)
+        self.ssrc = randint(1, 0xFFFFFFFF)
+        self.serverRtcpPort = None
+        
+        # RTP/AVP/TCP: luồng đọc RTSP tách khung '$' của kênh RTP vào mediaQueue cho listenRtp
+        self.interleaved = self.INTERLEAVED
+        self.rtpChannel, self.rtcpChannel = self.INTERLEAVED_CHANNELS
+        self.mediaQueue = queue.Queue(self.MEDIA_QUEUE_PACKETS)
+        self.sendLock = threading.Lock()    # Lệnh RTSP (GUI) và RTCP (listenRtp) ghi chung 1 socket TCP
         
         # Cấu hình Log (True: In chi tiết, False: Im lặng khi chạy tự động)
         self.verbose = True
         
         # Bộ đệm dữ liệu & Điều khiển luồng
         self.jitter_buffer = JitterBuffer()
+        # Lịch hiển thị theo RTP Timestamp: bên hiển thị lấy frame qua playout.next() thay vì jitter_buffer.get()
+        self.playout = PlayoutScheduler(self.jitter_buffer, self.RTP_CLOCK_RATE)
         self.playEvent = threading.Event()
         
         # KẾT NỐI NGAY LẬP TỨC
@@ -85,6 +133,12 @@ class RtspCore:
                 self.log(f"Connected to {self.serverAddr}:{self.serverPort}", "SYSTEM")
         except:
             self.log(f"Failed to connect to {self.serverAddr}", "ERROR")
+            return
+        
+        # 1 thread đọc phản hồi suốt vòng đời kết nối (thay vì 1 thread / lệnh)
+        threading.Thread(target=self.recvRtspReply, args=(self.rtspSocket,), daemon=True).start()
+        # 1 thread giữ phiên sống khi người dùng không thao tác (vd: đang xem)
+        threading.Thread(target=self.keepAlive, args=(self.rtspSocket,), daemon=True).start()
 
     # =========================================================================
     # SECTION 2: ADVANCED FEATURES (RECONNECT, SWITCH, REPLAY)
@@ -124,6 +178,11 @@ class RtspCore:
             except: pass
             self.rtpSocket = None 
             
+        if self.rtcpSocket:
+            try: self.rtcpSocket.close()
+            except: pass
+            self.rtcpSocket = None
+            
         # 3. Cập nhật thông số mới
         self.serverAddr = new_ip
         self.serverPort = int(new_port)
@@ -134,25 +193,23 @@ class RtspCore:
         self.rtspSeq = 0
         self.sessionId = 0
         self.requestSent = -1
+        self.pendingRequests = {}
         self.teardownAcked = 0
+        self.sessionTimeout = self.DEFAULT_SESSION_TIMEOUT
+        self.serverRtcpPort = None
+        self.rtpChannel, self.rtcpChannel = self.INTERLEAVED_CHANNELS
+        self.mediaQueue = queue.Queue(self.MEDIA_QUEUE_PACKETS)
         self.jitter_buffer.clear()
+        self.playout.reset()
         
         # 5. Kết nối lại (TCP)
         self.connectToServer()
         
-        # 6. Tự động SETUP -> PLAY (Auto-stream)
-        time.sleep(0.1)
-        self.sendSetup()
+        # 6. Tự động SETUP + PLAY gửi liền 1 lần (pipeline, tiết kiệm 1 RTT)
+        self.sendSetupAndPlay()
         
-        # Chạy thread riêng để chờ Setup xong rồi mới Play
-        def delayed_play():
-            time.sleep(0.2)
-            self.sendPlay()
-            
-            self.verbose = True 
-            self.log("✅ SYNC_COMPLETE: Stream active & stable.", "SYSTEM")
-            
-        threading.Thread(target=delayed_play).start()
+        self.verbose = True 
+        self.log("✅ SYNC_COMPLETE: Stream active & stable.", "SYSTEM")
        
     # Hàm phụ trợ đổi file   
     def switch_media(self, filename):
@@ -168,24 +225,64 @@ class RtspCore:
     # SECTION 3: RTSP PROTOCOL HANDLERS (SEND COMMANDS)
     # ========================================================================
     
+    # Hàm tạo header Transport của SETUP
+    def transportSpec(self):
+        """ UDP: cổng RTP/RTCP của Client. TCP (interleaved): 2 kênh trên chính kết nối RTSP. """
+        if self.interleaved:
+            return f"RTP/AVP/TCP;unicast;interleaved={self.rtpChannel}-{self.rtcpChannel}"
+        return f"RTP/UDP; client_port={self.rtpPort}-{self.rtpPort + 1}"
+
     # Hàm gửi lệnh SETUP
     def sendSetup(self):
         """ Gửi lệnh SETUP. """
         if self.state == self.INIT:
             self.rtspSeq += 1
-            request = f"SETUP {self.fileName} RTSP/1.0\r\nCSeq: {self.rtspSeq}\r\nTransport: RTP/UDP; client_port={self.rtpPort}\r\n\r\n"
+            request = f"SETUP {self.fileName} RTSP/1.0\r\nCSeq: {self.rtspSeq}\r\nTransport: {self.transportSpec()}\r\n\r\n"
             self.requestSent = self.SETUP
             self.sendRtspRequest(request)
 
+    # Hàm gửi SETUP + PLAY liền nhau (pipeline)
+    def sendSetupAndPlay(self):
+        """
+        Gửi SETUP và PLAY trong cùng 1 lần ghi TCP, không chờ phản hồi SETUP.
+        Cổng RTP được mở trước để không mất gói đầu tiên. Server xử lý lần lượt theo thứ tự.
+        """
+        if self.state != self.INIT:
+            return
+        self.openRtpPort()
+        self.rtspSeq += 1
+        setup = f"SETUP {self.fileName} RTSP/1.0\r\nCSeq: {self.rtspSeq}\r\nTransport: {self.transportSpec()}\r\n\r\n"
+        self.pendingRequests[self.rtspSeq] = self.SETUP
+        self.rtspSeq += 1
+        play = f"PLAY {self.fileName} RTSP/1.0\r\nCSeq: {self.rtspSeq}\r\n\r\n"
+        self.requestSent = self.PLAY
+        self.sendRtspRequest(setup + play)
+
     # Hàm gửi lệnh PLAY
-    def sendPlay(self):
-        """ Gửi lệnh PLAY. """
+    def sendPlay(self, startTime=None):
+        """ Gửi lệnh PLAY. startTime (giây): phát từ vị trí đó (Range: npt=). """
         if self.state == self.READY:
             self.rtspSeq += 1
-            request = f"PLAY {self.fileName} RTSP/1.0\r\nCSeq: {self.rtspSeq}\r\nSession: {self.sessionId}\r\n\r\n"
+            request = f"PLAY {self.fileName} RTSP/1.0\r\nCSeq: {self.rtspSeq}\r\nSession: {self.sessionId}\r\n"
+            if startTime is not None:
+                request += f"Range: npt={startTime:.3f}-\r\n"
+            request += "\r\n"
             self.requestSent = self.PLAY
             self.sendRtspRequest(request)
 
+    # Hàm tua tới vị trí bất kỳ
+    def sendSeek(self, startTime):
+        """ Tua tới startTime (giây). Đang PLAY -> gửi PLAY kèm Range, Server nhảy ngay tới frame đó. """
+        if self.state == self.PLAYING:
+            self.rtspSeq += 1
+            request = f"PLAY {self.fileName} RTSP/1.0\r\nCSeq: {self.rtspSeq}\r\nSession: {self.sessionId}\r\nRange: npt={startTime:.3f}-\r\n\r\n"
+            self.requestSent = self.PLAY
+            self.jitter_buffer.clear()
+            self.playout.reset()
+            self.sendRtspRequest(request)
+        else:
+            self.sendPlay(startTime)
+
     # Hàm gửi lệnh PAUSE
     def sendPause(self):
         """ Gửi lệnh PAUSE. """
@@ -203,17 +300,33 @@ class RtspCore:
         self.requestSent = self.TEARDOWN
         self.sendRtspRequest(request)
 
+    # Hàm gửi keepalive
+    def sendKeepalive(self):
+        """ Gửi GET_PARAMETER rỗng: Server làm mới thời gian hoạt động của phiên, không đổi trạng thái. """
+        self.rtspSeq += 1
+        request = f"GET_PARAMETER {self.fileName} RTSP/1.0\r\nCSeq: {self.rtspSeq}\r\nSession: {self.sessionId}\r\n\r\n"
+        self.sendRtspRequest(request, self.GET_PARAMETER)
+
+    # Hàm giữ phiên sống
+    def keepAlive(self, sock):
+        """ Chạy suốt vòng đời 1 kết nối: đã im lặng nửa timeout của phiên -> gửi keepalive. """
+        while self.rtspSocket is sock:
+            time.sleep(self.KEEPALIVE_CHECK)
+            if self.state != self.INIT and time.monotonic() - self.lastRequest >= self.sessionTimeout / 2:
+                self.sendKeepalive()
+
     # Hàm gửi yêu cầu RTSP chung
-    def sendRtspRequest(self, request):
-        """ Hàm chung để gửi gói tin RTSP qua socket TCP. """
+    def sendRtspRequest(self, request, method=None):
+        """ Hàm chung để gửi gói tin RTSP qua socket TCP. Ghi nhớ CSeq -> lệnh để ghép với phản hồi. """
         if self.rtspSocket:
             try:
-                self.rtspSocket.send(request.encode())
+                self.pendingRequests[self.rtspSeq] = method or self.requestSent
+                self.lastRequest = time.monotonic()
+                with self.sendLock:
+                    self.rtspSocket.sendall(request.encode())
                 
                 if self.verbose:
                     self.log(request.strip(), "CLIENT")
-                    
-                threading.Thread(target=self.recvRtspReply).start()
             except Exception as e:
                 self.log(f"Send Error: {e}", "ERROR")
 
@@ -222,13 +335,38 @@ class RtspCore:
     # =========================================================================
     
     # Hàm nhận phản hồi RTSP
-    def recvRtspReply(self):
-        """ Nhận phản hồi từ Server. """
+    def recvRtspReply(self, sock):
+        """
+        Vòng lặp nhận phản hồi từ Server cho tới khi kết nối đóng.
+        RtspMessageParser tách từng phản hồi (nhiều phản hồi dính nhau khi gửi pipeline)
+        và các khung '$' (RTP/AVP/TCP): gói kênh RTP vào mediaQueue, đúng thứ tự sau phản hồi PLAY.
+        """
+        parser = RtspMessageParser()
+        while True:
+            try:
+                data = sock.recv(65536)
+                if not data:
+                    break
+                messages = parser.feed(data)
+            except ValueError as e:
+                self.log(f"Malformed RTSP reply: {e}", "ERROR")
+                break
+            except OSError:
+                break
+            for message in messages:
+                if isinstance(message, InterleavedFrame):
+                    self.onInterleaved(message)
+                else:
+                    self.parseRtspReply(message.text())
+    
+    # Hàm nhận khung RTP lồng trên kết nối RTSP
+    def onInterleaved(self, frame):
+        """ Chỉ nhận gói kênh RTP khi đang PLAY; listenRtp chậm quá (hàng đợi đầy) -> bỏ gói như UDP tràn bộ đệm. """
+        if frame.channel != self.rtpChannel or self.state != self.PLAYING:
+            return
         try:
-            reply = self.rtspSocket.recv(1024)
-            if reply:
-                self.parseRtspReply(reply.decode("utf-8"))
-        except:
+            self.mediaQueue.put_nowait(frame.data)
+        except queue.Full:
             pass
     
     # Hàm phân tích phản hồi RTSP
@@ -245,36 +383,96 @@ class RtspCore:
         except:
             return
 
-        # Lấy Session ID
+        # Lấy Session ID (Session: <id>[;timeout=<giây>])
         for line in lines:
             if "Session" in line:
-                self.sessionId = int(line.split(' ')[1])
+                params = line.split(':', 1)[1].strip().split(';')
+                self.sessionId = int(params[0])
+                for param in params[1:]:
+                    name, _, value = param.partition('=')
+                    if name.strip() == "timeout" and value.strip().isdigit():
+                        self.sessionTimeout = int(value)
+            elif line.startswith("Transport:"):
+                self.parseTransport(line)
+        
+        # Lệnh tương ứng với phản hồi này (theo CSeq)
+        method = self.pendingRequests.pop(seqNum, self.requestSent)
+        
+        # Server từ chối (vd: 404 khi SETUP, chưa có Session; 457 Invalid Range) -> giữ nguyên trạng thái
+        if status_line.split(' ')[1:2] != ["200"]:
+            self.log(f"Request rejected: {status_line}", "ERROR")
+            return
         
         if self.sessionId == 0: return
         
         # Xử lý chuyển đổi trạng thái (State Machine)
         if self.sessionId != 0:
-            if self.requestSent == self.SETUP:
+            if method == self.GET_PARAMETER:
+                # Phản hồi keepalive: không đổi trạng thái
+                return
+            if method == self.SETUP:
                 self.state = self.READY
                 self.openRtpPort()
-            elif self.requestSent == self.PLAY:
+            elif method == self.PLAY:
+                if self.state == self.PLAYING:
+                    # Phản hồi cho lệnh Seek: luồng nhận RTP vẫn đang chạy
+                    return
                 self.state = self.PLAYING
+                self.playout.resume()
+                self.jitter_buffer.resume()
                 self.playEvent = threading.Event()
                 self.playEvent.clear()
                 threading.Thread(target=self.listenRtp).start()
-            elif self.requestSent == self.PAUSE:
+            elif method == self.PAUSE:
                 self.state = self.READY
+                self.playout.pause()
                 self.playEvent.set()
-            elif self.requestSent == self.TEARDOWN:
+            elif method == self.TEARDOWN:
                 self.state = self.INIT
                 self.playEvent.set()
                 self.teardownAcked = 1
                 try: self.rtspSocket.close() 
                 except: pass
 
+    # Hàm đọc header Transport
+    def parseTransport(self, line):
+        """ Transport: ...;server_port=<rtp>-<rtcp> -> cổng Server nhận RTCP RR; interleaved=<rtp>-<rtcp> -> kênh TCP. """
+        for part in line.split(':', 1)[1].split(';'):
+            name, _, value = part.strip().partition('=')
+            try:
+                if name == "server_port" and '-' in value:
+                    self.serverRtcpPort = int(value.split('-')[1])
+                elif name == "interleaved" and '-' in value:
+                    self.rtpChannel, self.rtcpChannel = (int(c) for c in value.split('-')[:2])
+            except ValueError:
+                self.log(f"Bad Transport parameter: {part.strip()}", "ERROR")
+
+    # Hàm gửi RTCP Receiver Report
+    def sendReceiverReport(self, stats):
+        """ Gửi 1 RR (tỉ lệ mất, jitter, seq cao nhất) về cổng RTCP của Server. """
+        block = stats.reportBlock()
+        if block is None:
+            return
+        self.sendRtcp(ReceiverReport(self.ssrc, [block]).encode())
+
+    # Hàm gửi 1 gói RTCP
+    def sendRtcp(self, packet):
+        """ UDP: tới cổng RTCP của Server (server_port). TCP: khung '$' kênh RTCP trên kết nối RTSP. """
+        try:
+            if self.interleaved:
+                if self.rtspSocket is not None:
+                    with self.sendLock:
+                        self.rtspSocket.sendall(frameInterleaved(self.rtcpChannel, packet))
+            elif self.rtcpSocket is not None and self.serverRtcpPort is not None:
+                self.rtcpSocket.sendto(packet, (self.serverAddr, self.serverRtcpPort))
+        except OSError as e:
+            self.log(f"RTCP send error: {e}", "ERROR")
+
     # Hàm mở cổng RTP (UDP)
     def openRtpPort(self):
-        """ Mở cổng UDP để nhận RTP và thiết lập socket. """
+        """ Mở cổng UDP để nhận RTP và thiết lập socket (bỏ qua nếu đã mở, vd: SETUP pipeline, hoặc RTP đi qua TCP). """
+        if self.rtpSocket is not None or self.interleaved:
+            return
         self.rtpSocket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         
         # Cho phép dùng lại cổng ngay lập tức (Chống lỗi 'Address already in use')
@@ -290,83 +488,98 @@ class RtspCore:
                 self.log(f"RTP Port {self.rtpPort} Open", "SYSTEM")
         except Exception as e:
             self.log(f"Unable to bind RTP Port {self.rtpPort}: {e}", "ERROR")
+        
+        # Cổng RTCP = RTP + 1 (quy ước RFC 3550); bận thì dùng cổng bất kỳ (chỉ gửi, không nhận)
+        self.rtcpSocket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            self.rtcpSocket.bind(("", self.rtpPort + 1))
+        except OSError:
+            self.rtcpSocket.bind(("", 0))
+
+    # Hàm gửi RTCP NACK
+    def sendNack(self, mediaSsrc, seqs):
+        """ Xin Server gửi lại các gói bị mất (RTCP Generic NACK, RFC 4585) qua cổng RTCP. """
+        self.sendRtcp(GenericNack(self.ssrc, mediaSsrc, seqs).encode())
+
+    # Hàm tạo bộ nhận RTP
+    def openReceiver(self):
+        """ Bộ nhận theo lô: UDP (recv_into vào buffer cấp sẵn) hoặc mediaQueue (RTP/AVP/TCP). """
+        if self.interleaved:
+            return QueueReceiver(self.mediaQueue)
+        return RtpReceiver(self.rtpSocket)
 
     # Hàm lắng nghe RTP
     def listenRtp(self):
         """
-        VÒNG LẶP CHÍNH: Nhận gói RTP, ghép mảnh, tính toán Loss/Stats.
+        VÒNG LẶP CHÍNH: Nhận gói RTP theo lô, ghép mảnh theo Seq (FrameReassembler), xin gửi lại gói mất (NACK),
+        tính toán Loss/Stats. Chỉ frame đủ mảnh mới vào JitterBuffer.
+        Không cấp phát cho mỗi gói: datagram được recv_into vào buffer dùng lại, header đọc tại chỗ,
+        payload (memoryview) ghi thẳng vào buffer của frame đang ghép.
         """
-        current_frame_buffer = bytearray()
-        packet_count = 0 
+        reassembler = FrameReassembler()
+        receiver = self.openReceiver()
         total_frame_count = 0
-        
-        # Biến tính toán Packet Loss
-        last_seq_num = -1      
-        total_lost = 0         
-        total_received = 0     
         current_loss_rate = 0.0 
         
+        # Thống kê RTCP (RFC 3550) + hạn gửi Receiver Report kế tiếp
+        reception = ReceptionStats(self.RTP_CLOCK_RATE)
+        next_report = time.monotonic() + self.RTCP_INTERVAL
+        
         while True:
             if self.playEvent.is_set(): 
                 break
+            
+            now = time.monotonic()
+            if now >= next_report:
+                self.sendReceiverReport(reception)
+                next_report = now + self.RTCP_INTERVAL
+            
+            # Lỗ hổng Seq đã chờ đủ lâu -> NACK; frame không vá kịp bị bỏ
+            lost = reassembler.poll(now)
+            if lost and reception.ssrc is not None:
+                self.sendNack(reception.ssrc, lost)
                 
             try:
-                data = self.rtpSocket.recv(20480)
-                if data:
-                    rtpPacket = RtpPacket()
-                    rtpPacket.decode(data)
+                count = receiver.receive()
+                now = time.monotonic()
+                for i in range(count):
+                    packet = receiver.packet(i)
+                    if packet is None:
+                        continue
+                    marker, pt, seq, timestamp, ssrc, payload, info = packet
+                    if pt == FEC_PT:
+                        # Gói FEC (Seq riêng, không tính vào thống kê): vá ngay gói mất trong nhóm của nó
+                        reassembler.pushParity(payload, now, timestamp)
+                        continue
+                    # 1. Gói gửi lại (trả lời NACK) không tính vào thống kê mất gói của đường truyền
+                    #    (Server cần biết mạng mất bao nhiêu để đổi chất lượng - ABR)
+                    if not reassembler.isRetransmission(seq):
+                        reception.update(seq, timestamp, now, ssrc)
                     
-                    # 1. Lấy thông tin gói
-                    curr_seq = rtpPacket.seqNum()
-                    payload = rtpPacket.getPayload()
+                    # 2. Đặt mảnh vào đúng vị trí theo Seq (FRAME_INFO: biết trước kích thước / mảnh đầu frame)
+                    reassembler.push(seq, marker, payload, now, timestamp, info)
+                
+                # 3. Lấy các frame đã đủ mảnh
+                for frame_data, packet_count, timestamp in reassembler.frames():
+                    total_frame_count += 1
                     
-                    current_frame_buffer += payload
-                    packet_count += 1
-                    total_received += 1
+                    # Tính toán % Loss (trước khi gửi lại)
+                    expected = reception.expected()
+                    if expected > 0:
+                        current_loss_rate = max(0, reception.lost()) / expected * 100
                     
-                    # 2. Thuật toán tính Loss (Gap Detection)
-                    if last_seq_num != -1:
-                        # Tính khoảng cách giữa gói hiện tại và gói trước
-                        diff = curr_seq - last_seq_num
-                        
-                        # Xử lý trường hợp số thứ tự quay vòng (0 -> 65535)
-                        if diff < 0: 
-                            diff += 65536
-                            
-                        # Nếu khoảng cách > 1, tức là có gói bị rơi ở giữa
-                        if diff > 1:
-                            lost = diff - 1
-                            total_lost += lost
-                            # print(f"[LOSS] Detected {lost} missing packets!") # Uncomment để debug
+                    # In log thống kê (Sampling mỗi 50 frame)
+                    if total_frame_count % 50 == 0:
+                        st = reassembler.stats()
+                        msg = (f"📊 STREAM_MONITOR: Frame #{total_frame_count} | Size: {len(frame_data)}b | "
+                               f"Frag: {packet_count} | Loss: {current_loss_rate:.1f}% | "
+                               f"NACK: {st['nacked']} | Recovered: {st['recovered']} | FEC: {st['fecRecovered']} | "
+                               f"Dropped: {st['dropped']} | Concealed: {st['concealed']} | "
+                               f"Buffer: {self.jitter_buffer.occupancy() * 1000:.0f}/{self.jitter_buffer.targetDelay() * 1000:.0f} ms")
+                        self.log(msg, "SYSTEM")
                     
-                    # Cập nhật số thứ tự cho vòng sau
-                    last_seq_num = curr_seq
-                    
-                    # 3. Kiểm tra Marker Bit (Kết thúc Frame)
-                    if rtpPacket.header[1] >> 7 == 1:
-                        if len(current_frame_buffer) > 0:
-                            total_frame_count += 1
-                            
-                            # Tính toán % Loss
-                            if (total_received + total_lost) > 0:
-                                current_loss_rate = (total_lost / (total_received + total_lost)) * 100
-                            
-                            # In log thống kê (Sampling mỗi 50 frame)
-                            if total_frame_count % 50 == 0:
-                                sz = len(current_frame_buffer)
-                                msg = f"📊 STREAM_MONITOR: Frame #{total_frame_count} | Size: {sz}b | Frag: {packet_count} | Loss: {current_loss_rate:.1f}%"
-                                self.log(msg, "SYSTEM")
-                            
-                            # Gửi TUPLE (Data, Pkts, Loss) sang Buffer
-                            frame_tuple = (current_frame_buffer[:], packet_count, current_loss_rate)
-                            self.jitter_buffer.put(frame_tuple)
-                        
-                        # Reset cho frame tiếp theo
-                        current_frame_buffer = bytearray()
-                        packet_count = 0
-                        
+                    # Gửi TUPLE (Data, Pkts, Loss, thời điểm media) sang Buffer
+                    self.jitter_buffer.put((frame_data, packet_count, current_loss_rate, self.playout.arrive(timestamp, now)), now)
                         
-            except socket.timeout:
-                continue
             except Exception as e:
-                pass
\ No newline at end of file
+                pass
@@ -0,0 +1,66 @@
+import struct
+
+# Payload Type động dành cho gói sửa lỗi (FEC), cùng SSRC với luồng video nhưng Seq riêng:
+# gói FEC mất không tạo lỗ hổng trong chuỗi Seq của video (không bị NACK)
+FEC_PT = 127
+
+# Seq gói dữ liệu đầu tiên của nhóm | số gói trong nhóm | XOR bit Marker | XOR độ dài payload
+FEC_HEADER = struct.Struct('!HBBH')
+
+def xorParity(payloads):
+    """
+    Parity XOR của 1 nhóm payload (payload ngắn hơn được coi như đệm 0 ở cuối).
+    Trả về (parity, XOR độ dài). XOR trên số nguyên lớn: 1 phép tính / payload thay vì từng byte.
+    """
+    size = max(len(payload) for payload in payloads)
+    acc = lengths = 0
+    for payload in payloads:
+        acc ^= int.from_bytes(payload, 'big') << (8 * (size - len(payload)))
+        lengths ^= len(payload)
+    return acc.to_bytes(size, 'big'), lengths
+
+class FecPacket:
+    """
+    Payload của 1 gói FEC (XOR parity, ý tưởng như RFC 5109 nhưng gọn hơn):
+    bảo vệ `count` gói dữ liệu liên tiếp từ Seq `base` trong cùng 1 frame.
+    Mất đúng 1 gói trong nhóm -> dựng lại được ngay từ các gói còn lại + parity, không cần chờ gửi lại.
+    Gói FEC mang RTP Timestamp của frame được bảo vệ (timestamp, bên nhận gán từ header RTP).
+    """
+    __slots__ = ('base', 'count', 'marker', 'length', 'parity', 'timestamp')
+
+    def __init__(self, base, count, marker, length, parity, timestamp=None):
+        self.base = base
+        self.count = count
+        self.marker = marker        # XOR bit Marker của nhóm (1 nếu nhóm chứa gói cuối frame)
+        self.length = length        # XOR độ dài payload của nhóm
+        self.parity = parity
+        self.timestamp = timestamp  # RTP Timestamp của frame chứa nhóm (None nếu không biết)
+
+    @staticmethod
+    def body(payloads, lastOfFrame):
+        """ Phần payload FEC sau trường base (không đổi theo Seq -> cache được cùng frame). """
+        parity, length = xorParity(payloads)
+        return FEC_HEADER.pack(0, len(payloads), 1 if lastOfFrame else 0, length)[2:] + parity
+
+    @classmethod
+    def decode(cls, payload, timestamp=None):
+        if len(payload) < FEC_HEADER.size:
+            raise ValueError("FEC payload too short")
+        base, count, marker, length = FEC_HEADER.unpack_from(payload)
+        return cls(base, count, marker & 1, length, bytes(payload[FEC_HEADER.size:]), timestamp)
+
+    def recover(self, received):
+        """
+        received: [(marker, payload)] của count - 1 gói còn lại trong nhóm.
+        Trả về (marker, payload) của gói bị mất.
+        """
+        size = len(self.parity)
+        acc = int.from_bytes(self.parity, 'big')
+        marker, length = self.marker, self.length
+        for bit, payload in received:
+            acc ^= int.from_bytes(payload, 'big') << (8 * (size - len(payload)))
+            marker ^= bit
+            length ^= len(payload)
+        if length > size:
+            raise ValueError("FEC group does not match its parity")
+        return marker, acc.to_bytes(size, 'big')[:length]
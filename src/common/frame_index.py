@@ -0,0 +1,112 @@
+import os
+import struct
+import sys
+from array import array
+
+class FrameIndex:
+    """
+    Bảng chỉ mục khung hình (Frame Offset Index).
+    frame number (0-based) -> (byte offset, length) của dữ liệu JPEG trong file.
+
+    Được lưu cạnh file video dưới dạng sidecar "<video>.idx" để chỉ phải quét 1 lần.
+    Sidecar tự bị bỏ qua (và build lại) khi mtime/kích thước của file video thay đổi.
+    """
+
+    MAGIC = b'FIDX'
+    VERSION = 1
+    # magic | version | mtime_ns | file size | frame count
+    HEADER = struct.Struct('<4sHqQI')
+    SUFFIX = '.idx'
+
+    def __init__(self, offsets=None, lengths=None, mtime=0, size=0):
+        self.offsets = offsets if offsets is not None else array('Q')
+        self.lengths = lengths if lengths is not None else array('I')
+        self.mtime = mtime
+        self.size = size
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def add(self, offset, length):
+        self.offsets.append(offset)
+        self.lengths.append(length)
+
+    def lookup(self, frameIndex):
+        """ Trả về (offset, length) của frame thứ frameIndex (0-based). """
+        return self.offsets[frameIndex], self.lengths[frameIndex]
+
+    # =========================================================================
+    # SIDECAR (LƯU / NẠP)
+    # =========================================================================
+
+    @classmethod
+    def sidecarPath(cls, videoPath):
+        return videoPath + cls.SUFFIX
+
+    @staticmethod
+    def _fileStamp(videoPath):
+        st = os.stat(videoPath)
+        return st.st_mtime_ns, st.st_size
+
+    @classmethod
+    def load(cls, videoPath):
+        """ Nạp sidecar nếu còn hợp lệ, ngược lại trả về None. """
+        try:
+            mtime, size = cls._fileStamp(videoPath)
+            with open(cls.sidecarPath(videoPath), 'rb') as f:
+                magic, version, idxMtime, idxSize, count = cls.HEADER.unpack(f.read(cls.HEADER.size))
+                if magic != cls.MAGIC or version != cls.VERSION:
+                    return None
+                if idxMtime != mtime or idxSize != size:
+                    return None
+
+                offsets = array('Q')
+                lengths = array('I')
+                offsets.fromfile(f, count)
+                lengths.fromfile(f, count)
+        except (OSError, EOFError, struct.error):
+            return None
+
+        if sys.byteorder == 'big':
+            offsets.byteswap()
+            lengths.byteswap()
+        return cls(offsets, lengths, mtime, size)
+
+    def save(self, videoPath):
+        """ Ghi sidecar. Thư mục chỉ đọc -> bỏ qua (index vẫn dùng được trong RAM). """
+        offsets, lengths = self.offsets, self.lengths
+        if sys.byteorder == 'big':
+            offsets, lengths = array('Q', offsets), array('I', lengths)
+            offsets.byteswap()
+            lengths.byteswap()
+
+        tmpPath = self.sidecarPath(videoPath) + '.tmp'
+        try:
+            with open(tmpPath, 'wb') as f:
+                f.write(self.HEADER.pack(self.MAGIC, self.VERSION, self.mtime, self.size, len(offsets)))
+                offsets.tofile(f)
+                lengths.tofile(f)
+            os.replace(tmpPath, self.sidecarPath(videoPath))
+        except OSError as e:
+            print(f"[FrameIndex] Could not write sidecar for {videoPath}: {e}")
+
+    @classmethod
+    def build(cls, videoStream):
+        """
+        Quét toàn bộ file 1 lần để lập chỉ mục.
+        Vị trí con trỏ file của videoStream được khôi phục sau khi quét.
+        """
+        mtime, size = cls._fileStamp(videoStream.filename)
+        index = cls(mtime=mtime, size=size)
+        for offset, length in videoStream.scanFrames():
+            index.add(offset, length)
+        return index
+
+    @classmethod
+    def loadOrBuild(cls, videoStream):
+        """ Dùng sidecar nếu hợp lệ, ngược lại quét file và lưu sidecar mới. """
+        index = cls.load(videoStream.filename)
+        if index is None:
+            index = cls.build(videoStream)
+            index.save(videoStream.filename)
+        return index
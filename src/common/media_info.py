@@ -0,0 +1,48 @@
+import json
+
+class MediaInfo:
+    """
+    Metadata của 1 file video, lưu cạnh file dưới dạng sidecar "<video>.json".
+    converter.py ghi file này khi convert; có thể viết tay cho file tải trên mạng, vd:
+        {"fps": 25}
+    renditions: các bản mã hóa chất lượng khác của cùng video (cùng fps / số frame, đường dẫn
+    tương đối với thư mục của file), dùng cho ABR (--abr), vd:
+        {"fps": 30, "renditions": [{"file": "movie_480p.Mjpeg", "height": 480}]}
+    """
+
+    SUFFIX = '.json'
+
+    def __init__(self, fps=None, width=None, height=None, frames=None, renditions=None):
+        self.fps = fps
+        self.width = width
+        self.height = height
+        self.frames = frames
+        self.renditions = renditions
+
+    @classmethod
+    def sidecarPath(cls, videoPath):
+        return videoPath + cls.SUFFIX
+
+    @classmethod
+    def load(cls, videoPath):
+        """ Đọc sidecar. Không có / hỏng -> MediaInfo rỗng (mọi trường là None). """
+        try:
+            with open(cls.sidecarPath(videoPath), 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return cls()
+
+        fps = meta.get('fps')
+        if not isinstance(fps, (int, float)) or fps <= 0:
+            fps = None
+        renditions = meta.get('renditions')
+        if isinstance(renditions, list):
+            renditions = [r for r in renditions if isinstance(r, dict) and isinstance(r.get('file'), str)] or None
+        else:
+            renditions = None
+        return cls(fps, meta.get('width'), meta.get('height'), meta.get('frames'), renditions)
+
+    def save(self, videoPath):
+        meta = {key: value for key, value in self.__dict__.items() if value is not None}
+        with open(self.sidecarPath(videoPath), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
@@ -0,0 +1,231 @@
+import struct
+
+# Payload Type của RTCP (RFC 3550)
+RTCP_SR = 200
+RTCP_RR = 201
+# Transport layer feedback (RFC 4585), FMT 1 = Generic NACK
+RTCP_RTPFB = 205
+RTPFB_NACK = 1
+
+# V/P/RC | PT | length (số word 32-bit - 1) | SSRC người gửi
+RTCP_HEADER = struct.Struct('!BBHI')
+# SSRC nguồn | fraction lost (8) + cumulative lost (24) | extended highest seq | jitter | LSR | DLSR
+REPORT_BLOCK = struct.Struct('!IIIIII')
+# Generic NACK: SSRC của luồng media | FCI: PID (seq mất đầu tiên) + BLP (bitmask 16 seq mất tiếp theo)
+NACK_MEDIA = struct.Struct('!I')
+NACK_FCI = struct.Struct('!HH')
+# Sender Report: NTP (64) | RTP timestamp | packet count | octet count (bỏ qua khi đọc)
+SENDER_INFO_SIZE = 20
+
+class ReportBlock:
+    """
+    1 khối báo cáo nhận (Reception Report Block) về 1 nguồn RTP.
+    fractionLost: tỉ lệ mất trong khoảng từ report trước (0.0 - 1.0, gửi đi dạng /256).
+    """
+    __slots__ = ('ssrc', 'fractionLost', 'cumulativeLost', 'highestSeq', 'jitter', 'lsr', 'dlsr')
+
+    def __init__(self, ssrc, fractionLost=0.0, cumulativeLost=0, highestSeq=0, jitter=0, lsr=0, dlsr=0):
+        self.ssrc = ssrc
+        self.fractionLost = fractionLost
+        self.cumulativeLost = cumulativeLost
+        self.highestSeq = highestSeq
+        self.jitter = jitter
+        self.lsr = lsr
+        self.dlsr = dlsr
+
+    def pack(self):
+        fraction = min(255, max(0, int(self.fractionLost * 256)))
+        # Cumulative lost: số có dấu 24 bit (âm khi nhận trùng nhiều hơn mất)
+        lost = max(-0x800000, min(0x7FFFFF, self.cumulativeLost)) & 0xFFFFFF
+        return REPORT_BLOCK.pack(self.ssrc, (fraction << 24) | lost, self.highestSeq & 0xFFFFFFFF,
+                                 int(self.jitter) & 0xFFFFFFFF, self.lsr, self.dlsr)
+
+    @classmethod
+    def unpack(cls, data, offset=0):
+        ssrc, lostWord, highestSeq, jitter, lsr, dlsr = REPORT_BLOCK.unpack_from(data, offset)
+        lost = lostWord & 0xFFFFFF
+        if lost & 0x800000:
+            lost -= 0x1000000
+        return cls(ssrc, (lostWord >> 24) / 256, lost, highestSeq, jitter, lsr, dlsr)
+
+class ReceiverReport:
+    """
+    Gói RTCP Receiver Report (RR, PT 201): Client báo cho Server tình trạng nhận của từng luồng.
+    """
+
+    def __init__(self, ssrc=0, blocks=None):
+        self.ssrc = ssrc            # SSRC của chính người nhận
+        self.blocks = blocks or []  # [ReportBlock]
+
+    def encode(self):
+        """ Đóng gói RR (tối đa 31 khối báo cáo). """
+        blocks = self.blocks[:31]
+        length = 1 + 6 * len(blocks)
+        header = RTCP_HEADER.pack((2 << 6) | len(blocks), RTCP_RR, length, self.ssrc)
+        return header + b''.join(block.pack() for block in blocks)
+
+    @classmethod
+    def decode(cls, data):
+        """
+        Đọc gói RTCP (có thể là gói ghép - compound), trả về danh sách ReceiverReport.
+        Khối báo cáo trong Sender Report cũng được lấy ra; các loại gói khác (SDES, BYE...) bị bỏ qua.
+        ValueError nếu sai định dạng.
+        """
+        return [packet for packet in decodeCompound(data) if isinstance(packet, cls)]
+
+class GenericNack:
+    """
+    Gói RTCP Generic NACK (RTPFB, FMT 1 - RFC 4585): Client xin gửi lại các gói RTP bị mất.
+    Mỗi FCI 32 bit phủ 17 seq liên tiếp (PID + 16 bit BLP) -> loạt mất gần nhau chỉ tốn vài byte.
+    """
+
+    def __init__(self, ssrc=0, mediaSsrc=0, lost=None):
+        self.ssrc = ssrc                # SSRC của người gửi NACK (Client)
+        self.mediaSsrc = mediaSsrc      # SSRC của luồng RTP bị mất gói (Server cấp lúc SETUP)
+        self.lost = lost or []          # Seq (16 bit) bị mất
+
+    def encode(self):
+        fci = []
+        pending = sorted(set(seq & 0xFFFF for seq in self.lost))
+        # Gom theo cửa sổ 17 seq tính từ seq đầu còn lại. Quay vòng 65535 -> 0: bắt đầu ngay sau khoảng trống
+        # lớn nhất giữa 2 seq liên tiếp (vd: [0, 1, 65535] -> 65535, 0, 1)
+        if len(pending) > 1:
+            gaps = [pending[i] - pending[i - 1] for i in range(1, len(pending))]
+            split = max(range(len(gaps)), key=gaps.__getitem__) + 1
+            if gaps[split - 1] > pending[0] + 0x10000 - pending[-1]:
+                pending = pending[split:] + pending[:split]
+        while pending:
+            pid, bitmask, rest = pending[0], 0, []
+            for seq in pending[1:]:
+                offset = (seq - pid) & 0xFFFF
+                if offset <= 16:
+                    bitmask |= 1 << (offset - 1)
+                else:
+                    rest.append(seq)
+            fci.append(NACK_FCI.pack(pid, bitmask))
+            pending = rest
+        length = 2 + len(fci)
+        header = RTCP_HEADER.pack((2 << 6) | RTPFB_NACK, RTCP_RTPFB, length, self.ssrc)
+        return header + NACK_MEDIA.pack(self.mediaSsrc) + b''.join(fci)
+
+    @classmethod
+    def unpack(cls, data, ssrc, start, end):
+        """ Phần thân sau header chung (start = ngay sau SSRC người gửi). """
+        if start + NACK_MEDIA.size > end:
+            raise ValueError("Truncated RTCP NACK")
+        mediaSsrc, = NACK_MEDIA.unpack_from(data, start)
+        lost = []
+        for offset in range(start + NACK_MEDIA.size, end - NACK_FCI.size + 1, NACK_FCI.size):
+            pid, bitmask = NACK_FCI.unpack_from(data, offset)
+            lost.append(pid)
+            lost.extend((pid + bit + 1) & 0xFFFF for bit in range(16) if bitmask >> bit & 1)
+        return cls(ssrc, mediaSsrc, lost)
+
+def decodeCompound(data):
+    """
+    Đọc gói RTCP (có thể là gói ghép - compound): danh sách ReceiverReport / GenericNack theo thứ tự.
+    Khối báo cáo trong Sender Report được lấy ra như RR; các loại gói khác (SDES, BYE...) bị bỏ qua.
+    ValueError nếu sai định dạng.
+    """
+    packets = []
+    offset = 0
+    while offset + RTCP_HEADER.size <= len(data):
+        first, pt, length, ssrc = RTCP_HEADER.unpack_from(data, offset)
+        if first >> 6 != 2:
+            raise ValueError("Not an RTCP packet (version != 2)")
+        end = offset + 4 * (length + 1)
+        if end > len(data):
+            raise ValueError("Truncated RTCP packet")
+
+        start = offset + RTCP_HEADER.size
+        if pt == RTCP_SR:
+            start += SENDER_INFO_SIZE
+        if pt in (RTCP_RR, RTCP_SR):
+            count = first & 0x1F
+            if start + count * REPORT_BLOCK.size > end:
+                raise ValueError("RTCP report count exceeds packet length")
+            blocks = [ReportBlock.unpack(data, start + i * REPORT_BLOCK.size) for i in range(count)]
+            packets.append(ReceiverReport(ssrc, blocks))
+        elif pt == RTCP_RTPFB and first & 0x1F == RTPFB_NACK:
+            packets.append(GenericNack.unpack(data, ssrc, start, end))
+        offset = end
+    return packets
+
+class ReceptionStats:
+    """
+    Thống kê nhận của 1 luồng RTP theo RFC 3550 (A.1 số thứ tự mở rộng, A.3 tỉ lệ mất, A.8 jitter).
+    Client gọi update() cho mỗi gói và reportBlock() mỗi lần gửi RR.
+    """
+
+    # Nhảy số thứ tự lớn hơn ngưỡng này -> coi là luồng mới (khởi động lại bộ đếm)
+    MAX_DROPOUT = 3000
+    MAX_MISORDER = 100
+    SEQ_MOD = 1 << 16
+
+    def __init__(self, clockRate):
+        self.clockRate = clockRate      # Đơn vị của RTP timestamp (số tick / giây)
+        self.ssrc = None
+        self.baseSeq = None
+        self.maxSeq = 0
+        self.cycles = 0
+        self.received = 0
+        self.expectedPrior = 0
+        self.receivedPrior = 0
+        self.transit = None
+        self.jitter = 0.0
+
+    def update(self, seq, timestamp, arrival, ssrc):
+        """ Ghi nhận 1 gói: seq/timestamp/ssrc từ header RTP, arrival = thời điểm nhận (giây). """
+        if self.baseSeq is None or ssrc != self.ssrc:
+            self._restart(seq, ssrc)
+        else:
+            delta = (seq - self.maxSeq) % self.SEQ_MOD
+            if delta < self.MAX_DROPOUT:
+                # Tăng bình thường (có thể mất vài gói); seq quay vòng -> thêm 1 chu kỳ
+                if seq < self.maxSeq:
+                    self.cycles += self.SEQ_MOD
+                self.maxSeq = seq
+            elif delta <= self.SEQ_MOD - self.MAX_MISORDER:
+                # Nhảy quá xa (nguồn khởi động lại) -> bắt đầu đếm lại
+                self._restart(seq, ssrc)
+            # Còn lại: gói đến trễ / trùng -> chỉ đếm vào received
+
+        self.received += 1
+        transit = arrival * self.clockRate - timestamp
+        if self.transit is not None:
+            # Timestamp 32 bit quay vòng (gốc ngẫu nhiên) -> lấy độ lệch theo modulo 2^32
+            d = abs((transit - self.transit + 0x80000000) % 0x100000000 - 0x80000000)
+            self.jitter += (d - self.jitter) / 16
+        self.transit = transit
+
+    def _restart(self, seq, ssrc):
+        self.ssrc = ssrc
+        self.baseSeq = seq
+        self.maxSeq = seq
+        self.cycles = 0
+        self.received = 0
+        self.expectedPrior = 0
+        self.receivedPrior = 0
+        self.transit = None
+
+    def extendedMax(self):
+        return self.cycles + self.maxSeq
+
+    def expected(self):
+        return self.extendedMax() - self.baseSeq + 1 if self.baseSeq is not None else 0
+
+    def lost(self):
+        return self.expected() - self.received
+
+    def reportBlock(self):
+        """ Khối báo cáo cho khoảng từ lần gọi trước. None nếu chưa nhận gói nào. """
+        if self.baseSeq is None:
+            return None
+        expected = self.expected()
+        expectedInterval = expected - self.expectedPrior
+        receivedInterval = self.received - self.receivedPrior
+        self.expectedPrior = expected
+        self.receivedPrior = self.received
+        lostInterval = expectedInterval - receivedInterval
+        fraction = lostInterval / expectedInterval if expectedInterval > 0 and lostInterval > 0 else 0.0
+        return ReportBlock(self.ssrc, fraction, self.lost(), self.extendedMax(), self.jitter)
@@ -1,9 +1,62 @@
 ﻿import sys
+import struct
 from time import time
 
 # Kích thước Header RTP chuẩn là 12 bytes
 HEADER_SIZE = 12
 
+# Đồng hồ media của RTP Timestamp (tick/giây): 90 kHz như mọi payload video (RFC 2435 cho JPEG)
+RTP_CLOCK_RATE = 90000
+
+# Byte 1 (M|PT) + Seq (16) + Timestamp (32) + SSRC (32): phần thay đổi theo từng gói
+HEADER_FIELDS = struct.Struct('!BHII')
+
+# Header extension RFC 8285 dạng 1 byte: profile 0xBEDE | độ dài (số từ 32 bit), rồi các phần tử
+# [ID (4 bit) | L (4 bit) = độ dài - 1] + dữ liệu, đệm 0 tới bội 4
+EXTENSION_ONE_BYTE = 0xBEDE
+EXTENSION_HEADER = struct.Struct('!HH')
+
+# Phần tử FRAME_INFO_ID: số thứ tự frame | chỉ số mảnh | số mảnh của frame | kích thước frame (byte)
+FRAME_INFO_ID = 1
+FRAME_INFO = struct.Struct('!IHHI')
+# Khối extension chỉ chứa FRAME_INFO (profile, độ dài 4 từ, byte ID/L, 12 byte dữ liệu, 3 byte đệm)
+FRAME_INFO_BLOCK = struct.Struct('!HHBIHHI3x')
+FRAME_INFO_TAG = FRAME_INFO_ID << 4 | (FRAME_INFO.size - 1)
+
+def encodeExtension(elements):
+    """ [(ID 1..14, dữ liệu 1..16 byte)] -> khối header extension RFC 8285 (1 byte). """
+    body = bytearray()
+    for elementId, data in elements:
+        if not 1 <= elementId <= 14 or not 1 <= len(data) <= 16:
+            raise ValueError(f"Invalid one-byte header extension element {elementId} ({len(data)} bytes)")
+        body.append(elementId << 4 | (len(data) - 1))
+        body += data
+    body += bytes(-len(body) % 4)
+    return EXTENSION_HEADER.pack(EXTENSION_ONE_BYTE, len(body) // 4) + body
+
+def decodeExtension(data):
+    """ Khối header extension (bắt đầu từ profile) -> {ID: dữ liệu}. Profile khác 0xBEDE -> {}. """
+    if len(data) < EXTENSION_HEADER.size:
+        raise ValueError("Header extension too short")
+    profile, words = EXTENSION_HEADER.unpack_from(data)
+    if profile != EXTENSION_ONE_BYTE:
+        return {}
+    end = min(len(data), EXTENSION_HEADER.size + 4 * words)
+    elements = {}
+    pos = EXTENSION_HEADER.size
+    while pos < end:
+        tag = data[pos]
+        if tag == 0:
+            # Byte đệm
+            pos += 1
+            continue
+        elementId, length = tag >> 4, (tag & 0x0F) + 1
+        if elementId == 15:
+            break
+        elements[elementId] = bytes(data[pos + 1 : pos + 1 + length])
+        pos += 1 + length
+    return elements
+
 class RtpPacket:    
     """
     Xử lý gói tin RTP (Real-time Transport Protocol).
@@ -11,13 +64,14 @@ class RtpPacket:
     """
     def __init__(self):
         self.header = bytearray(HEADER_SIZE)
+        self.extension = b''        # Khối header extension (từ profile), rỗng nếu không có
         self.payload = bytearray()
         
     # =========================================================================
     # ENCODING (ĐÓNG GÓI DỮ LIỆU)
     # =========================================================================
         
-    def encode(self, version, padding, extension, cc, seqnum, marker, pt, ssrc, payload, timestamp=None):
+    def encode(self, version, padding, extension, cc, seqnum, marker, pt, ssrc, payload, timestamp=None, extensions=None):
         """
         Tạo gói tin RTP từ các thông số đầu vào.
         
@@ -30,14 +84,18 @@ class RtpPacket:
         :param pt: Payload Type (MJPEG = 26)
         :param ssrc: Synchronization Source Identifier
         :param payload: Dữ liệu ảnh (hoặc mảnh của ảnh)
-        :param timestamp: Thời gian gửi (nếu None sẽ lấy thời gian thực)
+        :param timestamp: RTP Timestamp (RTP_CLOCK_RATE), None -> lấy theo đồng hồ thực
+        :param extensions: Các phần tử header extension RFC 8285 [(ID, dữ liệu)] (bật Extension bit)
         """
         
         # Tự động lấy thời gian nếu không truyền vào
         if timestamp is None:
-            timestamp = int(time())
+            timestamp = int(time() * RTP_CLOCK_RATE) & 0xFFFFFFFF
         
         self.header = bytearray(HEADER_SIZE)
+        self.extension = encodeExtension(extensions) if extensions else b''
+        if self.extension:
+            extension = 1
         
         # --- Byte 0: V (2 bits) | P (1 bit) | X (1 bit) | CC (4 bits) ---
         self.header[0] = (version << 6) | (padding << 5) | (extension << 4) | cc
@@ -74,7 +132,16 @@ class RtpPacket:
             raise ValueError("Data stream too short to be RTP packet")
 
         self.header = bytearray(byteStream[:HEADER_SIZE])
-        self.payload = byteStream[HEADER_SIZE:]
+        # Bỏ qua CSRC, tách header extension (nếu có) khỏi payload
+        start = HEADER_SIZE + 4 * (self.header[0] & 0x0F)
+        self.extension = b''
+        if self.header[0] & 0x10:
+            if len(byteStream) < start + EXTENSION_HEADER.size:
+                raise ValueError("Data stream too short for its header extension")
+            end = start + EXTENSION_HEADER.size + 4 * int.from_bytes(byteStream[start + 2 : start + 4], 'big')
+            self.extension = bytes(byteStream[start:end])
+            start = end
+        self.payload = byteStream[start:]
     
     # =========================================================================
     # GETTERS (LẤY THÔNG TIN HEADER)
@@ -94,15 +161,56 @@ class RtpPacket:
         timestamp = (self.header[4] << 24) | (self.header[5] << 16) | (self.header[6] << 8) | self.header[7]
         return int(timestamp)
     
+    def ssrc(self):
+        """ Lấy SSRC (định danh luồng). """
+        return int.from_bytes(self.header[8:12], 'big')
+    
     def payloadType(self):
         """ Lấy Payload Type. """
         pt = self.header[1] & 127
         return int(pt)
     
+    def extensions(self):
+        """ Các phần tử header extension RFC 8285: {ID: dữ liệu}. """
+        return decodeExtension(self.extension) if self.extension else {}
+    
+    def frameInfo(self):
+        """ (số thứ tự frame, chỉ số mảnh, số mảnh, kích thước frame) từ header extension, None nếu không có. """
+        data = self.extensions().get(FRAME_INFO_ID)
+        if data is None or len(data) != FRAME_INFO.size:
+            return None
+        return FRAME_INFO.unpack(data)
+    
     def getPayload(self):
         """ Lấy dữ liệu ảnh. """
         return self.payload
         
     def getPacket(self):
-        """ Lấy toàn bộ gói RTP (Header + Payload) để gửi đi. """
-        return self.header + self.payload
\ No newline at end of file
+        """ Lấy toàn bộ gói RTP (Header + Extension + Payload) để gửi đi. """
+        return self.header + self.extension + self.payload
+
+class RtpHeaderTemplate:
+    """
+    Header RTP dựng sẵn cho 1 luồng gửi (V/P/X/CC/PT cố định).
+    Mỗi gói chỉ cần ghi đè Marker/Seq/Timestamp/SSRC vào buffer có sẵn (struct.pack_into),
+    không tạo RtpPacket / bytearray mới.
+    frameInfo: mỗi header kèm khối extension FRAME_INFO (size = 12 + 20 byte), ghi bằng writeFrameInfo.
+    """
+    def __init__(self, pt=26, ssrc=0, version=2, frameInfo=False):
+        self.first = version << 6 | (0x10 if frameInfo else 0)
+        self.pt = pt
+        self.ssrc = ssrc
+        self.frameInfo = frameInfo
+        self.size = HEADER_SIZE + (FRAME_INFO_BLOCK.size if frameInfo else 0)
+
+    def write(self, buffer, offset, seqnum, marker, timestamp):
+        """ Ghi header 12 byte vào buffer[offset:offset+12]. """
+        buffer[offset] = self.first
+        HEADER_FIELDS.pack_into(buffer, offset + 1, (marker << 7) | self.pt, seqnum & 0xFFFF,
+                                timestamp & 0xFFFFFFFF, self.ssrc)
+
+    def writeFrameInfo(self, buffer, offset, frameNum, index, count, size):
+        """ Ghi khối extension FRAME_INFO ngay sau header 12 byte bắt đầu tại offset. """
+        FRAME_INFO_BLOCK.pack_into(buffer, offset + HEADER_SIZE, EXTENSION_ONE_BYTE, (FRAME_INFO_BLOCK.size - 4) // 4,
+                                   FRAME_INFO_TAG, frameNum & 0xFFFFFFFF, index, count, size)
+
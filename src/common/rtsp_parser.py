@@ -0,0 +1,126 @@
+import struct
+
+# RFC 2326 §10.12: RTP/RTCP lồng trên kết nối RTSP (RTP/AVP/TCP) -> '$' | kênh (1 byte) | độ dài (2 byte) | gói
+INTERLEAVED_MAGIC = 0x24
+INTERLEAVED_HEADER = struct.Struct('!BBH')
+
+def frameInterleaved(channel, packet):
+    """ Đóng khung 1 gói RTP/RTCP để gửi lồng trên kết nối RTSP. """
+    return INTERLEAVED_HEADER.pack(INTERLEAVED_MAGIC, channel, len(packet)) + packet
+
+class RtspMessage:
+    """
+    1 thông điệp RTSP hoàn chỉnh (request hoặc reply): dòng đầu + header + body.
+    """
+
+    def __init__(self, startLine, headers, body=b''):
+        self.startLine = startLine
+        self.headers = headers      # [(tên, giá trị)] theo đúng thứ tự nhận được
+        self.body = body
+
+    def header(self, name, default=None):
+        """ Giá trị header đầu tiên có tên name (không phân biệt hoa/thường). """
+        name = name.lower()
+        for key, value in self.headers:
+            if key.lower() == name:
+                return value
+        return default
+
+    def text(self):
+        """ Toàn bộ thông điệp dạng chuỗi (các dòng cách nhau bởi \\r\\n), như khi đọc thẳng từ socket. """
+        lines = [self.startLine] + [f"{key}: {value}" for key, value in self.headers]
+        return '\r\n'.join(lines) + '\r\n\r\n' + self.body.decode('utf-8', errors='replace')
+
+class InterleavedFrame:
+    """ 1 gói RTP/RTCP nhận lồng trên kết nối RTSP (khung '$'), kênh theo Transport: interleaved=<rtp>-<rtcp>. """
+    __slots__ = ('channel', 'data')
+
+    def __init__(self, channel, data):
+        self.channel = channel
+        self.data = data
+
+class RtspMessageParser:
+    """
+    Bộ tách thông điệp RTSP tăng dần (Incremental Framing) trên luồng TCP.
+    - Gom byte cho tới khi gặp dòng trống (\\r\\n\\r\\n, chấp nhận cả \\n\\n).
+    - Có Content-Length -> đọc thêm đúng số byte body.
+    - 1 lần feed() có thể trả về 0, 1 hay nhiều thông điệp (request được pipeline / bị TCP gộp),
+      phần thừa được giữ lại cho lần sau (request bị cắt giữa 2 segment).
+    - Khung '$' (RTP/AVP/TCP) xen giữa các thông điệp được trả về dạng InterleavedFrame, đúng thứ tự.
+    """
+
+    # Header dài quá ngưỡng mà chưa kết thúc -> coi là dữ liệu rác
+    MAX_HEADER_BYTES = 8192
+    MAX_BODY_BYTES = 64 * 1024
+
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def feed(self, data):
+        """
+        Thêm byte vừa nhận, trả về danh sách RtspMessage / InterleavedFrame đã hoàn chỉnh (theo thứ tự).
+        ValueError nếu sai định dạng.
+        """
+        self.buffer += data
+        messages = []
+        while True:
+            message = self._next()
+            if message is None:
+                return messages
+            messages.append(message)
+
+    def _next(self):
+        buffer = self.buffer
+        # Bỏ dòng trống thừa giữa 2 thông điệp
+        start = 0
+        while start < len(buffer) and buffer[start] in b'\r\n':
+            start += 1
+        if start:
+            del buffer[:start]
+        if buffer[:1] == b'$':
+            return self._nextInterleaved()
+
+        end, sep = buffer.find(b'\r\n\r\n'), 4
+        bare = buffer.find(b'\n\n')
+        if bare != -1 and (end == -1 or bare < end):
+            end, sep = bare, 2
+        if end == -1:
+            if len(buffer) > self.MAX_HEADER_BYTES:
+                raise ValueError("RTSP header too long")
+            return None
+
+        lines = buffer[:end].decode('utf-8', errors='replace').splitlines()
+        headers = []
+        for line in lines[1:]:
+            key, colon, value = line.partition(':')
+            if colon:
+                headers.append((key.strip(), value.strip()))
+
+        length = 0
+        for key, value in headers:
+            if key.lower() == 'content-length':
+                try:
+                    length = int(value)
+                except ValueError:
+                    raise ValueError(f"Invalid Content-Length: {value}")
+        if length < 0 or length > self.MAX_BODY_BYTES:
+            raise ValueError(f"Invalid Content-Length: {length}")
+
+        bodyStart = end + sep
+        if len(buffer) < bodyStart + length:
+            return None
+        body = bytes(buffer[bodyStart : bodyStart + length])
+        del buffer[:bodyStart + length]
+        return RtspMessage(lines[0].strip(), headers, body)
+
+    def _nextInterleaved(self):
+        buffer = self.buffer
+        if len(buffer) < INTERLEAVED_HEADER.size:
+            return None
+        _, channel, length = INTERLEAVED_HEADER.unpack_from(buffer)
+        end = INTERLEAVED_HEADER.size + length
+        if len(buffer) < end:
+            return None
+        data = bytes(buffer[INTERLEAVED_HEADER.size : end])
+        del buffer[:end]
+        return InterleavedFrame(channel, data)
@@ -1,4 +1,12 @@
 import os
+import mmap
+import threading
+
+# --- IMPORT MODULES ---
+try:
+    from src.common.frame_index import FrameIndex
+except ImportError:
+    from frame_index import FrameIndex
 
 class VideoStream:
     """
@@ -6,6 +14,11 @@ class VideoStream:
     Hỗ trợ 2 chế độ:
     1. Proprietary Mode: Header độ dài (5 hoặc 6 bytes) - Dùng cho file convert.
     2. Standard Mode: Quét Marker JPEG (\xff\xd8 ... \xff\xd9) - Dùng cho file tải trên mạng.
+    
+    Sau khi gọi loadIndex(), mọi lần đọc đi qua FrameIndex (truy cập ngẫu nhiên O(1), seek được).
+    
+    File được map vào bộ nhớ (mmap): frame trả về là memoryview trỏ thẳng vào vùng map
+    (zero-copy), dùng được như bytes cho len()/slice/sendto.
     """
     
     def __init__(self, filename):
@@ -13,9 +26,13 @@ class VideoStream:
         self.frameNum = 0
         self.mode = "UNKNOWN"
         self.header_size = 5
+        self.index = None
+        # Khóa con trỏ file: luồng gửi RTP và luồng RTSP (seek) có thể chạm cùng lúc
+        self.lock = threading.Lock()
         
         try:
             self.file = open(filename, 'rb')
+            self._map_file()
             self._detect_file_mode()
         except FileNotFoundError:
             print(f"ERROR: File {filename} not found.")
@@ -24,6 +41,15 @@ class VideoStream:
             print(f"ERROR: Could not open file: {e}")
             raise IOError
 
+    def _map_file(self):
+        """ Map toàn bộ file (chỉ đọc). File rỗng không map được -> self.mm = None. """
+        try:
+            self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.view = memoryview(self.mm)
+        except (ValueError, OSError):
+            self.mm = None
+            self.view = None
+
     def _detect_file_mode(self):
         """
         Logic phát hiện chế độ cực kỳ nghiêm ngặt.
@@ -67,10 +93,27 @@ class VideoStream:
 
     def nextFrame(self):
         """Điều phối việc đọc frame."""
-        if self.mode == "PROPRIETARY":
-            return self._read_proprietary_frame()
-        else:
-            return self._read_standard_frame()
+        with self.lock:
+            if self.index is not None:
+                return self._read_indexed_frame()
+            if self.mode == "PROPRIETARY":
+                return self._read_proprietary_frame()
+            else:
+                return self._read_standard_frame()
+
+    def _read_indexed_frame(self):
+        if self.frameNum >= len(self.index): return None
+        
+        offset, length = self.index.lookup(self.frameNum)
+        self.frameNum += 1
+        return self._slice(offset, length)
+
+    def _slice(self, offset, length):
+        """ Lấy length bytes tại offset: zero-copy qua mmap, fallback đọc file. """
+        if self.view is not None:
+            return self.view[offset : offset + length]
+        self.file.seek(offset)
+        return self.file.read(length)
 
     def _read_proprietary_frame(self):
         try:
@@ -78,7 +121,9 @@ class VideoStream:
             if len(data) < self.header_size: return None
             
             framelength = int(data)
-            data = self.file.read(framelength)
+            offset = self.file.tell()
+            data = self._slice(offset, framelength)
+            self.file.seek(offset + len(data))
             self.frameNum += 1
             return data
         except ValueError:
@@ -87,48 +132,112 @@ class VideoStream:
             return self._read_standard_frame()
 
     def _read_standard_frame(self):
-        data = bytearray()
-        found_soi = False
+        """
+        Quét marker JPEG bằng mmap.find() (chạy trong C) thay vì đọc từng byte.
+        Frame kết thúc ở EOI (FF D9) đầu tiên, hoặc ngay trước SOI (FF D8) kế tiếp nếu gặp SOI trước.
+        """
+        mm = self.mm
+        if mm is None: return None # File rỗng
         
         # 1. Tìm SOI (FF D8)
-        while not found_soi:
-            byte = self.file.read(1)
-            if not byte: return None # EOF
-            
-            if byte == b'\xff':
-                next_byte = self.file.read(1)
-                if next_byte == b'\xd8':
-                    data.extend(b'\xff\xd8')
-                    found_soi = True
-                elif next_byte == b'\xff':
-                    self.file.seek(-1, 1)
+        start = mm.find(b'\xff\xd8', self.file.tell())
+        if start < 0:
+            self.file.seek(0, 2)
+            return None # EOF
         
-        while True:
-            byte = self.file.read(1)
-            if not byte: return None
-            
-            data.extend(byte)
-            
-            if byte == b'\xff':
-                next_byte = self.file.read(1)
-                data.extend(next_byte)
-                
-                if next_byte == b'\xd9':
-                    self.frameNum += 1
-                    return bytes(data)
-                
-                if next_byte == b'\xd8':
-                    self.file.seek(-2, 1)
-                    self.frameNum += 1
-                    return bytes(data[:-2])
+        # 2. Tìm EOI (FF D9) hoặc SOI kế tiếp
+        eoi = mm.find(b'\xff\xd9', start + 2)
+        nextSoi = mm.find(b'\xff\xd8', start + 2)
+        
+        if nextSoi >= 0 and (eoi < 0 or nextSoi < eoi):
+            end = nextSoi
+        elif eoi >= 0:
+            end = eoi + 2
+        else:
+            self.file.seek(0, 2)
+            return None # Frame cụt ở cuối file
+        
+        self.file.seek(end)
+        self.frameNum += 1
+        return self.view[start:end]
     
     def frameNbr(self):
         return self.frameNum
     
     def close(self):
+        if self.view is not None:
+            self.view.release()
+        if self.mm is not None:
+            try:
+                self.mm.close()
+            except BufferError:
+                # Vẫn còn frame (memoryview) đang được dùng -> để GC đóng sau
+                pass
         if self.file: self.file.close()
 
     def reset(self):
         if self.file:
             self.file.seek(0)
-            self.frameNum = 0
\ No newline at end of file
+            self.frameNum = 0
+
+    # =========================================================================
+    # FRAME INDEX (TRUY CẬP NGẪU NHIÊN / SEEK)
+    # =========================================================================
+
+    def loadIndex(self):
+        """ Nạp (hoặc quét & lưu) chỉ mục frame. Gọi 1 lần sau khi mở file. """
+        if self.index is None:
+            self.index = FrameIndex.loadOrBuild(self)
+        return self.index
+
+    def scanFrames(self):
+        """
+        Duyệt toàn bộ file, sinh ra (offset, length) của từng frame JPEG.
+        Proprietary Mode chỉ đọc header rồi nhảy qua dữ liệu (không đọc ảnh).
+        """
+        with self.lock:
+            savedPos, savedNum, savedMode = self.file.tell(), self.frameNum, self.mode
+            fileSize = os.fstat(self.file.fileno()).st_size
+            try:
+                self.file.seek(0)
+                while True:
+                    if self.mode == "PROPRIETARY":
+                        header = self.file.read(self.header_size)
+                        if len(header) < self.header_size: break
+                        try:
+                            length = int(header)
+                        except ValueError:
+                            self.mode = "STANDARD"
+                            self.file.seek(-len(header), 1)
+                            continue
+                        offset = self.file.tell()
+                        length = min(length, fileSize - offset)
+                        if length <= 0: break
+                        self.file.seek(length, 1)
+                        yield offset, length
+                    else:
+                        data = self._read_standard_frame()
+                        if data is None: break
+                        yield self.file.tell() - len(data), len(data)
+            finally:
+                self.file.seek(savedPos)
+                self.frameNum, self.mode = savedNum, savedMode
+
+    def frameCount(self):
+        """ Tổng số frame (cần index). """
+        return len(self.loadIndex())
+
+    def seek(self, frameIndex):
+        """ Nhảy tới frame frameIndex (0-based): lần nextFrame() kế tiếp trả về frame đó. """
+        index = self.loadIndex()
+        with self.lock:
+            self.frameNum = max(0, min(int(frameIndex), len(index)))
+
+    def getFrame(self, frameIndex):
+        """ Đọc ngẫu nhiên 1 frame (không đổi vị trí phát hiện tại). """
+        index = self.loadIndex()
+        if not 0 <= frameIndex < len(index): return None
+        
+        offset, length = index.lookup(frameIndex)
+        with self.lock:
+            return self._slice(offset, length)
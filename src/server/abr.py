@@ -0,0 +1,65 @@
+class BitrateController:
+    """
+    Chọn bản chất lượng (rendition) cho 1 phiên theo RTCP Receiver Report (ABR phía Server).
+    - Mất gói > DOWN_LOSS: ước lượng băng thông thực nhận = bitrate hiện tại x (1 - loss),
+      hạ xuống bản cao nhất vừa dưới HEADROOM x ước lượng (ít nhất 1 bậc).
+    - UP_AFTER report liên tiếp mất <= UP_LOSS: thử lên 1 bậc. Vừa lên đã phải xuống lại
+      -> nhân đôi thời gian chờ lần thử sau (tránh dao động quanh mức băng thông).
+    - SETTLE report đầu sau mỗi lần xuống bị bỏ qua: chúng còn đo khoảng thời gian của bản cũ
+      (sau khi lên thì không: bản mới quá nặng phải được phát hiện ngay).
+    ServerWorker đổi file ở ranh giới frame kế tiếp, Seq/Timestamp/SSRC vẫn liền mạch.
+    """
+
+    DOWN_LOSS = 0.05
+    UP_LOSS = 0.01
+    HEADROOM = 0.85
+    UP_AFTER = 4
+    MAX_UP_AFTER = 64
+    SETTLE = 1
+
+    def __init__(self, ladder, index=None):
+        self.ladder = ladder                # [(đường dẫn, bitrate)] tăng dần
+        self.index = len(ladder) - 1 if index is None else index
+        self.upAfter = self.UP_AFTER
+        self.cleanReports = 0
+        self.settle = 0
+        self.lastMove = 0                   # +1 vừa lên, -1 vừa xuống
+        self.switches = 0
+
+    def current(self):
+        return self.ladder[self.index]
+
+    def onReport(self, lossFraction):
+        """ Xử lý 1 report, trả về chỉ số rendition mới nếu cần đổi, ngược lại None. """
+        if self.settle > 0:
+            self.settle -= 1
+            return None
+
+        if lossFraction > self.DOWN_LOSS and self.index > 0:
+            if self.lastMove > 0:
+                # Bậc vừa thử không chịu nổi -> chờ lâu hơn trước khi thử lại
+                self.upAfter = min(self.upAfter * 2, self.MAX_UP_AFTER)
+            delivered = self.ladder[self.index][1] * (1 - lossFraction) * self.HEADROOM
+            target = self.index - 1
+            while target > 0 and self.ladder[target][1] > delivered:
+                target -= 1
+            return self._move(target)
+
+        if lossFraction <= self.UP_LOSS:
+            self.cleanReports += 1
+            if self.cleanReports >= self.upAfter and self.index < len(self.ladder) - 1:
+                return self._move(self.index + 1)
+        else:
+            self.cleanReports = 0
+        return None
+
+    def _move(self, index):
+        self.lastMove = 1 if index > self.index else -1
+        if self.lastMove < 0 and self.cleanReports >= self.upAfter:
+            # Đã ổn định lâu ở bậc trên rồi mới mất gói (mạng đổi) -> không phạt lần thử sau
+            self.upAfter = self.UP_AFTER
+        self.index = index
+        self.cleanReports = 0
+        self.settle = self.SETTLE if self.lastMove < 0 else 0
+        self.switches += 1
+        return index
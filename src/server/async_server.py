@@ -0,0 +1,152 @@
+import asyncio
+import socket
+
+# --- IMPORT MODULES ---
+try:
+    from src.server.server_worker import ServerWorker
+    from src.common.rtsp_parser import RtspMessageParser
+    from src.server.pacing import FramePacer
+except ImportError:
+    try:
+        from server_worker import ServerWorker
+        from pacing import FramePacer
+        from src.common.rtsp_parser import RtspMessageParser  # server_worker đã thêm thư mục gốc vào sys.path
+    except ImportError:
+        import sys, os
+        sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+        from src.server.server_worker import ServerWorker
+        from src.server.pacing import FramePacer
+        from src.common.rtsp_parser import RtspMessageParser
+
+class AsyncServerWorker(ServerWorker):
+    """
+    ServerWorker chạy trên Event Loop (asyncio).
+    Giữ nguyên toàn bộ logic RTSP của processRtspRequest, chỉ thay:
+    1. Cách ghi phản hồi RTSP và khung RTP lồng '$' (transport của asyncio thay vì socket.send).
+    2. Cách gửi RTP (timer call_at của event loop theo FramePacer thay vì 1 thread sendRtp).
+    """
+
+    def __init__(self, clientInfo, transport, loop, server):
+        super().__init__(clientInfo)
+        self.transport = transport
+        self.loop = loop
+        self.server = server
+        self.timer = None
+
+    def sendRtspReply(self, reply):
+        """ Ghi phản hồi qua transport (không chặn event loop). """
+        if not self.transport.is_closing():
+            self.transport.write(reply)
+
+    def writeInterleaved(self, data):
+        """ RTP/AVP/TCP: khung '$' vào bộ đệm của transport (event loop ghi dần, không chặn). """
+        self.sendRtspReply(data)
+
+    def interleavedReady(self):
+        """ Client đọc chậm (transport còn tồn quá INTERLEAVED_BUFFER byte) -> bỏ frame thay vì xếp hàng thêm. """
+        return not self.transport.is_closing() and self.transport.get_write_buffer_size() < self.INTERLEAVED_BUFFER
+
+    def startStreaming(self):
+        """ Đặt timer gửi frame đầu tiên. Socket UDP để non-blocking (RTP/AVP/TCP ghi qua transport). """
+        if self.channel is not None:
+            return super().startStreaming()
+        if 'rtpSocket' in self.clientInfo:
+            self.clientInfo['rtpSocket'].setblocking(False)
+        self.stopStreaming()
+        self.setStreaming(True)
+        self.pacer = FramePacer(self.fps, clock=self.loop.time)
+        self.shaper = self.makeShaper(self.loop.time)
+        self.timer = self.loop.call_at(self.pacer.deadline(), self.onFrameDue)
+
+    def stopStreaming(self):
+        """ Hủy timer gửi frame (nếu có). """
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        super().stopStreaming()
+
+    def onFrameDue(self):
+        """ Tới hạn chót: gửi 1 frame (streamStep) rồi hẹn frame kế tiếp. """
+        self.timer = None
+        deadline = self.streamStep()
+        if deadline is not None:
+            self.timer = self.loop.call_at(deadline, self.onFrameDue)
+
+    def close(self):
+        """ Client ngắt kết nối TCP -> dừng stream và giải phóng tài nguyên (socket do transport đóng). """
+        self.releaseSession()
+        self.sessions.remove(self)
+
+    def expire(self):
+        """ SessionTable (chạy trên event loop): đóng transport, connection_lost sẽ gọi close(). """
+        print(f"[Sessions] Session {self.clientInfo.get('session')} idle for {self.sessions.timeout}s, closing")
+        self.transport.close()
+
+class RtspProtocol(asyncio.Protocol):
+    """ Nhận dữ liệu RTSP từ 1 kết nối TCP và chuyển cho AsyncServerWorker. """
+
+    def __init__(self, server):
+        self.server = server
+        self.worker = None
+        self.parser = RtspMessageParser()
+        self.transport = None
+
+    def connection_made(self, transport):
+        loop = asyncio.get_running_loop()
+        sock = transport.get_extra_info('socket')
+        client_addr = transport.get_extra_info('peername')
+        print(f"[*] Accepted connection from {client_addr[0]}:{client_addr[1]}")
+
+        # Giữ cấu trúc clientInfo giống chế độ thread: (socket, address)
+        self.transport = transport
+        clientInfo = {'rtspSocket': (sock, client_addr)}
+        self.worker = AsyncServerWorker(clientInfo, transport, loop, self.server)
+        ServerWorker.sessions.add(self.worker)
+
+    def data_received(self, data):
+        try:
+            messages = self.parser.feed(data)
+        except ValueError as e:
+            print(f"Malformed RTSP request: {e}")
+            self.transport.close()
+            return
+        for message in messages:
+            try:
+                self.worker.handleRtspMessage(message)
+            except Exception as e:
+                print(f"Error processing request: {e}")
+
+    def connection_lost(self, exc):
+        if self.worker:
+            self.worker.close()
+
+class AsyncServer:
+    """
+    RTSP SERVER (asyncio).
+    1 Event Loop duy nhất xử lý tất cả kết nối RTSP và nhịp gửi RTP của mọi phiên
+    (các timer call_at nằm chung 1 heap của event loop),
+    thay vì 1 thread nhận lệnh + 1 thread sendRtp cho mỗi Client.
+    """
+
+    def __init__(self):
+        self.sessions = ServerWorker.sessions
+
+    async def serve(self, port, reusePort=False):
+        loop = asyncio.get_running_loop()
+
+        rtspSocket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        rtspSocket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if reusePort:
+            rtspSocket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        rtspSocket.bind(('', port))
+
+        for channel in ServerWorker.broadcasts.values():
+            channel.start(loop=loop)
+        self.sessions.start(loop=loop)
+        if ServerWorker.rtcp is not None:
+            ServerWorker.rtcp.start(loop=loop)
+
+        server = await loop.create_server(lambda: RtspProtocol(self), sock=rtspSocket, backlog=128)
+        print(f"[*] Async server is running & listening on port {port}...")
+        async with server:
+            await server.serve_forever()
@@ -0,0 +1,174 @@
+import os
+import socket
+import threading
+from random import randint
+
+# --- IMPORT MODULES ---
+try:
+    from src.server.packetizer import RtpSender
+    from src.server.pacing import FramePacer
+except ImportError:
+    import sys
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+    from src.server.packetizer import RtpSender
+    from src.server.pacing import FramePacer
+
+class BroadcastChannel:
+    """
+    Kênh phát trực tiếp (Live Broadcast / Fan-out) cho 1 file video.
+    - Đọc + cắt mảnh mỗi frame đúng 1 lần, ghi header RTP 1 lần, rồi phát CÙNG chuỗi gói
+      (cùng SSRC/Seq/Timestamp) tới mọi subscriber (và multicast group nếu có).
+    - Người xem vào sau (late joiner) được gắn vào ở ranh giới frame kế tiếp,
+      không bao giờ nhận nửa frame.
+    - Kênh chạy liên tục theo nhịp fps của file, hết video thì quay lại đầu (như 1 kênh live).
+    Chi phí CPU gần như không đổi khi số người xem tăng (chỉ thêm syscall gửi).
+    """
+
+    # Multicast chỉ ra mạng cục bộ (TTL 1) và vòng lại cho chính máy chủ (loopback)
+    MULTICAST_TTL = 1
+    SNDBUF = 4 * 1024 * 1024
+
+    def __init__(self, name, videoStream, fps, multicast=None):
+        self.name = name
+        self.videoStream = videoStream
+        self.fps = fps
+        self.multicast = multicast
+
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.SNDBUF)
+        except OSError:
+            pass
+        if multicast is not None:
+            self.sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, self.MULTICAST_TTL)
+            self.sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_LOOP, 1)
+        self.sender = RtpSender(self.sock, multicast, ssrc=randint(1, 0xFFFFFFFF))
+
+        # subscribers: đang nhận | pending: chờ ranh giới frame kế tiếp | targets: ảnh chụp để gửi
+        self.lock = threading.Lock()
+        self.subscribers = set()
+        self.pending = set()
+        self.leaving = set()
+        self.targets = (multicast,) if multicast is not None else ()
+
+        self.pacer = None
+        self.task = None
+        self.timer = None
+        self.event = None
+        self.framesSent = 0
+        self.position = 0       # Số frame kênh đã phát qua (kể cả lúc chưa có người xem): đồng hồ media của kênh
+        self.sendErrors = 0
+
+    @property
+    def ssrc(self):
+        return self.sender.template.ssrc
+
+    # =========================================================================
+    # SUBSCRIBERS
+    # =========================================================================
+
+    def subscribe(self, address):
+        """ Thêm 1 người xem (ip, rtpPort). Bắt đầu nhận từ frame kế tiếp. """
+        with self.lock:
+            self.leaving.discard(address)
+            if address not in self.subscribers:
+                self.pending.add(address)
+        print(f"[Broadcast] {self.name}: {address[0]}:{address[1]} joined ({self.subscriberCount()} subscribers)")
+
+    def unsubscribe(self, address):
+        """ Bỏ 1 người xem (PAUSE/TEARDOWN). Có hiệu lực ở ranh giới frame kế tiếp. """
+        with self.lock:
+            self.pending.discard(address)
+            if address in self.subscribers:
+                self.leaving.add(address)
+
+    def subscriberCount(self):
+        with self.lock:
+            return len(self.subscribers) + len(self.pending) - len(self.leaving)
+
+    def _attachPending(self):
+        """ Gọi ở ranh giới frame: áp dụng join/leave và chụp lại danh sách đích. """
+        with self.lock:
+            if not self.pending and not self.leaving:
+                return self.targets
+            self.subscribers |= self.pending
+            self.subscribers -= self.leaving
+            self.pending.clear()
+            self.leaving.clear()
+            targets = list(self.subscribers)
+            if self.multicast is not None:
+                targets.append(self.multicast)
+            self.targets = tuple(targets)
+            return self.targets
+
+    # =========================================================================
+    # PHÁT
+    # =========================================================================
+
+    def step(self):
+        """ Phát 1 frame tới mọi đích, trả về hạn chót của frame kế tiếp (dùng như ServerWorker.streamStep). """
+        frame = self.videoStream.nextPacketizedFrame()
+        if frame is None:
+            # Hết file -> quay lại đầu, kênh live không dừng
+            self.videoStream.reset()
+            frame = self.videoStream.nextPacketizedFrame()
+
+        targets = self._attachPending()
+        if frame is not None and targets:
+            fragments = frame.fragments()
+            if fragments:
+                timestamp = self.sender.mediaTimestamp(self.position, self.fps)
+                self.sender.writeHeaders(len(fragments), timestamp, len(frame))
+                self.sender.writeParity(frame, timestamp)
+                for address in targets:
+                    try:
+                        self.sender.transmit(fragments, address)
+                    except OSError:
+                        # 1 người xem lỗi / buffer đầy không được làm hỏng frame của người khác
+                        self.sendErrors += 1
+                self.framesSent += 1
+
+        self.position += 1
+        self.pacer.advance()
+        if self.pacer.delay() < -FramePacer.MAX_LAG:
+            self.pacer.rebase()
+        return self.pacer.deadline()
+
+    def start(self, scheduler=None, loop=None):
+        """
+        Chạy kênh trên PacingScheduler (mode thread), timer call_at của event loop (mode async),
+        hoặc 1 thread riêng nếu không có cả hai.
+        """
+        if loop is not None:
+            self.sock.setblocking(False)
+            self.pacer = FramePacer(self.fps, clock=loop.time)
+
+            def onFrameDue():
+                self.timer = loop.call_at(self.step(), onFrameDue)
+            self.timer = loop.call_at(self.pacer.deadline(), onFrameDue)
+        elif scheduler is not None:
+            self.pacer = FramePacer(self.fps)
+            self.task = scheduler.schedule(self.pacer.deadline(), self.step)
+        else:
+            self.pacer = FramePacer(self.fps)
+            self.event = threading.Event()
+            threading.Thread(target=self.run, name=f"broadcast-{self.name}", daemon=True).start()
+
+        target = f", multicast {self.multicast[0]}:{self.multicast[1]}" if self.multicast else ""
+        print(f"[Broadcast] Channel '{self.name}' live at {self.fps:g} fps{target}")
+        return self
+
+    def run(self):
+        """ Vòng lặp phát khi không có scheduler (--sender-threads 0). """
+        while not self.pacer.wait(self.event):
+            self.step()
+
+    def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+        if self.timer is not None:
+            self.timer.cancel()
+        if self.event is not None:
+            self.event.set()
+        self.sock.close()
+        self.videoStream.close()
@@ -0,0 +1,305 @@
+import os
+import threading
+from collections import OrderedDict
+
+# --- IMPORT MODULES ---
+try:
+    from src.common.video_stream import VideoStream
+    from src.common.media_info import MediaInfo
+    from src.server.packetizer import PacketizedFrame
+except ImportError:
+    import sys
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+    from src.common.video_stream import VideoStream
+    from src.common.media_info import MediaInfo
+    from src.server.packetizer import PacketizedFrame
+
+def fileStamp(path):
+    """ (mtime_ns, kích thước) của file - cùng dấu với FrameIndex, None nếu không có file. """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+class FrameCache:
+    """
+    Bộ đệm frame dùng chung toàn tiến trình (Process-wide Frame Cache).
+    Khóa: (file, frame number). Giới hạn theo tổng số byte, loại bỏ theo LRU.
+    An toàn đa luồng (1 lock cho mọi thao tác, mỗi thao tác O(1)).
+    """
+
+    DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+    def __init__(self, maxBytes=DEFAULT_MAX_BYTES):
+        self.maxBytes = maxBytes
+        self.currentBytes = 0
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+        # Bộ đếm thống kê
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """ Lấy frame (và đánh dấu vừa dùng). None nếu chưa có. """
+        with self.lock:
+            frame = self.entries.get(key)
+            if frame is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return frame
+
+    def peek(self, key):
+        """ Như get() nhưng không tính vào thống kê và không đổi thứ tự LRU. """
+        with self.lock:
+            return self.entries.get(key)
+
+    def put(self, key, frame):
+        """ Thêm frame, loại frame cũ nhất cho tới khi vừa ngân sách byte. """
+        size = len(frame)
+        if size > self.maxBytes:
+            return
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.currentBytes -= len(old)
+            self.entries[key] = frame
+            self.currentBytes += size
+            self._evict()
+
+    def resize(self, maxBytes):
+        """ Đổi ngân sách byte (vd: theo tham số --cache-mb). """
+        with self.lock:
+            self.maxBytes = maxBytes
+            self._evict()
+
+    def _evict(self):
+        while self.currentBytes > self.maxBytes and self.entries:
+            _, frame = self.entries.popitem(last=False)
+            self.currentBytes -= len(frame)
+            self.evictions += 1
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self.entries),
+                'bytes': self.currentBytes,
+                'maxBytes': self.maxBytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hitRatio': self.hits / lookups if lookups else 0.0,
+            }
+
+class SharedVideoSource:
+    """
+    1 file video mở 1 lần cho mọi phiên (1 file handle, 1 FrameIndex).
+    Frame được đọc qua FrameCache: file phổ biến chỉ bị đọc/tách frame 1 lần.
+    Giá trị trong cache là PacketizedFrame (frame + các mảnh RTP cắt sẵn), khóa (file, mtime/kích thước, frame):
+    file bị ghi đè -> source mới không dùng lại frame của nội dung cũ.
+    """
+
+    def __init__(self, filename, cache):
+        self.filename = filename
+        self.cache = cache
+        self.stream = VideoStream(filename)
+        index = self.stream.loadIndex()
+        self.stamp = (index.mtime, index.size)
+        self.info = MediaInfo.load(filename)
+        self.refs = 0
+        self.lock = threading.Lock()
+
+    def frameCount(self):
+        return self.stream.frameCount()
+
+    def bitrate(self, fps):
+        """ Bitrate trung bình (bit/s) khi phát ở fps, tính từ FrameIndex (không đọc dữ liệu ảnh). """
+        index = self.stream.loadIndex()
+        if not len(index):
+            return 0
+        return sum(index.lengths) * 8 * fps / len(index)
+
+    def getPacketizedFrame(self, frameIndex):
+        key = (self.filename, self.stamp, frameIndex)
+        frame = self.cache.get(key)
+        if frame is not None:
+            return frame
+
+        # Cache miss: chỉ 1 luồng đọc file cho mỗi frame, các luồng khác chờ rồi dùng lại
+        with self.lock:
+            frame = self.cache.peek(key)
+            if frame is None:
+                data = self.stream.getFrame(frameIndex)
+                if data is None:
+                    return None
+                frame = PacketizedFrame(bytes(data))
+                self.cache.put(key, frame)
+            return frame
+
+    def getFrame(self, frameIndex):
+        frame = self.getPacketizedFrame(frameIndex)
+        return frame.data if frame is not None else None
+
+    def close(self):
+        self.stream.close()
+
+class CachedVideoStream:
+    """
+    Con trỏ phát riêng của 1 phiên trên SharedVideoSource.
+    Cùng giao diện với VideoStream (nextFrame, frameNbr, seek, ...) để ServerWorker dùng thay thế.
+    seek() (luồng RTSP) và next* (luồng gửi) dùng chung 1 lock: frame đọc ra và vị trí của nó (lastFrameNbr)
+    luôn khớp nhau, seek giữa lúc đọc không làm lệch Timestamp hay bỏ qua frame đích.
+    """
+
+    def __init__(self, library, source):
+        self.library = library
+        self.source = source
+        self.filename = source.filename
+        self.frameNum = 0
+        self.lastFrame = -1         # Vị trí (0-based) của frame next* trả về gần nhất
+        self.lock = threading.Lock()
+
+    def nextFrame(self):
+        frame = self.nextPacketizedFrame()
+        return frame.data if frame is not None else None
+
+    def nextPacketizedFrame(self):
+        with self.lock:
+            frame = self.source.getPacketizedFrame(self.frameNum)
+            if frame is not None:
+                self.lastFrame = self.frameNum
+                self.frameNum += 1
+            return frame
+
+    def frameNbr(self):
+        return self.frameNum
+
+    def lastFrameNbr(self):
+        """ Vị trí (0-based) của frame vừa đọc - không đổi khi seek() chen vào sau lần đọc đó. """
+        return self.lastFrame
+
+    def frameCount(self):
+        return self.source.frameCount()
+
+    def fps(self):
+        """ FPS ghi trong metadata của file (None nếu không có). """
+        return self.source.info.fps
+
+    def bitrate(self, fps):
+        return self.source.bitrate(fps)
+
+    def loadIndex(self):
+        return self.source.stream.loadIndex()
+
+    def seek(self, frameIndex):
+        frameIndex = max(0, min(int(frameIndex), self.frameCount()))
+        with self.lock:
+            self.frameNum = frameIndex
+
+    def getFrame(self, frameIndex):
+        return self.source.getFrame(frameIndex)
+
+    def reset(self):
+        with self.lock:
+            self.frameNum = 0
+
+    def close(self):
+        if self.source is not None:
+            self.library.release(self.source)
+            self.source = None
+
+class VideoLibrary:
+    """
+    Sổ đăng ký các SharedVideoSource đang mở (đếm tham chiếu).
+    File được đóng khi phiên cuối cùng dùng nó kết thúc.
+    SharedVideoSource được tạo ngoài lock của thư viện (lập FrameIndex cho file lớn có thể mất vài giây):
+    chỉ các phiên mở cùng file chờ nhau (loading), SETUP file khác không bị chặn.
+    File đổi mtime/kích thước -> phiên mới mở source mới, phiên cũ giữ source cũ tới khi đóng.
+    """
+
+    def __init__(self, cache=None):
+        self.cache = cache if cache is not None else FrameCache()
+        self.sources = {}
+        self.loading = {}           # Đường dẫn -> Event: đang tạo SharedVideoSource cho file đó
+        self.ladders = {}
+        self.lock = threading.Lock()
+
+    def open(self, filename):
+        """ Mở con trỏ phát cho filename. Ném IOError nếu không mở được file (giống VideoStream). """
+        key = os.path.realpath(filename)
+        while True:
+            stamp = fileStamp(key)
+            with self.lock:
+                source = self.sources.get(key)
+                if source is not None and source.stamp == stamp:
+                    source.refs += 1
+                    return CachedVideoStream(self, source)
+                loading = self.loading.get(key)
+                if loading is None:
+                    loading = self.loading[key] = threading.Event()
+                    break
+            # Phiên khác đang tạo source cho file này: chờ rồi dùng lại (lỗi -> tự thử lại để nhận IOError)
+            loading.wait()
+
+        source = None
+        try:
+            source = SharedVideoSource(key, self.cache)
+        finally:
+            with self.lock:
+                del self.loading[key]
+                if source is not None:
+                    source.refs += 1
+                    self.sources[key] = source
+            loading.set()
+        return CachedVideoStream(self, source)
+
+    def renditions(self, filename, fps):
+        """
+        Các bản chất lượng của filename (chính nó + "renditions" trong MediaInfo),
+        [(đường dẫn, bitrate bit/s)] tăng dần theo bitrate. Bản không mở được bị bỏ qua.
+        """
+        key = os.path.realpath(filename)
+        with self.lock:
+            cached = self.ladders.get(key)
+        # Còn hợp lệ nếu metadata và mọi file trong danh sách bản chất lượng không đổi
+        if cached is not None and cached[1] == self.ladderStamp(key, cached[0]):
+            return cached[2]
+
+        folder = os.path.dirname(key)
+        paths = [key] + [os.path.realpath(os.path.join(folder, r['file'])) for r in MediaInfo.load(key).renditions or []]
+        paths = list(dict.fromkeys(paths))
+        stamp = self.ladderStamp(key, paths)
+        ladder = []
+        for path in paths:
+            try:
+                stream = self.open(path)
+            except IOError:
+                print(f"[ABR] Rendition not found: {path}")
+                continue
+            try:
+                ladder.append((path, stream.bitrate(fps)))
+            finally:
+                stream.close()
+        ladder.sort(key=lambda rendition: rendition[1])
+        with self.lock:
+            self.ladders[key] = (paths, stamp, ladder)
+        return ladder
+
+    @staticmethod
+    def ladderStamp(key, paths):
+        return (fileStamp(MediaInfo.sidecarPath(key)),) + tuple(fileStamp(path) for path in paths)
+
+    def release(self, source):
+        with self.lock:
+            source.refs -= 1
+            if source.refs > 0:
+                return
+            # Source đã bị thay (file đổi nội dung) thì không còn trong sources nhưng vẫn phải đóng
+            if self.sources.get(source.filename) is source:
+                del self.sources[source.filename]
+            source.close()
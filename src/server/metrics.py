@@ -0,0 +1,391 @@
+import bisect
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class MetricChild:
+    """ Giá trị của 1 metric ứng với 1 bộ nhãn (label values). Mỗi thao tác chỉ giữ lock vài lệnh. """
+    __slots__ = ('lock', 'value')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.value = 0.0
+
+    def inc(self, amount=1):
+        with self.lock:
+            self.value += amount
+
+    def dec(self, amount=1):
+        with self.lock:
+            self.value -= amount
+
+    def set(self, value):
+        self.value = value
+
+class HistogramChild:
+    """
+    Histogram: đếm số quan sát theo bucket (không cộng dồn, cộng dồn khi xuất) + tổng + số lượng.
+    Nhiều histogram có thể dùng chung 1 lock để ghi cùng lúc chỉ tốn 1 lần lock (xem ServerMetrics.recordFrame).
+    """
+    __slots__ = ('lock', 'bounds', 'counts', 'sum', 'count')
+
+    def __init__(self, bounds, lock=None):
+        self.lock = lock or threading.Lock()
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        with self.lock:
+            self.add(value)
+
+    def add(self, value):
+        """ Ghi 1 quan sát, người gọi đã giữ self.lock. """
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+class Metric:
+    """
+    1 họ metric (cùng tên, khác nhãn). Không có nhãn -> gọi thẳng inc()/set()/observe() trên metric.
+    Có nhãn -> metric.labels(session).inc(); metric.remove(session) khi phiên kết thúc.
+    """
+
+    TYPE = 'untyped'
+
+    def __init__(self, name, help, labelNames=()):
+        self.name = name
+        self.help = help
+        self.labelNames = tuple(labelNames)
+        self.children = {}
+        self.lock = threading.Lock()
+        if not self.labelNames:
+            self.default = self.newChild()
+            self.children[()] = self.default
+
+    def newChild(self):
+        return MetricChild()
+
+    def labels(self, *values):
+        key = tuple(str(value) for value in values)
+        child = self.children.get(key)
+        if child is None:
+            with self.lock:
+                child = self.children.setdefault(key, self.newChild())
+        return child
+
+    def remove(self, *values):
+        with self.lock:
+            self.children.pop(tuple(str(value) for value in values), None)
+
+    def inc(self, amount=1):
+        self.default.inc(amount)
+
+    def dec(self, amount=1):
+        self.default.dec(amount)
+
+    def set(self, value):
+        self.default.set(value)
+
+    def labelText(self, key, extra=()):
+        pairs = list(zip(self.labelNames, key)) + list(extra)
+        if not pairs:
+            return ''
+        return '{' + ','.join(f'{name}="{value}"' for name, value in pairs) + '}'
+
+    def render(self, lines):
+        with self.lock:
+            items = list(self.children.items())
+        for key, child in items:
+            lines.append(f"{self.name}{self.labelText(key)} {formatValue(child.value)}")
+
+class Counter(Metric):
+    TYPE = 'counter'
+
+class Gauge(Metric):
+    TYPE = 'gauge'
+
+class Histogram(Metric):
+    TYPE = 'histogram'
+
+    def __init__(self, name, help, buckets, labelNames=(), lock=None):
+        self.bounds = sorted(buckets)
+        self.sharedLock = lock
+        super().__init__(name, help, labelNames)
+
+    def newChild(self):
+        return HistogramChild(self.bounds, self.sharedLock)
+
+    def observe(self, value):
+        self.default.observe(value)
+
+    def render(self, lines):
+        with self.lock:
+            items = list(self.children.items())
+        for key, child in items:
+            with child.lock:
+                counts, total, count = list(child.counts), child.sum, child.count
+            cumulative = 0
+            for bound, n in zip(self.bounds + [float('inf')], counts):
+                cumulative += n
+                le = '+Inf' if bound == float('inf') else formatValue(bound)
+                lines.append(f"{self.name}_bucket{self.labelText(key, [('le', le)])} {cumulative}")
+            lines.append(f"{self.name}_sum{self.labelText(key)} {formatValue(total)}")
+            lines.append(f"{self.name}_count{self.labelText(key)} {count}")
+
+def formatValue(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+class MetricsRegistry:
+    """
+    Tập metric của 1 tiến trình + các collector (hàm được gọi lúc scrape, vd: thống kê FrameCache).
+    render() xuất theo định dạng text của Prometheus (exposition format 0.0.4).
+    """
+
+    def __init__(self):
+        self.metrics = []
+        self.collectors = []
+        self.lock = threading.Lock()
+
+    def register(self, metric):
+        with self.lock:
+            self.metrics.append(metric)
+        return metric
+
+    def counter(self, name, help, labelNames=()):
+        return self.register(Counter(name, help, labelNames))
+
+    def gauge(self, name, help, labelNames=()):
+        return self.register(Gauge(name, help, labelNames))
+
+    def histogram(self, name, help, buckets, labelNames=(), lock=None):
+        return self.register(Histogram(name, help, buckets, labelNames, lock))
+
+    def addCollector(self, collector):
+        """ collector() trả về list (name, type, help, value); value có thể là list [(labels dict, value)]. """
+        with self.lock:
+            self.collectors.append(collector)
+
+    def render(self):
+        lines = []
+        with self.lock:
+            metrics, collectors = list(self.metrics), list(self.collectors)
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.TYPE}")
+            metric.render(lines)
+        for collector in collectors:
+            try:
+                samples = collector()
+            except Exception as e:
+                print(f"[Metrics] Collector error: {e}")
+                continue
+            for name, kind, help, value in samples:
+                lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} {kind}")
+                if not isinstance(value, list):
+                    lines.append(f"{name} {formatValue(value)}")
+                    continue
+                for labels, sample in value:
+                    text = ','.join(f'{key}="{label}"' for key, label in labels.items())
+                    lines.append(f"{name}{{{text}}} {formatValue(sample)}")
+        return '\n'.join(lines) + '\n'
+
+# =============================================================================
+# HTTP /metrics
+# =============================================================================
+
+class MetricsHttpServer:
+    """ Endpoint HTTP cục bộ GET /metrics (Prometheus scrape), chạy trên 1 daemon thread. """
+
+    CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+    def __init__(self, registry, port, host='127.0.0.1'):
+        metricsRegistry = registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = metricsRegistry.render().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', MetricsHttpServer.CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+
+    def start(self):
+        threading.Thread(target=self.httpd.serve_forever, name="metrics-http", daemon=True).start()
+        print(f"[*] Metrics available at http://{self.httpd.server_address[0]}:{self.port}/metrics")
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+# =============================================================================
+# METRIC CỦA SERVER
+# =============================================================================
+
+# Bucket (giây)
+SEND_BUCKETS = [0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.1]
+LATENESS_BUCKETS = [0.0005, 0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.5, 1.0]
+READ_BUCKETS = [0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05]
+
+class SessionStats:
+    """
+    Counter của 1 phiên: chỉ luồng gửi của phiên đó ghi (không cần lock), collector đọc khi scrape.
+    """
+    __slots__ = ('frames', 'packets', 'bytes', 'fecPackets', 'fecBytes', 'streaming', 'lossFraction', 'jitter', 'bitrate')
+
+    def __init__(self):
+        self.frames = 0
+        self.packets = 0
+        self.bytes = 0
+        self.fecPackets = 0
+        self.fecBytes = 0
+        self.streaming = False
+        # Theo RTCP RR gần nhất của Client / ABR
+        self.lossFraction = 0.0
+        self.jitter = 0.0
+        self.bitrate = 0
+
+class ServerMetrics:
+    """
+    Bộ metric chuẩn của RTSP Server (1 bản / tiến trình, ServerWorker.metrics).
+    Mỗi frame: 3 phép cộng không lock vào SessionStats + 1 lần lock cho 3 histogram
+    -> rẻ tới mức bật sẵn cả khi chạy thật (xem benchmarks/bench_metrics.py).
+    """
+
+    def __init__(self):
+        self.registry = MetricsRegistry()
+        r = self.registry
+        self.requests = r.counter('rtsp_requests_total', 'RTSP requests received', ['method'])
+        self.sendErrors = r.counter('rtp_send_errors_total', 'Frames whose send raised an error')
+        self.abrSwitches = r.counter('abr_switches_total', 'Rendition switches made by ABR', ['direction'])
+        self.retransmits = r.counter('rtp_retransmits_total', 'RTP packets resent in answer to RTCP NACK')
+        self.retransmitsSkipped = r.counter('rtp_retransmits_skipped_total',
+                                            'NACKed packets not resent', ['reason'])
+
+        # 3 histogram theo frame dùng chung 1 lock: recordFrame() chỉ lock 1 lần
+        self.frameLock = threading.Lock()
+        self.lateness = r.histogram('rtp_pacing_lateness_seconds', 'Frame send time minus its pacing deadline',
+                                    LATENESS_BUCKETS, lock=self.frameLock)
+        self.readSeconds = r.histogram('video_frame_read_seconds', 'Time to fetch a packetized frame from VideoStream / FrameCache',
+                                       READ_BUCKETS, lock=self.frameLock)
+        self.sendSeconds = r.histogram('rtp_send_seconds', 'Time spent in send calls per frame',
+                                       SEND_BUCKETS, lock=self.frameLock)
+
+        self.sessions = {}
+        self.sessionsLock = threading.Lock()
+        self.startTime = time.time()
+        r.addCollector(self.sessionSamples)
+        r.addCollector(self.processSamples)
+
+    def recordFrame(self, lateness, readTime, sendTime):
+        with self.frameLock:
+            self.lateness.default.add(lateness)
+            self.readSeconds.default.add(readTime)
+            self.sendSeconds.default.add(sendTime)
+
+    def openSession(self, session):
+        """ SETUP thành công -> SessionStats của phiên (được tính vào rtsp_sessions_active). """
+        stats = SessionStats()
+        with self.sessionsLock:
+            self.sessions[session] = stats
+        return stats
+
+    def closeSession(self, session):
+        """ Phiên kết thúc -> bỏ chuỗi nhãn của phiên (tránh số chuỗi metric tăng mãi). """
+        with self.sessionsLock:
+            self.sessions.pop(session, None)
+
+    def sessionSamples(self):
+        with self.sessionsLock:
+            items = list(self.sessions.items())
+        return [
+            ('rtsp_sessions_active', 'gauge', 'RTSP sessions between SETUP and TEARDOWN', len(items)),
+            ('rtsp_sessions_streaming', 'gauge', 'Sessions currently sending RTP', sum(1 for _, st in items if st.streaming)),
+            ('rtp_frames_sent_total', 'counter', 'Video frames sent', [({'session': s}, st.frames) for s, st in items]),
+            ('rtp_packets_sent_total', 'counter', 'RTP packets sent', [({'session': s}, st.packets) for s, st in items]),
+            ('rtp_bytes_sent_total', 'counter', 'RTP payload bytes sent', [({'session': s}, st.bytes) for s, st in items]),
+            ('rtp_fec_packets_sent_total', 'counter', 'FEC parity packets sent (overhead: divide by rtp_packets_sent_total)',
+             [({'session': s}, st.fecPackets) for s, st in items if st.fecPackets]),
+            ('rtp_fec_bytes_sent_total', 'counter', 'FEC payload bytes sent (overhead: divide by rtp_bytes_sent_total)',
+             [({'session': s}, st.fecBytes) for s, st in items if st.fecBytes]),
+            ('rtcp_fraction_lost', 'gauge', 'Loss fraction in the last RTCP receiver report',
+             [({'session': s}, st.lossFraction) for s, st in items]),
+            ('rtcp_jitter_seconds', 'gauge', 'Interarrival jitter in the last RTCP receiver report',
+             [({'session': s}, st.jitter) for s, st in items]),
+            ('abr_rendition_bitrate', 'gauge', 'Average bitrate (bit/s) of the rendition being sent',
+             [({'session': s}, st.bitrate) for s, st in items if st.bitrate]),
+        ]
+
+    def processSamples(self):
+        times = os.times()
+        return [
+            ('process_cpu_seconds_total', 'counter', 'User + system CPU time of the server process', times.user + times.system),
+            ('process_start_time_seconds', 'gauge', 'Unix time the server process started', self.startTime),
+            ('process_threads', 'gauge', 'Python threads in the server process', threading.active_count()),
+        ]
+
+    def addCacheCollector(self, cache):
+        def collect():
+            s = cache.stats()
+            return [
+                ('frame_cache_entries', 'gauge', 'Frames held in the shared FrameCache', s['entries']),
+                ('frame_cache_bytes', 'gauge', 'Bytes held in the shared FrameCache', s['bytes']),
+                ('frame_cache_max_bytes', 'gauge', 'FrameCache byte budget', s['maxBytes']),
+                ('frame_cache_hits_total', 'counter', 'FrameCache hits', s['hits']),
+                ('frame_cache_misses_total', 'counter', 'FrameCache misses', s['misses']),
+                ('frame_cache_evictions_total', 'counter', 'FrameCache LRU evictions', s['evictions']),
+            ]
+        self.registry.addCollector(collect)
+
+    def addSchedulerCollector(self, scheduler):
+        def collect():
+            s = scheduler.stats()
+            return [
+                ('scheduler_tasks', 'gauge', 'Streams waiting in the pacing scheduler heap', s['scheduled']),
+                ('scheduler_queue_depth', 'gauge', 'Due streams waiting for a sender thread', s['queueDepth']),
+                ('scheduler_dispatched_total', 'counter', 'Stream steps run by sender threads', s['dispatched']),
+                ('scheduler_wakeups_total', 'counter', 'Timer thread wakeups', s['wakeups']),
+                ('scheduler_missed_deadlines_total', 'counter', 'Steps started later than the miss tolerance', s['missedDeadlines']),
+                ('scheduler_max_lag_seconds', 'gauge', 'Worst observed dispatch lag', s['maxLag']),
+            ]
+        self.registry.addCollector(collect)
+
+    def addSessionTableCollector(self, table):
+        def collect():
+            s = table.stats()
+            return [
+                ('rtsp_connections', 'gauge', 'Open RTSP control connections', s['connections']),
+                ('rtsp_sessions_expired_total', 'counter', 'Connections closed after the idle timeout', s['expired']),
+                ('rtsp_sessions_rejected_total', 'counter', 'SETUPs refused because the session limit was reached', s['rejected']),
+            ]
+        self.registry.addCollector(collect)
+
+    def addRtcpCollector(self, listener):
+        def collect():
+            s = listener.stats()
+            return [
+                ('rtcp_reports_total', 'counter', 'RTCP report blocks delivered to sessions', s['reports']),
+                ('rtcp_nacks_total', 'counter', 'RTCP generic NACK packets delivered to sessions', s['nacks']),
+                ('rtcp_dropped_total', 'counter', 'Malformed RTCP packets or blocks for unknown sessions', s['dropped']),
+            ]
+        self.registry.addCollector(collect)
+
+    def render(self):
+        return self.registry.render()
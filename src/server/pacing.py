@@ -0,0 +1,79 @@
+import time
+
+class FramePacer:
+    """
+    Bộ định nhịp theo hạn chót (Deadline Scheduler) cho 1 luồng video.
+    Frame N được gửi tại start + N / fps (đồng hồ monotonic), không phụ thuộc thời gian xử lý
+    -> không bị trôi (drift) như kiểu "xử lý xong rồi mới wait(0.033)".
+    """
+
+    # Trễ quá ngưỡng này (vd: máy bị treo) -> đặt lại mốc thay vì gửi dồn hàng loạt frame
+    MAX_LAG = 0.5
+
+    def __init__(self, fps, clock=time.monotonic):
+        self.fps = float(fps)
+        self.interval = 1.0 / self.fps
+        self.clock = clock
+        self.start = clock()
+        self.frameCount = 0
+        self.resyncs = 0
+
+    def deadline(self):
+        """ Thời điểm (theo clock) phải gửi frame kế tiếp. """
+        return self.start + self.frameCount * self.interval
+
+    def delay(self):
+        """ Số giây còn phải chờ tới hạn chót (âm = đang trễ). """
+        return self.deadline() - self.clock()
+
+    def wait(self, event):
+        """
+        Chờ tới hạn chót của frame kế tiếp.
+        Trả về True nếu event được set trong lúc chờ (PAUSE/TEARDOWN).
+        """
+        delay = self.delay()
+        if delay > 0:
+            return event.wait(delay)
+        if -delay > self.MAX_LAG:
+            self.rebase()
+        return event.is_set()
+
+    def advance(self):
+        """ Đánh dấu đã gửi xong 1 frame. """
+        self.frameCount += 1
+
+    def rebase(self):
+        """ Lấy thời điểm hiện tại làm mốc mới cho frame kế tiếp. """
+        self.start = self.clock() - self.frameCount * self.interval
+        self.resyncs += 1
+
+class TokenBucket:
+    """
+    Bộ định hình lưu lượng (Token Bucket) cho 1 phiên.
+    Token (byte) được nạp đều theo rate, tối đa burst byte -> gửi liền 1 lúc tối đa burst byte,
+    phần còn lại của frame được rải đều thay vì bắn cả trăm gói liên tiếp làm tràn buffer nhận.
+    """
+
+    def __init__(self, rate, burst, clock=time.monotonic):
+        self.rate = float(rate)     # byte / giây
+        self.burst = burst          # byte
+        self.clock = clock
+        self.tokens = burst
+        self.last = clock()
+
+    def refill(self):
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.last) * self.rate)
+        self.last = now
+
+    def consume(self, size):
+        """ Lấy size byte nếu đủ token. Trả về True nếu được gửi ngay (gói lớn hơn burst: chờ đầy bucket). """
+        if self.tokens >= min(size, self.burst):
+            self.tokens -= size
+            return True
+        return False
+
+    def delay(self, size):
+        """ Số giây phải chờ tới khi đủ token cho size byte. """
+        missing = min(size, self.burst) - self.tokens
+        return missing / self.rate if missing > 0 else 0.0
@@ -0,0 +1,382 @@
+import os
+import sys
+import errno
+import socket
+import struct
+import threading
+import time
+from collections import deque
+from random import randint
+
+# --- IMPORT MODULES ---
+try:
+    from src.common.rtp_packet import RtpHeaderTemplate, HEADER_SIZE, RTP_CLOCK_RATE
+    from src.common.fec_packet import FecPacket, FEC_PT
+    from src.common.rtsp_parser import INTERLEAVED_HEADER, INTERLEAVED_MAGIC
+except ImportError:
+    import sys
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+    from src.common.rtp_packet import RtpHeaderTemplate, HEADER_SIZE, RTP_CLOCK_RATE
+    from src.common.fec_packet import FecPacket, FEC_PT
+    from src.common.rtsp_parser import INTERLEAVED_HEADER, INTERLEAVED_MAGIC
+
+# Kích thước payload tối đa của 1 gói RTP (vừa MTU 1500)
+MAX_RTP_PAYLOAD = 1400
+
+# UDP Generic Segmentation Offload (Linux >= 4.18): 1 sendmsg -> kernel tự cắt thành nhiều datagram
+SOL_UDP = getattr(socket, 'SOL_UDP', 17)
+UDP_SEGMENT = getattr(socket, 'UDP_SEGMENT', 103)
+GSO_MAX_SEGMENTS = 64
+GSO_MAX_BYTES = 65000
+
+class PacketizedFrame:
+    """
+    1 frame JPEG + danh sách mảnh payload (memoryview, không copy) đã cắt sẵn.
+    Được lưu trong FrameCache: frame phổ biến chỉ bị cắt mảnh 1 lần cho mọi người xem.
+    Parity FEC (nếu bật) cũng được tính 1 lần rồi dùng lại.
+    """
+    __slots__ = ('data', '_fragments', '_parity')
+
+    def __init__(self, data):
+        self.data = data
+        self._fragments = None
+        self._parity = None
+
+    def __len__(self):
+        return len(self.data)
+
+    def fragments(self):
+        """ Cắt mảnh lần đầu được gọi, các lần sau dùng lại. """
+        if self._fragments is None:
+            view = memoryview(self.data)
+            self._fragments = [view[pos : pos + MAX_RTP_PAYLOAD] for pos in range(0, len(view), MAX_RTP_PAYLOAD)]
+        return self._fragments
+
+    def parity(self, k):
+        """
+        Parity XOR cho từng nhóm k mảnh liên tiếp (nhóm cuối có thể ít hơn):
+        [(chỉ số mảnh đầu, chỉ số mảnh cuối, phần thân gói FEC)]. Tính lần đầu, các lần sau dùng lại.
+        """
+        cached = self._parity
+        if cached is None or cached[0] != k:
+            fragments = self.fragments()
+            groups = []
+            for first in range(0, len(fragments), k):
+                last = min(first + k, len(fragments)) - 1
+                groups.append((first, last, FecPacket.body(fragments[first : last + 1], last == len(fragments) - 1)))
+            cached = self._parity = (k, groups)
+        return cached[1]
+
+class RetransmitRing:
+    """
+    Lịch sử gói đã gửi của 1 phiên để trả lời RTCP NACK. Mỗi frame 1 mục: Seq đầu, bản sao header
+    (12 byte + extension / gói) và danh sách mảnh payload (memoryview vào frame trong FrameCache, không copy).
+    Giữ tối đa maxPackets gói gần nhất. Gói đã gửi quá window giây không gửi lại nữa: tới nơi cũng
+    đã quá hạn Client chờ ghép frame (frame bị bỏ), gửi lại chỉ tốn băng thông đang thiếu.
+    """
+
+    MAX_RETRIES = 2     # Số lần gửi lại tối đa cho 1 gói (NACK lặp lại khi bản gửi lại cũng mất)
+
+    def __init__(self, window, maxPackets=1024):
+        self.window = window
+        self.maxPackets = maxPackets
+        self.frames = deque()       # (seq đầu, headers, cỡ header, fragments, thời điểm gửi, số lần gửi lại / gói)
+        self.packets = 0
+        self.lock = threading.Lock()
+
+    def record(self, firstSeq, headers, fragments, sentAt, headerSize=HEADER_SIZE):
+        count = len(fragments)
+        entry = (firstSeq, bytes(headers[:count * headerSize]), headerSize, fragments, sentAt, bytearray(count))
+        with self.lock:
+            self.frames.append(entry)
+            self.packets += count
+            while self.packets > self.maxPackets and len(self.frames) > 1:
+                self.packets -= len(self.frames.popleft()[3])
+
+    def lookup(self, seq, now):
+        """ (gói RTP, None) để gửi lại, hoặc (None, lý do bỏ qua): 'evicted' / 'late' / 'limit'. """
+        with self.lock:
+            for firstSeq, headers, headerSize, fragments, sentAt, retries in reversed(self.frames):
+                i = (seq - firstSeq) & 0xFFFF
+                if i >= len(fragments):
+                    continue
+                if now - sentAt > self.window:
+                    return None, 'late'
+                if retries[i] >= self.MAX_RETRIES:
+                    return None, 'limit'
+                retries[i] += 1
+                return headers[i * headerSize : (i + 1) * headerSize] + fragments[i], None
+        return None, 'evicted'
+
+class RtpSender:
+    """
+    Bộ gửi RTP của 1 phiên. Giữ Seq/SSRC, header của cả frame được ghi vào 1 khối dùng lại
+    (pack_into). 3 cách phát gói, chọn tự động theo hệ điều hành:
+    - gso    : Linux - sendmsg scatter-gather + UDP_SEGMENT, ~45 gói / 1 syscall.
+    - sendmsg: header và payload (memoryview) là 2 iovec riêng, không nối chuỗi, 1 syscall / gói.
+    - sendto : fallback (vd: Windows không có sendmsg) - copy header + payload vào buffer rồi sendto.
+    GSO bị kernel từ chối -> tự lùi về sendmsg.
+    FRAME_INFO: mỗi gói mang header extension RFC 8285 (số thứ tự frame, chỉ số / số mảnh, kích thước frame)
+    để Client cấp đúng cỡ buffer frame và biết ngay mảnh thuộc frame nào (tắt: --no-frame-info).
+    Timestamp: đồng hồ media 90 kHz từ 1 gốc ngẫu nhiên (RFC 3550), tính theo vị trí frame (mediaTimestamp).
+    """
+
+    MODE_GSO = 'gso'
+    MODE_SENDMSG = 'sendmsg'
+    MODE_SENDTO = 'sendto'
+    FRAME_INFO = True
+
+    def __init__(self, sock, address, ssrc=0, pt=26, mode=None, frameInfo=None):
+        self.sock = sock
+        self.address = address
+        self.frameInfo = self.FRAME_INFO if frameInfo is None else frameInfo
+        self.template = RtpHeaderTemplate(pt=pt, ssrc=ssrc, frameInfo=self.frameInfo)
+        self.headerSize = self.template.size
+        self.seqNum = 0
+        self.frameNum = 0           # Số thứ tự frame ghi trong FRAME_INFO
+        self.timestampBase = randint(0, 0xFFFFFFFF)
+        self.mode = mode or self.detectMode(sock)
+        self.syscalls = 0
+
+        # Buffer gói (đường sendto) và khối header cho cả frame (đường sendmsg/gso)
+        self.buffer = bytearray(self.headerSize + MAX_RTP_PAYLOAD)
+        self.view = memoryview(self.buffer)
+        self.headers = bytearray()
+        self.headerViews = []
+        # RetransmitRing: None = không giữ lịch sử (không trả lời NACK, vd: kênh broadcast)
+        self.history = None
+        
+        # FEC: 1 gói parity XOR cho mỗi nhóm fecK mảnh (0 = tắt), Seq riêng với PT FEC_PT
+        self.fecK = 0
+        self.fecTemplate = RtpHeaderTemplate(pt=FEC_PT, ssrc=ssrc)
+        self.fecSeq = 0
+        self.parity = []        # [(chỉ số mảnh cuối của nhóm, header RTP + base, thân FEC)] của frame hiện tại
+        self.parityBytes = 0
+
+    @classmethod
+    def detectMode(cls, sock):
+        if not hasattr(sock, 'sendmsg'):
+            return cls.MODE_SENDTO
+        if sys.platform.startswith('linux'):
+            return cls.MODE_GSO
+        return cls.MODE_SENDMSG
+
+    def nextSeq(self):
+        seq = self.seqNum
+        self.seqNum = (seq + 1) & 0xFFFF
+        return seq
+
+    def mediaTimestamp(self, position, fps):
+        """ RTP Timestamp của frame thứ position (từ đầu video) khi phát ở fps: gốc + position / fps giây. """
+        return (self.timestampBase + round(position * RTP_CLOCK_RATE / fps)) & 0xFFFFFFFF
+
+    def _headerBlock(self, count):
+        """ Khối header đủ cho count gói (chỉ cấp phát lại khi frame lớn hơn trước). """
+        if len(self.headerViews) < count:
+            size = self.headerSize
+            self.headers = bytearray(size * count)
+            view = memoryview(self.headers)
+            self.headerViews = [view[i * size : (i + 1) * size] for i in range(count)]
+        return self.headers
+
+    def sendFrame(self, frame, timestamp):
+        """ Gửi toàn bộ mảnh của 1 PacketizedFrame. Trả về số gói đã gửi. """
+        fragments = frame.fragments()
+        count = len(fragments)
+        if count == 0:
+            return 0
+        self.writeHeaders(count, timestamp, len(frame))
+        self.writeParity(frame, timestamp)
+        self.remember(fragments)
+        self.transmit(fragments, self.address)
+        return count
+
+    def writeHeaders(self, count, timestamp, size):
+        """
+        Ghi Seq/Marker/Timestamp cho count gói của 1 frame (size byte) vào khối header (tăng Seq 1 lần / gói),
+        kèm FRAME_INFO nếu bật.
+        """
+        headers, template, headerSize = self._headerBlock(count), self.template, self.headerSize
+        for i in range(count):
+            template.write(headers, i * headerSize, self.nextSeq(), 1 if i == count - 1 else 0, timestamp)
+        if self.frameInfo:
+            frameNum = self.frameNum
+            for i in range(count):
+                template.writeFrameInfo(headers, i * headerSize, frameNum, i, count, size)
+        self.frameNum = (self.frameNum + 1) & 0xFFFFFFFF
+
+    def writeParity(self, frame, timestamp):
+        """
+        Gói FEC cho frame vừa ghi header (writeHeaders): thân lấy từ cache của PacketizedFrame,
+        chỉ ghi header RTP (Seq FEC riêng, cùng Timestamp) + Seq gói đầu của nhóm.
+        """
+        if self.fecK <= 0:
+            return
+        groups = frame.parity(self.fecK)
+        firstSeq = (self.seqNum - len(frame.fragments())) & 0xFFFF
+        parity, size = [], 0
+        for first, last, body in groups:
+            header = bytearray(HEADER_SIZE + 2)
+            self.fecTemplate.write(header, 0, self.fecSeq, 0, timestamp)
+            self.fecSeq = (self.fecSeq + 1) & 0xFFFF
+            header[HEADER_SIZE:] = ((firstSeq + first) & 0xFFFF).to_bytes(2, 'big')
+            parity.append((last, header, body))
+            size += 2 + len(body)
+        self.parity = parity
+        self.parityBytes = size
+    
+    def remember(self, fragments):
+        """ Lưu các gói vừa ghi header (writeHeaders) vào RetransmitRing, nếu có. """
+        if self.history is not None:
+            firstSeq = (self.seqNum - len(fragments)) & 0xFFFF
+            self.history.record(firstSeq, self.headers, fragments, time.monotonic(), self.headerSize)
+
+    def retransmit(self, seqs):
+        """
+        Gửi lại các gói Client báo mất (NACK) với đúng Seq/Timestamp cũ.
+        Trả về (số gói đã gửi lại, {lý do: số gói bỏ qua}).
+        """
+        sent, skipped = 0, {}
+        now = time.monotonic()
+        for seq in seqs:
+            packet, reason = self.history.lookup(seq, now)
+            if packet is None:
+                skipped[reason] = skipped.get(reason, 0) + 1
+                continue
+            try:
+                self.sendPacket(packet)
+            except OSError:
+                # Socket đầy (non-blocking) hoặc phiên vừa đóng -> bỏ phần còn lại
+                skipped['error'] = skipped.get('error', 0) + len(seqs) - sent - sum(skipped.values())
+                break
+            sent += 1
+        return sent, skipped
+
+    def sendPacket(self, packet):
+        """ Gửi 1 gói RTP hoàn chỉnh (gói gửi lại, đường gửi cũ không pre-packetize). """
+        self.sock.sendto(packet, self.address)
+
+    def transmit(self, fragments, address, start=0, end=None):
+        """
+        Phát các gói [start, end) đã ghi header (writeHeaders) tới address.
+        Gọi nhiều lần với nhiều address -> mọi đích nhận đúng cùng 1 chuỗi gói (broadcast);
+        gọi nhiều lần với các đoạn liên tiếp -> rải gói của 1 frame theo thời gian (TokenBucket).
+        """
+        count = len(fragments) if end is None else end
+        first = start
+        if self.mode == self.MODE_SENDTO:
+            self._sendCopy(fragments, start, count, address)
+        else:
+            if self.mode == self.MODE_GSO and count - start > 1:
+                start = self._sendGso(fragments, start, count, address)
+            if start < count:
+                self._sendScatter(fragments, start, count, address)
+        if self.parity:
+            self._sendParity(first, count, address)
+    
+    def _sendParity(self, start, end, address):
+        """ Gói FEC của các nhóm kết thúc trong đoạn [start, end) vừa gửi (ngay sau dữ liệu của nhóm). """
+        for last, header, body in self.parity:
+            if start <= last < end:
+                if self.mode == self.MODE_SENDTO:
+                    self.sock.sendto(header + body, address)
+                else:
+                    self.sock.sendmsg((header, body), (), 0, address)
+                self.syscalls += 1
+
+    def _sendCopy(self, fragments, start, count, address):
+        buffer, view, headerViews, headerSize = self.buffer, self.view, self.headerViews, self.headerSize
+        for i in range(start, count):
+            fragment = fragments[i]
+            buffer[:headerSize] = headerViews[i]
+            end = headerSize + len(fragment)
+            buffer[headerSize:end] = fragment
+            self.sock.sendto(view[:end], address)
+            self.syscalls += 1
+
+    def _sendScatter(self, fragments, start, count, address):
+        sendmsg, headerViews = self.sock.sendmsg, self.headerViews
+        for i in range(start, count):
+            sendmsg((headerViews[i], fragments[i]), (), 0, address)
+        self.syscalls += count - start
+
+    def _sendGso(self, fragments, first, count, address):
+        """
+        Gửi theo lô bằng UDP_SEGMENT: mọi segment dài đúng segSize (header + 1400),
+        chỉ segment cuối của frame được ngắn hơn -> đúng yêu cầu của GSO.
+        Trả về chỉ số gói đầu tiên CHƯA gửi được (count nếu gửi hết).
+        """
+        segSize = self.headerSize + len(fragments[0])
+        batch = max(1, min(GSO_MAX_SEGMENTS, GSO_MAX_BYTES // segSize))
+        control = [(SOL_UDP, UDP_SEGMENT, struct.pack('=H', segSize))]
+        headerViews = self.headerViews
+
+        for start in range(first, count, batch):
+            end = min(count, start + batch)
+            iov = []
+            for i in range(start, end):
+                iov.append(headerViews[i])
+                iov.append(fragments[i])
+            try:
+                self.sock.sendmsg(iov, control, 0, address)
+                self.syscalls += 1
+            except BlockingIOError:
+                raise
+            except OSError as e:
+                if e.errno not in (errno.EINVAL, errno.ENOPROTOOPT, errno.EIO, errno.EOPNOTSUPP, errno.EMSGSIZE):
+                    raise
+                # Kernel / card mạng không hỗ trợ GSO (hoặc segment > MTU) -> dùng sendmsg từng gói từ giờ
+                print(f"[RtpSender] UDP GSO unavailable ({e}), falling back to sendmsg")
+                self.mode = self.MODE_SENDMSG
+                return start
+        return count
+
+class InterleavedSender(RtpSender):
+    """
+    RTP lồng trên chính kết nối RTSP (RTP/AVP/TCP;interleaved=<kênh>, RFC 2326 §10.12) cho Client
+    sau mạng chặn / bóp UDP. Cùng Seq/header/FEC như RtpSender, mỗi gói được đóng khung
+    '$' | kênh | độ dài và cả đoạn gói được ghi 1 lần (write: hàm ghi lên kết nối RTSP của phiên).
+    ready() = False khi hàng đợi gửi của phiên đã đầy -> BlockingIOError, luồng gửi bỏ frame như với UDP
+    non-blocking, thay vì xếp hàng vô hạn / chặn luồng gửi vì 1 Client đọc chậm.
+    """
+
+    MODE_INTERLEAVED = 'interleaved'
+
+    def __init__(self, write, channel, ssrc=0, pt=26, ready=None, frameInfo=None):
+        super().__init__(None, None, ssrc=ssrc, pt=pt, mode=self.MODE_INTERLEAVED, frameInfo=frameInfo)
+        self.write = write
+        self.channel = channel
+        self.ready = ready
+
+    def frameHeader(self, length):
+        return INTERLEAVED_HEADER.pack(INTERLEAVED_MAGIC, self.channel, length)
+
+    def sendPacket(self, packet):
+        self.write(self.frameHeader(len(packet)) + packet)
+
+    def transmit(self, fragments, address, start=0, end=None):
+        """ Ghi các gói [start, end) (kèm gói FEC của các nhóm kết thúc trong đoạn) bằng 1 lần write. """
+        count = len(fragments) if end is None else end
+        if start >= count:
+            return
+        if self.ready is not None and not self.ready():
+            if start == 0 and count == len(fragments):
+                # Bỏ cả frame: trả lại Seq đã ghi -> Client không thấy lỗ hổng (TCP không mất gói, không có gì để chờ / NACK)
+                self.seqNum = (self.seqNum - count) & 0xFFFF
+                self.frameNum = (self.frameNum - 1) & 0xFFFFFFFF
+                self.fecSeq = (self.fecSeq - len(self.parity)) & 0xFFFF
+            raise BlockingIOError("interleaved send buffer full")
+        frameHeader, headerViews, headerSize = self.frameHeader, self.headerViews, self.headerSize
+        parts = []
+        for i in range(start, count):
+            fragment = fragments[i]
+            parts.append(frameHeader(headerSize + len(fragment)))
+            parts.append(headerViews[i])
+            parts.append(fragment)
+        for last, header, body in self.parity:
+            if start <= last < count:
+                parts.append(frameHeader(len(header) + len(body)))
+                parts.append(header)
+                parts.append(body)
+        self.write(b''.join(parts))
+        self.syscalls += 1
@@ -0,0 +1,133 @@
+import os
+import socket
+import threading
+
+# --- IMPORT MODULES ---
+try:
+    from src.common.rtcp_packet import GenericNack, decodeCompound
+except ImportError:
+    import sys
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+    from src.common.rtcp_packet import GenericNack, decodeCompound
+
+class RtcpListener:
+    """
+    1 cổng UDP nhận RTCP của mọi phiên (thay vì 1 socket + 1 thread / phiên).
+    Khối báo cáo trong RR được chuyển tới phiên có SSRC tương ứng (SSRC Server cấp lúc SETUP,
+    báo cho Client trong header Transport). Chỉ nhận report từ đúng IP của Client giữ phiên.
+    Generic NACK (RFC 4585) được chuyển tới phiên theo SSRC của luồng media -> worker.onNack(seqs).
+    Phiên RTP/AVP/TCP gửi RTCP trên kết nối RTSP: worker chuyển vào onInterleaved, xử lý giống hệt.
+    """
+
+    RECV_SIZE = 2048
+
+    def __init__(self, port, host=''):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind((host, port))
+        self.port = self.sock.getsockname()[1]
+        self.lock = threading.Lock()
+        self.sessions = {}          # SSRC -> worker
+        self.loop = None
+        self.reports = 0
+        self.nacks = 0
+        self.dropped = 0
+
+    def register(self, ssrc, worker):
+        with self.lock:
+            self.sessions[ssrc] = worker
+
+    def unregister(self, ssrc, worker):
+        with self.lock:
+            if self.sessions.get(ssrc) is worker:
+                del self.sessions[ssrc]
+
+    # =========================================================================
+    # NHẬN
+    # =========================================================================
+
+    def onDatagram(self, data, address):
+        """ Giải mã 1 gói RTCP: onReceiverReport(block) cho từng khối báo cáo, onNack(seqs) cho từng NACK. """
+        self.route(data, lambda ssrc: self.lookup(ssrc, address))
+
+    def onInterleaved(self, data, worker):
+        """ RTCP Client gửi lồng trên kết nối RTSP (RTP/AVP/TCP): chỉ nhận khối / NACK cho SSRC của chính phiên đó. """
+        ssrc = worker.clientInfo.get('ssrc')
+        self.route(data, lambda target: worker if target == ssrc else self.reject())
+
+    def route(self, data, find):
+        """ find(ssrc) -> worker nhận phản hồi, hoặc None (bỏ qua). """
+        try:
+            packets = decodeCompound(data)
+        except ValueError:
+            self.dropped += 1
+            return
+        for packet in packets:
+            if isinstance(packet, GenericNack):
+                worker = find(packet.mediaSsrc)
+                if worker is None:
+                    continue
+                self.nacks += 1
+                self.deliver(worker.onNack, packet.lost)
+                continue
+            for block in packet.blocks:
+                worker = find(block.ssrc)
+                if worker is None:
+                    continue
+                self.reports += 1
+                self.deliver(worker.onReceiverReport, block)
+
+    def lookup(self, ssrc, address):
+        """ Phiên giữ SSRC này, None (đếm vào dropped) nếu không có hoặc gói đến từ IP khác. """
+        with self.lock:
+            worker = self.sessions.get(ssrc)
+        if worker is None or worker.clientInfo['rtspSocket'][1][0] != address[0]:
+            return self.reject()
+        return worker
+
+    def reject(self):
+        self.dropped += 1
+        return None
+
+    @staticmethod
+    def deliver(handler, value):
+        try:
+            handler(value)
+        except Exception as e:
+            print(f"[RTCP] Feedback handling error: {e}")
+
+    def start(self, loop=None):
+        """ Đọc trên event loop (mode async, add_reader) hoặc 1 thread nền (mode thread). """
+        if loop is not None:
+            self.loop = loop
+            self.sock.setblocking(False)
+            loop.add_reader(self.sock.fileno(), self.onReadable)
+        else:
+            threading.Thread(target=self.run, name="rtcp-listener", daemon=True).start()
+        print(f"[RTCP] Listening for receiver reports on UDP {self.port}")
+        return self
+
+    def onReadable(self):
+        while True:
+            try:
+                data, address = self.sock.recvfrom(self.RECV_SIZE)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                return
+            self.onDatagram(data, address)
+
+    def run(self):
+        while True:
+            try:
+                data, address = self.sock.recvfrom(self.RECV_SIZE)
+            except OSError:
+                return
+            self.onDatagram(data, address)
+
+    def stop(self):
+        if self.loop is not None:
+            self.loop.remove_reader(self.sock.fileno())
+        self.sock.close()
+
+    def stats(self):
+        return {'reports': self.reports, 'nacks': self.nacks, 'dropped': self.dropped, 'sessions': len(self.sessions)}
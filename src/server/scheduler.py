@@ -0,0 +1,178 @@
+import heapq
+import itertools
+import queue
+import threading
+import time
+
+class ScheduledTask:
+    """
+    1 tác vụ định kỳ trong PacingScheduler (vd: luồng RTP của 1 phiên).
+    callback() chạy trên 1 sender thread và trả về hạn chót kế tiếp (None = dừng).
+    guard: Lock dùng chung cho mọi task của cùng 1 phiên - task mới (PLAY ngay sau PAUSE) không chạy song song
+    với lần gọi cuối của task cũ đã hủy nhưng vẫn đang chạy trên sender thread khác.
+    """
+    __slots__ = ('callback', 'cancelled', 'guard')
+
+    def __init__(self, callback, guard=None):
+        self.callback = callback
+        self.cancelled = False
+        self.guard = guard
+
+    def cancel(self):
+        self.cancelled = True
+
+class PacingScheduler:
+    """
+    Bộ lập lịch nhịp gửi dùng chung cho MỌI phiên (chế độ thread).
+    - 1 timer thread giữ heap (deadline, task) của tất cả phiên đang PLAY.
+    - Mỗi lần thức dậy lấy hết các task tới hạn trong cửa sổ COALESCE_WINDOW (gộp wakeup)
+      và đẩy sang hàng đợi cho 1 pool nhỏ sender thread cố định.
+    500 phiên chỉ tốn 1 + senderThreads thread thay vì 500 thread sendRtp.
+    """
+
+    # Task có hạn chót trong khoảng này được phát cùng 1 lần thức dậy
+    COALESCE_WINDOW = 0.002
+    # Bắt đầu chạy trễ hơn hạn chót quá ngưỡng này -> tính là trễ hạn (missed deadline)
+    MISS_TOLERANCE = 0.010
+    # In thống kê định kỳ (giây)
+    REPORT_INTERVAL = 10.0
+    # guard đang bị giữ (bước trước của cùng phiên chưa xong) -> hẹn lại sau khoảng này, không chặn sender thread
+    GUARD_RETRY = 0.001
+
+    def __init__(self, senderThreads=4, clock=time.monotonic):
+        self.clock = clock
+        self.senderThreads = senderThreads
+        self.heap = []
+        self.counter = itertools.count()
+        self.cond = threading.Condition()
+        self.work = queue.Queue()
+        self.running = False
+        self.threads = []
+
+        # Thống kê
+        self.dispatched = 0
+        self.missedDeadlines = 0
+        self.totalLag = 0.0
+        self.maxLag = 0.0
+        self.wakeups = 0
+        self.statsLock = threading.Lock()
+
+    def start(self):
+        self.running = True
+        self.threads = [threading.Thread(target=self.timerLoop, name="pacing-timer", daemon=True)]
+        for i in range(self.senderThreads):
+            self.threads.append(threading.Thread(target=self.senderLoop, name=f"pacing-sender-{i}", daemon=True))
+        for thread in self.threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        with self.cond:
+            self.running = False
+            self.cond.notify()
+        for _ in range(self.senderThreads):
+            self.work.put(None)
+
+    def schedule(self, deadline, callback, guard=None):
+        """ Đăng ký callback chạy tại deadline. Trả về ScheduledTask (gọi .cancel() để dừng). """
+        task = ScheduledTask(callback, guard)
+        self._push(deadline, task)
+        return task
+
+    def _push(self, deadline, task):
+        with self.cond:
+            heapq.heappush(self.heap, (deadline, next(self.counter), task))
+            # Task mới sớm hơn task đầu heap -> đánh thức timer để tính lại thời gian chờ
+            if self.heap[0][2] is task:
+                self.cond.notify()
+
+    # =========================================================================
+    # THREADS
+    # =========================================================================
+
+    def timerLoop(self):
+        nextReport = self.clock() + self.REPORT_INTERVAL
+        while True:
+            with self.cond:
+                if not self.running:
+                    return
+                now = self.clock()
+                if not self.heap or self.heap[0][0] > now + self.COALESCE_WINDOW:
+                    timeout = self.heap[0][0] - now if self.heap else self.REPORT_INTERVAL
+                    self.cond.wait(min(timeout, self.REPORT_INTERVAL))
+                    due = []
+                else:
+                    # Gộp mọi task tới hạn trong cửa sổ vào 1 lần thức dậy
+                    due = []
+                    limit = now + self.COALESCE_WINDOW
+                    while self.heap and self.heap[0][0] <= limit:
+                        deadline, _, task = heapq.heappop(self.heap)
+                        if not task.cancelled:
+                            due.append((deadline, task))
+                    self.wakeups += 1
+
+            for item in due:
+                self.work.put(item)
+
+            if self.clock() >= nextReport:
+                nextReport = self.clock() + self.REPORT_INTERVAL
+                self.report()
+
+    def senderLoop(self):
+        while True:
+            item = self.work.get()
+            if item is None:
+                return
+            deadline, task = item
+            if task.cancelled:
+                continue
+            guard = task.guard
+            if guard is not None and not guard.acquire(blocking=False):
+                self._push(self.clock() + self.GUARD_RETRY, task)
+                continue
+
+            lag = self.clock() - deadline
+            with self.statsLock:
+                self.dispatched += 1
+                if lag > 0:
+                    self.totalLag += lag
+                    self.maxLag = max(self.maxLag, lag)
+                if lag > self.MISS_TOLERANCE:
+                    self.missedDeadlines += 1
+
+            try:
+                nextDeadline = task.callback() if not task.cancelled else None
+            except Exception as e:
+                print(f"[Scheduler] Task error: {e}")
+                nextDeadline = None
+            finally:
+                if guard is not None:
+                    guard.release()
+
+            if nextDeadline is not None and not task.cancelled:
+                self._push(nextDeadline, task)
+
+    # =========================================================================
+    # THỐNG KÊ
+    # =========================================================================
+
+    def stats(self):
+        with self.cond:
+            scheduled = len(self.heap)
+        with self.statsLock:
+            return {
+                'scheduled': scheduled,
+                'queueDepth': self.work.qsize(),
+                'dispatched': self.dispatched,
+                'wakeups': self.wakeups,
+                'missedDeadlines': self.missedDeadlines,
+                'avgLag': self.totalLag / self.dispatched if self.dispatched else 0.0,
+                'maxLag': self.maxLag,
+            }
+
+    def report(self):
+        s = self.stats()
+        if s['dispatched'] == 0:
+            return
+        print(f"[Scheduler] sessions={s['scheduled']} dispatched={s['dispatched']} wakeups={s['wakeups']} "
+              f"lag avg={s['avgLag'] * 1000:.1f}ms max={s['maxLag'] * 1000:.1f}ms missed={s['missedDeadlines']}")
@@ -1,16 +1,41 @@
+import os
 import sys
 import socket
+import signal
+import argparse
+import asyncio
 
 # --- IMPORT MODULES ---
 try:
     from src.server.server_worker import ServerWorker
+    from src.server.async_server import AsyncServer
+    from src.server.frame_cache import FrameCache
+    from src.server.scheduler import PacingScheduler
+    from src.server.broadcast import BroadcastChannel
+    from src.server.packetizer import RtpSender
+    from src.server.metrics import MetricsHttpServer
+    from src.server.rtcp_listener import RtcpListener
 except ImportError:
     try:
         from server_worker import ServerWorker
+        from async_server import AsyncServer
+        from frame_cache import FrameCache
+        from scheduler import PacingScheduler
+        from broadcast import BroadcastChannel
+        from packetizer import RtpSender
+        from metrics import MetricsHttpServer
+        from rtcp_listener import RtcpListener
     except ImportError:
         import os
         sys.path.append(os.path.dirname(os.path.abspath(__file__)))
         from server_worker import ServerWorker
+        from async_server import AsyncServer
+        from frame_cache import FrameCache
+        from scheduler import PacingScheduler
+        from broadcast import BroadcastChannel
+        from packetizer import RtpSender
+        from metrics import MetricsHttpServer
+        from rtcp_listener import RtcpListener
 
 class Server:    
     """
@@ -19,20 +44,127 @@ class Server:
     """
     def main(self):
         # 1. Kiểm tra tham số
-        if len(sys.argv) < 2:
-            print("[Usage: python server_main.py <Server_Port>]")
-            print("Example: python server_main.py 8554")
-            sys.exit(1)
+        parser = argparse.ArgumentParser(
+            description="RTSP/RTP Video Streaming Server",
+            epilog="Example: python -m src.server.server_main 8554 --mode async")
+        parser.add_argument("port", type=int, help="Cổng RTSP (TCP)")
+        parser.add_argument("--mode", choices=["thread", "async"], default="thread",
+                            help="thread: 1 ServerWorker/thread cho mỗi Client | async: 1 Event Loop cho tất cả")
+        parser.add_argument("--video-dir", default=ServerWorker.VIDEO_DIR,
+                            help="Thư mục chứa file video (mặc định: assets/video)")
+        parser.add_argument("--cache-mb", type=int, default=FrameCache.DEFAULT_MAX_BYTES // (1024 * 1024),
+                            help="Ngân sách RAM cho FrameCache dùng chung (MB, LRU)")
+        parser.add_argument("--fps", type=float, default=ServerWorker.DEFAULT_FPS,
+                            help="FPS mặc định cho file không có metadata (<video>.json)")
+        parser.add_argument("--sender-threads", type=int, default=4,
+                            help="(mode thread) Số sender thread của PacingScheduler chung; 0 = mỗi phiên 1 thread sendRtp")
+        parser.add_argument("--shape-burst", type=int, default=ServerWorker.SHAPE_BURST, metavar="PACKETS",
+                            help="Định hình lưu lượng mỗi phiên (TokenBucket): tối đa PACKETS gói gửi liền, "
+                                 "phần còn lại rải đều trong chu kỳ frame; 0 = tắt")
+        parser.add_argument("--shape-rate", type=float, default=0, metavar="MBIT",
+                            help="Tốc độ nạp token (Mbit/s) khi định hình; 0 = tự tính theo kích thước từng frame")
+        parser.add_argument("--broadcast", nargs="+", default=[], metavar="FILE",
+                            help="Phát các file này như kênh live: đọc/cắt mảnh 1 lần, mọi người xem nhận cùng 1 chuỗi gói")
+        parser.add_argument("--multicast", metavar="GROUP:PORT",
+                            help="Phát thêm kênh live tới multicast group (vd: 239.255.0.1:5004; kênh thứ i dùng PORT + 2i)")
+        parser.add_argument("--no-prepacketize", action="store_true",
+                            help="Tắt cache mảnh RTP cắt sẵn (cắt mảnh + tạo RtpPacket cho từng gói)")
+        parser.add_argument("--no-frame-info", action="store_true",
+                            help="Không gửi header extension RFC 8285 (số frame, chỉ số / số mảnh, kích thước frame) "
+                                 "trong mỗi gói RTP (tiết kiệm 20 byte / gói)")
+        parser.add_argument("--metrics-port", type=int, default=0,
+                            help="Mở HTTP /metrics (Prometheus) trên 127.0.0.1:PORT; worker thứ i dùng PORT + i; 0 = tắt "
+                                 "(metric vẫn đọc được qua RTSP GET_PARAMETER 'metrics')")
+        parser.add_argument("--session-timeout", type=int, default=ServerWorker.sessions.timeout, metavar="SECONDS",
+                            help="Đóng kết nối RTSP không gửi request nào (kể cả keepalive GET_PARAMETER/OPTIONS) "
+                                 "trong SECONDS giây và giải phóng phiên; 0 = không bao giờ")
+        parser.add_argument("--max-sessions", type=int, default=0,
+                            help="Số phiên (SETUP) tối đa mỗi tiến trình, vượt quá trả 503; 0 = không giới hạn")
+        parser.add_argument("--rtcp-port", type=int, default=None,
+                            help="Cổng UDP nhận RTCP Receiver Report của mọi phiên (mặc định: cổng RTSP + 1; "
+                                 "worker thứ i dùng PORT + i); 0 = tắt")
+        parser.add_argument("--abr", action="store_true",
+                            help="Đổi bản chất lượng (\"renditions\" trong <video>.json) ở ranh giới frame "
+                                 "theo tỉ lệ mất gói Client báo qua RTCP")
+        parser.add_argument("--rtx-window", type=float, default=ServerWorker.RTX_WINDOW * 1000, metavar="MS",
+                            help="Gửi lại gói Client báo mất (RTCP NACK) nếu gói mới gửi chưa quá MS mili giây; "
+                                 "0 = tắt (cần cổng RTCP)")
+        parser.add_argument("--fec", type=int, default=0, metavar="K",
+                            help="Gửi thêm 1 gói parity XOR cho mỗi nhóm K mảnh của frame (tốn thêm ~1/K băng thông): "
+                                 "Client dựng lại 1 gói mất / nhóm không cần chờ gửi lại; 0 = tắt")
+        parser.add_argument("--workers", type=int, default=1,
+                            help="Số tiến trình Server (fork, cùng bind cổng RTSP bằng SO_REUSEPORT); "
+                                 "mỗi tiến trình giữ phiên + FrameCache riêng")
+        args = parser.parse_args()
 
+        ServerWorker.VIDEO_DIR = args.video_dir
+        ServerWorker.videoLibrary.cache.resize(args.cache_mb * 1024 * 1024)
+        ServerWorker.PREPACKETIZE = not args.no_prepacketize
+        RtpSender.FRAME_INFO = not args.no_frame_info
+        ServerWorker.DEFAULT_FPS = args.fps
+        ServerWorker.SHAPE_BURST = args.shape_burst
+        ServerWorker.SHAPE_RATE = args.shape_rate * 1e6 / 8
+        ServerWorker.sessions.timeout = args.session_timeout
+        ServerWorker.sessions.maxSessions = args.max_sessions
+        ServerWorker.ABR = args.abr
+        ServerWorker.RTX_WINDOW = args.rtx_window / 1000
+        ServerWorker.FEC_K = max(0, min(args.fec, 255))
+        if ServerWorker.FEC_K:
+            print(f"[*] FEC: 1 parity packet per {ServerWorker.FEC_K} fragments (+{1 / ServerWorker.FEC_K:.0%} packets)")
+
+        if args.workers > 1:
+            self.runWorkers(args)
+        else:
+            self.serve(args)
+
+    def serve(self, args, workerIndex=0, reusePort=False):
+        """ Chạy 1 tiến trình Server (thread hoặc async). reusePort: nhiều tiến trình cùng bind 1 cổng. """
+        SERVER_PORT = args.port
+        
+        ServerWorker.metrics.addCacheCollector(ServerWorker.videoLibrary.cache)
+        ServerWorker.metrics.addSessionTableCollector(ServerWorker.sessions)
+        if args.metrics_port:
+            try:
+                MetricsHttpServer(ServerWorker.metrics.registry, args.metrics_port + workerIndex).start()
+            except OSError as e:
+                print(f"[Error] Could not open metrics port {args.metrics_port + workerIndex}: {e}")
+        
+        rtcpPort = args.port + 1 if args.rtcp_port is None else args.rtcp_port
+        if rtcpPort:
+            try:
+                ServerWorker.rtcp = RtcpListener(rtcpPort + workerIndex)
+                ServerWorker.metrics.addRtcpCollector(ServerWorker.rtcp)
+            except OSError as e:
+                print(f"[Error] Could not open RTCP port {rtcpPort + workerIndex}: {e}")
+        if args.abr and ServerWorker.rtcp is None:
+            print("[Warning] --abr needs RTCP receiver reports, ABR stays off")
+        
+        # Kênh live chỉ phát multicast từ worker 0 (tránh N bản sao trên cùng group)
+        multicast = args.multicast if workerIndex == 0 else None
         try:
-            SERVER_PORT = int(sys.argv[1])
-        except ValueError:
-            print("[Error] Port must be a number.")
-            sys.exit(1)
+            ServerWorker.broadcasts = self.openBroadcasts(args.broadcast, multicast)
+        except (IOError, ValueError) as e:
+            print(f"[Error] Could not open broadcast channel: {e}")
+            return
+
+        if args.mode == "async":
+            self.runAsync(SERVER_PORT, reusePort)
+            return
+
+        if args.sender_threads > 0:
+            ServerWorker.scheduler = PacingScheduler(args.sender_threads).start()
+            ServerWorker.metrics.addSchedulerCollector(ServerWorker.scheduler)
+        for channel in ServerWorker.broadcasts.values():
+            channel.start(scheduler=ServerWorker.scheduler)
+        ServerWorker.sessions.start()
+        if ServerWorker.rtcp is not None:
+            ServerWorker.rtcp.start()
 
         # 2. Khởi tạo Socket
         rtspSocket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         rtspSocket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if reusePort:
+            rtspSocket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
         
         try:
             rtspSocket.bind(('', SERVER_PORT))
@@ -41,7 +173,7 @@ class Server:
             print(f"[Error] Could not bind to port {SERVER_PORT}: {e}")
             return
 
-        rtspSocket.listen(5)        
+        rtspSocket.listen(128)        
 
         # 3. Vòng lặp chính (Main Loop)
         try:
@@ -61,5 +193,79 @@ class Server:
             rtspSocket.close()
             sys.exit(0)
 
+    def openBroadcasts(self, names, multicast):
+        """ Tạo BroadcastChannel cho mỗi file --broadcast (chưa chạy, mode thread/async tự start). """
+        group = None
+        if multicast:
+            host, _, port = multicast.rpartition(':')
+            group = (host, int(port))
+
+        channels = {}
+        for i, name in enumerate(names):
+            videoStream = ServerWorker.videoLibrary.open(os.path.join(ServerWorker.VIDEO_DIR, name))
+            fps = videoStream.fps() or ServerWorker.DEFAULT_FPS
+            target = (group[0], group[1] + 2 * i) if group else None
+            channels[name] = BroadcastChannel(name, videoStream, fps, target)
+            channels[name].sender.fecK = ServerWorker.FEC_K
+        return channels
+
+    def runWorkers(self, args):
+        """
+        Chế độ đa tiến trình: fork args.workers tiến trình con, mỗi con bind cổng RTSP với
+        SO_REUSEPORT -> kernel chia kết nối mới cho các con, mỗi con có GIL riêng (dùng hết các core).
+        Tiến trình cha chỉ chờ và dừng các con khi bị tắt.
+        """
+        if not hasattr(os, 'fork') or not hasattr(socket, 'SO_REUSEPORT'):
+            print("[Error] --workers needs os.fork and SO_REUSEPORT (Linux/BSD/macOS), running 1 process")
+            self.serve(args)
+            return
+
+        children = []
+        for i in range(args.workers):
+            pid = os.fork()
+            if pid == 0:
+                # Tiến trình con: chạy Server như bình thường rồi thoát hẳn (không quay lại vòng fork)
+                code = 0
+                try:
+                    self.serve(args, workerIndex=i, reusePort=True)
+                except SystemExit as e:
+                    code = e.code or 0
+                except KeyboardInterrupt:
+                    pass
+                finally:
+                    sys.stdout.flush()
+                    os._exit(code)
+            children.append(pid)
+        print(f"[*] Started {args.workers} worker processes (SO_REUSEPORT): {', '.join(map(str, children))}")
+
+        def stopChildren():
+            for pid in children:
+                try:
+                    os.kill(pid, signal.SIGTERM)
+                except OSError:
+                    pass
+        def onTerminate(*_):
+            stopChildren()
+            sys.exit(0)
+        signal.signal(signal.SIGTERM, onTerminate)
+
+        try:
+            for pid in children:
+                os.waitpid(pid, 0)
+        except KeyboardInterrupt:
+            print("\n[!] Server stopped by user.")
+            stopChildren()
+            sys.exit(0)
+
+    def runAsync(self, port, reusePort=False):
+        """ Chạy chế độ asyncio: 1 Event Loop cho toàn bộ RTSP + RTP. """
+        try:
+            asyncio.run(AsyncServer().serve(port, reusePort))
+        except OSError as e:
+            print(f"[Error] Could not bind to port {port}: {e}")
+        except KeyboardInterrupt:
+            print("\n[!] Server stopped by user.")
+            sys.exit(0)
+
 if __name__ == "__main__":
-    (Server()).main()
\ No newline at end of file
+    (Server()).main()
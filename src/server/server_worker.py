@@ -1,19 +1,38 @@
 from random import randint
-import sys, traceback, threading, socket, time, os
+import sys, traceback, threading, socket, select, time, os
+from collections import deque
 
 # --- IMPORT MODULES ---
 try:
-    from src.common.video_stream import VideoStream
-    from src.common.rtp_packet import RtpPacket
+    from src.common.rtp_packet import RtpPacket, HEADER_SIZE, FRAME_INFO_ID, FRAME_INFO, RTP_CLOCK_RATE
+    from src.common.rtsp_parser import RtspMessageParser, InterleavedFrame
+    from src.server.frame_cache import VideoLibrary
+    from src.server.packetizer import RtpSender, InterleavedSender, RetransmitRing, MAX_RTP_PAYLOAD
+    from src.server.pacing import FramePacer, TokenBucket
+    from src.server.metrics import ServerMetrics
+    from src.server.session_table import SessionTable
+    from src.server.abr import BitrateController
 except ImportError:
     try:
-        from common.video_stream import VideoStream
-        from common.rtp_packet import RtpPacket
+        from common.rtp_packet import RtpPacket, HEADER_SIZE, FRAME_INFO_ID, FRAME_INFO, RTP_CLOCK_RATE
+        from common.rtsp_parser import RtspMessageParser, InterleavedFrame
+        from server.frame_cache import VideoLibrary
+        from server.packetizer import RtpSender, InterleavedSender, RetransmitRing, MAX_RTP_PAYLOAD
+        from server.pacing import FramePacer, TokenBucket
+        from server.metrics import ServerMetrics
+        from server.session_table import SessionTable
+        from server.abr import BitrateController
     except ImportError:
         import sys, os
         sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
-        from src.common.video_stream import VideoStream
-        from src.common.rtp_packet import RtpPacket
+        from src.common.rtp_packet import RtpPacket, HEADER_SIZE, FRAME_INFO_ID, FRAME_INFO, RTP_CLOCK_RATE
+        from src.common.rtsp_parser import RtspMessageParser, InterleavedFrame
+        from src.server.frame_cache import VideoLibrary
+        from src.server.packetizer import RtpSender, InterleavedSender, RetransmitRing, MAX_RTP_PAYLOAD
+        from src.server.pacing import FramePacer, TokenBucket
+        from src.server.metrics import ServerMetrics
+        from src.server.session_table import SessionTable
+        from src.server.abr import BitrateController
 
 class ServerWorker:
     """
@@ -29,6 +48,9 @@ class ServerWorker:
     PLAY = 'PLAY'
     PAUSE = 'PAUSE'
     TEARDOWN = 'TEARDOWN'
+    GET_PARAMETER = 'GET_PARAMETER'
+    OPTIONS = 'OPTIONS'
+    METHODS = (OPTIONS, SETUP, PLAY, PAUSE, TEARDOWN, GET_PARAMETER)
     
     # Server States
     INIT = 0
@@ -40,55 +62,159 @@ class ServerWorker:
     OK_200 = 0
     FILE_NOT_FOUND_404 = 1
     CON_ERR_500 = 2
+    INVALID_RANGE_457 = 3
+    PARAMETER_NOT_UNDERSTOOD_451 = 4
+    SESSION_NOT_FOUND_454 = 5
+    SERVICE_UNAVAILABLE_503 = 6
+    UNSUPPORTED_TRANSPORT_461 = 7
+    METHOD_NOT_VALID_455 = 8
+    
+    # Thư mục chứa video (Server có thể đổi qua tham số --video-dir)
+    VIDEO_DIR = "assets/video"
+    
+    # Cấu hình đóng gói & tốc độ gửi
+    MAX_RTP_PAYLOAD = MAX_RTP_PAYLOAD
+    PREPACKETIZE = True     # False: cắt mảnh + tạo RtpPacket lại cho mỗi gói (đường cũ)
+    DEFAULT_FPS = 30        # Dùng khi file không có metadata fps (đổi được qua --fps)
+    RTP_CLOCK_RATE = RTP_CLOCK_RATE     # Đơn vị RTP timestamp (tick/giây): đồng hồ media 90 kHz
+    
+    # Định hình lưu lượng (TokenBucket) - rải gói của 1 frame trong chu kỳ frame thay vì bắn liền
+    SHAPE_BURST = 0         # Số gói tối đa được gửi liền 1 lúc; 0 = tắt định hình
+    SHAPE_RATE = 0          # byte/giây; 0 = tự tính theo kích thước từng frame
+    SHAPE_SPREAD = 0.8      # Rate tự tính: gửi xong frame trong 80% chu kỳ frame
+    
+    # Kho video dùng chung mọi phiên: 1 file handle / file + FrameCache (LRU theo byte)
+    videoLibrary = VideoLibrary()
+    
+    # Metric của tiến trình (Prometheus: HTTP /metrics và RTSP GET_PARAMETER "metrics")
+    metrics = ServerMetrics()
+    
+    # Nhận RTCP Receiver Report của mọi phiên (RtcpListener, None = không nhận)
+    rtcp = None
+    # ABR: đổi giữa các bản chất lượng (MediaInfo "renditions") theo tỉ lệ mất gói trong RR
+    ABR = False
+    # Gửi lại gói theo RTCP NACK: gói cũ hơn RTX_WINDOW giây bỏ qua (Client đã bỏ frame); 0 = tắt
+    RTX_WINDOW = 0.25
+    RTX_PACKETS = 1024      # Số gói gần nhất giữ lại mỗi phiên (RetransmitRing)
+    # FEC: 1 gói parity XOR cho mỗi nhóm FEC_K mảnh của frame (Client tự vá 1 gói mất / nhóm); 0 = tắt
+    FEC_K = 0
+    # RTP/AVP/TCP (interleaved): frame bị bỏ khi còn quá số byte này chưa ghi xong lên kết nối RTSP
+    INTERLEAVED_BUFFER = 512 * 1024
+    # Chế độ thread: chu kỳ (s) luồng nhận lệnh kiểm tra hàng đợi gửi còn tồn của phiên interleaved
+    INTERLEAVED_FLUSH = 0.1
+    
+    # Bảng phiên: Session id -> worker, keepalive + thu hồi phiên rảnh (--session-timeout, --max-sessions)
+    sessions = SessionTable()
+    
+    # Bộ lập lịch nhịp gửi dùng chung (PacingScheduler). None -> mỗi phiên 1 thread sendRtp
+    scheduler = None
+    
+    # Kênh phát trực tiếp (--broadcast): tên file -> BroadcastChannel dùng chung mọi người xem
+    broadcasts = {}
     
     clientInfo = {}
     
     def __init__(self, clientInfo):
         self.clientInfo = clientInfo
-        
-        # Set timeout cho socket RTSP để không bị treo nếu client mất kết nối
-        if self.clientInfo['rtspSocket'][0]:
-            self.clientInfo['rtspSocket'][0].settimeout(0.5)
+        self.rtpSender = None
+        self.fps = self.DEFAULT_FPS
+        self.pacer = None
+        self.shaper = None
+        self.inFlight = None    # [fragments, vị trí, kích thước] của frame đang được rải gói
+        self.streamTask = None
+        self.channel = None
+        self.rtpAddress = None
+        self.sessionStats = None    # SessionStats (metric) của phiên, có từ lúc SETUP
+        self.frameLateness = 0.0
+        self.frameReadTime = 0.0
+        self.frameSendTime = 0.0
+        self.lastActive = 0.0       # SessionTable: thời điểm nhận request RTSP gần nhất
+        self.abr = None             # BitrateController (chỉ khi --abr và file có nhiều bản chất lượng)
+        self.pendingRendition = None
+        self.interleaved = None     # (kênh RTP, kênh RTCP) khi RTP đi lồng trên kết nối RTSP
+        self.rtspLock = threading.Lock()    # Phản hồi RTSP và khung '$' ghi chung 1 socket TCP
+        self.outgoing = deque()     # Chế độ thread: dữ liệu chờ ghi lên kết nối RTSP (socket non-blocking)
+        self.outgoingBytes = 0
+        self.stepLock = threading.Lock()    # Mỗi lúc chỉ 1 streamStep của phiên (PLAY ngay sau PAUSE)
             
     def run(self):
-        """ Bắt đầu luồng nhận lệnh RTSP. """
-        threading.Thread(target=self.recvRtspRequest).start()
+        """
+        Bắt đầu luồng nhận lệnh RTSP.
+        Chờ (select) không timeout: Client im lặng quá lâu sẽ bị SessionTable đóng kết nối (expire),
+        khi đó recv() trả về b'' và luồng tự dọn dẹp.
+        """
+        self.sessions.add(self)
+        threading.Thread(target=self.recvRtspRequest, daemon=True).start()
         
     # =========================================================================
     # RTSP CONTROL (NHẬN LỆNH)
     # =========================================================================
         
     def recvRtspRequest(self):
-        """ Vòng lặp lắng nghe lệnh từ Client (TCP). """
+        """
+        Vòng lặp lắng nghe lệnh từ Client (TCP).
+        RtspMessageParser tách đúng từng request: request bị cắt giữa 2 segment được ghép lại,
+        nhiều request gửi liền (pipeline, vd: SETUP + PLAY) được xử lý lần lượt theo thứ tự.
+        Socket để non-blocking: luồng này cũng ghi nốt hàng đợi gửi (outgoing) khi TCP có chỗ trở lại.
+        """
         connSocket = self.clientInfo['rtspSocket'][0]
+        connSocket.setblocking(False)
+        parser = RtspMessageParser()
         while True:            
             try:
-                data = connSocket.recv(2048)
-                if data:
-                    print("-" * 40)
-                    print("Data received:\n" + data.decode("utf-8"))
-                    self.processRtspRequest(data.decode("utf-8"))
-            except socket.timeout:
-                continue
+                with self.rtspLock:
+                    self.flushOutgoing()
+                    pending = bool(self.outgoing)
+                # Phiên interleaved: luồng gửi có thể để lại dữ liệu rồi dừng (hết video) -> thức dậy định kỳ
+                timeout = None if self.interleaved is None else self.INTERLEAVED_FLUSH
+                readable, _, _ = select.select((connSocket,), (connSocket,) if pending else (), (), timeout)
+                if not readable:
+                    continue
+                try:
+                    data = connSocket.recv(4096)
+                except (BlockingIOError, InterruptedError):
+                    continue
+                if not data:
+                    # Client đóng kết nối TCP (recv trả về b'')
+                    break
+                for message in parser.feed(data):
+                    self.handleRtspMessage(message)
+            except ValueError as e:
+                print(f"Malformed RTSP request: {e}")
+                break
             except Exception as e:
                 # Nếu client đóng kết nối (KeyError 'event' hoặc ConnectionReset) thì dừng vòng lặp
                 if str(e) == "'event'":
                     break
                 print(f"Error receiving data: {e}")
                 break
+        # Client ngắt kết nối / bị đóng do hết hạn -> giải phóng phiên (không chờ TEARDOWN)
+        self.close()
+    
+    def handleRtspMessage(self, message):
+        """ Xử lý 1 request đã được RtspMessageParser tách trọn vẹn. Mọi request đều tính là keepalive. """
+        if isinstance(message, InterleavedFrame):
+            self.onInterleaved(message)
+            return
+        self.sessions.touch(self)
+        data = message.text()
+        self.metrics.requests.labels(message.startLine.split(' ')[0]).inc()
+        print("-" * 40)
+        print("Data received:\n" + data)
+        self.processRtspRequest(data)
     
     def processRtspRequest(self, data):
         """ Phân tích và xử lý lệnh RTSP. """
-        lines = data.split('\n')
+        lines = data.splitlines()
         line1 = lines[0].split(' ')
         requestType = line1[0]
         filename_req = line1[1] 
         
         # Đường dẫn tới thư mục video
-        VIDEO_DIR = "assets/video" 
-        filename = os.path.join(VIDEO_DIR, filename_req)
+        filename = os.path.join(self.VIDEO_DIR, filename_req)
         
         seq = 0
+        session = None
         for line in lines:
             if "CSeq:" in line:
                 try:
@@ -96,168 +222,717 @@ class ServerWorker:
                 except:
                     pass
             if "Session:" in line:
-                pass
+                # Session: <id>[;timeout=...]
+                session = line.split(':', 1)[1].split(';')[0].strip()
+        
+        # Request gắn Session id không phải của kết nối này (đã TEARDOWN / hết hạn / sai id)
+        if session is not None and requestType not in (self.SETUP, self.OPTIONS) \
+                and session != str(self.clientInfo.get('session')):
+            self.replyRtsp(self.SESSION_NOT_FOUND_454, seq)
+            return
 
         # --- SETUP ---
         if requestType == self.SETUP:
             if self.state == self.INIT:
                 print("processing SETUP\n")
+                interleaved = self.parseInterleaved(lines)
+                if interleaved is not None and filename_req in self.broadcasts:
+                    # Kênh live gửi 1 chuỗi datagram chung cho mọi người xem, không lồng được vào từng kết nối
+                    self.replyRtsp(self.UNSUPPORTED_TRANSPORT_461, seq)
+                    return
+                session = self.sessions.allocate(self)
+                if session is None:
+                    # Đã đủ --max-sessions phiên: từ chối thay vì mở thêm file / socket / thread
+                    self.replyRtsp(self.SERVICE_UNAVAILABLE_503, seq)
+                    return
+                self.clientInfo['session'] = session
+                self.channel = self.broadcasts.get(filename_req)
                 try:
-                    self.clientInfo['videoStream'] = VideoStream(filename)
+                    if self.channel is not None:
+                        # Kênh live: không mở file riêng, chỉ đăng ký nhận gói của kênh khi PLAY
+                        self.fps = self.channel.fps
+                    else:
+                        # Con trỏ phát riêng trên file dùng chung (đã có FrameIndex, đọc qua FrameCache)
+                        self.clientInfo['videoStream'] = self.videoLibrary.open(filename)
+                        self.fps = self.clientInfo['videoStream'].fps() or self.DEFAULT_FPS
                     self.state = self.READY
                 except IOError:
                     print(f"File not found: {filename}")
+                    self.sessions.release(self)
+                    del self.clientInfo['session']
                     self.replyRtsp(self.FILE_NOT_FOUND_404, seq)
                     return 
                 
-                self.clientInfo['session'] = randint(100000, 999999)
+                self.openSessionMetrics()
+                self.clientInfo['ssrc'] = randint(1, 0xFFFFFFFF)
                 
-                # Lấy RTP Port từ Client
-                self.clientInfo['rtpPort'] = 0
-                for line in lines:
-                    if "client_port" in line:
-                        try:
-                            parts = line.split(';')
-                            for part in parts:
-                                if "client_port" in part:
-                                    self.clientInfo['rtpPort'] = part.split('=')[1].strip()
-                        except:
-                            print("Error parsing port")
+                # Lấy cổng RTP/RTCP từ Client (Transport: ...;client_port=<rtp>[-<rtcp>])
+                self.clientInfo['rtpPort'], self.clientInfo['rtcpPort'] = self.parseClientPorts(lines)
+                self.rtpAddress = (self.clientInfo['rtspSocket'][1][0], self.clientInfo['rtpPort'])
+                if interleaved is not None:
+                    # RTP/AVP/TCP: gói đi lồng trên kết nối này. TCP không mất gói -> không FEC, không giữ lịch sử NACK
+                    self.interleaved = interleaved
+                    self.rtpSender = InterleavedSender(self.writeInterleaved, interleaved[0],
+                                                       ssrc=self.clientInfo['ssrc'], ready=self.interleavedReady)
+                    if self.ABR:
+                        self.openBitrateController(filename)
+                elif self.channel is None:
+                    # Socket UDP bắn dữ liệu của phiên (giữ tới TEARDOWN, PLAY sau PAUSE dùng lại)
+                    self.clientInfo["rtpSocket"] = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+                    self.clientInfo["rtpSocket"].bind(('', 0))
+                    self.rtpSender = RtpSender(self.clientInfo["rtpSocket"], self.rtpAddress, ssrc=self.clientInfo['ssrc'])
+                    self.rtpSender.fecK = self.FEC_K
+                    if self.rtcp is not None:
+                        self.rtcp.register(self.clientInfo['ssrc'], self)
+                        if self.RTX_WINDOW > 0:
+                            self.rtpSender.history = RetransmitRing(self.RTX_WINDOW, self.RTX_PACKETS)
+                    if self.ABR:
+                        self.openBitrateController(filename)
 
-                self.replyRtsp(self.OK_200, seq)
+                self.replyRtsp(self.OK_200, seq, [self.transportHeader()])
         
         # --- PLAY ---      
         elif requestType == self.PLAY:
+            # Range: npt=<start>- -> nhảy tới frame tương ứng (qua FrameIndex)
+            startTime = self.parseRange(lines)
+            if self.state == self.INIT:
+                # Chưa SETUP thành công (vd: SETUP + PLAY gửi pipeline nhưng SETUP bị 404): vẫn phải trả lời CSeq này
+                self.replyRtsp(self.METHOD_NOT_VALID_455, seq)
+                return
+            if self.channel is not None:
+                # Kênh live không tua được: bỏ qua Range, luôn phát từ "now"
+                startTime = None
+            if startTime is not None and self.state != self.INIT:
+                if not self.seekTo(startTime):
+                    self.replyRtsp(self.INVALID_RANGE_457, seq)
+                    return
+                
             if self.state == self.READY:
                 print("processing PLAY\n")
                 self.state = self.PLAYING
+                self.replyRtsp(self.OK_200, seq, self.rangeHeader())
                 
-                # Tạo socket UDP mới để bắn dữ liệu
-                self.clientInfo["rtpSocket"] = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-                
-                self.replyRtsp(self.OK_200, seq)
+                # Bắt đầu gửi RTP
+                self.startStreaming()
                 
-                # Bắt đầu luồng gửi RTP
-                self.clientInfo['event'] = threading.Event()
-                self.clientInfo['worker']= threading.Thread(target=self.sendRtp) 
-                self.clientInfo['worker'].start()
+            elif self.state == self.PLAYING and startTime is not None:
+                # Seek khi đang phát: luồng gửi tiếp tục từ vị trí mới
+                print("processing PLAY (seek)\n")
+                self.replyRtsp(self.OK_200, seq, self.rangeHeader())
         
         # --- PAUSE ---
         elif requestType == self.PAUSE:
             if self.state == self.PLAYING:
                 print("processing PAUSE\n")
                 self.state = self.READY
-                self.clientInfo['event'].set() # Dừng luồng gửi
+                self.stopStreaming() # Dừng luồng gửi
                 self.replyRtsp(self.OK_200, seq)
         
         # --- TEARDOWN ---
         elif requestType == self.TEARDOWN:
             print("processing TEARDOWN\n")
-            self.state = self.INIT 
-            self.clientInfo['event'].set() # Dừng luồng gửi
+            self.stopStreaming() # Dừng luồng gửi
             self.replyRtsp(self.OK_200, seq)
             
             # Dọn dẹp tài nguyên
-            if 'rtpSocket' in self.clientInfo:
-                self.clientInfo['rtpSocket'].close()
-            if 'videoStream' in self.clientInfo:
-                self.clientInfo['videoStream'].close() 
+            self.releaseSession()
+        
+        # --- OPTIONS ---
+        elif requestType == self.OPTIONS:
+            self.replyRtsp(self.OK_200, seq, [f"Public: {', '.join(self.METHODS)}"])
+        
+        # --- GET_PARAMETER ---
+        elif requestType == self.GET_PARAMETER:
+            # Body rỗng = giữ kết nối (keepalive); "metrics" = toàn bộ metric dạng text Prometheus
+            params = self.parseParameters(data)
+            unknown = [name for name in params if name != 'metrics']
+            if unknown:
+                self.replyRtsp(self.PARAMETER_NOT_UNDERSTOOD_451, seq)
+            elif params:
+                self.replyRtsp(self.OK_200, seq, ["Content-Type: text/parameters"], body=self.metrics.render())
+            else:
+                self.replyRtsp(self.OK_200, seq)
      
-    def replyRtsp(self, code, seq):
-        """ Gửi phản hồi RTSP về Client. """
+    def replyRtsp(self, code, seq, headers=None, body=None):
+        """ Gửi phản hồi RTSP về Client. headers: các dòng header bổ sung (vd: Range), body: nội dung (str). """
+        extra = ''.join(f'{header}\r\n' for header in (headers or []))
+        session = self.clientInfo.get("session")
+        sessionLine = ''
+        if session is not None:
+            timeout = f';timeout={self.sessions.timeout}' if self.sessions.timeout > 0 else ''
+            sessionLine = f'Session: {session}{timeout}\r\n'
         if code == self.OK_200:
-            reply = f'RTSP/1.0 200 OK\r\nCSeq: {seq}\r\nSession: {self.clientInfo["session"]}\r\n\r\n'
-            connSocket = self.clientInfo['rtspSocket'][0]
-            connSocket.send(reply.encode())
+            payload = body.encode() if body else b''
+            if payload:
+                extra += f'Content-Length: {len(payload)}\r\n'
+            reply = f'RTSP/1.0 200 OK\r\nCSeq: {seq}\r\n{sessionLine}{extra}\r\n'
+            self.sendRtspReply(reply.encode() + payload)
         
+        elif code == self.INVALID_RANGE_457:
+            print("457 INVALID RANGE")
+            reply = f'RTSP/1.0 457 Invalid Range\r\nCSeq: {seq}\r\n{sessionLine}\r\n'
+            self.sendRtspReply(reply.encode())
+        elif code == self.PARAMETER_NOT_UNDERSTOOD_451:
+            print("451 PARAMETER NOT UNDERSTOOD")
+            reply = f'RTSP/1.0 451 Parameter Not Understood\r\nCSeq: {seq}\r\n{sessionLine}\r\n'
+            self.sendRtspReply(reply.encode())
+        elif code == self.SESSION_NOT_FOUND_454:
+            print("454 SESSION NOT FOUND")
+            reply = f'RTSP/1.0 454 Session Not Found\r\nCSeq: {seq}\r\n\r\n'
+            self.sendRtspReply(reply.encode())
+        elif code == self.UNSUPPORTED_TRANSPORT_461:
+            print("461 UNSUPPORTED TRANSPORT")
+            reply = f'RTSP/1.0 461 Unsupported Transport\r\nCSeq: {seq}\r\n\r\n'
+            self.sendRtspReply(reply.encode())
+        elif code == self.SERVICE_UNAVAILABLE_503:
+            print("503 SERVICE UNAVAILABLE")
+            reply = f'RTSP/1.0 503 Service Unavailable\r\nCSeq: {seq}\r\n\r\n'
+            self.sendRtspReply(reply.encode())
         elif code == self.FILE_NOT_FOUND_404:
             print("404 NOT FOUND")
+            reply = f'RTSP/1.0 404 Not Found\r\nCSeq: {seq}\r\n\r\n'
+            self.sendRtspReply(reply.encode())
+        elif code == self.METHOD_NOT_VALID_455:
+            print("455 METHOD NOT VALID IN THIS STATE")
+            reply = f'RTSP/1.0 455 Method Not Valid in This State\r\nCSeq: {seq}\r\n{sessionLine}\r\n'
+            self.sendRtspReply(reply.encode())
         elif code == self.CON_ERR_500:
             print("500 CONNECTION ERROR")
             print("500 CONNECTION ERROR")
      
+    @staticmethod
+    def parseClientPorts(lines):
+        """ (rtpPort, rtcpPort) từ 'Transport: ...;client_port=a[-b]'. Không có b -> RTCP = a + 1. """
+        for line in lines:
+            if "client_port" not in line:
+                continue
+            for part in line.split(';'):
+                if "client_port" in part:
+                    try:
+                        ports = part.split('=')[1].strip().split('-')
+                        rtpPort = int(ports[0])
+                        return rtpPort, int(ports[1]) if len(ports) > 1 else rtpPort + 1
+                    except (IndexError, ValueError):
+                        print("Error parsing port")
+        return 0, 0
+    
+    @staticmethod
+    def parseInterleaved(lines):
+        """
+        (kênh RTP, kênh RTCP) nếu Client xin 'Transport: RTP/AVP/TCP;...;interleaved=a[-b]', None nếu dùng UDP.
+        Không ghi kênh -> 0-1 (RFC 2326 §12.39).
+        """
+        for line in lines:
+            if not line.lower().startswith("transport:") or "/tcp" not in line.lower():
+                continue
+            for part in line.split(':', 1)[1].split(';'):
+                name, _, value = part.strip().partition('=')
+                if name == "interleaved":
+                    try:
+                        channels = [int(c) for c in value.split('-')]
+                        return channels[0], channels[1] if len(channels) > 1 else channels[0] + 1
+                    except ValueError:
+                        print("Error parsing interleaved channels")
+            return 0, 1
+        return None
+    
+    def transportHeader(self):
+        """ Header Transport của phản hồi SETUP: cổng 2 phía + SSRC (Client gửi RTCP RR về server_port). """
+        if self.interleaved is not None:
+            rtp, rtcp = self.interleaved
+            return f"Transport: RTP/AVP/TCP;unicast;interleaved={rtp}-{rtcp};ssrc={self.clientInfo['ssrc']:08X}"
+        transport = f"Transport: RTP/AVP;unicast;client_port={self.clientInfo['rtpPort']}-{self.clientInfo['rtcpPort']}"
+        if self.channel is not None:
+            return transport + f";ssrc={self.channel.ssrc:08X}"
+        rtpPort = self.clientInfo['rtpSocket'].getsockname()[1]
+        if self.rtcp is not None:
+            transport += f";server_port={rtpPort}-{self.rtcp.port}"
+        return transport + f";ssrc={self.clientInfo['ssrc']:08X}"
+    
+    @staticmethod
+    def parseParameters(data):
+        """ Tên tham số trong body của GET_PARAMETER (mỗi dòng 1 tên, sau dòng trống). """
+        _, _, body = data.partition('\r\n\r\n')
+        return [line.strip().rstrip(':') for line in body.splitlines() if line.strip()]
+    
+    # =========================================================================
+    # VÒNG ĐỜI PHIÊN (TEARDOWN / NGẮT KẾT NỐI / HẾT HẠN)
+    # =========================================================================
+    
+    def releaseSession(self):
+        """ Giải phóng tài nguyên của phiên: luồng gửi, socket RTP, file video, Session id. Gọi nhiều lần không sao. """
+        self.stopStreaming()
+        self.state = self.INIT
+        if self.rtcp is not None and 'ssrc' in self.clientInfo:
+            self.rtcp.unregister(self.clientInfo['ssrc'], self)
+        # Bước gửi đã bắt đầu trước khi bị hủy (sender thread / sendRtp) vẫn dùng socket, sender, file:
+        # chờ nó xong rồi mới đóng (như startStreaming khi thay pacer / shaper)
+        with self.stepLock:
+            self.abr = None
+            self.pendingRendition = None
+            self.interleaved = None
+            rtpSocket = self.clientInfo.pop('rtpSocket', None)
+            if rtpSocket is not None:
+                rtpSocket.close()
+            self.rtpSender = None
+            videoStream = self.clientInfo.pop('videoStream', None)
+            if videoStream is not None:
+                videoStream.close()
+            self.channel = None
+        self.closeSessionMetrics()
+        self.sessions.release(self)
+        self.clientInfo.pop('session', None)
+    
+    def close(self):
+        """ Kết nối RTSP đã đóng -> giải phóng phiên và bỏ khỏi SessionTable. """
+        self.releaseSession()
+        self.sessions.remove(self)
+        try:
+            self.clientInfo['rtspSocket'][0].close()
+        except OSError:
+            pass
+    
+    def expire(self):
+        """ SessionTable: Client im lặng quá timeout -> đóng kết nối, luồng nhận lệnh sẽ gọi close(). """
+        session = self.clientInfo.get('session')
+        print(f"[Sessions] Session {session} idle for {self.sessions.timeout}s, closing")
+        try:
+            self.clientInfo['rtspSocket'][0].shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+    
+    # =========================================================================
+    # RTCP: RECEIVER REPORT (ABR) & NACK (GỬI LẠI GÓI MẤT)
+    # =========================================================================
+    
+    def onReceiverReport(self, block):
+        """ RtcpListener: Client báo tình trạng nhận (RTCP RR cũng tính là keepalive). """
+        self.sessions.touch(self)
+        stats = self.sessionStats
+        if stats is not None:
+            stats.lossFraction = block.fractionLost
+            stats.jitter = block.jitter / self.RTP_CLOCK_RATE
+        if self.abr is not None:
+            index = self.abr.onReport(block.fractionLost)
+            if index is not None:
+                # Luồng gửi đổi file ở ranh giới frame kế tiếp (readFrame)
+                self.pendingRendition = index
+    
+    def onInterleaved(self, frame):
+        """ Khung '$' từ Client: RTCP (RR / NACK) trên kênh RTCP của phiên, kênh khác bỏ qua. """
+        if self.interleaved is not None and frame.channel == self.interleaved[1] and self.rtcp is not None:
+            self.rtcp.onInterleaved(frame.data, self)
+    
+    def onNack(self, seqs):
+        """ RtcpListener: Client báo mất các gói seqs -> gửi lại những gói còn kịp hạn trong RetransmitRing. """
+        sender = self.rtpSender
+        if sender is None or sender.history is None:
+            return
+        sent, skipped = sender.retransmit(seqs)
+        if sent:
+            self.metrics.retransmits.inc(sent)
+        for reason, count in skipped.items():
+            self.metrics.retransmitsSkipped.labels(reason).inc(count)
+    
+    def openBitrateController(self, filename):
+        """ Bật ABR cho phiên nếu file có nhiều hơn 1 bản chất lượng. Bắt đầu từ bản được yêu cầu. """
+        ladder = self.videoLibrary.renditions(filename, self.fps)
+        if len(ladder) < 2:
+            return
+        paths = [path for path, _ in ladder]
+        requested = os.path.realpath(filename)
+        self.abr = BitrateController(ladder, paths.index(requested) if requested in paths else None)
+        if self.sessionStats is not None:
+            self.sessionStats.bitrate = self.abr.current()[1]
+    
+    def switchRendition(self):
+        """ Đổi sang bản chất lượng pendingRendition, giữ nguyên vị trí frame. """
+        index, self.pendingRendition = self.pendingRendition, None
+        path, bitrate = self.abr.ladder[index]
+        oldStream = self.clientInfo['videoStream']
+        try:
+            newStream = self.videoLibrary.open(path)
+        except IOError:
+            print(f"[ABR] Could not open rendition {path}")
+            return
+        newStream.seek(oldStream.frameNbr())
+        self.clientInfo['videoStream'] = newStream
+        oldStream.close()
+        if self.sessionStats is not None:
+            direction = 'up' if bitrate > self.sessionStats.bitrate else 'down'
+            self.sessionStats.bitrate = bitrate
+            self.metrics.abrSwitches.labels(direction).inc()
+        print(f"[ABR] Session {self.clientInfo.get('session')}: switched to {os.path.basename(path)} ({bitrate / 1e6:.1f} Mbit/s)")
+    
+    # =========================================================================
+    # METRICS
+    # =========================================================================
+    
+    def openSessionMetrics(self):
+        """ SETUP thành công: phiên được tính vào rtsp_sessions_active, có counter riêng. """
+        self.sessionStats = self.metrics.openSession(self.clientInfo['session'])
+    
+    def closeSessionMetrics(self):
+        """ Phiên kết thúc (TEARDOWN / mất kết nối). Gọi nhiều lần không sao. """
+        if self.sessionStats is not None:
+            self.sessionStats.streaming = False
+            self.sessionStats = None
+            self.metrics.closeSession(self.clientInfo['session'])
+    
+    def setStreaming(self, streaming):
+        if self.sessionStats is not None:
+            self.sessionStats.streaming = streaming
+    
+    def recordFrame(self, packets, size, fecPackets=0, fecBytes=0):
+        """
+        Gửi xong 1 frame (frame bị bỏ giữa chừng thì không gọi): cộng counter của phiên theo số gói dữ liệu /
+        gói FEC rtpSender đã thật sự gửi + ghi 3 histogram (readFrame đo trễ nhịp / thời gian đọc).
+        """
+        stats = self.sessionStats
+        if stats is not None:
+            stats.frames += 1
+            stats.packets += packets
+            stats.bytes += size
+            stats.fecPackets += fecPackets
+            stats.fecBytes += fecBytes
+        self.metrics.recordFrame(self.frameLateness, self.frameReadTime, self.frameSendTime)
+    
+    def sentParity(self):
+        """ (số gói, số byte) FEC mà writeParity ghi cho frame vừa gửi trọn (đường pre-packetize). """
+        sender = self.rtpSender
+        if not sender.fecK:
+            return 0, 0
+        return len(sender.parity), sender.parityBytes
+    
+    # =========================================================================
+    # RANGE (SEEK THEO THỜI GIAN NPT)
+    # =========================================================================
+    
+    @staticmethod
+    def parseNpt(value):
+        """ Đổi thời gian npt ('12.5' hoặc 'hh:mm:ss.ff') sang giây. """
+        seconds = 0.0
+        for part in value.split(':'):
+            seconds = seconds * 60 + float(part)
+        return seconds
+    
+    def parseRange(self, lines):
+        """ Đọc header 'Range: npt=<start>-[<end>]'. Trả về start (giây) hoặc None. """
+        for line in lines:
+            if line.lower().startswith("range:"):
+                value = line.split(':', 1)[1].strip()
+                if not value.startswith("npt="):
+                    return None
+                start = value[4:].split('-')[0].strip()
+                if not start or start == "now":
+                    return None
+                try:
+                    return self.parseNpt(start)
+                except ValueError:
+                    print(f"Error parsing Range: {value}")
+                    return None
+        return None
+    
+    def seekTo(self, startTime):
+        """ Nhảy tới frame ứng với startTime (giây). False nếu vượt quá độ dài video. """
+        videoStream = self.clientInfo['videoStream']
+        frameIndex = int(startTime * self.fps)
+        if startTime < 0 or frameIndex >= videoStream.frameCount():
+            return False
+        videoStream.seek(frameIndex)
+        return True
+    
+    def rangeHeader(self):
+        """ Header Range cho phản hồi PLAY: vị trí hiện tại -> hết video. """
+        if self.channel is not None:
+            return ["Range: npt=now-"]
+        videoStream = self.clientInfo['videoStream']
+        start = videoStream.frameNbr() / self.fps
+        end = videoStream.frameCount() / self.fps
+        return [f"Range: npt={start:.3f}-{end:.3f}"]
+     
+    def sendRtspReply(self, reply):
+        """ Ghi phản hồi (bytes) lên kết nối RTSP. Chế độ asyncio ghi đè hàm này. """
+        self.writeInterleaved(reply)
+    
+    def writeInterleaved(self, data):
+        """
+        Xếp data vào hàng đợi gửi rồi ghi non-blocking phần TCP nhận được ngay (không bao giờ chặn luồng gửi).
+        Lock: phản hồi không chen vào giữa 1 khung '$' của luồng gửi. Phần còn lại do luồng nhận lệnh ghi tiếp.
+        """
+        with self.rtspLock:
+            self.outgoing.append(data)
+            self.outgoingBytes += len(data)
+            self.flushOutgoing()
+    
+    def flushOutgoing(self):
+        """ Ghi hàng đợi gửi lên socket tới khi hết hoặc bộ đệm TCP đầy (gọi khi đang giữ rtspLock). """
+        connSocket = self.clientInfo['rtspSocket'][0]
+        outgoing = self.outgoing
+        while outgoing:
+            data = outgoing[0]
+            try:
+                sent = connSocket.send(data)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                # Kết nối hỏng: bỏ hàng đợi, lỗi đi tiếp lên luồng gọi như sendall() trước đây
+                outgoing.clear()
+                self.outgoingBytes = 0
+                raise
+            self.outgoingBytes -= sent
+            if sent < len(data):
+                outgoing[0] = memoryview(data)[sent:]
+            else:
+                outgoing.popleft()
+    
+    def interleavedReady(self):
+        """ Hàng đợi gửi còn dưới INTERLEAVED_BUFFER byte (Client vẫn đọc kịp) -> gửi frame kế tiếp, không thì bỏ frame. """
+        with self.rtspLock:
+            self.flushOutgoing()
+            return self.outgoingBytes < self.INTERLEAVED_BUFFER
+     
     # =========================================================================
     # RTP STREAMING (GỬI DỮ LIỆU)
     # =========================================================================
+    
+    def startStreaming(self):
+        """ Bắt đầu gửi RTP: đăng ký vào PacingScheduler chung, hoặc 1 thread riêng nếu không có. """
+        self.setStreaming(True)
+        if self.channel is not None:
+            # Kênh live: nhận gói chung của kênh từ ranh giới frame kế tiếp
+            self.channel.subscribe(self.rtpAddress)
+            return
+        
+        # Bước cuối của lần PLAY trước (đã hủy) có thể vẫn đang chạy: chờ nó xong rồi mới thay pacer / shaper
+        with self.stepLock:
+            self.pacer = FramePacer(self.fps)
+            self.shaper = self.makeShaper(self.pacer.clock)
+        if self.scheduler is not None:
+            self.streamTask = self.scheduler.schedule(self.pacer.deadline(), self.streamStep, self.stepLock)
+            return
+        
+        self.clientInfo['event'] = threading.Event()
+        self.clientInfo['worker']= threading.Thread(target=self.sendRtp) 
+        self.clientInfo['worker'].start()
+        
+    def stopStreaming(self):
+        """ Dừng gửi RTP (nếu đang chạy). """
+        self.setStreaming(False)
+        if self.channel is not None and self.rtpAddress is not None:
+            self.channel.unsubscribe(self.rtpAddress)
+        if self.streamTask is not None:
+            self.streamTask.cancel()
+            self.streamTask = None
+        if 'event' in self.clientInfo:
+            self.clientInfo['event'].set()
+    
+    def streamStep(self):
+        """
+        Gửi 1 frame khi tới hạn, trả về thời điểm phải gọi lại (None = hết video).
+        Dùng chung cho PacingScheduler (thread), timer call_at (asyncio) và thread sendRtp.
+        """
+        if self.shaper is not None:
+            deadline = self.shapedStep()
+        elif self.sendFrame():
+            deadline = self.nextDeadline()
+        else:
+            deadline = None
+        if deadline is None:
+            self.setStreaming(False)
+        return deadline
+    
+    def nextDeadline(self):
+        """ Xong 1 frame: tăng bộ đếm FramePacer, trả về hạn chót của frame kế tiếp. """
+        self.pacer.advance()
+        if self.pacer.delay() < -FramePacer.MAX_LAG:
+            self.pacer.rebase()
+        return self.pacer.deadline()
      
     def sendRtp(self):
         """
-        VÒNG LẶP GỬI DỮ LIỆU (Streaming Loop).
-        Hỗ trợ Phân mảnh (Fragmentation) cho Video HD.
+        VÒNG LẶP GỬI DỮ LIỆU (Streaming Loop) khi không có PacingScheduler.
+        Frame N được gửi đúng hạn start + N / fps (FramePacer), thời gian đọc/gửi không cộng dồn.
+        """
+        event = self.clientInfo['event']
+        deadline = self.pacer.deadline()
+        while deadline is not None:
+            # Chờ tới thời điểm gửi kế tiếp (PAUSE/TEARDOWN -> event được set)
+            delay = deadline - self.pacer.clock()
+            if event.wait(delay) if delay > 0 else event.is_set():
+                return
+            with self.stepLock:
+                if event.is_set():
+                    return
+                deadline = self.streamStep()
+        event.set()
+    
+    # =========================================================================
+    # ĐỊNH HÌNH LƯU LƯỢNG (TOKEN BUCKET)
+    # =========================================================================
+    
+    def makeShaper(self, clock):
+        """ TokenBucket cho phiên này, None nếu tắt định hình (SHAPE_BURST = 0). """
+        self.inFlight = None
+        if self.SHAPE_BURST <= 0:
+            return None
+        burst = self.SHAPE_BURST * (self.rtpSender.headerSize + self.MAX_RTP_PAYLOAD)
+        return TokenBucket(self.SHAPE_RATE or burst * self.fps, burst, clock)
+    
+    def shapedStep(self):
+        """
+        Gửi phần gói của frame hiện tại mà TokenBucket cho phép.
+        Trả về thời điểm đủ token cho gói kế tiếp, hoặc hạn chót frame sau nếu đã gửi hết frame.
         """
-        currentSeqNum = 0 
+        if self.inFlight is None:
+            frame = self.readFrame()
+            if frame is None:
+                print("End of video stream.")
+                return None
+            fragments = frame.fragments()
+            timestamp = self.frameTimestamp()
+            self.rtpSender.writeHeaders(len(fragments), timestamp, len(frame))
+            self.rtpSender.writeParity(frame, timestamp)
+            self.rtpSender.remember(fragments)
+            if not self.SHAPE_RATE:
+                # Rải đều cả frame (kể cả gói FEC) trong SHAPE_SPREAD chu kỳ frame
+                wireBytes = len(frame) + self.rtpSender.headerSize * len(fragments) + self.fecWireBytes()
+                self.shaper.rate = wireBytes * self.fps / self.SHAPE_SPREAD
+            self.inFlight = [fragments, 0, len(frame)]
+            self.logProgress(frame)
+        
+        fragments, start, size = self.inFlight
+        shaper, end, headerSize = self.shaper, start, self.rtpSender.headerSize
+        shaper.refill()
+        while end < len(fragments) and shaper.consume(headerSize + len(fragments[end])):
+            end += 1
+        sendStart = time.perf_counter()
+        sent = True
+        try:
+            self.rtpSender.transmit(fragments, self.rtpSender.address, start, end)
+        except BlockingIOError:
+            # Socket non-blocking (chế độ asyncio) bị đầy -> bỏ phần còn lại của frame
+            end, sent = len(fragments), False
+        except Exception as e:
+            print(f"Connection Error: {e}")
+            self.metrics.sendErrors.inc()
+            end, sent = len(fragments), False
+        self.frameSendTime += time.perf_counter() - sendStart
         
-        while True:
-            # [CẤU HÌNH TỐI ƯU] Tốc độ 30 FPS (0.033s)
-            # Giúp Server gửi ổn định, không làm ngộp Client
-            self.clientInfo['event'].wait(0.033)  # ~30 FPS
+        if end < len(fragments):
+            self.inFlight[1] = end
+            return shaper.clock() + shaper.delay(headerSize + len(fragments[end]))
+        self.inFlight = None
+        if sent:
+            self.recordFrame(len(fragments), size, *self.sentParity())
+        return self.nextDeadline()
+    
+    def fecWireBytes(self):
+        """ Số byte (kể cả header RTP) của các gói FEC của frame hiện tại. """
+        sender = self.rtpSender
+        return sender.parityBytes + HEADER_SIZE * len(sender.parity) if sender.fecK else 0
+    
+    def sendFrame(self):
+        """
+        Đọc 1 frame và gửi đi (có Phân mảnh - Fragmentation cho Video HD).
+        Trả về False khi hết video.
+        """
+        frame = self.readFrame()
+        if frame is None:
+            print("End of video stream.")
+            return False
             
-            if self.clientInfo['event'].is_set(): 
-                break 
-                
-            data = self.clientInfo['videoStream'].nextFrame()
+        sendStart = time.perf_counter()
+        packets = None      # Số gói dữ liệu đã gửi, None = frame bị bỏ (không tính vào counter)
+        parity = (0, 0)
+        try:
+            currentTimestamp = self.frameTimestamp()
             
-            if data: 
-                frameNumber = self.clientInfo['videoStream'].frameNbr()
-                try:
-                    address = self.clientInfo['rtspSocket'][1][0]
-                    port = int(self.clientInfo['rtpPort'])
-                    
-                    # --- Logic Phân mảnh (Fragmentation) ---
-                    MAX_RTP_PAYLOAD = 1400 
-                    datalen = len(data)
-                    currentTimestamp = int(time.time()) 
-                    
-                    currPos = 0 
-                    while currPos < datalen:
-                        # Tính toán kích thước mảnh
-                        chunkSize = min(MAX_RTP_PAYLOAD, datalen - currPos)
-                        chunk = data[currPos : currPos + chunkSize]
-                        currPos += chunkSize
-                        
-                        # Marker Bit: 1 nếu là mảnh cuối, 0 nếu còn nữa
-                        marker = 1 if currPos >= datalen else 0
-                        
-                        # Gửi gói
-                        self.clientInfo['rtpSocket'].sendto(
-                            self.makeRtp(chunk, currentSeqNum, marker, currentTimestamp),
-                            (address, port)
-                        )
-                        currentSeqNum += 1
-                        
-                    # In log mỗi 100 frame
-                    if frameNumber % 100 == 0:
-                        print(f"Sent frame {frameNumber}, Total size: {datalen} bytes")
-
-                except Exception as e:
-                    print(f"Connection Error: {e}")
+            if self.PREPACKETIZE:
+                # Mảnh đã cắt sẵn trong FrameCache, chỉ ghi Seq/Timestamp/SSRC vào header template
+                packets = self.rtpSender.sendFrame(frame, currentTimestamp)
+                parity = self.sentParity()
             else:
-                print("End of video stream.")
-                self.clientInfo['event'].set()
-                break
+                packets = self.sendFragments(frame.data, currentTimestamp)
+                
+            self.logProgress(frame)
+
+        except BlockingIOError:
+            # Socket non-blocking (chế độ asyncio) bị đầy -> bỏ phần còn lại của frame
+            packets = None
+        except Exception as e:
+            print(f"Connection Error: {e}")
+            self.metrics.sendErrors.inc()
+            packets = None
+        self.frameSendTime = time.perf_counter() - sendStart
+        if packets is not None:
+            self.recordFrame(packets, len(frame), *parity)
+        return True
+    
+    def frameTimestamp(self):
+        """ RTP Timestamp của frame vừa đọc: theo vị trí trong video (seek / đổi bản chất lượng vẫn liền mạch). """
+        return self.rtpSender.mediaTimestamp(self.clientInfo['videoStream'].lastFrameNbr(), self.fps)
+    
+    def readFrame(self):
+        """ Lấy frame kế tiếp (đã cắt mảnh) + ghi metric độ trễ so với hạn chót và thời gian đọc. """
+        if self.pendingRendition is not None:
+            self.switchRendition()
+        if self.pacer is not None:
+            self.frameLateness = max(0.0, self.pacer.clock() - self.pacer.deadline())
+        readStart = time.perf_counter()
+        frame = self.clientInfo['videoStream'].nextPacketizedFrame()
+        self.frameReadTime = time.perf_counter() - readStart
+        self.frameSendTime = 0.0
+        return frame
+    
+    def logProgress(self, frame):
+        """ In log mỗi 100 frame. """
+        frameNumber = self.clientInfo['videoStream'].frameNbr()
+        if frameNumber % 100 == 0:
+            cache = self.videoLibrary.cache.stats()
+            print(f"Sent frame {frameNumber}, Total size: {len(frame)} bytes | "
+                  f"Cache hit {cache['hitRatio']:.0%} ({cache['bytes'] // 1024} KB, {cache['evictions']} evictions)")
     
-    def makeRtp(self, payload, seqNum, marker, timestamp):
-        """ Đóng gói dữ liệu vào RTP Packet. """
+    def sendFragments(self, data, currentTimestamp):
+        """ Đường gửi cũ (không pre-packetize): cắt mảnh + tạo RtpPacket cho từng gói. Trả về số gói đã gửi. """
+        sender = self.rtpSender
+        
+        # --- Logic Phân mảnh (Fragmentation) ---
+        MAX_RTP_PAYLOAD = self.MAX_RTP_PAYLOAD
+        datalen = len(data)
+        count = -(-datalen // MAX_RTP_PAYLOAD)
+        frameNum = sender.frameNum
+        sender.frameNum = (frameNum + 1) & 0xFFFFFFFF
+        
+        currPos = 0 
+        while currPos < datalen:
+            # Tính toán kích thước mảnh
+            chunkSize = min(MAX_RTP_PAYLOAD, datalen - currPos)
+            chunk = data[currPos : currPos + chunkSize]
+            currPos += chunkSize
+            
+            # Marker Bit: 1 nếu là mảnh cuối, 0 nếu còn nữa
+            marker = 1 if currPos >= datalen else 0
+            
+            # Header extension: vị trí mảnh trong frame (như đường pre-packetize)
+            frameInfo = None
+            if sender.frameInfo:
+                frameInfo = (frameNum, (currPos - 1) // MAX_RTP_PAYLOAD, count, datalen)
+            
+            # Gửi gói
+            sender.sendPacket(self.makeRtp(chunk, sender.nextSeq(), marker, currentTimestamp, sender.template.ssrc, frameInfo))
+        return count
+    
+    def makeRtp(self, payload, seqNum, marker, timestamp, ssrc=0, frameInfo=None):
+        """ Đóng gói dữ liệu vào RTP Packet (frameInfo: (số frame, chỉ số mảnh, số mảnh, kích thước frame)). """
         version = 2
         padding = 0
         extension = 0
         cc = 0
         pt = 26 # MJPEG type
-        ssrc = 0 
+        extensions = [(FRAME_INFO_ID, FRAME_INFO.pack(*frameInfo))] if frameInfo else None
         
         rtpPacket = RtpPacket()
-        rtpPacket.encode(version, padding, extension, cc, seqNum, marker, pt, ssrc, payload, timestamp)
+        rtpPacket.encode(version, padding, extension, cc, seqNum, marker, pt, ssrc, payload, timestamp, extensions)
         
         return rtpPacket.getPacket()
-                        
-    
-    
-    
-            
-    
-            
-    
-
-    
-        
-    
\ No newline at end of file
@@ -0,0 +1,138 @@
+import threading
+import time
+from random import randint
+
+class SessionTable:
+    """
+    Bảng phiên trung tâm của Server (1 bản / tiến trình, ServerWorker.sessions).
+    - Mọi kết nối RTSP (ServerWorker) được ghi danh từ lúc accept, kể cả khi chưa SETUP.
+    - SETUP cấp Session id duy nhất (tra ngược id -> worker qua get()), giới hạn maxSessions phiên.
+    - Mỗi request RTSP (kể cả keepalive GET_PARAMETER / OPTIONS) làm mới thời điểm hoạt động;
+      kết nối im lặng quá timeout giây bị reap(): worker.expire() đóng kết nối, worker tự dọn
+      socket RTP / file / thread như khi Client ngắt kết nối.
+    """
+
+    # Mặc định theo RFC 2326 (Session: <id>;timeout=60)
+    DEFAULT_TIMEOUT = 60
+    # Chu kỳ quét tìm phiên hết hạn (giây), không quá nửa timeout
+    REAP_INTERVAL = 5.0
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, maxSessions=0, clock=time.monotonic):
+        self.timeout = timeout
+        self.maxSessions = maxSessions      # 0 = không giới hạn
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.workers = set()                # mọi kết nối RTSP đang mở
+        self.sessions = {}                  # Session id -> worker (đã SETUP)
+        self.expired = 0
+        self.rejected = 0
+        self.thread = None
+        self.timer = None
+        self.running = False
+
+    def __len__(self):
+        return len(self.sessions)
+
+    # =========================================================================
+    # KẾT NỐI & PHIÊN
+    # =========================================================================
+
+    def add(self, worker):
+        """ Kết nối mới: bắt đầu tính thời gian rảnh. """
+        worker.lastActive = self.clock()
+        with self.lock:
+            self.workers.add(worker)
+
+    def remove(self, worker):
+        """ Kết nối đã đóng: bỏ khỏi bảng (cùng Session id nếu còn). """
+        with self.lock:
+            self.workers.discard(worker)
+            self._release(worker)
+
+    def allocate(self, worker):
+        """ SETUP: cấp Session id mới cho worker. None nếu bảng đã đủ maxSessions phiên. """
+        with self.lock:
+            if self.maxSessions and len(self.sessions) >= self.maxSessions:
+                self.rejected += 1
+                return None
+            session = randint(100000, 999999)
+            while session in self.sessions:
+                session = randint(100000, 999999)
+            self.sessions[session] = worker
+            return session
+
+    def release(self, worker):
+        """ TEARDOWN: trả lại Session id (kết nối vẫn có thể SETUP lại). """
+        with self.lock:
+            self._release(worker)
+
+    def _release(self, worker):
+        session = worker.clientInfo.get('session')
+        if self.sessions.get(session) is worker:
+            del self.sessions[session]
+
+    def get(self, session):
+        """ Worker đang giữ Session id, None nếu không có (hết hạn / đã TEARDOWN). """
+        with self.lock:
+            return self.sessions.get(session)
+
+    def touch(self, worker):
+        """ Có request RTSP từ worker -> làm mới thời điểm hoạt động (chỉ 1 phép gán, không lock). """
+        worker.lastActive = self.clock()
+
+    # =========================================================================
+    # THU HỒI PHIÊN RẢNH (IDLE TIMEOUT)
+    # =========================================================================
+
+    def reap(self):
+        """ Đóng mọi kết nối rảnh quá timeout. Trả về số kết nối bị đóng. """
+        if self.timeout <= 0:
+            return 0
+        limit = self.clock() - self.timeout
+        with self.lock:
+            idle = [worker for worker in self.workers if worker.lastActive < limit]
+            for worker in idle:
+                self.workers.discard(worker)
+                self._release(worker)
+            self.expired += len(idle)
+        for worker in idle:
+            try:
+                worker.expire()
+            except Exception as e:
+                print(f"[Sessions] Expire error: {e}")
+        return len(idle)
+
+    def start(self, loop=None):
+        """ Quét định kỳ: timer call_later của event loop (mode async) hoặc 1 thread nền (mode thread). """
+        self.running = True
+        if loop is not None:
+            def onReapDue():
+                self.reap()
+                self.timer = loop.call_later(self.interval(), onReapDue)
+            self.timer = loop.call_later(self.interval(), onReapDue)
+        else:
+            self.thread = threading.Thread(target=self.run, name="session-reaper", daemon=True)
+            self.thread.start()
+        return self
+
+    def interval(self):
+        return min(self.REAP_INTERVAL, self.timeout / 2) if self.timeout > 0 else self.REAP_INTERVAL
+
+    def run(self):
+        while self.running:
+            time.sleep(self.interval())
+            self.reap()
+
+    def stop(self):
+        self.running = False
+        if self.timer is not None:
+            self.timer.cancel()
+
+    def stats(self):
+        with self.lock:
+            return {
+                'connections': len(self.workers),
+                'sessions': len(self.sessions),
+                'expired': self.expired,
+                'rejected': self.rejected,
+            }
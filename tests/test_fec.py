@@ -0,0 +1,68 @@
+import unittest
+
+from src.common.fec_packet import FecPacket, xorParity
+from src.client.reassembler import FrameReassembler
+
+def jpeg(number, size):
+    body = bytes((number * 7 + i) & 0xFF for i in range(size - 4))
+    return b'\xff\xd8' + body + b'\xff\xd9'
+
+def fecPayload(base, payloads, lastOfFrame):
+    """ Payload gói FEC như RtpSender gửi: Seq gói đầu nhóm + thân FecPacket.body. """
+    return (base & 0xFFFF).to_bytes(2, 'big') + FecPacket.body(payloads, lastOfFrame)
+
+class FecPacketTest(unittest.TestCase):
+
+    def test_recover_each_member(self):
+        payloads = [b'\x01\x02\x03', b'\xff' * 7, b'', b'abcde']
+        fec = FecPacket.decode(fecPayload(100, payloads, True), timestamp=1234)
+        self.assertEqual((fec.base, fec.count, fec.marker, fec.timestamp), (100, 4, 1, 1234))
+        markers = [0, 0, 0, 1]
+        for lost in range(len(payloads)):
+            received = [(markers[i], payloads[i]) for i in range(len(payloads)) if i != lost]
+            self.assertEqual(fec.recover(received), (markers[lost], payloads[lost]))
+
+    def test_parity_length(self):
+        parity, length = xorParity([b'ab', b'abcd'])
+        self.assertEqual(len(parity), 4)
+        self.assertEqual(length, 2 ^ 4)
+
+class FecRecoveryTest(unittest.TestCase):
+    """ Gói dựng lại từ FEC giữ RTP Timestamp (và FRAME_INFO) của frame. """
+
+    FRAGMENT = 100
+
+    def frame(self, number, firstSeq):
+        data = jpeg(number, 450)
+        pieces = [data[i:i + self.FRAGMENT] for i in range(0, len(data), self.FRAGMENT)]
+        seqs = [(firstSeq + i) & 0xFFFF for i in range(len(pieces))]
+        return data, pieces, seqs
+
+    def deliver(self, withInfo):
+        reassembler = FrameReassembler()
+        # Frame 0 trọn vẹn, frame 1 mất mảnh đầu (chỉ vá được bằng FEC)
+        out = []
+        seq = 65533
+        for number in range(3):
+            data, pieces, seqs = self.frame(number, seq)
+            timestamp = 90000 + number * 3000
+            for i, (piece, s) in enumerate(zip(pieces, seqs)):
+                info = (number, i, len(pieces), len(data)) if withInfo else None
+                if number == 1 and i == 0:
+                    continue
+                reassembler.push(s, int(i == len(pieces) - 1), piece, number * 0.033, timestamp, info)
+            reassembler.pushParity(fecPayload(seqs[0], pieces, True), number * 0.033 + 0.001, timestamp)
+            out += list(reassembler.frames())
+            seq += len(pieces)
+        return out, reassembler
+
+    def test_lost_first_fragment_keeps_timestamp(self):
+        for withInfo in (False, True):
+            with self.subTest(frameInfo=withInfo):
+                out, reassembler = self.deliver(withInfo)
+                self.assertEqual(reassembler.stats()['fecRecovered'], 1)
+                self.assertEqual([stamp for _, _, stamp in out], [90000, 93000, 96000])
+                self.assertEqual([bytes(data) for data, _, _ in out], [self.frame(n, 0)[0] for n in range(3)])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,199 @@
+import os
+import shutil
+import tempfile
+import unittest
+from array import array
+
+from benchmarks.media import writeMjpeg, makeFrame
+from src.common.frame_index import FrameIndex
+from src.common.video_stream import VideoStream
+from src.server.frame_cache import FrameCache, VideoLibrary
+from src.server.server_worker import ServerWorker
+
+FRAME_COUNT = 20
+FRAME_SIZE = 2000
+
+def proprietaryFrames(path):
+    """ Tách file Proprietary (header 6 số + JPEG) thành danh sách frame - đáp án để so với FrameIndex. """
+    with open(path, 'rb') as f:
+        data = f.read()
+    frames, pos = [], 0
+    while pos < len(data):
+        length = int(data[pos:pos + 6])
+        frames.append(data[pos + 6:pos + 6 + length])
+        pos += 6 + length
+    return frames
+
+class FrameIndexSidecarTest(unittest.TestCase):
+    """ Sidecar "<video>.idx": định dạng header, bỏ qua khi mtime_ns / kích thước đổi, ghi tmp + replace. """
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.path = writeMjpeg(os.path.join(self.folder, 'movie.Mjpeg'), FRAME_COUNT, FRAME_SIZE)
+        self.sidecar = FrameIndex.sidecarPath(self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def build(self):
+        stream = VideoStream(self.path)
+        try:
+            return stream.loadIndex()
+        finally:
+            stream.close()
+
+    def header(self):
+        with open(self.sidecar, 'rb') as f:
+            return FrameIndex.HEADER.unpack(f.read(FrameIndex.HEADER.size))
+
+    def test_build_matches_frames(self):
+        index = self.build()
+        frames = proprietaryFrames(self.path)
+        self.assertEqual(len(index), FRAME_COUNT)
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        for i, frame in enumerate(frames):
+            offset, length = index.lookup(i)
+            self.assertEqual(data[offset:offset + length], frame)
+
+    def test_sidecar_header_and_round_trip(self):
+        index = self.build()
+        st = os.stat(self.path)
+        self.assertEqual(self.header(), (FrameIndex.MAGIC, FrameIndex.VERSION, st.st_mtime_ns, st.st_size, FRAME_COUNT))
+        # Header + offsets (Q, 8 byte) + lengths (I, 4 byte)
+        self.assertEqual(os.path.getsize(self.sidecar), FrameIndex.HEADER.size + FRAME_COUNT * (8 + 4))
+        self.assertFalse(os.path.exists(self.sidecar + '.tmp'))
+
+        loaded = FrameIndex.load(self.path)
+        self.assertIsNotNone(loaded)
+        self.assertEqual(loaded.offsets, index.offsets)
+        self.assertEqual(loaded.lengths, index.lengths)
+        self.assertEqual((loaded.mtime, loaded.size), (st.st_mtime_ns, st.st_size))
+
+    def test_valid_sidecar_is_used_without_scanning(self):
+        self.build()
+        stream = VideoStream(self.path)
+        stream.scanFrames = lambda: self.fail("index rebuilt although the sidecar is valid")
+        try:
+            self.assertEqual(stream.frameCount(), FRAME_COUNT)
+        finally:
+            stream.close()
+
+    def test_touched_file_is_rebuilt(self):
+        self.build()
+        st = os.stat(self.path)
+        mtime = st.st_mtime_ns + 5 * 10**9
+        os.utime(self.path, ns=(st.st_atime_ns, mtime))
+        self.assertIsNone(FrameIndex.load(self.path))
+
+        self.assertEqual(len(self.build()), FRAME_COUNT)
+        self.assertEqual(self.header()[2:], (mtime, st.st_size, FRAME_COUNT))
+        self.assertIsNotNone(FrameIndex.load(self.path))
+
+    def test_resized_file_is_rebuilt(self):
+        self.build()
+        st = os.stat(self.path)
+        frame = makeFrame(FRAME_SIZE)
+        with open(self.path, 'ab') as f:
+            f.write(str(len(frame)).zfill(6).encode() + frame)
+        # Giữ nguyên mtime: chỉ kích thước đổi
+        os.utime(self.path, ns=(st.st_atime_ns, st.st_mtime_ns))
+        self.assertIsNone(FrameIndex.load(self.path))
+
+        index = self.build()
+        self.assertEqual(len(index), FRAME_COUNT + 1)
+        self.assertEqual(self.header()[3:], (st.st_size + 6 + len(frame), FRAME_COUNT + 1))
+        self.assertEqual(index.lookup(FRAME_COUNT), (st.st_size + 6, len(frame)))
+
+    def test_bad_sidecar_is_rebuilt(self):
+        index = self.build()
+        with open(self.sidecar, 'rb') as f:
+            good = f.read()
+        bad = {
+            'magic': b'XXXX' + good[4:],
+            'version': good[:4] + bytes([FrameIndex.VERSION + 1, 0]) + good[6:],
+            'short header': good[:FrameIndex.HEADER.size - 1],
+            'short arrays': good[:-4],
+        }
+        for name, data in bad.items():
+            with self.subTest(sidecar=name):
+                with open(self.sidecar, 'wb') as f:
+                    f.write(data)
+                self.assertIsNone(FrameIndex.load(self.path))
+                self.assertEqual(self.build().offsets, index.offsets)
+                with open(self.sidecar, 'rb') as f:
+                    self.assertEqual(f.read(), good)
+
+    def test_rewrite_replaces_stale_tmp(self):
+        # .tmp sót lại từ lần ghi bị ngắt: bị ghi đè rồi đổi tên, sidecar cũ không bao giờ bị ghi dở
+        with open(self.sidecar + '.tmp', 'wb') as f:
+            f.write(b'garbage')
+        self.build()
+        self.assertFalse(os.path.exists(self.sidecar + '.tmp'))
+        self.assertIsNotNone(FrameIndex.load(self.path))
+
+    def test_unwritable_sidecar_keeps_index_in_memory(self):
+        # Thư mục trùng tên .tmp -> không mở được để ghi: index vẫn dùng được, không có sidecar
+        os.mkdir(self.sidecar + '.tmp')
+        index = self.build()
+        self.assertEqual(len(index), FRAME_COUNT)
+        self.assertFalse(os.path.exists(self.sidecar))
+
+    def test_load_byte_order(self):
+        index = self.build()
+        with open(self.sidecar, 'rb') as f:
+            f.seek(FrameIndex.HEADER.size)
+            offsets = array('Q')
+            offsets.frombytes(f.read(FRAME_COUNT * 8))
+        # Sidecar luôn little-endian, bất kể máy ghi
+        self.assertEqual(offsets.tobytes(), b''.join(o.to_bytes(8, 'little') for o in index.offsets))
+
+class CachedSeekTest(unittest.TestCase):
+    """ CachedVideoStream.seek kẹp vị trí vào [0, frameCount]; seekTo (Range npt) ánh xạ giây -> frame. """
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.path = writeMjpeg(os.path.join(self.folder, 'movie.Mjpeg'), FRAME_COUNT, FRAME_SIZE)
+        self.frames = proprietaryFrames(self.path)
+        self.library = VideoLibrary(FrameCache())
+        self.stream = self.library.open(self.path)
+
+    def tearDown(self):
+        self.stream.close()
+        shutil.rmtree(self.folder)
+
+    def test_seek_reads_target_frame(self):
+        for target in (5, 0, FRAME_COUNT - 1, 3):
+            with self.subTest(target=target):
+                self.stream.seek(target)
+                self.assertEqual(self.stream.frameNbr(), target)
+                self.assertEqual(self.stream.nextFrame(), self.frames[target])
+                self.assertEqual(self.stream.lastFrameNbr(), target)
+
+    def test_seek_past_eof_is_clamped(self):
+        self.stream.seek(FRAME_COUNT + 50)
+        self.assertEqual(self.stream.frameNbr(), FRAME_COUNT)
+        self.assertIsNone(self.stream.nextPacketizedFrame())
+        self.assertEqual(self.stream.frameNbr(), FRAME_COUNT)
+
+    def test_seek_before_start_is_clamped(self):
+        self.stream.seek(4)
+        self.stream.seek(-3)
+        self.assertEqual(self.stream.frameNbr(), 0)
+        self.assertEqual(self.stream.nextFrame(), self.frames[0])
+
+    def test_seek_to_time(self):
+        worker = ServerWorker({'videoStream': self.stream})
+        worker.fps = 10
+        self.assertTrue(worker.seekTo(0.55))
+        self.assertEqual(self.stream.frameNbr(), 5)
+        self.assertTrue(worker.seekTo((FRAME_COUNT - 1) / 10))
+        self.assertEqual(self.stream.frameNbr(), FRAME_COUNT - 1)
+        # Quá độ dài video hoặc âm: từ chối, vị trí giữ nguyên
+        for startTime in (FRAME_COUNT / 10, 100.0, -0.1):
+            with self.subTest(startTime=startTime):
+                self.assertFalse(worker.seekTo(startTime))
+                self.assertEqual(self.stream.frameNbr(), FRAME_COUNT - 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import socket
+import time
+import unittest
+
+from src.common.rtsp_parser import RtspMessageParser, InterleavedFrame, RtspMessage
+from src.server.packetizer import InterleavedSender, PacketizedFrame
+from src.server.server_worker import ServerWorker
+
+FRAME_SIZE = 60 * 1024
+
+class InterleavedQueueTest(unittest.TestCase):
+    """ Chế độ thread: Client đọc chậm -> luồng gửi không bị chặn, frame bị bỏ trọn vẹn, Seq liền mạch. """
+
+    def setUp(self):
+        self.server, self.client = socket.socketpair()
+        for sock in (self.server, self.client):
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 16 * 1024)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 16 * 1024)
+        self.server.setblocking(False)
+        self.worker = ServerWorker({'rtspSocket': (self.server, ('127.0.0.1', 0))})
+        self.worker.INTERLEAVED_BUFFER = 128 * 1024
+        self.sender = InterleavedSender(self.worker.writeInterleaved, 0, ready=self.worker.interleavedReady)
+        self.frame = PacketizedFrame(b'\xff\xd8' + bytes(FRAME_SIZE - 4) + b'\xff\xd9')
+
+    def tearDown(self):
+        self.server.close()
+        self.client.close()
+
+    def sendFrames(self, count):
+        sent = dropped = 0
+        for i in range(count):
+            started = time.monotonic()
+            try:
+                self.sender.sendFrame(self.frame, i * 3000)
+                sent += 1
+            except BlockingIOError:
+                dropped += 1
+            self.assertLess(time.monotonic() - started, 0.05)
+        return sent, dropped
+
+    def drain(self):
+        """ Đọc hết những gì Server đã xếp hàng (luồng nhận lệnh tự ghi tiếp phần tồn -> ở đây gọi tay). """
+        parser = RtspMessageParser()
+        messages = []
+        self.client.settimeout(0.2)
+        while True:
+            with self.worker.rtspLock:
+                self.worker.flushOutgoing()
+            try:
+                data = self.client.recv(65536)
+            except socket.timeout:
+                if not self.worker.outgoing:
+                    return messages
+                continue
+            messages.extend(parser.feed(data))
+
+    def test_slow_reader_drops_whole_frames(self):
+        sent, dropped = self.sendFrames(40)
+        self.assertGreater(sent, 0)
+        self.assertGreater(dropped, 0)
+        # Hàng đợi bị chặn trên: không quá ngưỡng + 1 frame đang ghi dở
+        self.assertLess(self.worker.outgoingBytes, self.worker.INTERLEAVED_BUFFER + 2 * FRAME_SIZE)
+
+        packets = [m.data for m in self.drain() if isinstance(m, InterleavedFrame)]
+        seqs = [int.from_bytes(p[2:4], 'big') for p in packets]
+        self.assertEqual(seqs, list(range(seqs[0], seqs[0] + len(seqs))))
+        markers = sum(1 for p in packets if p[1] & 0x80)
+        self.assertEqual(markers, sent)
+        self.assertEqual(self.worker.outgoingBytes, 0)
+        self.assertTrue(self.worker.interleavedReady())
+
+    def test_reply_is_queued_behind_whole_frames(self):
+        self.sendFrames(10)
+        self.assertFalse(self.worker.interleavedReady())
+        reply = b'RTSP/1.0 200 OK\r\nCSeq: 7\r\nSession: 1\r\n\r\n'
+        self.worker.sendRtspReply(reply)
+
+        messages = self.drain()
+        replies = [m for m in messages if isinstance(m, RtspMessage)]
+        self.assertEqual(len(replies), 1)
+        self.assertIn('CSeq: 7', replies[0].text())
+        self.assertIsInstance(messages[-1], RtspMessage)
+
+if __name__ == '__main__':
+    unittest.main()
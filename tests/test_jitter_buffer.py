@@ -0,0 +1,153 @@
+import unittest
+
+from src.client.buffer import JitterBuffer
+
+FPS = 30
+INTERVAL = 1 / FPS
+
+def frame(media, size=100):
+    """ Mục của JitterBuffer: (data, packets, loss, thời điểm media giây). """
+    return (bytes(size), 1, 0.0, media)
+
+class JitterEstimateTest(unittest.TestCase):
+    """ targetDelay thích nghi theo jitter (RFC 3550), đồng hồ truyền vào qua put(frame, now). """
+
+    def feed(self, buffer, count, noise=lambda i: 0.0, start=0, fps=FPS, offset=0.0):
+        """ count frame liên tiếp, frame i tới lúc media(i) + offset + noise(i). """
+        for i in range(start, start + count):
+            media = i / fps
+            buffer.put(frame(media), offset + media + noise(i))
+            buffer.get()
+
+    def test_steady_arrivals_converge_to_minimum(self):
+        buffer = JitterBuffer()
+        self.feed(buffer, 300)
+        self.assertAlmostEqual(buffer.jitter, 0.0, places=9)
+        self.assertAlmostEqual(buffer.interval, INTERVAL, places=9)
+        self.assertEqual(buffer.targetDelay(), JitterBuffer.MIN_DELAY)
+
+    def test_jitter_converges_to_mean_deviation(self):
+        # Lệch +-5 ms xen kẽ -> |D| = 10 ms mỗi frame
+        buffer = JitterBuffer()
+        self.feed(buffer, 600, noise=lambda i: 0.005 if i % 2 else -0.005)
+        self.assertAlmostEqual(buffer.jitter, 0.010, places=4)
+        self.assertAlmostEqual(buffer.targetDelay(), JitterBuffer.JITTER_FACTOR * 0.010 + INTERVAL, places=3)
+
+    def test_interval_follows_stream_fps(self):
+        buffer = JitterBuffer()
+        self.feed(buffer, 400, fps=25)
+        self.assertAlmostEqual(buffer.interval, 1 / 25, places=6)
+        self.assertAlmostEqual(buffer.targetDelay(), 1 / 25, places=6)
+
+    def test_target_is_clamped(self):
+        buffer = JitterBuffer()
+        buffer.jitter = 10.0
+        self.assertEqual(buffer.targetDelay(), JitterBuffer.MAX_DELAY)
+
+    def test_seek_jumps_are_ignored(self):
+        buffer = JitterBuffer()
+        self.feed(buffer, 100)
+        jitter, interval = buffer.jitter, buffer.interval
+        now = 100 / FPS
+        # Tua tới 60 s rồi lùi về 5 s: Timestamp nhảy xa (>= MAX_STEP) hoặc lùi, frame vẫn tới đúng nhịp
+        buffer.put(frame(60.0), now)
+        buffer.put(frame(5.0), now + INTERVAL)
+        self.assertEqual((buffer.jitter, buffer.interval), (jitter, interval))
+        # Frame sau đó so với mốc mới (5 s), không với mốc trước khi tua
+        buffer.put(frame(5.0 + INTERVAL), now + 2 * INTERVAL)
+        self.assertAlmostEqual(buffer.jitter, jitter, places=9)
+
+    def test_pause_gap_ignored_after_resume(self):
+        buffer = JitterBuffer()
+        self.feed(buffer, 100)
+        # PAUSE 5 s: frame kế tiếp tới trễ 5 s so với Timestamp của nó
+        buffer.resume()
+        self.feed(buffer, 100, start=100, offset=5.0)
+        self.assertAlmostEqual(buffer.jitter, 0.0, places=9)
+
+    def test_pause_gap_without_resume_counts(self):
+        """ Đối chứng: không gọi resume() thì khoảng dừng bị tính là jitter. """
+        buffer = JitterBuffer()
+        self.feed(buffer, 100)
+        self.feed(buffer, 1, start=100, offset=0.5)
+        self.assertGreater(buffer.jitter, 0.02)
+
+    def test_frames_without_timestamp_do_not_update_jitter(self):
+        buffer = JitterBuffer()
+        self.feed(buffer, 50)
+        for i in range(10):
+            buffer.put(frame(None), 100.0 + i * 3)
+        self.assertAlmostEqual(buffer.jitter, 0.0, places=9)
+
+class OccupancyTest(unittest.TestCase):
+
+    def test_span_of_timestamps(self):
+        buffer = JitterBuffer()
+        for i in range(10):
+            buffer.put(frame(2.0 + i * INTERVAL), i * INTERVAL)
+        self.assertAlmostEqual(buffer.occupancy(), 10 * INTERVAL)
+        buffer.get()
+        self.assertAlmostEqual(buffer.occupancy(), 9 * INTERVAL)
+
+    def test_falls_back_to_frame_count(self):
+        buffer = JitterBuffer()
+        self.assertEqual(buffer.occupancy(), 0.0)
+        for i in range(4):
+            buffer.put(frame(None))
+        self.assertAlmostEqual(buffer.occupancy(), 4 * buffer.interval)
+        # Timestamp lùi trong hàng (tua lùi) -> không tin khoảng Timestamp
+        buffer.clear()
+        for media in (30.0, 30.0 + INTERVAL, 1.0):
+            buffer.put(frame(media), media)
+        self.assertAlmostEqual(buffer.occupancy(), 3 * buffer.interval)
+
+class EvictionTest(unittest.TestCase):
+    """ Đầy (byte hoặc số frame) -> bỏ frame cũ nhất; bộ đếm byte khớp với nội dung hàng. """
+
+    def assertAccounting(self, buffer):
+        self.assertEqual(buffer.size(), sum(len(f[0]) for f in buffer.frames))
+
+    def test_evicts_oldest_by_count(self):
+        buffer = JitterBuffer(max_size=5)
+        for i in range(8):
+            buffer.put(frame(i * INTERVAL), i * INTERVAL)
+        self.assertEqual(buffer.qsize(), 5)
+        self.assertEqual(buffer.dropped, 3)
+        self.assertEqual(buffer.peek()[3], 3 * INTERVAL)
+        self.assertAccounting(buffer)
+
+    def test_evicts_oldest_by_bytes(self):
+        buffer = JitterBuffer(max_size=100, max_bytes=1000)
+        for i in range(5):
+            buffer.put(frame(i * INTERVAL, size=300), i * INTERVAL)
+        self.assertEqual(buffer.qsize(), 3)
+        self.assertEqual(buffer.size(), 900)
+        self.assertEqual(buffer.dropped, 2)
+        self.assertEqual(buffer.peek()[3], 2 * INTERVAL)
+        # Frame lớn hơn chỗ trống: bỏ bao nhiêu frame cũ cũng được để vừa
+        buffer.put(frame(5 * INTERVAL, size=800), 5 * INTERVAL)
+        self.assertEqual(buffer.qsize(), 1)
+        self.assertEqual(buffer.size(), 800)
+        self.assertAccounting(buffer)
+
+    def test_oversized_frame_is_still_kept(self):
+        buffer = JitterBuffer(max_bytes=1000)
+        buffer.put(frame(0.0, size=400))
+        buffer.put(frame(INTERVAL, size=5000))
+        self.assertEqual(buffer.qsize(), 1)
+        self.assertEqual(buffer.size(), 5000)
+
+    def test_accounting_through_get_and_clear(self):
+        buffer = JitterBuffer(max_size=4, max_bytes=1000)
+        for i in range(10):
+            buffer.put(frame(i * INTERVAL, size=100 + 50 * (i % 3)), i * INTERVAL)
+            if i % 3 == 0:
+                buffer.get()
+            self.assertAccounting(buffer)
+        buffer.clear()
+        self.assertEqual((buffer.qsize(), buffer.size()), (0, 0))
+        self.assertIsNone(buffer.get())
+        self.assertIsNone(buffer.peek())
+
+if __name__ == '__main__':
+    unittest.main()
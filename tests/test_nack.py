@@ -0,0 +1,141 @@
+import random
+import threading
+import unittest
+
+from src.common.rtcp_packet import GenericNack, NACK_FCI, decodeCompound
+from src.client.reassembler import FrameReassembler
+
+def jpeg(number, size):
+    """ JPEG giả (SOI ... EOI), nội dung khác nhau theo number. """
+    body = bytes((number + i) & 0xFF for i in range(size - 4))
+    return b'\xff\xd8' + body + b'\xff\xd9'
+
+def packetize(frames, firstSeq, fragment=100):
+    """ [(seq 16 bit, marker, payload, timestamp, frame number)] như Server gửi. """
+    packets = []
+    seq = firstSeq
+    for number, frame in enumerate(frames):
+        pieces = [frame[i:i + fragment] for i in range(0, len(frame), fragment)]
+        for i, piece in enumerate(pieces):
+            packets.append((seq & 0xFFFF, int(i == len(pieces) - 1), piece, number * 3000, number))
+            seq += 1
+    return packets
+
+class GenericNackTest(unittest.TestCase):
+
+    def roundTrip(self, lost):
+        data = GenericNack(ssrc=0x11, mediaSsrc=0x22, lost=lost).encode()
+        packets = decodeCompound(data)
+        self.assertEqual(len(packets), 1)
+        nack = packets[0]
+        self.assertEqual((nack.ssrc, nack.mediaSsrc), (0x11, 0x22))
+        return nack.lost, (len(data) - 12) // NACK_FCI.size
+
+    def test_round_trip_around_wrap(self):
+        cases = [
+            [65534, 65535, 0, 1, 5],
+            list(range(65530, 65536)) + list(range(0, 20)),
+            [65535, 0],
+            [0, 65535],
+            [65535],
+            [0],
+            [0, 20000, 40000],
+            [1, 32770, 65535],
+        ]
+        for lost in cases:
+            with self.subTest(lost=lost):
+                decoded, _ = self.roundTrip(lost)
+                self.assertEqual(sorted(decoded), sorted(lost))
+                self.assertEqual(len(decoded), len(set(decoded)))
+
+    def test_window_across_wrap_uses_one_fci(self):
+        # 17 seq liên tiếp qua 65535 -> 0: PID = 65528, BLP phủ 16 seq sau
+        lost = [(65528 + i) & 0xFFFF for i in range(17)]
+        decoded, fcis = self.roundTrip(lost)
+        self.assertEqual(fcis, 1)
+        self.assertEqual(decoded[0], 65528)
+        self.assertEqual(decoded, lost)
+        # Seq thứ 18 cần FCI thứ 2
+        decoded, fcis = self.roundTrip(lost + [(65528 + 17) & 0xFFFF])
+        self.assertEqual(fcis, 2)
+
+    def test_bitmask_bits(self):
+        data = GenericNack(lost=[65535, 0, 15]).encode()
+        pid, blp = NACK_FCI.unpack_from(data, 12)
+        self.assertEqual(pid, 65535)
+        self.assertEqual(blp, 1 << 0 | 1 << 15)
+
+    def test_random_sets_near_wrap(self):
+        rng = random.Random(17)
+        for _ in range(200):
+            start = rng.randrange(65536)
+            lost = sorted({(start + rng.randrange(300)) & 0xFFFF for _ in range(rng.randrange(1, 60))})
+            decoded, _ = self.roundTrip(lost)
+            self.assertEqual(sorted(decoded), lost)
+
+    def test_duplicates_and_wide_values(self):
+        decoded, fcis = self.roundTrip([5, 5, 65536 + 6, 7])
+        self.assertEqual(sorted(decoded), [5, 6, 7])
+        self.assertEqual(fcis, 1)
+
+class PollTest(unittest.TestCase):
+
+    def run_lossy(self, loss, seed, firstSeq=65000, frameCount=300):
+        """ Luồng 30 fps, mất gói ngẫu nhiên (không gửi lại), poll sau mỗi gói. """
+        rng = random.Random(seed)
+        frames = [jpeg(n, 700 + rng.randrange(400)) for n in range(frameCount)]
+        packets = packetize(frames, firstSeq)
+        reassembler = FrameReassembler()
+        lostSeqs, nacks, out = set(), {}, []
+        for seq, marker, payload, timestamp, number in packets:
+            now = number / 30
+            if rng.random() < loss and number > 0:
+                lostSeqs.add(seq)
+            else:
+                reassembler.push(seq, marker, payload, now, timestamp)
+            for nacked in reassembler.poll(now):
+                nacks[nacked] = nacks.get(nacked, 0) + 1
+            out += list(reassembler.frames())
+        # Hết luồng: để mọi lỗ hổng quá MAX_WAIT
+        for step in range(1, 40):
+            for nacked in reassembler.poll(frameCount / 30 + step * 0.05):
+                nacks[nacked] = nacks.get(nacked, 0) + 1
+        out += list(reassembler.frames())
+        return frames, out, lostSeqs, nacks, reassembler
+
+    def test_many_losses_terminates_and_drains(self):
+        result = []
+        worker = threading.Thread(target=lambda: result.append(self.run_lossy(0.2, 953)), daemon=True)
+        worker.start()
+        worker.join(10)
+        self.assertFalse(worker.is_alive(), "poll() did not terminate")
+        frames, out, lostSeqs, nacks, reassembler = result[0]
+
+        self.assertEqual(reassembler.missing, {})
+        self.assertEqual(reassembler.packets, {})
+        # Chỉ NACK gói thật sự mất, mỗi gói tối đa MAX_NACKS lần
+        self.assertTrue(set(nacks) <= lostSeqs)
+        self.assertLessEqual(max(nacks.values()), FrameReassembler.MAX_NACKS)
+        # Frame trả ra là frame gốc nguyên vẹn, đúng thứ tự
+        numbers = [stamp // 3000 for _, _, stamp in out]
+        self.assertEqual(numbers, sorted(set(numbers)))
+        for data, _, stamp in out:
+            self.assertEqual(bytes(data), frames[stamp // 3000])
+        stats = reassembler.stats()
+        self.assertGreater(stats['completed'], 0)
+        self.assertGreater(stats['dropped'], 0)
+
+    def test_total_loss_bursts(self):
+        # Mất 60% gói: hầu hết frame bị bỏ, vẫn phải dừng và không giữ lại gì
+        _, out, _, _, reassembler = self.run_lossy(0.6, 5, firstSeq=65530)
+        self.assertEqual(reassembler.missing, {})
+        for data, _, _ in out:
+            self.assertTrue(FrameReassembler.isJpeg(data))
+
+    def test_lossless_stream_sends_no_nack(self):
+        frames, out, lostSeqs, nacks, reassembler = self.run_lossy(0.0, 1)
+        self.assertEqual(nacks, {})
+        self.assertEqual([bytes(data) for data, _, _ in out], frames)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,181 @@
+import random
+import socket
+import unittest
+
+from benchmarks.bench_pacing_drift import SimClock, processingTime
+from src.server.packetizer import PacketizedFrame, RtpSender, MAX_RTP_PAYLOAD
+from src.server.metrics import ServerMetrics
+from src.server.pacing import FramePacer, TokenBucket
+from src.server.server_worker import ServerWorker
+
+FRAME = PacketizedFrame(b'\xff\xd8' + bytes(200) + b'\xff\xd9')
+
+class FramePacerTest(unittest.TestCase):
+
+    def stream(self, pacer, clock, rng, frames, stallAt=None, stall=0.0, hiccups=0.01):
+        """ Gửi frames frame qua pacer, trả về [thời điểm gửi] (đồng hồ mô phỏng). """
+        sent = []
+        for n in range(frames):
+            self.assertFalse(pacer.wait(clock))
+            sent.append(clock.now)
+            clock.now += processingTime(rng, hiccups) + (stall if n == stallAt else 0.0)
+            pacer.advance()
+        return sent
+
+    def test_ten_minutes_bounded_drift(self):
+        fps = 30.0
+        frames = int(10 * 60 * fps)
+        rng = random.Random(953)
+        clock = SimClock(rng, wakeupJitter=0.001)
+        pacer = FramePacer(fps, clock=clock)
+        sent = self.stream(pacer, clock, rng, frames)
+
+        # Frame cuối gửi gần đúng start + N / fps: không cộng dồn thời gian xử lý / giật / đánh thức trễ
+        drift = sent[-1] - (frames - 1) / fps
+        self.assertLess(abs(drift), 0.005)
+        # Giật 150 ms < MAX_LAG: chỉ gửi bù, không đặt lại mốc
+        self.assertEqual(pacer.resyncs, 0)
+        self.assertLess(max(t - n / fps for n, t in enumerate(sent)), 0.2)
+
+    def test_long_stall_resyncs_once(self):
+        fps = 30.0
+        rng = random.Random(1)
+        clock = SimClock(rng)
+        pacer = FramePacer(fps, clock=clock)
+        sent = self.stream(pacer, clock, rng, 300, stallAt=100, stall=2.0, hiccups=0.0)
+
+        self.assertEqual(pacer.resyncs, 1)
+        # Sau khi đặt lại mốc không gửi dồn cả 2 giây frame bị lỡ: nhịp trở lại 1 / fps
+        gaps = [b - a for a, b in zip(sent[102:], sent[103:])]
+        self.assertLess(max(abs(gap - 1 / fps) for gap in gaps), 0.013)
+        self.assertAlmostEqual(sent[-1] - sent[101], 198 / fps, delta=0.02)
+
+    def test_wait_reports_stop_event(self):
+        clock = SimClock()
+        pacer = FramePacer(30, clock=clock)
+        pacer.advance()
+        clock.stopped = True
+        self.assertTrue(pacer.wait(clock))
+
+class SimVideoStream:
+    """ VideoStream giả: frames frame giống nhau, mỗi lần đọc tốn processingTime trên đồng hồ mô phỏng. """
+
+    def __init__(self, clock, rng, frames, stallAt=None, stall=0.0, hiccups=0.01, frame=FRAME):
+        self.clock = clock
+        self.rng = rng
+        self.frames = frames
+        self.stallAt = stallAt
+        self.stall = stall
+        self.hiccups = hiccups
+        self.frame = frame
+        self.frameNum = 0
+
+    def nextPacketizedFrame(self):
+        if self.frameNum >= self.frames:
+            return None
+        self.clock.now += processingTime(self.rng, self.hiccups) + (self.stall if self.frameNum == self.stallAt else 0.0)
+        self.frameNum += 1
+        return self.frame
+
+    def lastFrameNbr(self):
+        return self.frameNum - 1
+
+    def frameNbr(self):
+        return self.frameNum
+
+class ScheduledStreamTest(unittest.TestCase):
+    """
+    Đường production của chế độ thread: PacingScheduler gọi streamStep() tại hạn chót nó trả về,
+    hạn chót kế tiếp lấy từ nextDeadline() (FramePacer.advance / rebase / deadline), không qua FramePacer.wait().
+    """
+
+    def setUp(self):
+        self.receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.receiver.bind(('127.0.0.1', 0))
+        self.rtpSocket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def tearDown(self):
+        self.receiver.close()
+        self.rtpSocket.close()
+
+    def stream(self, clock, videoStream, fps=30.0, dispatchLag=0.001, shapeBurst=0):
+        """
+        Chạy worker như PacingScheduler tới hết video, trả về (worker, [thời điểm bắt đầu mỗi bước]).
+        Timer thread thức dậy tại hạn chót (hoặc ngay nếu đã trễ) + độ trễ đánh thức / chuyển sang sender thread.
+        """
+        worker = ServerWorker({'videoStream': videoStream, 'session': 1})
+        worker.fps = fps
+        worker.metrics = ServerMetrics()
+        worker.sessionStats = worker.metrics.openSession(1)
+        worker.rtpSender = RtpSender(self.rtpSocket, self.receiver.getsockname())
+        worker.pacer = FramePacer(fps, clock=clock)
+        worker.SHAPE_BURST = shapeBurst
+        worker.shaper = worker.makeShaper(clock)
+
+        started = []
+        deadline = worker.pacer.deadline()
+        while deadline is not None:
+            clock.now = max(clock.now, deadline) + clock.rng.uniform(0, dispatchLag)
+            started.append(clock.now)
+            deadline = worker.streamStep()
+            if deadline is not None:
+                # Hạn chót trả về cho scheduler không bao giờ lùi quá MAX_LAG so với hiện tại
+                self.assertGreaterEqual(deadline, clock.now - FramePacer.MAX_LAG)
+        return worker, started
+
+    def test_ten_minutes_bounded_drift(self):
+        fps = 30.0
+        frames = int(10 * 60 * fps)
+        rng = random.Random(953)
+        clock = SimClock(rng)
+        worker, started = self.stream(clock, SimVideoStream(clock, rng, frames), fps)
+
+        self.assertEqual(len(started), frames + 1)      # + bước cuối đọc hết video
+        self.assertEqual(worker.sessionStats.frames, frames)
+        drift = started[frames - 1] - (frames - 1) / fps
+        self.assertLess(abs(drift), 0.005)
+        self.assertEqual(worker.pacer.resyncs, 0)
+        self.assertLess(max(t - n / fps for n, t in enumerate(started)), 0.2)
+
+    def test_long_stall_rebases_once(self):
+        fps = 30.0
+        rng = random.Random(1)
+        clock = SimClock(rng)
+        videoStream = SimVideoStream(clock, rng, 300, stallAt=100, stall=2.0, hiccups=0.0)
+        worker, started = self.stream(clock, videoStream, fps)
+
+        self.assertEqual(worker.pacer.resyncs, 1)
+        # Không gửi dồn 2 giây frame bị lỡ: ngay sau bước bị treo, nhịp trở lại 1 / fps
+        gaps = [b - a for a, b in zip(started[101:299], started[102:300])]
+        self.assertLess(max(abs(gap - 1 / fps) for gap in gaps), 0.013)
+        self.assertAlmostEqual(started[299] - started[101], 198 / fps, delta=0.02)
+
+    def test_shaped_steps_keep_frame_deadlines(self):
+        # Định hình bật (1 gói / bước): nhiều bước cho 1 frame, nhưng frame N vẫn bắt đầu tại start + N / fps
+        fps = 30.0
+        rng = random.Random(5)
+        clock = SimClock(rng)
+        frame = PacketizedFrame(b'\xff\xd8' + bytes(4 * MAX_RTP_PAYLOAD) + b'\xff\xd9')
+        videoStream = SimVideoStream(clock, rng, 600, hiccups=0.0, frame=frame)
+        worker, started = self.stream(clock, videoStream, fps, shapeBurst=1)
+
+        self.assertGreater(len(started), 2 * 600)
+        self.assertEqual(worker.sessionStats.frames, 600)
+        self.assertEqual(worker.sessionStats.packets, 600 * len(frame.fragments()))
+        self.assertEqual(worker.pacer.resyncs, 0)
+        self.assertAlmostEqual(worker.pacer.deadline(), 600 / fps, places=6)
+
+class TokenBucketTest(unittest.TestCase):
+
+    def test_rate_limits_after_burst(self):
+        clock = SimClock()
+        bucket = TokenBucket(rate=1000, burst=500, clock=clock)
+        self.assertTrue(bucket.consume(500))
+        self.assertFalse(bucket.consume(100))
+        self.assertAlmostEqual(bucket.delay(100), 0.1)
+        clock.now += 0.1
+        bucket.refill()
+        self.assertTrue(bucket.consume(100))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,198 @@
+import random
+import unittest
+
+from src.client.reassembler import FrameReassembler
+
+FRAGMENT = 100
+FRAME_TICKS = 3000
+
+def jpeg(number, size):
+    body = bytes((number * 7 + i) & 0xFF for i in range(size - 4))
+    return b'\xff\xd8' + body + b'\xff\xd9'
+
+def packetize(count, firstSeq=0, withInfo=False, sizes=(450, 230, 301)):
+    """ count frame -> (danh sách frame JPEG, danh sách gói (seq, marker, payload, timestamp, info)) như Server gửi. """
+    frames, packets = [], []
+    seq = firstSeq
+    for number in range(count):
+        data = jpeg(number, sizes[number % len(sizes)])
+        pieces = [data[i:i + FRAGMENT] for i in range(0, len(data), FRAGMENT)]
+        timestamp = number * FRAME_TICKS
+        for i, piece in enumerate(pieces):
+            info = (number, i, len(pieces), len(data)) if withInfo else None
+            packets.append((seq & 0xFFFF, int(i == len(pieces) - 1), piece, timestamp, info))
+            seq += 1
+        frames.append(data)
+    return frames, packets
+
+class FrameReassemblerTest(unittest.TestCase):
+    """ Kịch bản tất định: thứ tự đến, mất gói, gói trùng và 2 đường bỏ frame (MAX_WAIT / REORDER_FRAMES). """
+
+    def setUp(self):
+        self.reassembler = FrameReassembler()
+        self.out = []
+
+    def push(self, packets, now=0.0):
+        for seq, marker, payload, timestamp, info in packets:
+            self.reassembler.push(seq, marker, payload, now, timestamp, info)
+        self.collect()
+
+    def collect(self):
+        self.out += [(bytes(data), packets, timestamp) for data, packets, timestamp in self.reassembler.frames()]
+
+    def poll(self, now):
+        lost = self.reassembler.poll(now)
+        self.collect()
+        return lost
+
+    def delivered(self):
+        return [data for data, _, _ in self.out]
+
+    def firstIndex(self, packets, number):
+        """ Vị trí gói đầu của frame number trong danh sách gói (theo Timestamp). """
+        return next(i for i, p in enumerate(packets) if p[3] == number * FRAME_TICKS)
+
+    # --- Không mất gói ---
+
+    def test_in_order(self):
+        for withInfo in (False, True):
+            with self.subTest(withInfo=withInfo):
+                self.setUp()
+                frames, packets = packetize(6, firstSeq=65530, withInfo=withInfo)
+                self.push(packets)
+                self.assertEqual(self.delivered(), frames)
+                self.assertEqual([t for _, _, t in self.out], [n * FRAME_TICKS for n in range(6)])
+                self.assertEqual(sum(n for _, n, _ in self.out), len(packets))
+                self.assertEqual(self.poll(1.0), [])
+                self.assertEqual(self.reassembler.stats()['dropped'], 0)
+
+    def test_reordered(self):
+        rng = random.Random(7)
+        for withInfo in (False, True):
+            with self.subTest(withInfo=withInfo):
+                self.setUp()
+                frames, packets = packetize(12, firstSeq=65500, withInfo=withInfo)
+                # Gói đầu giữ nguyên (điểm vào luồng), phần còn lại tráo trong từng cửa sổ 5 gói
+                shuffled = packets[:1]
+                for i in range(1, len(packets), 5):
+                    window = packets[i:i + 5]
+                    rng.shuffle(window)
+                    shuffled += window
+                self.push(shuffled)
+                self.assertEqual(self.delivered(), frames)
+                self.assertEqual(self.poll(0.005), [])
+                self.assertEqual(self.reassembler.stats()['nacked'], 0)
+
+    def test_duplicates(self):
+        frames, packets = packetize(5, firstSeq=65533)
+        doubled = [p for packet in packets for p in (packet, packet)]
+        # Gói của frame đã trả ra đến lại muộn
+        self.push(doubled + packets[:4])
+        self.assertEqual(self.delivered(), frames)
+        self.assertEqual(self.reassembler.completed, 5)
+        self.assertEqual(self.poll(1.0), [])
+
+    # --- Mất gói, được gửi lại ---
+
+    def test_lost_first_fragment_recovered_by_nack(self):
+        frames, packets = packetize(4, firstSeq=65534)
+        first = self.firstIndex(packets, 1)
+        lost = packets[first]
+        self.push(packets[:first] + packets[first + 1:])
+        self.assertEqual(self.delivered(), frames[:1])
+
+        self.assertEqual(self.poll(0.0), [])
+        self.assertEqual(self.poll(FrameReassembler.NACK_DELAY), [lost[0]])
+        self.assertTrue(self.reassembler.isRetransmission(lost[0]))
+        self.push([lost], now=0.02)
+        self.assertEqual(self.delivered(), frames)
+        stats = self.reassembler.stats()
+        self.assertEqual((stats['recovered'], stats['repaired'], stats['dropped']), (1, 1, 0))
+
+    def test_lost_marker_recovered_by_nack(self):
+        frames, packets = packetize(4)
+        marker = self.firstIndex(packets, 2) - 1
+        lost = packets[marker]
+        self.push(packets[:marker] + packets[marker + 1:])
+        self.assertEqual(self.delivered(), frames[:1])
+        self.assertEqual(self.poll(FrameReassembler.NACK_DELAY), [lost[0]])
+        self.push([lost], now=0.02)
+        self.assertEqual(self.delivered(), frames)
+
+    def test_nack_retries_are_bounded(self):
+        frames, packets = packetize(3)
+        hole = self.firstIndex(packets, 1) + 1
+        self.push(packets[:hole] + packets[hole + 1:])
+        now, sent = 0.0, 0
+        while now < FrameReassembler.MAX_WAIT:
+            sent += len(self.poll(now))
+            now += 0.005
+        self.assertEqual(sent, FrameReassembler.MAX_NACKS)
+
+    # --- Mất gói, không được vá: bỏ frame ---
+
+    def test_lost_first_fragment_dropped_after_max_wait(self):
+        for withInfo in (False, True):
+            with self.subTest(withInfo=withInfo):
+                self.setUp()
+                frames, packets = packetize(4, firstSeq=65534, withInfo=withInfo)
+                first = self.firstIndex(packets, 1)
+                self.push(packets[:first] + packets[first + 1:])
+                self.poll(FrameReassembler.MAX_WAIT)
+                self.assertEqual(self.delivered(), frames[:1])
+                self.poll(FrameReassembler.MAX_WAIT + 0.001)
+                self.assertEqual(self.delivered(), [frames[0]] + frames[2:])
+                self.assertEqual(self.reassembler.dropped, 1)
+                self.assertEqual(self.reassembler.missing, {})
+
+    def test_lost_marker_dropped_after_max_wait(self):
+        for withInfo in (False, True):
+            with self.subTest(withInfo=withInfo):
+                self.setUp()
+                frames, packets = packetize(4, withInfo=withInfo)
+                marker = self.firstIndex(packets, 2) - 1
+                self.push(packets[:marker] + packets[marker + 1:])
+                self.poll(FrameReassembler.MAX_WAIT + 0.001)
+                # Frame sau bắt đầu ở gói mở đầu JPEG (hoặc mảnh đầu theo FRAME_INFO)
+                self.assertEqual(self.delivered(), [frames[0], frames[2], frames[3]])
+                self.assertEqual(self.reassembler.dropped, 1)
+
+    def test_late_packet_after_drop_is_ignored(self):
+        frames, packets = packetize(3)
+        hole = self.firstIndex(packets, 1) + 1
+        self.push(packets[:hole] + packets[hole + 1:])
+        self.poll(FrameReassembler.MAX_WAIT + 0.001)
+        self.push([packets[hole]], now=0.4)
+        self.assertEqual(self.delivered(), [frames[0], frames[2]])
+        self.assertEqual(self.reassembler.completed, 2)
+
+    def test_reorder_window_drops_before_max_wait(self):
+        window = FrameReassembler.REORDER_FRAMES
+        frames, packets = packetize(window + 2)
+        hole = self.firstIndex(packets, 1) + 1
+        held = self.firstIndex(packets, window + 1)
+
+        # Đang giữ đúng REORDER_FRAMES Marker (frame có lỗ hổng + các frame chờ sau nó): vẫn chờ vá
+        self.push(packets[:hole] + packets[hole + 1:held])
+        self.poll(0.0)
+        self.assertEqual(self.delivered(), frames[:1])
+        self.assertEqual(len(self.reassembler.markers), window)
+
+        # Thêm 1 frame -> vượt cửa sổ, bỏ frame có lỗ hổng ngay (chưa tới MAX_WAIT)
+        self.push(packets[held:])
+        self.poll(0.001)
+        self.assertEqual(self.delivered(), [frames[0]] + frames[2:])
+        self.assertEqual(self.reassembler.dropped, 1)
+
+    def test_conceal_repeats_last_frame(self):
+        self.reassembler.CONCEAL = True
+        frames, packets = packetize(3)
+        hole = self.firstIndex(packets, 1) + 1
+        self.push(packets[:hole] + packets[hole + 1:])
+        self.poll(FrameReassembler.MAX_WAIT + 0.001)
+        self.assertEqual(self.delivered(), [frames[0], frames[0], frames[2]])
+        self.assertEqual(self.out[1][1], 0)
+        self.assertEqual(self.reassembler.concealed, 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,154 @@
+import random
+import unittest
+
+from src.common.rtp_packet import (RtpPacket, RtpHeaderTemplate, encodeExtension, decodeExtension, HEADER_SIZE,
+                                   EXTENSION_ONE_BYTE, EXTENSION_HEADER, FRAME_INFO, FRAME_INFO_BLOCK, FRAME_INFO_ID)
+from src.client.rtp_receiver import parseRtp
+
+PAYLOAD = bytes(range(200))
+INFO = (0x12345678, 3, 9, 123456)
+
+def slot(packet, spare=64):
+    """ Gói nằm đầu 1 buffer nhận lớn hơn nó (như RtpReceiver): (memoryview, size). """
+    buffer = bytearray(packet) + bytes(b'\xee' * spare)
+    return memoryview(buffer), len(packet)
+
+def rtpPacket(payload=PAYLOAD, extensions=None, seq=7, marker=1, timestamp=90000):
+    packet = RtpPacket()
+    packet.encode(2, 0, 0, 0, seq, marker, 26, 0xCAFE, payload, timestamp, extensions)
+    return bytes(packet.getPacket())
+
+def withCsrc(packet, count):
+    """ Chèn count CSRC (4 byte) sau header 12 byte và ghi CC tương ứng. """
+    return bytes([packet[0] | count]) + packet[1:HEADER_SIZE] + bytes(4 * count) + packet[HEADER_SIZE:]
+
+def withPadding(packet, count):
+    """ Bật bit P và đệm count byte (byte cuối = count) như RFC 3550. """
+    return bytes([packet[0] | 0x20]) + packet[1:] + bytes(count - 1) + bytes([count])
+
+class ExtensionCodecTest(unittest.TestCase):
+    """ encodeExtension / decodeExtension (RFC 8285 dạng 1 byte): độ dài tính theo từ 32 bit, đệm tới bội 4. """
+
+    def test_single_element_round_trip(self):
+        for elementId in range(1, 15):
+            for length in range(1, 17):
+                with self.subTest(elementId=elementId, length=length):
+                    data = bytes((elementId * 16 + i) & 0xFF or 1 for i in range(length))
+                    block = encodeExtension([(elementId, data)])
+                    profile, words = EXTENSION_HEADER.unpack_from(block)
+                    self.assertEqual(profile, EXTENSION_ONE_BYTE)
+                    # 1 byte ID/L + dữ liệu, đệm 0 tới bội 4
+                    padded = -(-(1 + length) // 4) * 4
+                    self.assertEqual(len(block), EXTENSION_HEADER.size + padded)
+                    self.assertEqual(words * 4, padded)
+                    self.assertEqual(block[EXTENSION_HEADER.size + 1 + length:], bytes(padded - 1 - length))
+                    self.assertEqual(block[EXTENSION_HEADER.size], elementId << 4 | (length - 1))
+                    self.assertEqual(decodeExtension(block), {elementId: data})
+
+    def test_multiple_elements_round_trip(self):
+        rng = random.Random(3)
+        for _ in range(200):
+            ids = rng.sample(range(1, 15), rng.randint(1, 6))
+            elements = [(i, bytes(rng.randint(1, 255) for _ in range(rng.randint(1, 16)))) for i in ids]
+            block = encodeExtension(elements)
+            body = sum(1 + len(data) for _, data in elements)
+            self.assertEqual(EXTENSION_HEADER.unpack_from(block)[1], -(-body // 4))
+            self.assertEqual(len(block) % 4, 0)
+            self.assertEqual(decodeExtension(block), dict(elements))
+
+    def test_invalid_elements_rejected(self):
+        for elementId, data in ((0, b'x'), (15, b'x'), (1, b''), (1, bytes(17))):
+            with self.subTest(elementId=elementId, length=len(data)):
+                with self.assertRaises(ValueError):
+                    encodeExtension([(elementId, data)])
+
+    def test_decode_padding_between_elements(self):
+        # Byte đệm 0 có thể nằm giữa các phần tử (RFC 8285 §4.2)
+        block = EXTENSION_HEADER.pack(EXTENSION_ONE_BYTE, 2) + bytes([0x10, 0xAA, 0, 0, 0x21, 0xBB, 0xCC, 0])
+        self.assertEqual(decodeExtension(block), {1: b'\xaa', 2: b'\xbb\xcc'})
+
+    def test_decode_stops_at_reserved_id(self):
+        block = EXTENSION_HEADER.pack(EXTENSION_ONE_BYTE, 2) + bytes([0x10, 0xAA, 0xF0, 0x31, 0x01, 0x02, 0, 0])
+        self.assertEqual(decodeExtension(block), {1: b'\xaa'})
+
+    def test_decode_ignores_bytes_after_declared_length(self):
+        block = encodeExtension([(1, b'ab')]) + encodeExtension([(2, b'cd')])[EXTENSION_HEADER.size:]
+        self.assertEqual(decodeExtension(block), {1: b'ab'})
+
+    def test_decode_other_profile_and_short_block(self):
+        self.assertEqual(decodeExtension(EXTENSION_HEADER.pack(0x1000, 1) + bytes([0x10, 1, 0, 0])), {})
+        with self.assertRaises(ValueError):
+            decodeExtension(b'\xbe\xde\x00')
+
+class FrameInfoParseTest(unittest.TestCase):
+    """ parseRtp: đường nhanh (khối chỉ có FRAME_INFO) và đường đầy đủ phải cho cùng kết quả với RtpPacket.decode. """
+
+    def assertMatchesDecoder(self, packet, payload=PAYLOAD):
+        view, size = slot(packet)
+        parsed = parseRtp(view, size)
+        self.assertIsNotNone(parsed)
+        marker, pt, seq, timestamp, ssrc, body, info = parsed
+        decoded = RtpPacket()
+        decoded.decode(packet)
+        self.assertEqual((marker, pt, seq, timestamp, ssrc), (decoded.header[1] >> 7, decoded.payloadType(),
+                                                              decoded.seqNum(), decoded.timestamp(), decoded.ssrc()))
+        self.assertEqual(info, decoded.frameInfo())
+        self.assertEqual(bytes(body), payload)
+        return info
+
+    def templatePacket(self, info=INFO, seq=7, marker=1, timestamp=90000):
+        template = RtpHeaderTemplate(ssrc=0xCAFE, frameInfo=True)
+        buffer = bytearray(template.size)
+        template.write(buffer, 0, seq, marker, timestamp)
+        template.writeFrameInfo(buffer, 0, *info)
+        return bytes(buffer) + PAYLOAD
+
+    def test_template_block_matches_generic_encoder(self):
+        packet = self.templatePacket()
+        block = packet[HEADER_SIZE:HEADER_SIZE + FRAME_INFO_BLOCK.size]
+        self.assertEqual(block, encodeExtension([(FRAME_INFO_ID, FRAME_INFO.pack(*INFO))]))
+        self.assertEqual(packet, rtpPacket(extensions=[(FRAME_INFO_ID, FRAME_INFO.pack(*INFO))]))
+
+    def test_fast_path(self):
+        for info in (INFO, (0, 0, 1, 1), (0xFFFFFFFF, 0xFFFF, 0xFFFF, 0xFFFFFFFF)):
+            with self.subTest(info=info):
+                self.assertEqual(self.assertMatchesDecoder(self.templatePacket(info)), info)
+
+    def test_full_path_with_other_elements(self):
+        frameInfo = (FRAME_INFO_ID, FRAME_INFO.pack(*INFO))
+        for elements in ([frameInfo, (5, b'xy')], [(5, b'xy'), frameInfo], [(2, bytes(16)), frameInfo, (14, b'z')]):
+            with self.subTest(ids=[i for i, _ in elements]):
+                self.assertEqual(self.assertMatchesDecoder(rtpPacket(extensions=elements)), INFO)
+
+    def test_extension_without_frame_info(self):
+        self.assertIsNone(self.assertMatchesDecoder(rtpPacket(extensions=[(5, b'xy')])))
+        # FRAME_INFO sai độ dài -> bỏ qua
+        self.assertIsNone(self.assertMatchesDecoder(rtpPacket(extensions=[(FRAME_INFO_ID, bytes(8))])))
+
+    def test_no_extension(self):
+        self.assertIsNone(self.assertMatchesDecoder(rtpPacket()))
+
+    def test_csrc_and_padding(self):
+        for packet in (self.templatePacket(), rtpPacket(extensions=[(5, b'xy'), (FRAME_INFO_ID, FRAME_INFO.pack(*INFO))])):
+            csrc = withCsrc(packet, 2)
+            self.assertEqual(self.assertMatchesDecoder(csrc), INFO)
+            view, size = slot(withPadding(csrc, 3))
+            parsed = parseRtp(view, size)
+            self.assertEqual(parsed[6], INFO)
+            self.assertEqual(bytes(parsed[5]), PAYLOAD)
+
+    def test_invalid_packets(self):
+        packet = self.templatePacket()
+        # Header cắt cụt, sai version
+        self.assertIsNone(parseRtp(*slot(packet[:HEADER_SIZE - 1])))
+        self.assertIsNone(parseRtp(*slot(bytes([packet[0] & 0x3F]) + packet[1:])))
+        # Khối extension dài hơn gói: không rơi vào đường nhanh, đường đầy đủ trả về None
+        for cut in (HEADER_SIZE + 2, HEADER_SIZE + 4, HEADER_SIZE + FRAME_INFO_BLOCK.size - 1):
+            with self.subTest(cut=cut):
+                self.assertIsNone(parseRtp(*slot(packet[:cut])))
+        # Số byte đệm (byte cuối) lớn hơn cả gói
+        padded = bytes([packet[0] | 0x20]) + packet[1:HEADER_SIZE + FRAME_INFO_BLOCK.size] + b'\x00\x00\xff'
+        self.assertIsNone(parseRtp(*slot(padded)))
+
+if __name__ == '__main__':
+    unittest.main()
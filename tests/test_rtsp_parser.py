@@ -0,0 +1,141 @@
+import unittest
+
+from src.common.rtsp_parser import RtspMessage, InterleavedFrame, RtspMessageParser, frameInterleaved
+
+SETUP = b"SETUP m.Mjpeg RTSP/1.0\r\nCSeq: 1\r\nTransport: RTP/AVP;unicast;client_port=25000-25001\r\n\r\n"
+PLAY = b"PLAY m.Mjpeg RTSP/1.0\r\nCSeq: 2\r\nSession: 123456\r\n\r\n"
+METRICS = b"GET_PARAMETER m.Mjpeg RTSP/1.0\r\nCSeq: 3\r\nContent-Type: text/parameters\r\nContent-Length: 9\r\n\r\nmetrics\r\n"
+REPLY = b"RTSP/1.0 200 OK\r\nCSeq: 4\r\nSession: 123456;timeout=60\r\nContent-Length: 5\r\n\r\nhello"
+
+def describe(items):
+    """ Kết quả feed() -> dạng so sánh được. """
+    out = []
+    for item in items:
+        if isinstance(item, InterleavedFrame):
+            out.append(('$', item.channel, item.data))
+        else:
+            out.append((item.startLine, tuple(item.headers), item.body))
+    return out
+
+class RtspMessageParserTest(unittest.TestCase):
+
+    def feedAll(self, data, cut=None):
+        """ Feed data 1 lần, hoặc thành 2 phần tại byte cut. """
+        parser = RtspMessageParser()
+        if cut is None:
+            return describe(parser.feed(data)), parser
+        return describe(parser.feed(data[:cut]) + parser.feed(data[cut:])), parser
+
+    def test_single_request(self):
+        items, _ = self.feedAll(SETUP)
+        self.assertEqual(len(items), 1)
+        startLine, headers, body = items[0]
+        self.assertEqual(startLine, "SETUP m.Mjpeg RTSP/1.0")
+        self.assertEqual(dict(headers)['CSeq'], "1")
+        self.assertEqual(body, b'')
+
+    def test_header_lookup_is_case_insensitive(self):
+        message = RtspMessageParser().feed(PLAY)[0]
+        self.assertEqual(message.header('session'), "123456")
+        self.assertEqual(message.header('CSEQ'), "2")
+        self.assertIsNone(message.header('Range'))
+        self.assertEqual(message.header('Range', 'npt=0-'), 'npt=0-')
+
+    def test_pipelined_messages_in_one_read(self):
+        items, parser = self.feedAll(SETUP + PLAY + METRICS)
+        self.assertEqual([item[0].split(' ')[0] for item in items], ['SETUP', 'PLAY', 'GET_PARAMETER'])
+        self.assertEqual(items[2][2], b"metrics\r\n")
+        self.assertEqual(len(parser.buffer), 0)
+
+    def test_split_at_every_byte_boundary(self):
+        frame = frameInterleaved(1, b'\x81\xc9' + bytes(30))
+        stream = SETUP + METRICS + frame + REPLY + PLAY
+        expected, _ = self.feedAll(stream)
+        self.assertEqual(len(expected), 5)
+        for cut in range(1, len(stream)):
+            with self.subTest(cut=cut):
+                self.assertEqual(self.feedAll(stream, cut)[0], expected)
+
+    def test_one_byte_at_a_time(self):
+        stream = METRICS + frameInterleaved(0, bytes(range(256)) * 2) + REPLY
+        parser = RtspMessageParser()
+        items = []
+        for i in range(len(stream)):
+            items += parser.feed(stream[i:i + 1])
+        self.assertEqual(describe(items), self.feedAll(stream)[0])
+
+    def test_bare_newline_endings(self):
+        data = b"OPTIONS * RTSP/1.0\nCSeq: 7\n\nPLAY m.Mjpeg RTSP/1.0\nCSeq: 8\nContent-Length: 2\n\nokTEARDOWN m.Mjpeg RTSP/1.0\r\nCSeq: 9\r\n\r\n"
+        items, _ = self.feedAll(data)
+        self.assertEqual([dict(item[1])['CSeq'] for item in items], ['7', '8', '9'])
+        self.assertEqual(items[1][2], b'ok')
+        for cut in range(1, len(data)):
+            with self.subTest(cut=cut):
+                self.assertEqual(self.feedAll(data, cut)[0], items)
+
+    def test_blank_lines_between_messages_are_skipped(self):
+        items, _ = self.feedAll(b"\r\n\r\n" + SETUP + b"\r\n" + PLAY)
+        self.assertEqual(len(items), 2)
+
+    def test_body_waits_for_content_length(self):
+        parser = RtspMessageParser()
+        head, body = REPLY[:-3], REPLY[-3:]
+        self.assertEqual(parser.feed(head), [])
+        items = parser.feed(body)
+        self.assertEqual(items[0].body, b"hello")
+
+    def test_interleaved_frames_mixed_with_replies(self):
+        rtp = b'\x80\x1a' + bytes(1398)
+        rtcp = b'\x81\xcd\x00\x03' + bytes(12)
+        stream = frameInterleaved(0, rtp) + REPLY + frameInterleaved(1, rtcp) + frameInterleaved(0, b'') + PLAY
+        items, parser = self.feedAll(stream)
+        self.assertEqual(items[0], ('$', 0, rtp))
+        self.assertEqual(items[1][0], "RTSP/1.0 200 OK")
+        self.assertEqual(items[2], ('$', 1, rtcp))
+        self.assertEqual(items[3], ('$', 0, b''))
+        self.assertEqual(items[4][0], "PLAY m.Mjpeg RTSP/1.0")
+        self.assertEqual(len(parser.buffer), 0)
+
+    def test_interleaved_payload_may_contain_header_bytes(self):
+        # Dữ liệu gói có '\r\n\r\n' / 'RTSP' không được làm lệch khung
+        payload = b"RTSP/1.0 200 OK\r\n\r\n$" + bytes(10)
+        items, _ = self.feedAll(frameInterleaved(0, payload) + PLAY)
+        self.assertEqual(items[0], ('$', 0, payload))
+        self.assertEqual(items[1][0], "PLAY m.Mjpeg RTSP/1.0")
+
+    def test_oversized_header_rejected(self):
+        parser = RtspMessageParser()
+        data = b"SETUP m.Mjpeg RTSP/1.0\r\n" + b"X-Pad: " + b"a" * RtspMessageParser.MAX_HEADER_BYTES
+        with self.assertRaises(ValueError):
+            parser.feed(data)
+
+    def test_header_just_under_limit_waits(self):
+        parser = RtspMessageParser()
+        data = b"SETUP m.Mjpeg RTSP/1.0\r\nX-Pad: " + b"a" * (RtspMessageParser.MAX_HEADER_BYTES - 40)
+        self.assertEqual(parser.feed(data), [])
+        self.assertEqual(len(parser.feed(b"\r\n\r\n")), 1)
+
+    def test_oversized_body_rejected(self):
+        data = f"SET_PARAMETER m.Mjpeg RTSP/1.0\r\nCSeq: 5\r\nContent-Length: {RtspMessageParser.MAX_BODY_BYTES + 1}\r\n\r\n"
+        with self.assertRaises(ValueError):
+            RtspMessageParser().feed(data.encode())
+
+    def test_body_at_limit_accepted(self):
+        size = RtspMessageParser.MAX_BODY_BYTES
+        data = f"SET_PARAMETER m.Mjpeg RTSP/1.0\r\nCSeq: 5\r\nContent-Length: {size}\r\n\r\n".encode() + b"x" * size
+        items = RtspMessageParser().feed(data)
+        self.assertEqual(len(items[0].body), size)
+
+    def test_invalid_content_length_rejected(self):
+        for value in (b"abc", b"-1"):
+            with self.subTest(value=value):
+                with self.assertRaises(ValueError):
+                    RtspMessageParser().feed(b"PLAY m RTSP/1.0\r\nCSeq: 1\r\nContent-Length: " + value + b"\r\n\r\n")
+
+    def test_text_round_trip(self):
+        message = RtspMessageParser().feed(METRICS)[0]
+        self.assertEqual(RtspMessageParser().feed(message.text().encode())[0].body, message.body)
+        self.assertIsInstance(message, RtspMessage)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,181 @@
+import socket
+import threading
+import time
+import unittest
+
+from src.server.scheduler import PacingScheduler
+from src.server.packetizer import PacketizedFrame, RtpSender
+from src.server.metrics import ServerMetrics
+from src.server.session_table import SessionTable
+from src.server.server_worker import ServerWorker
+
+class PacingSchedulerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.scheduler = PacingScheduler(senderThreads=4).start()
+
+    def tearDown(self):
+        self.scheduler.stop()
+
+    def test_runs_until_callback_returns_none(self):
+        calls = []
+        done = threading.Event()
+
+        def step():
+            calls.append(time.monotonic())
+            if len(calls) == 5:
+                done.set()
+                return None
+            return time.monotonic() + 0.005
+
+        self.scheduler.schedule(time.monotonic(), step)
+        self.assertTrue(done.wait(2))
+        time.sleep(0.05)
+        self.assertEqual(len(calls), 5)
+
+    def test_guarded_tasks_never_overlap(self):
+        """ PAUSE rồi PLAY ngay: task mới cùng guard không chạy song song với bước cuối của task cũ đã hủy. """
+        guard = threading.Lock()
+        active = []
+        overlaps = []
+        entered = threading.Event()
+        release = threading.Event()
+        steps = {'new': 0}
+
+        def oldStep():
+            active.append('old')
+            entered.set()
+            release.wait(2)
+            active.remove('old')
+            return time.monotonic()
+
+        def newStep():
+            if active:
+                overlaps.append(list(active))
+            steps['new'] += 1
+            return time.monotonic() + 0.002
+
+        old = self.scheduler.schedule(time.monotonic(), oldStep, guard)
+        self.assertTrue(entered.wait(2))
+        old.cancel()
+        new = self.scheduler.schedule(time.monotonic(), newStep, guard)
+        time.sleep(0.05)
+        self.assertEqual(steps['new'], 0)
+        release.set()
+        time.sleep(0.05)
+        new.cancel()
+
+        self.assertEqual(overlaps, [])
+        self.assertGreater(steps['new'], 0)
+        # Task cũ đã hủy không được hẹn lại
+        self.assertNotIn('old', active)
+
+    def test_cancelled_task_is_not_called(self):
+        called = []
+        task = self.scheduler.schedule(time.monotonic() + 0.02, lambda: called.append(1))
+        task.cancel()
+        time.sleep(0.06)
+        self.assertEqual(called, [])
+
+class BlockingVideoStream:
+    """ VideoStream giả: mỗi lần đọc frame dừng lại tới khi test cho đi tiếp (bước gửi đang chạy dở). """
+
+    def __init__(self):
+        self.entered = threading.Event()
+        self.proceed = threading.Event()
+        self.frames = 0
+        self.closed = False
+
+    def nextPacketizedFrame(self):
+        self.entered.set()
+        self.proceed.wait(5)
+        self.frames += 1
+        return PacketizedFrame(b'\xff\xd8' + bytes(3000) + b'\xff\xd9')
+
+    def lastFrameNbr(self):
+        return self.frames - 1
+
+    def frameNbr(self):
+        return self.frames
+
+    def close(self):
+        self.closed = True
+
+class SessionTeardownTest(unittest.TestCase):
+    """ Giải phóng phiên khi 1 bước gửi của nó đang chạy trên sender thread: chờ bước đó xong rồi mới đóng. """
+
+    def setUp(self):
+        self.scheduler = PacingScheduler(senderThreads=2).start()
+        self.rtspServer, self.rtspClient = socket.socketpair()
+        self.receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.receiver.bind(('127.0.0.1', 0))
+        self.receiver.settimeout(1)
+        self.rtpSocket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.stream = BlockingVideoStream()
+        worker = ServerWorker({'rtspSocket': (self.rtspServer, ('127.0.0.1', 0)), 'rtpSocket': self.rtpSocket,
+                               'videoStream': self.stream, 'session': 123456})
+        worker.scheduler = self.scheduler
+        worker.metrics = ServerMetrics()
+        worker.sessions = SessionTable()
+        worker.rtpSender = RtpSender(self.rtpSocket, self.receiver.getsockname())
+        worker.state = worker.PLAYING
+        self.worker = worker
+
+    def tearDown(self):
+        self.stream.proceed.set()
+        self.scheduler.stop()
+        for sock in (self.rtspServer, self.rtspClient, self.receiver, self.rtpSocket):
+            sock.close()
+
+    def startStep(self):
+        """ PLAY rồi chờ bước gửi đầu tiên vào tới lúc đọc frame (chưa gửi). """
+        self.worker.startStreaming()
+        self.assertTrue(self.stream.entered.wait(2))
+
+    def assertStepFinishedCleanly(self):
+        """ Bước dở dang gửi được frame của nó, không lỗi, và không có bước nào sau khi phiên đóng. """
+        self.assertTrue(self.receiver.recv(65536))
+        self.assertEqual(self.worker.metrics.sendErrors.default.value, 0)
+        self.assertTrue(self.stream.closed)
+        self.assertEqual(self.rtpSocket.fileno(), -1)
+        self.assertIsNone(self.worker.rtpSender)
+        time.sleep(0.1)
+        self.assertEqual(self.stream.frames, 1)
+
+    def test_teardown_waits_for_step_in_flight(self):
+        self.startStep()
+        teardown = threading.Thread(target=self.worker.releaseSession)
+        teardown.start()
+        time.sleep(0.05)
+        # Bước vẫn đang chạy: socket RTP, sender và file chưa bị đóng
+        self.assertTrue(teardown.is_alive())
+        self.assertFalse(self.stream.closed)
+        self.assertNotEqual(self.rtpSocket.fileno(), -1)
+
+        self.stream.proceed.set()
+        teardown.join(2)
+        self.assertFalse(teardown.is_alive())
+        self.assertStepFinishedCleanly()
+
+    def test_idle_expiry_waits_for_step_in_flight(self):
+        """ SessionTable.reap -> expire (đóng kết nối) -> luồng nhận lệnh close() -> releaseSession. """
+        now = [0.0]
+        self.worker.sessions = SessionTable(timeout=10, clock=lambda: now[0])
+        self.worker.run()
+        self.startStep()
+        now[0] = 11.0
+        self.assertEqual(self.worker.sessions.reap(), 1)
+        time.sleep(0.05)
+        self.assertFalse(self.stream.closed)
+        self.assertNotEqual(self.rtpSocket.fileno(), -1)
+
+        self.stream.proceed.set()
+        deadline = time.monotonic() + 2
+        while not self.stream.closed and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertStepFinishedCleanly()
+        self.assertEqual(self.worker.sessions.stats()['connections'], 0)
+        self.assertEqual(self.rtspServer.fileno(), -1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import socket
+import unittest
+
+from src.server.packetizer import PacketizedFrame, RtpSender, MAX_RTP_PAYLOAD
+from src.server.metrics import ServerMetrics
+from src.server.pacing import FramePacer
+from src.server.server_worker import ServerWorker
+
+FRAME = PacketizedFrame(b'\xff\xd8' + bytes(3 * MAX_RTP_PAYLOAD) + b'\xff\xd9')
+
+class StaticVideoStream:
+    """ VideoStream giả: luôn trả cùng 1 frame. """
+
+    def __init__(self):
+        self.frames = 0
+
+    def nextPacketizedFrame(self):
+        self.frames += 1
+        return FRAME
+
+    def lastFrameNbr(self):
+        return self.frames - 1
+
+    def frameNbr(self):
+        return self.frames
+
+class SendMetricsTest(unittest.TestCase):
+    """ Counter của phiên chỉ tính frame gửi trọn, theo số gói dữ liệu / FEC rtpSender thật sự gửi. """
+
+    def setUp(self):
+        self.receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.receiver.bind(('127.0.0.1', 0))
+        self.rtpSocket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        worker = ServerWorker({'videoStream': StaticVideoStream(), 'session': 1})
+        worker.metrics = ServerMetrics()
+        worker.rtpSender = RtpSender(self.rtpSocket, self.receiver.getsockname())
+        worker.sessionStats = worker.metrics.openSession(1)
+        self.worker = worker
+
+    def tearDown(self):
+        self.receiver.close()
+        self.rtpSocket.close()
+
+    def counters(self):
+        stats = self.worker.sessionStats
+        return stats.frames, stats.packets, stats.bytes, stats.fecPackets, stats.fecBytes
+
+    def test_sent_frame(self):
+        self.worker.sendFrame()
+        self.assertEqual(self.counters(), (1, len(FRAME.fragments()), len(FRAME), 0, 0))
+
+    def test_fec_parity_counted(self):
+        self.worker.rtpSender.fecK = 2
+        self.worker.sendFrame()
+        groups = FRAME.parity(2)
+        fecBytes = sum(2 + len(body) for _, _, body in groups)
+        self.assertEqual(self.counters(), (1, len(FRAME.fragments()), len(FRAME), len(groups), fecBytes))
+
+    def test_failed_send_not_counted(self):
+        self.rtpSocket.close()
+        self.worker.sendFrame()
+        self.assertEqual(self.counters(), (0, 0, 0, 0, 0))
+        self.assertEqual(self.worker.metrics.sendErrors.default.value, 1)
+
+    def test_legacy_path(self):
+        self.worker.PREPACKETIZE = False
+        self.worker.sendFrame()
+        self.assertEqual(self.counters(), (1, -(-len(FRAME) // MAX_RTP_PAYLOAD), len(FRAME), 0, 0))
+
+    def shapedFrame(self, failAfter=None):
+        """ Gửi 1 frame qua TokenBucket (SHAPE_BURST = 1: 1 gói / bước); failAfter bước thì socket hỏng. """
+        worker = self.worker
+        worker.SHAPE_BURST = 1
+        worker.pacer = FramePacer(worker.fps)
+        worker.shaper = worker.makeShaper(worker.pacer.clock)
+        steps = 0
+        while True:
+            if steps == failAfter:
+                self.rtpSocket.close()
+            worker.shapedStep()
+            steps += 1
+            if worker.inFlight is None:
+                return steps
+
+    def test_shaped_frame_counted_once_complete(self):
+        self.worker.rtpSender.fecK = 2
+        steps = self.shapedFrame()
+        self.assertGreater(steps, 1)
+        groups = FRAME.parity(2)
+        fecBytes = sum(2 + len(body) for _, _, body in groups)
+        self.assertEqual(self.counters(), (1, len(FRAME.fragments()), len(FRAME), len(groups), fecBytes))
+
+    def test_shaped_frame_dropped_midway_not_counted(self):
+        self.shapedFrame(failAfter=1)
+        self.assertEqual(self.counters(), (0, 0, 0, 0, 0))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import io
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+from benchmarks.media import writeMjpeg, makeFrame
+from benchmarks.bench_standard_scan import legacyReadStandardFrame
+from src.common.video_stream import VideoStream
+
+SOI, EOI = b'\xff\xd8', b'\xff\xd9'
+
+def legacyFrames(data):
+    """ Các frame bộ quét cũ (read(1) từng byte) tách ra từ data. """
+    file = io.BytesIO(data)
+    frames = []
+    while True:
+        frame = legacyReadStandardFrame(file)
+        if frame is None:
+            return frames
+        frames.append(frame)
+
+class StandardScanTest(unittest.TestCase):
+    """ Bộ quét mmap.find() của STANDARD mode cho cùng kết quả với bộ quét byte-pair cũ trên dữ liệu tổng hợp. """
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.rng = random.Random(953)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def write(self, data, name='movie.Mjpeg'):
+        path = os.path.join(self.folder, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def scan(self, path):
+        """ (frame đọc tuần tự bằng nextFrame, frame theo scanFrames / FrameIndex). """
+        stream = VideoStream(path)
+        try:
+            self.assertNotEqual(stream.mode, "PROPRIETARY")
+            frames = []
+            while True:
+                frame = stream.nextFrame()
+                if frame is None:
+                    break
+                frames.append(bytes(frame))
+            self.assertEqual(stream.frameNbr(), len(frames))
+            with open(path, 'rb') as f:
+                data = f.read()
+            indexed = [data[offset:offset + length] for offset, length in stream.scanFrames()]
+            return frames, indexed
+        finally:
+            stream.close()
+
+    def assertParity(self, data, expected=None):
+        frames, indexed = self.scan(self.write(data))
+        self.assertEqual(frames, legacyFrames(data))
+        self.assertEqual(indexed, frames)
+        if expected is not None:
+            self.assertEqual(frames, expected)
+        return frames
+
+    def frames(self, count, size=300):
+        return [makeFrame(size + 37 * i, self.rng) for i in range(count)]
+
+    def test_generated_file(self):
+        path = writeMjpeg(os.path.join(self.folder, 'standard.Mjpeg'), 12, 1500, mode="STANDARD")
+        with open(path, 'rb') as f:
+            data = f.read()
+        frames = self.assertParity(data)
+        self.assertEqual(len(frames), 12)
+        self.assertEqual(b''.join(frames), data)
+
+    def test_soi_before_eoi_splits_frame(self):
+        # Frame 1 thiếu EOI: kết thúc ngay trước SOI của frame kế tiếp
+        first, second, third = self.frames(3)
+        self.assertParity(first[:-2] + second + third, [first[:-2], second, third])
+
+    def test_truncated_last_frame(self):
+        first, second, third = self.frames(3)
+        for cut in (2, 3, len(third) // 2, len(third) - 1):
+            with self.subTest(cut=cut):
+                self.assertParity(first + second + third[:cut], [first, second])
+
+    def test_leading_garbage(self):
+        first, second = self.frames(2)
+        # Rác chứa 0xFF, 'FF FF D8' (SOI sau 1 byte 0xFF lẻ) và EOI lạc
+        for garbage in (b'\x00' * 17, b'\xff\x00\xffjunk', b'\xd9\xff\xd9\xff', b'abc\xff'):
+            with self.subTest(garbage=garbage):
+                self.assertParity(garbage + first + second, [first, second])
+
+    def test_garbage_between_frames(self):
+        first, second = self.frames(2)
+        self.assertParity(first + b'\x00\xff\x00' * 5 + second, [first, second])
+
+    def test_no_frames(self):
+        self.assertParity(b'', [])
+        self.assertParity(b'\x00\xff\x11' * 40, [])
+        self.assertParity(SOI + bytes(100), [])
+
+    def test_fill_byte_before_eoi(self):
+        # 'FF FF D9' (byte đệm 0xFF trước EOI, hợp lệ trong JPEG): bộ quét cũ ăn cặp FF FF rồi bỏ qua EOI,
+        # chỉ cắt được khi gặp SOI kế tiếp -> frame cuối bị coi là cụt. Bộ quét mmap cắt đúng tại EOI.
+        first, second = self.frames(2)
+        padded = second[:-2] + b'\xff' + EOI
+        frames, indexed = self.scan(self.write(first + padded))
+        self.assertEqual(frames, [first, padded])
+        self.assertEqual(indexed, frames)
+        self.assertEqual(legacyFrames(first + padded), [first])
+        # Có SOI ngay sau: cả 2 bộ quét cho cùng kết quả
+        self.assertParity(padded + first, [padded, first])
+
+if __name__ == '__main__':
+    unittest.main()